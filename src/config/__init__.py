@@ -65,7 +65,8 @@ from .test_scenarios import (
 # API configuration
 from .api_config import (
     API_ENDPOINTS,
-    API_SETTINGS
+    API_SETTINGS,
+    LOCAL_DATA_SOURCES
 )
 
 # Backward compatibility - export all constants as they were
@@ -114,5 +115,6 @@ __all__ = [
     
     # API Config
     'API_ENDPOINTS',
-    'API_SETTINGS'
+    'API_SETTINGS',
+    'LOCAL_DATA_SOURCES'
 ]
\ No newline at end of file
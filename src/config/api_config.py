@@ -15,6 +15,7 @@ API_ENDPOINTS = {
     'clinvar_api': 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi',
     'clingen_erepo': 'https://erepo.genome.network/evrepo/api',
     'clingen_search': 'https://search.clinicalgenome.org/kb/gene-validity/',
+    'clingen_validity_csv': 'https://search.clinicalgenome.org/kb/gene-validity/download',
     'clingen_dosage_tsv': 'https://ftp.clinicalgenome.org/ClinGen_gene_curation_list_GRCh38.tsv',
     
     # Population frequency databases
@@ -39,5 +40,30 @@ API_SETTINGS = {
     'enabled': True,  # Master switch for all API integrations
     'timeout': 30,    # Default timeout in seconds
     'max_retries': 3, # Maximum retry attempts
-    'cache_ttl': 3600 # Cache time-to-live in seconds
-}
\ No newline at end of file
+    'cache_ttl': 3600, # Cache time-to-live in seconds
+    'gnomad_graphql_batch_size': 50,  # Aliased variant() selections per gnomAD GraphQL request
+    'gnomad_bloom_fpr': 0.001  # False-positive rate of newly built gnomAD site Bloom filters
+}
+
+# Local (offline) data sources. Each entry is a file path or None; when None,
+# the matching ACMG_* environment variable is consulted. Local sources are
+# queried before the remote APIs and work without network access.
+LOCAL_DATA_SOURCES = {
+    'dbnsfp': None,  # bgzip + tabix indexed dbNSFP extract (env: ACMG_DBNSFP_PATH)
+    'gnomad': None,  # Binary gnomAD frequency store, see utils/gnomad_store.py (env: ACMG_GNOMAD_STORE)
+    'gnomad_bloom': None,  # Bloom filter of gnomAD site keys for absence checks, see utils/gnomad_bloom.py (env: ACMG_GNOMAD_BLOOM)
+    'alphamissense': None,  # AlphaMissense score store, see utils/alphamissense_store.py (env: ACMG_ALPHAMISSENSE_STORE)
+    'clinvar': None,  # ClinVar release snapshot, see utils/clinvar_snapshot.py (env: ACMG_CLINVAR_SNAPSHOT)
+    'cancer_hotspots': None,  # CancerHotspots table (TSV/CSV export or JSON), see utils/cancer_hotspots.py (env: ACMG_CANCER_HOTSPOTS)
+    'gnomad_constraint': None,  # gnomAD constraint metrics TSV, see utils/gnomad_constraint.py (env: ACMG_GNOMAD_CONSTRAINT)
+    'clingen_validity': None,  # ClinGen gene-validity CSV export or saved snapshot, see utils/clingen_validity.py (env: ACMG_CLINGEN_VALIDITY)
+    'hgnc': None,  # HGNC complete set (hgnc_complete_set.txt) or saved index, see utils/hgnc_index.py (env: ACMG_HGNC_PATH)
+    'reference_genome': None,  # GRCh38 reference, FASTA (+.fai) or UCSC .2bit, see utils/reference_genome.py (env: ACMG_REFERENCE_GENOME)
+    'liftover_chain': None,  # UCSC GRCh37 -> GRCh38 chain file (hg19ToHg38.over.chain.gz), see utils/liftover.py (env: ACMG_LIFTOVER_CHAIN)
+    'transcripts': None,  # RefSeq/MANE GFF3 transcript models or saved index, see utils/transcript_index.py (env: ACMG_TRANSCRIPT_GFF)
+    'phylop': None,  # phyloP conservation track, bigWig or bedGraph, see utils/conservation_tracks.py (env: ACMG_PHYLOP_TRACK)
+    'phastcons': None,  # phastCons conservation track, bigWig or bedGraph (env: ACMG_PHASTCONS_TRACK)
+    'gerp': None,  # GERP++ RS track, bigWig or bedGraph (env: ACMG_GERP_TRACK)
+    'hpo_ontology': None,  # HPO ontology (hp.obo), see utils/hpo_ontology.py (env: ACMG_HPO_OBO)
+    'hpo_annotations': None,  # HPO annotations (phenotype.hpoa) for term information content (env: ACMG_HPO_ANNOTATIONS)
+}
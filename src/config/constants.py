@@ -26,7 +26,7 @@ from .ui_config import (
 )
 from .validation import VALIDATION_PATTERNS, VARIANT_CONSEQUENCES, ALL_VARIANT_CONSEQUENCES, ALIASES
 from .test_scenarios import TEST_SCENARIOS, TEST_MODE_DATA
-from .api_config import API_ENDPOINTS, API_SETTINGS
+from .api_config import API_ENDPOINTS, API_SETTINGS, LOCAL_DATA_SOURCES
 
 # =============================================================================
 # PM1 Hotspot/Domain Evidence Thresholds
@@ -75,6 +75,16 @@ PHENOTYPE_SIMILARITY_THRESHOLDS = {
     'BP5': 0.2,           # Low match -> BP5 (phenotype inconsistent with gene-disease)
 }
 
+# Thresholds used instead when an HPO ontology is configured. The Lin
+# best-match average gives related (ancestor/descendant) terms partial credit,
+# so it runs higher than weighted Jaccard for overlapping sets, while
+# unrelated terms share only low-information ancestors and score near 0.
+PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY = {
+    'PP4': 0.85,          # Near-identical or directly related phenotype sets
+    'PP4_SUPPORTING': 0.6, # Most patient terms close to a gene term
+    'BP5': 0.1,           # Only generic ancestors in common
+}
+
 # Low-information HPO terms that should receive reduced weight in similarity calculations.
 # These terms are overly generic and can cause false-positive PP4 evidence when used alone.
 # 
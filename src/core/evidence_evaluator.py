@@ -55,17 +55,17 @@ class InframeAnalyzer:
     Evaluates whether in-frame indels affect critical functional regions,
     which influences PM4 (protein length changes) and BP3 (repeat region) criteria.
     
+    Region membership is an overlap query of the affected codon range against
+    the shared per-gene domain index (see utils/domain_index.py).
+    
     Attributes:
-        critical_regions: Dict mapping genes to critical region coordinates
-        repeat_regions: Dict mapping genes to repeat region coordinates
-        domain_boundaries: Dict mapping genes to functional domain boundaries
+        domain_index: Shared DomainIndex with critical, hotspot, domain and repeat regions
     """
     def __init__(self):
         import logging
+        from utils.domain_index import get_domain_index
         self.logger = logging.getLogger("InframeAnalyzer")
-        self.critical_regions = self._load_critical_regions()
-        self.repeat_regions = self._load_repeat_regions()
-        self.domain_boundaries = self._load_domain_boundaries()
+        self.domain_index = get_domain_index()
 
     def evaluate_inframe_deletion(self, variant_data) -> Optional[str]:
         """
@@ -89,47 +89,49 @@ class InframeAnalyzer:
         return None
 
     def _affects_critical_region(self, variant_data):
-        gene = variant_data.basic_info.get('gene', None)
-        hgvs_c = variant_data.basic_info.get('hgvs_c', None)
-        position = self._extract_position(hgvs_c)
-        if position is None:
-            return False
-        if gene in self.critical_regions:
-            for region in self.critical_regions[gene]:
-                if region['start'] <= position <= region['end']:
-                    return True
-        return False
+        return bool(self._overlapping_regions(variant_data, ('critical', 'hotspot')))
 
     def _affects_functional_domain(self, variant_data):
-        return False
+        return bool(self._overlapping_regions(variant_data, ('domain',)))
 
     def _affects_structural_integrity(self, variant_data):
         return False
 
     def _in_repeat_region(self, variant_data):
-        return False
+        return bool(self._overlapping_regions(variant_data, ('repeat',)))
 
-    def _extract_position(self, hgvs_c):
+    def _overlapping_regions(self, variant_data, kinds):
+        gene = variant_data.basic_info.get('gene', None)
+        codons = self._extract_codon_range(variant_data.basic_info.get('hgvs_c', None))
+        if not gene or codons is None:
+            return []
+        return self.domain_index.query(gene, codons[0], codons[1], kinds=kinds)
+
+    def _extract_codon_range(self, hgvs_c):
+        """Return the (first, last) codons spanned by a c. position or range."""
+        positions = self._extract_positions(hgvs_c)
+        if positions is None:
+            return None
+        return (positions[0] - 1) // 3 + 1, (positions[1] - 1) // 3 + 1
+
+    def _extract_positions(self, hgvs_c):
         import re
         if not hgvs_c:
             if hasattr(self, 'logger'):
                 self.logger.warning("hgvs_c is None or empty")
             return None
-        match = re.search(r'c\.(\d+)', hgvs_c)
+        match = re.search(r'c\.(\d+)(?:[+-]\d+)?(?:_(\d+))?', hgvs_c)
         if match:
-            return int(match.group(1))
+            first = int(match.group(1))
+            last = int(match.group(2)) if match.group(2) else first
+            return min(first, last), max(first, last)
         if hasattr(self, 'logger'):
             self.logger.warning(f"No position found in hgvs_c: {hgvs_c}")
         return None
 
-    def _load_critical_regions(self):
-        return {'TP53': [{'start': 730, 'end': 750}]}
-
-    def _load_repeat_regions(self):
-        return {}
-
-    def _load_domain_boundaries(self):
-        return {}
+    def _extract_position(self, hgvs_c):
+        positions = self._extract_positions(hgvs_c)
+        return positions[0] if positions else None
 """
 Evidence Evaluator Module
 =========================
@@ -183,6 +185,14 @@ class EvidenceEvaluator:
             self.api_client = None
             self.api_enabled = False
         
+        # A local ClinVar snapshot answers PP5/BP6 even with remote APIs disabled
+        from utils.clinvar_snapshot import get_clinvar_snapshot
+        self.clinvar_local = not test_mode and get_clinvar_snapshot() is not None
+        
+        # A gnomAD site Bloom filter settles "absent from gnomAD" (PM2) offline
+        from utils.gnomad_bloom import get_gnomad_bloom
+        self.gnomad_bloom = None if test_mode else get_gnomad_bloom()
+        
         # Initialize multi-source API clients for predictors and population data
         self._init_multi_source_clients()
         
@@ -225,17 +235,33 @@ class EvidenceEvaluator:
             except ImportError:
                 pass  # Cache module not available - continue without caching
             
+            # Optional offline sources (LOCAL_DATA_SOURCES / ACMG_* environment variables)
+            local_dbnsfp = None
+            local_gnomad = None
+            local_alphamissense = None
+            if not self.test_mode:
+                from utils.dbnsfp_backend import open_local_dbnsfp
+                from utils.gnomad_store import get_gnomad_store
+                from utils.alphamissense_store import get_alphamissense_store
+                local_dbnsfp = open_local_dbnsfp()
+                local_gnomad = get_gnomad_store()
+                local_alphamissense = get_alphamissense_store()
+            
             self.predictor_client = PredictorAPIClient(
                 api_enabled=API_SETTINGS.get('enabled', True),
                 timeout=API_SETTINGS.get('timeout', 15),
                 test_mode=self.test_mode,
-                result_cache=result_cache
+                result_cache=result_cache,
+                local_backend=local_dbnsfp,
+                alphamissense_store=local_alphamissense
             )
             self.population_client = PopulationAPIClient(
                 api_enabled=API_SETTINGS.get('enabled', True),
                 timeout=API_SETTINGS.get('timeout', 15),
                 test_mode=self.test_mode,
-                result_cache=result_cache
+                result_cache=result_cache,
+                local_store=local_gnomad,
+                bloom_filter=self.gnomad_bloom
             )
             
             # Store cache reference for potential direct access
@@ -661,6 +687,11 @@ class EvidenceEvaluator:
                 # Fallback to manual hard-coded list (API unavailable)
                 result = self._check_lof_manual(gene, variant_type, consequence, result)
                 result['details'] += " [gnomAD/ClinGen APIs unavailable - using manual classification]"
+
+            # Last-exon / NMD-escape modulation from the local transcript model
+            truncating = variant_type in ('nonsense', 'frameshift') or consequence in ('stop_gained', 'frameshift_variant')
+            if result['applies'] and truncating:
+                self._apply_nmd_context(variant_data, result)
         
         # Check for intronic variants with high SpliceAI scores (splice-altering)
         elif variant_type == 'intronic':
@@ -692,6 +723,54 @@ class EvidenceEvaluator:
         
         return result
     
+    def _apply_nmd_context(self, variant_data, result: Dict[str, Any]) -> None:
+        """
+        Downgrade PVS1 for truncating variants predicted to escape NMD.
+        
+        Uses the local transcript index (utils/transcript_index.py): a stop in
+        the last exon or within 50 nt of the last exon-exon junction escapes
+        NMD (PVS1_Strong), or PVS1_Moderate when less than 10% of the protein
+        is removed. Frameshifts are located at the first affected codon, so
+        only their escape prediction is conclusive.
+        """
+        if self.test_mode:
+            return
+        from utils.hgvs_parser import parse_hgvs_variant
+        from utils.transcript_index import get_transcript_index
+        index = get_transcript_index()
+        if index is None:
+            return
+        
+        basic_info = variant_data.basic_info
+        hgvs = basic_info.get('hgvs_c') or basic_info.get('hgvs_cdna') or basic_info.get('cdna_change')
+        parsed = parse_hgvs_variant(hgvs) if hgvs else None
+        if not parsed:
+            return
+        context = index.locate(
+            parsed.get('refseq_id') or basic_info.get('transcript'),
+            parsed['position'].partition('_')[0],
+            gene=basic_info.get('gene')
+        )
+        if context is None:
+            return
+        
+        result['transcript_context'] = context.to_dict()
+        if not context.escapes_nmd:
+            result['details'] += f" | Predicted NMD (exon {context.exon or context.intron}/{context.exon_count}, {context.transcript_id})"
+            return
+        
+        removed = None
+        if context.cds_position and context.cds_length:
+            removed = 1 - (context.cds_position - 1) / context.cds_length
+        strength = 'Moderate' if removed is not None and removed < 0.10 else 'Strong'
+        ladder = ('Supporting', 'Moderate', 'Strong', 'Very Strong')
+        if result.get('strength') not in ladder or ladder.index(strength) < ladder.index(result['strength']):
+            result['strength'] = strength
+        where = 'last exon' if context.in_last_exon else f"{context.distance_to_last_junction} nt upstream of the last exon junction"
+        result['details'] += (
+            f" | Predicted to escape NMD ({where}, {context.transcript_id}) - PVS1 {result['strength']}"
+        )
+
     def _check_lof_intolerance(self, gene: str) -> Dict[str, Any]:
         """
         Check if gene is LOF intolerant using gnomAD API or fallback to manual list.
@@ -709,8 +788,10 @@ class EvidenceEvaluator:
         """
         from config.constants import API_SETTINGS
         
-        # Try API if enabled
-        if API_SETTINGS.get('enabled', True) and hasattr(self, 'api_client'):
+        # Try the local constraint table or the API if enabled
+        from utils.gnomad_constraint import get_constraint_table
+        use_constraint = API_SETTINGS.get('enabled', True) or (not self.test_mode and get_constraint_table() is not None)
+        if use_constraint and hasattr(self, 'api_client'):
             try:
                 constraint_data = self.api_client.get_gene_constraint(gene)
                 
@@ -770,9 +851,11 @@ class EvidenceEvaluator:
                 - primary_mechanism (str): LOF mechanism type if found
         """
         from config.constants import API_SETTINGS
+        from utils.clingen_validity import get_validity_snapshot
         
-        # Try API if enabled
-        if API_SETTINGS.get('enabled', True) and hasattr(self, 'api_client'):
+        # Try API if enabled, or the local gene-validity snapshot
+        use_clingen = API_SETTINGS.get('enabled', True) or (not self.test_mode and get_validity_snapshot() is not None)
+        if use_clingen and hasattr(self, 'api_client'):
             try:
                 clingen_data = self.api_client.get_clingen_gene_validity(gene, disease)
                 
@@ -1788,9 +1871,16 @@ class EvidenceEvaluator:
         frequencies = {}
         data_sources = []
         
-        # Source 1: gnomAD v4 API
+        # Source 1: gnomAD site Bloom filter (definite absence), then the gnomAD v4 API
         gnomad_af = None
-        if self.api_client and self.api_enabled:
+        basic_info = variant_data.basic_info
+        bloom_coordinates = [basic_info.get(key) for key in ('chromosome', 'position', 'ref_allele', 'alt_allele')]
+        if self.gnomad_bloom is not None and all(bloom_coordinates) and \
+                self.gnomad_bloom.definitely_absent(*bloom_coordinates):
+            gnomad_af = 0.0
+            frequencies['gnomad_v4'] = gnomad_af
+            data_sources.append(f"gnomAD {self.gnomad_bloom.version_label} (Bloom filter: absent)")
+        elif self.api_client and self.api_enabled:
             try:
                 # Get genomic coordinates if available
                 basic_info = variant_data.basic_info
@@ -2584,7 +2674,7 @@ class EvidenceEvaluator:
         }
         
         # Try API-based ClinVar lookup first
-        if self.api_client and self.api_enabled:
+        if self.api_client and (self.api_enabled or self.clinvar_local):
             try:
                 gene = variant_data.gene
                 hgvs = variant_data.hgvs_c
@@ -3495,7 +3585,7 @@ class EvidenceEvaluator:
         }
         
         # Try API-based ClinVar lookup first
-        if self.api_client and self.api_enabled:
+        if self.api_client and (self.api_enabled or self.clinvar_local):
             try:
                 gene = variant_data.gene
                 hgvs = variant_data.hgvs_c
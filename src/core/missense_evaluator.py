@@ -38,6 +38,11 @@ from config.predictors import (
 )
 
 
+# UniProt region features marking flexible, variation-tolerant sequence; a
+# residue only inside these scores below neutral for domain impact
+LOW_COMPLEXITY_FEATURES = ('disordered', 'compositional bias', 'low complexity')
+
+
 class MissenseEvaluator:
     """
     Evaluates missense variants using multiple evidence sources.
@@ -395,6 +400,20 @@ class MissenseEvaluator:
         if in_functional_domain:
             return 0.6
         
+        # No flags: look the residue up in the shared domain index
+        indexed_regions = []
+        if not domain_name:
+            position = self._extract_protein_position(
+                basic_info.get('hgvs_p') or basic_info.get('amino_acid_change')
+            )
+            if position is not None:
+                indexed_regions = self.domain_regions.query(
+                    basic_info.get('gene'), position, kinds=('domain', 'region', 'critical')
+                )
+            domain_name = ' '.join(
+                f"{region.name} {region.attributes.get('type', '')}" for region in indexed_regions
+            )
+        
         # Check for critical domain keywords
         critical_domains = ['active_site', 'catalytic', 'dna_binding', 'atp_binding',
                            'kinase', 'ring', 'brct', 'zinc_finger']
@@ -404,8 +423,33 @@ class MissenseEvaluator:
                 if critical in domain_lower:
                     return 0.75
         
+        if indexed_regions:
+            # Disordered / compositionally biased segments tolerate substitutions
+            if all(self._is_low_complexity(region) for region in indexed_regions):
+                return 0.35
+            # Indexed domain of unknown benign variation = moderate impact
+            if any(region.kind in ('domain', 'critical') for region in indexed_regions):
+                return 0.6
+            # Other annotated regions (e.g. "Interaction with X") = mild impact
+            return 0.55
+        
         return 0.5  # Neutral when no domain information
     
+    @staticmethod
+    def _is_low_complexity(region) -> bool:
+        """True for disordered, low-complexity and compositional-bias regions."""
+        label = f"{region.name} {region.attributes.get('type', '')}".lower()
+        return any(feature in label for feature in LOW_COMPLEXITY_FEATURES)
+    
+    @staticmethod
+    def _extract_protein_position(hgvs_p: Optional[str]) -> Optional[int]:
+        """Extract the residue number from p.Arg273His / p.R273H / R273H."""
+        if not hgvs_p:
+            return None
+        import re
+        match = re.search(r'(?:p\.)?\(?[A-Za-z]{1,3}(\d+)', hgvs_p)
+        return int(match.group(1)) if match else None
+    
     def _calculate_population_context(self, variant_data) -> float:
         """
         Calculate population context score based on allele frequency.
@@ -628,9 +672,10 @@ class MissenseEvaluator:
         return normalized
     
     # Data loading methods (placeholders for external data sources)
-    def _load_domain_regions(self) -> Dict:
-        """Load functional domain region data."""
-        return {}
+    def _load_domain_regions(self):
+        """Return the shared per-gene domain interval index."""
+        from utils.domain_index import get_domain_index
+        return get_domain_index()
     
     def _load_conservation_data(self) -> Dict:
         """Load conservation score data."""
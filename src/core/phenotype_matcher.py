@@ -13,7 +13,9 @@ with proper HPO ontology tools or semantic similarity APIs.
 Classes:
     - HPOClient: Local HPO term normalization layer
     - GenePhenotypeDatabase: Local gene-phenotype association database
-    - PhenotypeSimilarityCalculator: Weighted Jaccard similarity scoring
+    - GenePhenotypeIndex: Inverted HPO term -> gene index for ranking all genes
+    - PhenotypeSimilarityCalculator: Weighted Jaccard similarity scoring, or
+      ancestor-aware semantic similarity when an HPO ontology is configured
     - PhenotypeMatcher: Main interface for phenotype-based evidence evaluation
 """
 
@@ -21,12 +23,15 @@ import json
 import os
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Any, Union
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any, Union
+
+import numpy as np
 
 # Import thresholds and low-information HPOs from config
 try:
     from config.constants import (
         PHENOTYPE_SIMILARITY_THRESHOLDS,
+        PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY,
         LOW_INFORMATION_HPO,
         LOW_INFORMATION_HPO_WEIGHT,
         MIN_TERMS_FOR_PHENOTYPE_EVIDENCE
@@ -38,6 +43,11 @@ except ImportError:
         'PP4_SUPPORTING': 0.5,
         'BP5': 0.2,
     }
+    PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY = {
+        'PP4': 0.85,
+        'PP4_SUPPORTING': 0.6,
+        'BP5': 0.1,
+    }
     LOW_INFORMATION_HPO = {
         "HP:0002664",  # Neoplasm
         "HP:0000118",  # Phenotypic abnormality
@@ -45,6 +55,9 @@ except ImportError:
     LOW_INFORMATION_HPO_WEIGHT = 0.3
     MIN_TERMS_FOR_PHENOTYPE_EVIDENCE = 3
 
+from utils.hpo_ontology import HPOOntology, get_hpo_ontology
+from utils.hpo_text_matcher import HPOTextMatcher, PhenotypeMention
+
 
 class HPOClient:
     """
@@ -57,6 +70,10 @@ class HPOClient:
     NOTE: This is a simple text-matching approach. For production use, consider
     using proper HPO ontology tools with semantic similarity.
     
+    Longer free text (e.g. a clinical note) that is not a known phrase is
+    scanned with an HPOTextMatcher built over the local synonyms and, when
+    configured, every HPO label and synonym. Negated mentions are skipped.
+    
     Example:
         >>> client = HPOClient()
         >>> client.get_phenotype_terms("breast cancer")
@@ -68,16 +85,20 @@ class HPOClient:
     # Regex pattern for valid HPO IDs (e.g., HP:0000001)
     HPO_PATTERN = re.compile(r'^HP:\d{7}$')
     
-    def __init__(self, synonyms_path: Optional[str] = None):
+    def __init__(self, synonyms_path: Optional[str] = None, ontology: Optional[HPOOntology] = None):
         """
         Initialize the HPO client with local synonyms data.
         
         Args:
             synonyms_path: Optional path to HPO synonyms JSON file.
                           Defaults to src/data/hpo_synonyms.json
+            ontology: Optional HPOOntology whose labels and synonyms are added
+                     to the free-text matcher
         """
         self._synonyms_cache: Optional[Dict] = None
         self._synonyms_path = synonyms_path
+        self._ontology = ontology
+        self._text_matcher: Optional[HPOTextMatcher] = None
         
     def _get_default_path(self) -> Path:
         """Get the default path to the HPO synonyms file."""
@@ -113,6 +134,30 @@ class HPOClient:
         
         return self._synonyms_cache
     
+    def get_text_matcher(self) -> HPOTextMatcher:
+        """Get the free-text phenotype matcher, built once on first use."""
+        if self._text_matcher is None:
+            self._text_matcher = HPOTextMatcher.from_sources(self._load_synonyms(), self._ontology)
+        return self._text_matcher
+    
+    def extract_phenotypes(self, text: str, include_negated: bool = False) -> List[PhenotypeMention]:
+        """
+        Find HPO phenotype mentions in free text such as a clinical note.
+        
+        Args:
+            text: Free text to scan
+            include_negated: Also return mentions preceded by a negation cue
+            
+        Returns:
+            List of PhenotypeMention (hpo_id, text, start, end, negated) in text order
+            
+        Example:
+            >>> client = HPOClient()
+            >>> [m.hpo_id for m in client.extract_phenotypes("Breast cancer at 38, no seizures.")]
+            ['HP:0003002']
+        """
+        return self.get_text_matcher().find(text, include_negated=include_negated)
+    
     def is_hpo_id(self, term: str) -> bool:
         """
         Check if a term is a valid HPO ID.
@@ -192,6 +237,7 @@ class HPOClient:
         - Already valid HPO IDs: returned as-is
         - Free text descriptions: mapped via local synonyms dictionary
         - Plural forms: attempts singular fallback if plural lookup fails
+        - Longer free text: scanned for every HPO phrase it mentions
         - Unknown terms: wrapped as normalized tokens for set comparison
         
         Args:
@@ -246,7 +292,14 @@ class HPOClient:
                 result.add(synonyms[singular])
                 continue
             
-            # Case 4: Try partial matching (for compound terms)
+            # Case 4: Scan free text for all known phrases (clinical notes);
+            # a text whose only mentions are negated contributes nothing
+            mentions = self.extract_phenotypes(term, include_negated=True)
+            if mentions:
+                result.update(m.hpo_id for m in mentions if not m.negated)
+                continue
+            
+            # Case 5: Try partial matching (for compound terms)
             matched = False
             for syn_text, hpo_id in synonyms.items():
                 if syn_text in normalized or normalized in syn_text:
@@ -257,7 +310,7 @@ class HPOClient:
             if matched:
                 continue
             
-            # Case 5: Unknown term - wrap as token for set comparison
+            # Case 6: Unknown term - wrap as token for set comparison
             # This allows the similarity calculator to still work with unknown terms
             result.add(f"TEXT:{normalized}")
         
@@ -292,6 +345,7 @@ class GenePhenotypeDatabase:
         """
         self._cache: Optional[Dict] = None
         self._data_path = data_path
+        self._index: Optional['GenePhenotypeIndex'] = None
     
     def _get_default_path(self) -> Path:
         """Get the default path to the gene phenotypes file."""
@@ -400,6 +454,58 @@ class GenePhenotypeDatabase:
         """Get list of all genes in the database."""
         data = self._load_data()
         return list(data.keys())
+    
+    def get_all_annotations(self) -> Dict[str, Set[str]]:
+        """Get the HPO term set of every gene (used for term information content)."""
+        return {gene: self.get_gene_phenotypes(gene) for gene in self.get_all_genes()}
+    
+    def get_index(self) -> 'GenePhenotypeIndex':
+        """Get the inverted term -> gene index, built once on first use."""
+        if self._index is None:
+            self._index = GenePhenotypeIndex(self.get_all_annotations())
+        return self._index
+
+
+class GenePhenotypeIndex:
+    """
+    Inverted HPO term -> gene index over all genes with phenotype data.
+    
+    Genes are numbered by row (sorted by symbol) and every term keeps a numpy
+    array of the rows of the genes annotated with it. Scoring a patient
+    against all genes then touches only the postings of the patient's own
+    terms instead of every gene's term set.
+    
+    Example:
+        >>> index = GenePhenotypeDatabase().get_index()
+        >>> [index.genes[row] for row in index.term_genes['HP:0003002']]
+        ['BRCA1', 'BRCA2', 'TP53']
+    """
+    
+    def __init__(self, gene_terms: Dict[str, Set[str]]):
+        """
+        Build the index.
+        
+        Args:
+            gene_terms: Gene symbol -> set of HPO IDs; genes without terms are skipped
+        """
+        self.genes: List[str] = sorted(gene for gene, terms in gene_terms.items() if terms)
+        self.gene_terms: List[frozenset] = [frozenset(gene_terms[gene]) for gene in self.genes]
+        self._rows = {gene: row for row, gene in enumerate(self.genes)}
+        
+        postings: Dict[str, List[int]] = {}
+        for row, terms in enumerate(self.gene_terms):
+            for term in terms:
+                postings.setdefault(term, []).append(row)
+        self.term_genes: Dict[str, np.ndarray] = {
+            term: np.array(rows, dtype=np.int32) for term, rows in postings.items()
+        }
+    
+    def __len__(self) -> int:
+        return len(self.genes)
+    
+    def row(self, gene: str) -> Optional[int]:
+        """Row of a gene symbol (case-insensitive), or None if it has no phenotype data."""
+        return self._rows.get(gene.strip().upper()) if gene else None
 
 
 class PhenotypeSimilarityCalculator:
@@ -420,6 +526,16 @@ class PhenotypeSimilarityCalculator:
         - Union weight = sum of weights for all unique HPOs
         - Similarity = intersection_weight / union_weight
     
+    ONTOLOGY MODE: When an HPOOntology is given, similarity is the best-match
+    average of Lin similarity over the HPO is_a graph instead, so a patient
+    term matches the gene's more specific or related terms through their
+    common ancestors. Information content replaces the fixed low-information
+    weights: generic terms such as "Neoplasm" contribute little by construction.
+    Tokens outside the ontology (TEXT: tokens, unknown IDs) stay in the
+    average as exact matches: 1.0 if the other set has the same token, else
+    0.0. Scores in this mode are compared against
+    PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY.
+    
     Example:
         >>> calc = PhenotypeSimilarityCalculator()
         >>> # Generic "Neoplasm" alone should not trigger high similarity
@@ -430,7 +546,9 @@ class PhenotypeSimilarityCalculator:
     def __init__(
         self,
         low_info_hpos: Optional[Set[str]] = None,
-        low_info_weight: float = LOW_INFORMATION_HPO_WEIGHT
+        low_info_weight: float = LOW_INFORMATION_HPO_WEIGHT,
+        ontology: Optional[HPOOntology] = None,
+        information_content=None
     ):
         """
         Initialize the calculator with low-information HPO configuration.
@@ -438,9 +556,16 @@ class PhenotypeSimilarityCalculator:
         Args:
             low_info_hpos: Set of HPO IDs to down-weight. Defaults to LOW_INFORMATION_HPO.
             low_info_weight: Weight for low-information terms (0.0-1.0). Default 0.3.
+            ontology: Optional HPOOntology enabling ancestor-aware similarity.
+            information_content: Optional per-term IC array for the ontology.
+                                Defaults to the ontology's own IC.
         """
         self.low_info_hpos = low_info_hpos or LOW_INFORMATION_HPO
         self.low_info_weight = low_info_weight
+        self.ontology = ontology
+        self.information_content = information_content
+        # Per-gene arrays of the last index scored by calculate_similarity_many
+        self._layout: Optional[Dict[str, Any]] = None
     
     def _get_term_weight(self, term: str) -> float:
         """
@@ -510,6 +635,23 @@ class PhenotypeSimilarityCalculator:
         if not set_a or not set_b:
             return 0.0
         
+        # Ancestor-aware best-match average; other tokens score as exact matches
+        if self.ontology is not None:
+            terms_a = self.ontology.to_indices(set_a)
+            terms_b = self.ontology.to_indices(set_b)
+            other_a = [term for term in set_a if term not in self.ontology]
+            other_b = [term for term in set_b if term not in self.ontology]
+            exact = sum(1 for term in other_a if term in set_b)
+            best_a = best_b = 0.0
+            if len(terms_a) and len(terms_b):
+                matrix = self.ontology.similarity_matrix(
+                    terms_a, terms_b, 'lin', self.information_content
+                )
+                best_a, best_b = matrix.max(axis=1).sum(), matrix.max(axis=0).sum()
+            similarity = ((best_a + exact) / (len(terms_a) + len(other_a))
+                          + (best_b + exact) / (len(terms_b) + len(other_b))) / 2
+            return max(0.0, min(1.0, float(similarity)))
+        
         # Calculate weighted intersection and union
         intersection = set_a & set_b
         union = set_a | set_b
@@ -530,6 +672,118 @@ class PhenotypeSimilarityCalculator:
         similarity = intersection_weight / union_weight
         return max(0.0, min(1.0, similarity))
     
+    def calculate_similarity_many(
+        self,
+        patient_terms: Union[Set[str], List[str]],
+        index: GenePhenotypeIndex
+    ) -> np.ndarray:
+        """
+        Similarity of one patient term set to every gene of an index.
+        
+        Gives the same score as calculate_similarity for each gene, in one
+        vectorized pass:
+        - Weighted Jaccard: each patient term adds its weight to the
+          intersection of the genes in its posting list; union weights follow
+          from the precomputed per-gene term weights.
+        - Ontology mode: one patient x (all annotated terms) Lin matrix, reduced
+          per gene with maximum.reduceat / add.reduceat for the best-match average;
+          exact matches of non-ontology tokens come from the posting lists.
+        
+        Args:
+            patient_terms: Set or list of patient HPO terms/tokens
+            index: GenePhenotypeIndex to score against
+            
+        Returns:
+            Array of similarities aligned with index.genes
+        """
+        set_a = set(patient_terms) if not isinstance(patient_terms, set) else patient_terms
+        scores = np.zeros(len(index), dtype=np.float64)
+        if not set_a or not len(index):
+            return scores
+        
+        layout = self._index_layout(index)
+        if self.ontology is not None:
+            return self._best_match_many(set_a, index, layout)
+        
+        # Weighted Jaccard for all genes
+        intersection = np.zeros(len(index), dtype=np.float64)
+        for term in set_a:
+            rows = index.term_genes.get(term)
+            if rows is not None:
+                intersection[rows] += self._get_term_weight(term)
+        patient_weight = sum(self._get_term_weight(term) for term in set_a)
+        union = patient_weight + layout['gene_weights'] - intersection
+        np.divide(intersection, union, out=scores, where=union > 0)
+        return np.clip(scores, 0.0, 1.0)
+    
+    def _best_match_many(
+        self,
+        set_a: Set[str],
+        index: GenePhenotypeIndex,
+        layout: Dict[str, Any]
+    ) -> np.ndarray:
+        """Ontology-mode calculate_similarity for every gene of an index."""
+        terms_a = self.ontology.to_indices(set_a)
+        other_a = [term for term in set_a if term not in self.ontology]
+        
+        # Exact matches of non-ontology tokens count on both sides of the average
+        exact = np.zeros(len(index), dtype=np.float64)
+        for term in other_a:
+            rows = index.term_genes.get(term)
+            if rows is not None:
+                exact[rows] += 1.0
+        patient_best = exact.copy()
+        gene_best = exact.copy()
+        
+        genes = layout['ontology_genes']
+        if len(terms_a) and len(genes):
+            matrix = self.ontology.similarity_matrix(
+                terms_a, layout['ontology_terms'], 'lin', self.information_content
+            )
+            columns, starts = layout['columns'], layout['starts']
+            patient_best[genes] += np.maximum.reduceat(matrix[:, columns], starts, axis=1).sum(axis=0)
+            gene_best[genes] += np.add.reduceat(matrix.max(axis=0)[columns], starts)
+        
+        gene_counts = layout['term_counts']
+        scores = np.zeros(len(index), dtype=np.float64)
+        np.divide(gene_best, gene_counts, out=scores, where=gene_counts > 0)
+        scores = (patient_best / (len(terms_a) + len(other_a)) + scores) / 2
+        return np.clip(scores, 0.0, 1.0)
+    
+    def _index_layout(self, index: GenePhenotypeIndex) -> Dict[str, Any]:
+        """Per-gene weights and ontology columns of an index, computed once per index."""
+        layout = self._layout
+        if layout is not None and layout['index'] is index:
+            return layout
+        
+        layout = {
+            'index': index,
+            'gene_weights': np.array([
+                sum(self._get_term_weight(term) for term in terms) for terms in index.gene_terms
+            ], dtype=np.float64),
+            'ontology_genes': np.zeros(0, dtype=np.int64),
+        }
+        if self.ontology is not None:
+            # Deduplicated ontology indices per gene, as columns into one shared term array
+            per_gene = [self.ontology.to_indices(terms) for terms in index.gene_terms]
+            layout['term_counts'] = np.array([
+                len(known) + sum(1 for term in terms if term not in self.ontology)
+                for known, terms in zip(per_gene, index.gene_terms)
+            ], dtype=np.float64)
+            rows = np.array([row for row, terms in enumerate(per_gene) if len(terms)], dtype=np.int64)
+            if len(rows):
+                known = [per_gene[row] for row in rows]
+                ontology_terms, columns = np.unique(np.concatenate(known), return_inverse=True)
+                counts = np.array([len(terms) for terms in known], dtype=np.int64)
+                layout.update({
+                    'ontology_genes': rows,
+                    'ontology_terms': ontology_terms.astype(np.int32),
+                    'columns': columns.ravel(),
+                    'starts': np.concatenate(([0], np.cumsum(counts)[:-1])),
+                })
+        self._layout = layout
+        return layout
+    
     def calculate_overlap_ratio(
         self,
         patient_terms: Union[Set[str], List[str]],
@@ -573,7 +827,8 @@ class PhenotypeMatcher:
     This class combines HPO normalization, gene-phenotype lookup, and weighted
     similarity calculation to provide PP4/BP5-style evidence based on phenotype matching.
     
-    Thresholds are loaded from config.constants.PHENOTYPE_SIMILARITY_THRESHOLDS.
+    Thresholds are loaded from config.constants.PHENOTYPE_SIMILARITY_THRESHOLDS,
+    or PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY when an HPO ontology is used.
     Low-information HPO terms are down-weighted to prevent false PP4 from generic terms.
     
     Usage:
@@ -597,7 +852,8 @@ class PhenotypeMatcher:
         self,
         gene_db_path: Optional[str] = None,
         synonyms_path: Optional[str] = None,
-        thresholds: Optional[Dict[str, float]] = None
+        thresholds: Optional[Dict[str, float]] = None,
+        ontology: Optional[HPOOntology] = None
     ):
         """
         Initialize the phenotype matcher with its components.
@@ -606,22 +862,107 @@ class PhenotypeMatcher:
             gene_db_path: Optional path to gene phenotypes JSON file
             synonyms_path: Optional path to HPO synonyms JSON file
             thresholds: Optional custom thresholds for PP4/BP5 assignment.
-                       Uses PHENOTYPE_SIMILARITY_THRESHOLDS from config if not provided.
+                       Uses PHENOTYPE_SIMILARITY_THRESHOLDS from config if not provided
+                       (PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY with an ontology).
+            ontology: Optional HPOOntology for ancestor-aware similarity.
+                     Defaults to the configured ontology (LOCAL_DATA_SOURCES['hpo_ontology']
+                     or ACMG_HPO_OBO); weighted Jaccard is used when none is configured.
         """
-        self.hpo_client = HPOClient(synonyms_path)
+        if ontology is None:
+            ontology = get_hpo_ontology()
+        self.ontology = ontology
+        
+        self.hpo_client = HPOClient(synonyms_path, ontology=ontology)
         self.gene_phenotype_db = GenePhenotypeDatabase(gene_db_path)
-        self.similarity_calculator = PhenotypeSimilarityCalculator()
+        self.similarity_calculator = PhenotypeSimilarityCalculator(
+            ontology=ontology,
+            information_content=self._information_content(ontology)
+        )
         
-        # Use thresholds from config, allowing override
-        self.thresholds = thresholds or {
-            'PP4': PHENOTYPE_SIMILARITY_THRESHOLDS.get('PP4', 0.8),
-            'PP4_SUPPORTING': PHENOTYPE_SIMILARITY_THRESHOLDS.get('PP4_SUPPORTING', 0.5),
-            'BP5': PHENOTYPE_SIMILARITY_THRESHOLDS.get('BP5', 0.2),
-        }
+        # Use thresholds from config, allowing override; Lin scores have their own scale
+        if ontology is not None:
+            self.thresholds = thresholds or {
+                'PP4': PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY.get('PP4', 0.85),
+                'PP4_SUPPORTING': PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY.get('PP4_SUPPORTING', 0.6),
+                'BP5': PHENOTYPE_SIMILARITY_THRESHOLDS_ONTOLOGY.get('BP5', 0.1),
+            }
+        else:
+            self.thresholds = thresholds or {
+                'PP4': PHENOTYPE_SIMILARITY_THRESHOLDS.get('PP4', 0.8),
+                'PP4_SUPPORTING': PHENOTYPE_SIMILARITY_THRESHOLDS.get('PP4_SUPPORTING', 0.5),
+                'BP5': PHENOTYPE_SIMILARITY_THRESHOLDS.get('BP5', 0.2),
+            }
         
         # Minimum terms for reliable evidence
         self.min_terms = MIN_TERMS_FOR_PHENOTYPE_EVIDENCE
     
+    def _information_content(self, ontology: Optional[HPOOntology]):
+        """
+        Term IC for the similarity calculator.
+        
+        An ontology annotated from phenotype.hpoa keeps its own IC; otherwise
+        IC is taken from the gene annotations of the local gene database.
+        """
+        if ontology is None or ontology.ic_source != 'structure':
+            return None
+        try:
+            return ontology.annotation_ic(self.gene_phenotype_db.get_all_annotations())
+        except ValueError:
+            return None
+    
+    def rank_genes(
+        self,
+        patient_phenotypes: Union[List[str], Set[str]],
+        top_k: Optional[int] = 10,
+        min_similarity: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank every gene in the database by similarity to a patient's phenotypes.
+        
+        Scores all genes at once through the inverted term -> gene index
+        (see PhenotypeSimilarityCalculator.calculate_similarity_many) instead of
+        calling evaluate_phenotype_match per gene.
+        
+        Args:
+            patient_phenotypes: List of patient HPO terms or text descriptions
+            top_k: Number of genes to return (None for all)
+            min_similarity: Drop genes scoring below this similarity
+            
+        Returns:
+            List of dicts with gene, similarity, disease, inheritance and
+            matched_terms (patient terms annotated to the gene), best first.
+            
+        Example:
+            >>> matcher = PhenotypeMatcher()
+            >>> matcher.rank_genes(['breast cancer', 'ovarian neoplasm'], top_k=3)[0]['gene']
+            'BRCA1'
+        """
+        if not patient_phenotypes:
+            return []
+        patient_terms = self.hpo_client.get_phenotype_terms(patient_phenotypes)
+        index = self.gene_phenotype_db.get_index()
+        scores = self.similarity_calculator.calculate_similarity_many(patient_terms, index)
+        
+        rows = np.flatnonzero(scores >= min_similarity) if min_similarity > 0 else np.arange(len(scores))
+        if top_k is not None and top_k < len(rows):
+            # Partial selection, then a stable sort of the survivors (ties by gene symbol)
+            cutoff = np.partition(scores[rows], len(rows) - top_k)[len(rows) - top_k]
+            rows = rows[scores[rows] >= cutoff]
+        rows = sorted(rows, key=lambda row: (-scores[row], index.genes[row]))[:top_k]
+        
+        ranking = []
+        for row in rows:
+            gene = index.genes[row]
+            gene_info = self.gene_phenotype_db.get_gene_info(gene) or {}
+            ranking.append({
+                'gene': gene,
+                'similarity': float(scores[row]),
+                'disease': gene_info.get('disease') if isinstance(gene_info, dict) else None,
+                'inheritance': gene_info.get('inheritance') if isinstance(gene_info, dict) else None,
+                'matched_terms': patient_terms & index.gene_terms[row],
+            })
+        return ranking
+    
     def evaluate_phenotype_match(
         self,
         variant_data,
@@ -663,12 +1004,7 @@ class PhenotypeMatcher:
             >>> result['evidence_code']
             'PP4'  # High match for BRCA1
         """
-        # Get gene from variant data
-        gene = None
-        if hasattr(variant_data, 'gene'):
-            gene = variant_data.gene
-        elif hasattr(variant_data, 'basic_info') and variant_data.basic_info:
-            gene = variant_data.basic_info.get('gene')
+        gene = self._gene_of(variant_data)
         
         if not gene:
             return {
@@ -687,14 +1023,106 @@ class PhenotypeMatcher:
         if patient_phenotypes is None:
             patient_phenotypes = getattr(variant_data, 'patient_phenotypes', None)
         
+        return self._match_result(
+            gene, self.gene_phenotype_db.get_gene_phenotypes(gene), patient_phenotypes
+        )
+    
+    def evaluate_phenotype_matches(
+        self,
+        pairs: Iterable[Tuple[Optional[Union[List[str], Set[str]]], Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate PP4/BP5 for many (patient phenotypes, gene) pairs at once.
+        
+        Intended for cohort reanalysis. Each distinct patient phenotype list is
+        normalized once and scored against all genes in one vectorized pass
+        (see PhenotypeSimilarityCalculator.calculate_similarity_many). Gene
+        term sets and weights come from the cached GenePhenotypeIndex. Every
+        result is identical to what evaluate_phenotype_match returns for the pair.
+        
+        Args:
+            pairs: Iterable of (patient_phenotypes, gene) where gene is a gene
+                   symbol or a VariantData-like object
+                   
+        Returns:
+            List of result dicts in the order of ``pairs``
+            
+        Example:
+            >>> matcher = PhenotypeMatcher()
+            >>> results = matcher.evaluate_phenotype_matches([
+            ...     (['HP:0003002', 'HP:0100013', 'HP:0000137', 'HP:0030075'], 'BRCA1'),
+            ...     (['HP:0001250'], 'BRCA1'),
+            ... ])
+            >>> [r['evidence_code'] for r in results]
+            ['PP4', 'BP5']
+        """
+        index = self.gene_phenotype_db.get_index()
+        patients: Dict[Any, tuple] = {}
+        results = []
+        
+        for patient_phenotypes, variant_data in pairs:
+            if isinstance(variant_data, str):
+                gene = variant_data
+            else:
+                gene = self._gene_of(variant_data)
+                if patient_phenotypes is None:
+                    patient_phenotypes = getattr(variant_data, 'patient_phenotypes', None)
+            if not gene:
+                results.append(self.evaluate_phenotype_match(variant_data, patient_phenotypes))
+                continue
+            
+            row = index.row(gene)
+            if row is None or not patient_phenotypes:
+                results.append(self._match_result(
+                    gene, self.gene_phenotype_db.get_gene_phenotypes(gene), patient_phenotypes
+                ))
+                continue
+            
+            # Normalize and score each distinct patient once
+            key = patient_phenotypes if isinstance(patient_phenotypes, str) else frozenset(map(str, patient_phenotypes))
+            if key not in patients:
+                patient_terms = self.hpo_client.get_phenotype_terms(patient_phenotypes)
+                patients[key] = (
+                    patient_terms,
+                    self.similarity_calculator.calculate_similarity_many(patient_terms, index)
+                )
+            patient_terms, scores = patients[key]
+            
+            results.append(self._match_result(
+                gene, set(index.gene_terms[row]), patient_phenotypes,
+                patient_terms=set(patient_terms), similarity=float(scores[row])
+            ))
+        
+        return results
+    
+    @staticmethod
+    def _gene_of(variant_data) -> Optional[str]:
+        """Gene symbol of a VariantData-like object."""
+        if hasattr(variant_data, 'gene'):
+            return variant_data.gene
+        if hasattr(variant_data, 'basic_info') and variant_data.basic_info:
+            return variant_data.basic_info.get('gene')
+        return None
+    
+    def _match_result(
+        self,
+        gene: str,
+        gene_terms: Set[str],
+        patient_phenotypes,
+        patient_terms: Optional[Set[str]] = None,
+        similarity: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the evaluate_phenotype_match result for a gene.
+        
+        Patient terms and similarity are computed here unless the caller
+        (the batch path) already has them.
+        """
         # Get gene info for disease/inheritance context
         gene_info = self.gene_phenotype_db.get_gene_info(gene)
         disease = gene_info.get('disease') if gene_info else None
         inheritance = gene_info.get('inheritance') if gene_info else None
         
-        # Get gene-associated phenotypes
-        gene_terms = self.gene_phenotype_db.get_gene_phenotypes(gene)
-        
         if not gene_terms:
             return {
                 'similarity': 0.0,
@@ -723,7 +1151,8 @@ class PhenotypeMatcher:
             }
         
         # Normalize patient phenotypes
-        patient_terms = self.hpo_client.get_phenotype_terms(patient_phenotypes)
+        if patient_terms is None:
+            patient_terms = self.hpo_client.get_phenotype_terms(patient_phenotypes)
         
         if not patient_terms:
             return {
@@ -739,9 +1168,10 @@ class PhenotypeMatcher:
             }
         
         # Calculate weighted similarity
-        similarity = self.similarity_calculator.calculate_similarity(
-            patient_terms, gene_terms
-        )
+        if similarity is None:
+            similarity = self.similarity_calculator.calculate_similarity(
+                patient_terms, gene_terms
+            )
         
         # Determine evidence code based on thresholds
         evidence_code, strength, explanation = self._determine_evidence(
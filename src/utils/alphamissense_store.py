@@ -0,0 +1,523 @@
+"""
+Local AlphaMissense Score Store
+===============================
+
+Offline, indexed store of the published AlphaMissense substitution tables
+(Cheng et al., Science 2023), replacing remote AlphaMissense lookups.
+
+Scores are imported once from the public downloads:
+
+- AlphaMissense_aa_substitutions.tsv.gz: uniprot_id, protein_variant, score
+- AlphaMissense_isoforms_aa_substitutions.tsv.gz: transcript_id, ...
+- AlphaMissense_hg38.tsv.gz: genomic coordinates, uniprot_id, transcript_id
+- a gene -> UniProt map (HGNC complete set or a UniProt TSV export)
+
+and written to a single memory-mapped file:
+
+    header    64 bytes         magic, version, section offsets
+    proteins  per protein      L reference residues, then L x 20 uint16
+                               scores (score x 10000, 0xFFFF = none)
+    genomic   8 + 3 bytes/rec  sorted (contig << 32 | pos) keys, then
+                               (ref << 2 | alt) nucleotide byte + score
+    meta      JSON             protein directory, transcript aliases,
+                               gene map, contigs
+
+A protein lookup is a dictionary hit plus a direct offset computation
+(constant time); a genomic lookup is a binary search over the key column.
+
+Usage:
+    import_alphamissense('am.bin', substitutions_path='AlphaMissense_aa_substitutions.tsv.gz',
+                         hg38_path='AlphaMissense_hg38.tsv.gz', gene_map_path='hgnc_complete_set.txt')
+    store = LocalAlphaMissenseStore('am.bin')
+    store.get_protein_score('P04637', 273, 'H', ref_aa='R')
+    store.get_genomic_score('17', 7675088, 'C', 'T')
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import gzip
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils.local_store import LocalResource
+
+
+ALPHAMISSENSE_STORE_MAGIC = b'ACMGAMSS'
+ALPHAMISSENSE_STORE_VERSION = 1
+
+# Published am_class cut-offs
+AM_LIKELY_BENIGN_MAX = 0.34
+AM_LIKELY_PATHOGENIC_MIN = 0.564
+
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY'
+_AA_INDEX = {aa: i for i, aa in enumerate(AMINO_ACIDS)}
+
+AA_THREE_TO_ONE = {
+    'Ala': 'A', 'Arg': 'R', 'Asn': 'N', 'Asp': 'D', 'Cys': 'C',
+    'Gln': 'Q', 'Glu': 'E', 'Gly': 'G', 'His': 'H', 'Ile': 'I',
+    'Leu': 'L', 'Lys': 'K', 'Met': 'M', 'Phe': 'F', 'Pro': 'P',
+    'Ser': 'S', 'Thr': 'T', 'Trp': 'W', 'Tyr': 'Y', 'Val': 'V',
+}
+
+_NUCLEOTIDE_INDEX = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+
+_HEADER = struct.Struct('<8sIIQQQQQQ')
+_KEY = struct.Struct('<Q')
+_GENOMIC_RECORD = struct.Struct('<BH')
+_SCORE = struct.Struct('<H')
+
+_SCORE_NONE = 0xFFFF
+_SCORE_SCALE = 10000
+
+# Gene map column names (HGNC complete set, HGNC custom download, UniProt TSV)
+_GENE_COLUMNS = ('symbol', 'Approved symbol', 'Gene Names (primary)', 'gene_symbol')
+_UNIPROT_COLUMNS = ('uniprot_ids', 'UniProt ID(supplied by UniProt)', 'Entry', 'uniprot_id')
+
+
+class AlphaMissenseStoreError(ValueError):
+    """Raised for malformed input tables or store files."""
+
+
+# =============================================================================
+# Parsing helpers
+# =============================================================================
+
+def parse_protein_variant(variant: str) -> Optional[Tuple[str, int, str]]:
+    """
+    Parse a protein change into (ref_aa, position, alt_aa) one-letter codes.
+
+    Accepts AlphaMissense notation ('R273H') and HGVS ('p.R273H', 'p.Arg273His').
+    Returns None for non-missense or unparseable changes.
+    """
+    variant = variant.strip()
+    if variant.startswith('p.'):
+        variant = variant[2:].strip('()')
+    match = re.fullmatch(r'([A-Z][a-z]{2})(\d+)([A-Z][a-z]{2})', variant)
+    if match:
+        ref, alt = AA_THREE_TO_ONE.get(match.group(1)), AA_THREE_TO_ONE.get(match.group(3))
+        if ref is None or alt is None:
+            return None
+        return ref, int(match.group(2)), alt
+    match = re.fullmatch(r'([A-Z])(\d+)([A-Z])', variant)
+    if match and match.group(1) in _AA_INDEX and match.group(3) in _AA_INDEX:
+        return match.group(1), int(match.group(2)), match.group(3)
+    return None
+
+
+def classify_alphamissense(score: Optional[float]) -> Optional[str]:
+    """Return the published am_class for a score."""
+    if score is None:
+        return None
+    if score < AM_LIKELY_BENIGN_MAX:
+        return 'likely_benign'
+    if score > AM_LIKELY_PATHOGENIC_MIN:
+        return 'likely_pathogenic'
+    return 'ambiguous'
+
+
+def _strip_version(identifier: str) -> str:
+    return identifier.split('.', 1)[0]
+
+
+def _normalize_contig(chrom: str) -> str:
+    chrom = str(chrom)
+    if chrom.lower().startswith('chr'):
+        chrom = chrom[3:]
+    return 'MT' if chrom in ('M', 'm') else chrom
+
+
+def _open_text(path: str):
+    return gzip.open(path, 'rt') if path.endswith(('.gz', '.bgz')) else open(path, 'r')
+
+
+def _iter_table(path: str) -> Iterator[Dict[str, str]]:
+    """Yield rows of an AlphaMissense TSV as dicts (copyright comment lines skipped)."""
+    with _open_text(path) as f:
+        columns = None
+        for line in f:
+            if line.startswith('#') and not line.startswith('#CHROM'):
+                continue
+            fields = line.rstrip('\n').split('\t')
+            if columns is None:
+                columns = [c.lstrip('#') for c in fields]
+                continue
+            yield dict(zip(columns, fields))
+
+
+def load_gene_uniprot_map(path: str) -> Dict[str, str]:
+    """
+    Load gene symbol -> UniProt accession pairs from a TSV.
+
+    Supports the HGNC complete set ('symbol', 'uniprot_ids') and UniProt
+    TSV exports ('Entry', 'Gene Names (primary)'). The first accession
+    listed for a gene is used.
+    """
+    genes = {}
+    with _open_text(path) as f:
+        header = f.readline().rstrip('\n').split('\t')
+        gene_col = next((header.index(c) for c in _GENE_COLUMNS if c in header), None)
+        uniprot_col = next((header.index(c) for c in _UNIPROT_COLUMNS if c in header), None)
+        if gene_col is None or uniprot_col is None:
+            raise AlphaMissenseStoreError(f"{path} has no gene symbol / UniProt columns")
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if max(gene_col, uniprot_col) >= len(fields):
+                continue
+            gene = fields[gene_col].strip().split(' ')[0].split(';')[0].upper()
+            accession = re.split(r'[|;, ]', fields[uniprot_col].strip().strip('"'))[0]
+            if gene and accession and gene not in genes:
+                genes[gene] = accession
+    return genes
+
+
+# =============================================================================
+# Import
+# =============================================================================
+
+class _ProteinWriter:
+    """Stream per-protein score matrices to a data file."""
+
+    def __init__(self, f):
+        self._f = f
+        self.offset = 0
+        self.directory: Dict[str, List[int]] = {}
+        self._current = None
+        self._residues: Dict[int, str] = {}
+        self._scores: Dict[Tuple[int, int], int] = {}
+
+    def add(self, protein_id: str, variant: str, score: str) -> None:
+        parsed = parse_protein_variant(variant)
+        if parsed is None:
+            return
+        ref, position, alt = parsed
+        if protein_id != self._current:
+            self.flush()
+            if protein_id in self.directory:
+                raise AlphaMissenseStoreError(f"Rows for {protein_id} are not contiguous")
+            self._current = protein_id
+        self._residues[position] = ref
+        self._scores[(position, _AA_INDEX[alt])] = min(_SCORE_NONE - 1, round(float(score) * _SCORE_SCALE))
+
+    def flush(self) -> None:
+        if self._current is None:
+            return
+        length = max(self._residues)
+        sequence = bytearray(b'X' * length)
+        for position, ref in self._residues.items():
+            sequence[position - 1] = ord(ref)
+        scores = [_SCORE_NONE] * (length * len(AMINO_ACIDS))
+        for (position, alt_index), value in self._scores.items():
+            scores[(position - 1) * len(AMINO_ACIDS) + alt_index] = value
+        self._f.write(sequence)
+        self._f.write(struct.pack(f'<{len(scores)}H', *scores))
+        self.directory[self._current] = [self.offset, length]
+        self.offset += length + 2 * len(scores)
+        self._current = None
+        self._residues = {}
+        self._scores = {}
+
+
+def import_alphamissense(
+    out_path: str,
+    substitutions_path: Optional[str] = None,
+    hg38_path: Optional[str] = None,
+    isoforms_path: Optional[str] = None,
+    gene_map_path: Optional[str] = None,
+    version: str = '2023'
+) -> Dict[str, int]:
+    """
+    Import published AlphaMissense tables into a store file.
+
+    Args:
+        out_path: Destination store file
+        substitutions_path: AlphaMissense_aa_substitutions.tsv(.gz), keyed by UniProt
+        hg38_path: AlphaMissense_hg38.tsv(.gz); adds the genomic index and
+                   transcript -> UniProt aliases
+        isoforms_path: AlphaMissense_isoforms_aa_substitutions.tsv(.gz), keyed by transcript
+        gene_map_path: Gene symbol -> UniProt TSV (see load_gene_uniprot_map)
+        version: AlphaMissense release label
+
+    Returns:
+        Counts of imported proteins, genomic records, aliases and genes
+
+    Raises:
+        AlphaMissenseStoreError: if a table is not grouped/sorted as published
+    """
+    temp_dir = tempfile.mkdtemp(prefix='acmg_alphamissense_')
+    try:
+        protein_file = os.path.join(temp_dir, 'proteins')
+        keys_file = os.path.join(temp_dir, 'keys')
+        records_file = os.path.join(temp_dir, 'records')
+
+        with open(protein_file, 'wb') as f:
+            writer = _ProteinWriter(f)
+            for path, id_column in ((substitutions_path, 'uniprot_id'), (isoforms_path, 'transcript_id')):
+                if path:
+                    for row in _iter_table(path):
+                        writer.add(row[id_column], row['protein_variant'], row['am_pathogenicity'])
+                    writer.flush()
+        directory = writer.directory
+
+        aliases: Dict[str, str] = {}
+        contigs: List[str] = []
+        genomic_count = 0
+        with open(keys_file, 'wb') as keys, open(records_file, 'wb') as records:
+            if hg38_path:
+                last_key = -1
+                for row in _iter_table(hg38_path):
+                    contig = _normalize_contig(row['CHROM'])
+                    if not contigs or contigs[-1] != contig:
+                        if contig in contigs:
+                            raise AlphaMissenseStoreError(f"{hg38_path} is not sorted by chromosome")
+                        contigs.append(contig)
+                    key = ((len(contigs) - 1) << 32) | int(row['POS'])
+                    if key < last_key:
+                        raise AlphaMissenseStoreError(f"{hg38_path} is not sorted at {row['CHROM']}:{row['POS']}")
+                    last_key = key
+                    ref, alt = _NUCLEOTIDE_INDEX.get(row['REF']), _NUCLEOTIDE_INDEX.get(row['ALT'])
+                    if ref is None or alt is None:
+                        continue
+                    keys.write(_KEY.pack(key))
+                    records.write(_GENOMIC_RECORD.pack(
+                        (ref << 2) | alt, min(_SCORE_NONE - 1, round(float(row['am_pathogenicity']) * _SCORE_SCALE))
+                    ))
+                    genomic_count += 1
+
+                    transcript = row.get('transcript_id')
+                    if transcript and transcript not in directory and transcript not in aliases:
+                        aliases[transcript] = row['uniprot_id']
+
+        genes = load_gene_uniprot_map(gene_map_path) if gene_map_path else {}
+
+        meta = json.dumps({
+            'version': version,
+            'proteins': directory,
+            'aliases': aliases,
+            'genes': genes,
+            'contigs': contigs,
+        }).encode()
+
+        protein_offset = _HEADER.size
+        keys_offset = protein_offset + writer.offset
+        records_offset = keys_offset + genomic_count * _KEY.size
+        meta_offset = records_offset + genomic_count * _GENOMIC_RECORD.size
+
+        tmp_path = f"{out_path}.tmp"
+        with open(tmp_path, 'wb') as out:
+            out.write(_HEADER.pack(ALPHAMISSENSE_STORE_MAGIC, ALPHAMISSENSE_STORE_VERSION, 0, genomic_count,
+                                   protein_offset, keys_offset, records_offset, meta_offset, len(meta)))
+            for part in (protein_file, keys_file, records_file):
+                with open(part, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+            out.write(meta)
+        os.replace(tmp_path, out_path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        'proteins': len(directory),
+        'genomic': genomic_count,
+        'aliases': len(aliases),
+        'genes': len(genes),
+    }
+
+
+# =============================================================================
+# Lookup
+# =============================================================================
+
+class LocalAlphaMissenseStore:
+    """
+    Read-only, memory-mapped AlphaMissense store.
+
+    Usage:
+        store = LocalAlphaMissenseStore('am.bin')
+        accession = store.get_uniprot_accession('TP53')
+        score = store.get_protein_score(accession, 273, 'H')
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise AlphaMissenseStoreError(f"{path} is empty")
+
+        if len(self._mm) < _HEADER.size:
+            self.close()
+            raise AlphaMissenseStoreError(f"{path} is not an AlphaMissense store")
+        (magic, version, _, self._genomic_count, self._protein_offset, self._keys_offset,
+         self._records_offset, meta_offset, meta_size) = _HEADER.unpack_from(self._mm, 0)
+        if magic != ALPHAMISSENSE_STORE_MAGIC or version != ALPHAMISSENSE_STORE_VERSION:
+            self.close()
+            raise AlphaMissenseStoreError(
+                f"{path} is not a version {ALPHAMISSENSE_STORE_VERSION} AlphaMissense store"
+            )
+
+        meta = json.loads(self._mm[meta_offset:meta_offset + meta_size].decode())
+        self.version = meta.get('version', '')
+        self._proteins: Dict[str, List[int]] = meta.get('proteins', {})
+        self._aliases: Dict[str, str] = meta.get('aliases', {})
+        self._genes: Dict[str, str] = meta.get('genes', {})
+        self._contig_ids = {name: i for i, name in enumerate(meta.get('contigs', []))}
+
+        # Version-less transcript IDs resolve as well
+        self._unversioned = {}
+        for identifier in list(self._proteins) + list(self._aliases):
+            self._unversioned.setdefault(_strip_version(identifier), identifier)
+
+    @property
+    def protein_count(self) -> int:
+        return len(self._proteins)
+
+    def get_uniprot_accession(self, gene_symbol: str) -> Optional[str]:
+        """Return the UniProt accession for a gene symbol (case-insensitive)."""
+        if not gene_symbol:
+            return None
+        return self._genes.get(gene_symbol.strip().upper())
+
+    def _resolve(self, protein_id: str) -> Optional[List[int]]:
+        protein_id = protein_id.strip()
+        for candidate in (protein_id, self._unversioned.get(_strip_version(protein_id))):
+            if candidate in self._proteins:
+                return self._proteins[candidate]
+            if candidate in self._aliases:
+                return self._proteins.get(self._aliases[candidate])
+        return None
+
+    def has_protein(self, protein_id: str) -> bool:
+        return self._resolve(protein_id) is not None
+
+    def get_protein_score(
+        self,
+        protein_id: str,
+        position: int,
+        alt_aa: str,
+        ref_aa: Optional[str] = None
+    ) -> Optional[float]:
+        """
+        Look up a substitution by UniProt accession or transcript ID.
+
+        Returns None if the protein, position or substitution is not scored,
+        or if ``ref_aa`` does not match the reference residue.
+        """
+        entry = self._resolve(protein_id)
+        alt_index = _AA_INDEX.get(alt_aa)
+        if entry is None or alt_index is None:
+            return None
+        offset, length = entry
+        if not 1 <= position <= length:
+            return None
+
+        base = self._protein_offset + offset
+        if ref_aa is not None and self._mm[base + position - 1] != ord(ref_aa):
+            return None
+        value = _SCORE.unpack_from(self._mm, base + length + 2 * ((position - 1) * len(AMINO_ACIDS) + alt_index))[0]
+        return None if value == _SCORE_NONE else value / _SCORE_SCALE
+
+    def get_reference_residue(self, protein_id: str, position: int) -> Optional[str]:
+        entry = self._resolve(protein_id)
+        if entry is None or not 1 <= position <= entry[1]:
+            return None
+        residue = chr(self._mm[self._protein_offset + entry[0] + position - 1])
+        return None if residue == 'X' else residue
+
+    def lookup_hgvs(self, gene_or_protein: str, hgvs_protein: str) -> Optional[Dict[str, object]]:
+        """
+        Look up a missense change given a gene symbol (or protein/transcript ID) and HGVS p.
+
+        Returns:
+            Dict with protein_id, position, ref_aa, alt_aa, score and am_class,
+            or None if the change cannot be parsed or the protein is unknown.
+        """
+        parsed = parse_protein_variant(hgvs_protein)
+        if parsed is None:
+            return None
+        protein_id = self.get_uniprot_accession(gene_or_protein) or gene_or_protein
+        if not self.has_protein(protein_id):
+            return None
+        ref_aa, position, alt_aa = parsed
+        residue = self.get_reference_residue(protein_id, position)
+        score = self.get_protein_score(protein_id, position, alt_aa, ref_aa=ref_aa)
+        return {
+            'protein_id': protein_id,
+            'position': position,
+            'ref_aa': ref_aa,
+            'alt_aa': alt_aa,
+            'score': score,
+            'am_class': classify_alphamissense(score),
+            'reference_mismatch': residue is not None and residue != ref_aa,
+        }
+
+    def get_genomic_score(self, chrom: str, pos: int, ref: str, alt: str) -> Optional[float]:
+        """Look up a GRCh38 SNV in the genomic index (binary search)."""
+        contig_id = self._contig_ids.get(_normalize_contig(chrom))
+        ref_index, alt_index = _NUCLEOTIDE_INDEX.get(ref), _NUCLEOTIDE_INDEX.get(alt)
+        if contig_id is None or ref_index is None or alt_index is None:
+            return None
+
+        key = (contig_id << 32) | int(pos)
+        lo, hi = 0, self._genomic_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _KEY.unpack_from(self._mm, self._keys_offset + mid * _KEY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        alleles = (ref_index << 2) | alt_index
+        index = lo
+        while index < self._genomic_count and \
+                _KEY.unpack_from(self._mm, self._keys_offset + index * _KEY.size)[0] == key:
+            packed, value = _GENOMIC_RECORD.unpack_from(
+                self._mm, self._records_offset + index * _GENOMIC_RECORD.size
+            )
+            if packed == alleles:
+                return None if value == _SCORE_NONE else value / _SCORE_SCALE
+            index += 1
+        return None
+
+    def close(self) -> None:
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self) -> 'LocalAlphaMissenseStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# =============================================================================
+# Shared store resolution
+# =============================================================================
+
+_stores = LocalResource('alphamissense', 'ACMG_ALPHAMISSENSE_STORE', LocalAlphaMissenseStore,
+                        label='Local AlphaMissense store', errors=(AlphaMissenseStoreError,))
+
+
+def get_alphamissense_store(path: Optional[str] = None) -> Optional[LocalAlphaMissenseStore]:
+    """
+    Return the shared store, opening it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['alphamissense'], then
+    the ACMG_ALPHAMISSENSE_STORE environment variable. Returns None when
+    nothing is configured or the store cannot be opened.
+    """
+    return _stores.get(path)
+
+
+def clear_alphamissense_stores() -> None:
+    """Close and drop all shared stores (e.g. after a re-import)."""
+    _stores.clear()
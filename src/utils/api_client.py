@@ -128,6 +128,54 @@ import os
 from colorama import Fore, Style, init
 from config.constants import API_ENDPOINTS, OUTPUT_SETTINGS, COLORAMA_COLORS
 from utils.api_error_handler import get_error_handler
+from utils.clingen_dosage import (
+    ClinGenDosageTable,
+    DosageRecord,
+    default_tsv_path,
+    get_dosage_table,
+    register_dosage_table,
+)
+from utils.gnomad_store import get_gnomad_store
+from utils.alphamissense_store import get_alphamissense_store, parse_protein_variant
+from utils.clinvar_snapshot import get_clinvar_snapshot
+from utils.gnomad_constraint import CONSTRAINT_COLUMNS, build_constraint_result, get_constraint_table
+from utils.clingen_validity import ClinGenValiditySnapshot, get_validity_snapshot, validity_snapshot_path
+from utils.local_store import is_snapshot_path
+from utils.hgnc_index import canonical_gene_symbol, get_hgnc_index
+from utils.reference_genome import get_reference_genome
+from utils.conservation_tracks import get_conservation_tracks
+
+# gnomAD GraphQL selection set for batched frequency queries (get_variant_frequencies)
+GNOMAD_FREQUENCY_SELECTION = """{
+    variant_id
+    reference_genome
+    chrom
+    pos
+    ref
+    alt
+    genome {
+      ac
+      an
+      af
+      ac_hom
+      ac_hemi
+      filters
+      faf95 {
+        popmax
+        popmax_population
+      }
+    }
+  }"""
+
+# ClinVar E-utilities batch sizes: positions OR-ed into one esearch term,
+# and records per esummary request (IDs or history-server page)
+CLINVAR_ESEARCH_BATCH_SIZE = 100
+CLINVAR_ESUMMARY_BATCH_SIZE = 500
+
+# Ensembl REST POST limits: symbols per /lookup/symbol, variants per /vep/region
+ENSEMBL_LOOKUP_BATCH_SIZE = 1000
+ENSEMBL_VEP_BATCH_SIZE = 200
+MYGENE_QUERY_BATCH_SIZE = 1000
 
 # Initialize colorama
 init()
@@ -216,6 +264,17 @@ class APIClient:
             }
             self._save_cache()
     
+    def _cache_responses(self, responses: Dict[str, Dict[str, Any]]):
+        """Cache several API responses with a single cache file write."""
+        if self.cache_enabled and responses:
+            timestamp = datetime.now().isoformat()
+            for cache_key, data in responses.items():
+                self.cache[cache_key] = {
+                    'data': data,
+                    'timestamp': timestamp
+                }
+            self._save_cache()
+    
     def _api_call_with_retry(
         self, 
         api_name: str, 
@@ -291,8 +350,11 @@ class APIClient:
         """
         Get chromosome information for a gene from Ensembl with MyGene.info fallback.
         
+        Genes in the local HGNC index (utils/hgnc_index.py) are answered
+        from it without network access; aliases resolve to the approved symbol.
+        
         Args:
-            gene_symbol (str): Gene symbol
+            gene_symbol (str): Gene symbol, alias or previous symbol
             
         Returns:
             Optional[str]: Chromosome or None if not found
@@ -300,7 +362,13 @@ class APIClient:
         if not gene_symbol or gene_symbol.upper() == 'NOT SPECIFIED':
             return None
         
-        cache_key = f"ensembl_chr_{gene_symbol.upper()}"
+        hgnc_index = get_hgnc_index()
+        record = hgnc_index.resolve(gene_symbol) if hgnc_index is not None else None
+        if record is not None and record.chromosome:
+            return record.chromosome
+        
+        gene_symbol = canonical_gene_symbol(gene_symbol)
+        cache_key = f"ensembl_chr_{gene_symbol}"
         cached_result = self._get_cached_response(cache_key)
         
         if cached_result is not None:
@@ -381,6 +449,110 @@ class APIClient:
             print(f"{COLORAMA_COLORS['RED']}❌ Error fetching from MyGene.info: {e}{COLORAMA_COLORS['RESET']}")
             return None
     
+    def get_chromosomes_from_ensembl(self, gene_symbols: list) -> Dict[str, Optional[str]]:
+        """
+        Get chromosomes for many genes with batched Ensembl and MyGene.info lookups.
+        
+        Uncached symbols are sent to Ensembl POST /lookup/symbol in batches of
+        up to ENSEMBL_LOOKUP_BATCH_SIZE; symbols Ensembl does not resolve are
+        retried with one MyGene.info batch query per chunk. Results are cached
+        per gene under the same keys as get_chromosome_from_ensembl().
+        
+        Args:
+            gene_symbols (list): Gene symbols
+            
+        Returns:
+            Dict[str, Optional[str]]: Chromosome (or None) keyed by upper-case symbol
+        """
+        results = {}
+        pending = []
+        queued = set()  # O(1) duplicate check; pending keeps request order
+        aliases = {}
+        hgnc_index = get_hgnc_index()
+        for gene_symbol in gene_symbols:
+            if not gene_symbol or gene_symbol.upper() == 'NOT SPECIFIED':
+                continue
+            record = hgnc_index.resolve(gene_symbol) if hgnc_index is not None else None
+            if record is not None and record.chromosome:
+                results[gene_symbol.strip().upper()] = record.chromosome
+                continue
+            symbol = canonical_gene_symbol(gene_symbol)
+            if symbol != gene_symbol.strip().upper():
+                aliases[gene_symbol.strip().upper()] = symbol
+            if symbol in results or symbol in queued:
+                continue
+            cached_result = self._get_cached_response(f"ensembl_chr_{symbol}")
+            if cached_result is not None:
+                results[symbol] = cached_result.get('chromosome')
+            else:
+                pending.append(symbol)
+                queued.add(symbol)
+        
+        resolved = {}
+        for start in range(0, len(pending), ENSEMBL_LOOKUP_BATCH_SIZE):
+            batch = pending[start:start + ENSEMBL_LOOKUP_BATCH_SIZE]
+            try:
+                print(f"{COLORAMA_COLORS['BLUE']}🔍 Fetching chromosome info for {len(batch)} genes from Ensembl...{COLORAMA_COLORS['RESET']}")
+                response = requests.post(
+                    f"{API_ENDPOINTS['ensembl_rest']}/lookup/symbol/homo_sapiens",
+                    json={'symbols': batch},
+                    headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+                    timeout=30
+                )
+                if response.status_code == 200:
+                    for symbol, data in (response.json() or {}).items():
+                        chromosome = (data or {}).get('seq_region_name')
+                        if chromosome:
+                            resolved[symbol.upper()] = chromosome
+                else:
+                    print(f"{COLORAMA_COLORS['YELLOW']}⚠️ Ensembl API returned status {response.status_code}, trying MyGene.info...{COLORAMA_COLORS['RESET']}")
+            except requests.RequestException as e:
+                print(f"{COLORAMA_COLORS['YELLOW']}⚠️ Error from Ensembl ({e}), trying MyGene.info...{COLORAMA_COLORS['RESET']}")
+        
+        # Fallback to MyGene.info batch query for unresolved symbols
+        missing = [symbol for symbol in pending if symbol not in resolved]
+        for start in range(0, len(missing), MYGENE_QUERY_BATCH_SIZE):
+            batch = missing[start:start + MYGENE_QUERY_BATCH_SIZE]
+            try:
+                response = requests.post(
+                    "https://mygene.info/v3/query",
+                    data={
+                        'q': ','.join(batch),
+                        'scopes': 'symbol',
+                        'species': 'human',
+                        'fields': 'genomic_pos'
+                    },
+                    timeout=30
+                )
+                if response.status_code != 200:
+                    continue
+                for hit in response.json() or []:
+                    symbol = str(hit.get('query', '')).upper()
+                    genomic_pos = hit.get('genomic_pos')
+                    if symbol in resolved or hit.get('notfound') or not genomic_pos:
+                        continue
+                    if isinstance(genomic_pos, list):
+                        genomic_pos = genomic_pos[0]
+                    if genomic_pos.get('chr'):
+                        resolved[symbol] = genomic_pos.get('chr')
+            except Exception as e:
+                print(f"{COLORAMA_COLORS['RED']}❌ Error fetching from MyGene.info: {e}{COLORAMA_COLORS['RESET']}")
+        
+        self._cache_responses({
+            f"ensembl_chr_{symbol}": {'chromosome': chromosome}
+            for symbol, chromosome in resolved.items()
+        })
+        
+        for symbol in pending:
+            results[symbol] = resolved.get(symbol)
+        for alias, symbol in aliases.items():
+            results[alias] = results.get(symbol)
+        
+        if pending:
+            print(f"{COLORAMA_COLORS['GREEN']}✅ Found chromosomes for {len(resolved)}/{len(pending)} genes{COLORAMA_COLORS['RESET']}")
+        
+        return results
+    
     def get_clinvar_status(self, chromosome: str, position: int, 
                           ref_allele: str, alt_allele: str) -> Dict[str, Any]:
         """
@@ -395,6 +567,10 @@ class APIClient:
         Returns:
             Dict[str, Any]: ClinVar information
         """
+        snapshot = get_clinvar_snapshot()
+        if snapshot is not None:
+            return snapshot.status_result(snapshot.get_allele(chromosome, position, ref_allele, alt_allele))
+        
         cache_key = f"clinvar_{chromosome}_{position}_{ref_allele}_{alt_allele}"
         cached_result = self._get_cached_response(cache_key)
         
@@ -515,6 +691,183 @@ class APIClient:
                 'url': f"https://www.ncbi.nlm.nih.gov/clinvar/variation/{clinvar_id}/"
             }
     
+    def get_clinvar_summaries(self, clinvar_ids: list) -> Dict[str, Dict[str, Any]]:
+        """
+        Get parsed ClinVar summaries for many variation IDs.
+        
+        IDs are sent to esummary as comma-separated lists (POST, up to
+        CLINVAR_ESUMMARY_BATCH_SIZE per request) and each record is parsed
+        with _parse_clinvar_summary().
+        
+        Args:
+            clinvar_ids (list): ClinVar variation UIDs (VCV prefixes are stripped)
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Parsed ClinVar information keyed by UID.
+            IDs with no summary record are omitted.
+        """
+        ids = []
+        seen = set()  # O(1) duplicate check; ids keeps request order
+        for clinvar_id in clinvar_ids:
+            uid = str(clinvar_id)
+            if uid.upper().startswith('VCV'):
+                uid = uid[3:].split('.')[0].lstrip('0')
+            if uid and uid not in seen:
+                ids.append(uid)
+                seen.add(uid)
+        
+        records = {}
+        for start in range(0, len(ids), CLINVAR_ESUMMARY_BATCH_SIZE):
+            batch = ids[start:start + CLINVAR_ESUMMARY_BATCH_SIZE]
+            try:
+                batch_records = self._fetch_clinvar_summary_records({'id': ','.join(batch)})
+            except requests.RequestException as e:
+                print(f"Error fetching ClinVar data: {e}")
+                continue
+            if batch_records is not None:
+                records.update(batch_records)
+        
+        summary_data = {'result': records}
+        return {uid: self._parse_clinvar_summary(summary_data, uid) for uid in ids if uid in records}
+    
+    def get_clinvar_status_many(self, variants: list) -> Dict[Tuple[str, int, str, str], Dict[str, Any]]:
+        """
+        Get ClinVar status for many variants with a handful of E-utilities calls.
+        
+        Uncached positions are OR-ed into one esearch per chunk with
+        ``usehistory=y``; the matching summaries are then paged out of the
+        history server (WebEnv/query_key) and mapped back to variants by
+        their GRCh38 location. Where several records share a position, the
+        record whose canonical SPDI alleles match is preferred, otherwise
+        the first record returned. Results have the same shape as
+        get_clinvar_status() and are cached per variant.
+        
+        Args:
+            variants (list): (chromosome, position, ref_allele, alt_allele) tuples
+            
+        Returns:
+            Dict mapping each variant tuple to its ClinVar information.
+        """
+        results = {}
+        pending = []
+        queued = set()  # O(1) duplicate check; pending keeps request order
+        snapshot = get_clinvar_snapshot()
+        for variant in variants:
+            variant = tuple(variant)
+            if variant in results or variant in queued:
+                continue
+            if snapshot is not None:
+                results[variant] = snapshot.status_result(snapshot.get_allele(*variant))
+                continue
+            cached_result = self._get_cached_response(f"clinvar_{'_'.join(map(str, variant))}")
+            if cached_result is not None:
+                results[variant] = cached_result
+            else:
+                pending.append(variant)
+                queued.add(variant)
+        
+        for start in range(0, len(pending), CLINVAR_ESEARCH_BATCH_SIZE):
+            batch = pending[start:start + CLINVAR_ESEARCH_BATCH_SIZE]
+            positions = sorted({(str(chrom), str(pos)) for chrom, pos, _, _ in batch})
+            search_term = ' OR '.join(f"({chrom}[chr] AND {pos}[chrpos])" for chrom, pos in positions)
+            
+            try:
+                search_response = requests.post(
+                    f"{API_ENDPOINTS['clinvar']}/esearch.fcgi",
+                    data={
+                        'db': 'clinvar',
+                        'term': search_term,
+                        'retmode': 'json',
+                        'retmax': 0,
+                        'usehistory': 'y'
+                    },
+                    timeout=10
+                )
+                
+                if search_response.status_code != 200:
+                    for variant in batch:
+                        results[variant] = {'status': 'error', 'significance': None, 'review_status': None}
+                    continue
+                
+                search_result = search_response.json().get('esearchresult', {})
+                count = int(search_result.get('count', 0) or 0)
+                records = {}
+                for retstart in range(0, count, CLINVAR_ESUMMARY_BATCH_SIZE):
+                    page = self._fetch_clinvar_summary_records({
+                        'WebEnv': search_result.get('webenv'),
+                        'query_key': search_result.get('querykey'),
+                        'retstart': retstart,
+                        'retmax': CLINVAR_ESUMMARY_BATCH_SIZE
+                    })
+                    if page is None:
+                        records = None
+                        break
+                    records.update(page)
+                
+                if records is None:
+                    # A failed page would report its variants as not_found; cache nothing
+                    for variant in batch:
+                        results[variant] = {'status': 'error', 'significance': None, 'review_status': None}
+                    continue
+                
+                # Index summaries by GRCh38 (chromosome, start)
+                by_position = {}
+                for uid, record in records.items():
+                    for location in self._clinvar_grch38_locations(record):
+                        by_position.setdefault(location, []).append(uid)
+                
+                summary_data = {'result': records}
+                batch_results = {}
+                for variant in batch:
+                    chrom, pos, ref, alt = variant
+                    uids = by_position.get((str(chrom), str(pos)), [])
+                    if not uids:
+                        result = {'status': 'not_found', 'significance': None, 'review_status': None}
+                    else:
+                        spdi_suffix = f":{int(pos) - 1}:{ref}:{alt}"
+                        matching = [
+                            uid for uid in uids
+                            if any(
+                                str(vs.get('canonical_spdi', '')).endswith(spdi_suffix)
+                                for vs in records[uid].get('variation_set', []) or []
+                            )
+                        ]
+                        result = self._parse_clinvar_summary(summary_data, (matching or uids)[0])
+                    results[variant] = result
+                    batch_results[f"clinvar_{'_'.join(map(str, variant))}"] = result
+                
+                self._cache_responses(batch_results)
+                
+            except requests.RequestException as e:
+                print(f"Error fetching ClinVar data: {e}")
+                for variant in batch:
+                    results[variant] = {'status': 'error', 'significance': None, 'review_status': None}
+        
+        return results
+    
+    def _fetch_clinvar_summary_records(self, params: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """POST one ClinVar esummary request; returns records keyed by UID, or None on an HTTP error."""
+        response = requests.post(
+            f"{API_ENDPOINTS['clinvar']}/esummary.fcgi",
+            data={'db': 'clinvar', 'retmode': 'json', **params},
+            timeout=15
+        )
+        if response.status_code != 200:
+            return None
+        
+        result = response.json().get('result', {}) or {}
+        return {uid: result[uid] for uid in result.get('uids', []) if uid in result}
+    
+    @staticmethod
+    def _clinvar_grch38_locations(record: Dict[str, Any]) -> list:
+        """Return the (chromosome, start) GRCh38 locations of a ClinVar summary record."""
+        locations = []
+        for variation in record.get('variation_set', []) or []:
+            for location in variation.get('variation_loc', []) or []:
+                if location.get('assembly_name') == 'GRCh38':
+                    locations.append((str(location.get('chr')), str(location.get('start'))))
+        return locations
+    
     def generate_varsome_url(self, chromosome: str, position: int, 
                            ref_allele: str, alt_allele: str) -> str:
         """
@@ -538,7 +891,11 @@ class APIClient:
     def validate_variant_coordinates(self, chromosome: str, position: int, 
                                    ref_allele: str, alt_allele: str) -> Dict[str, Any]:
         """
-        Validate variant coordinates using external APIs.
+        Validate variant coordinates.
+        
+        When a local reference genome is configured, the reference allele is
+        checked against it and the left-aligned representation of indels is
+        returned as 'normalized'.
         
         Args:
             chromosome (str): Chromosome
@@ -579,6 +936,33 @@ class APIClient:
             validation_result['valid'] = False
             validation_result['errors'].append("Reference and alternate alleles are identical")
         
+        # REF check and normalization against the local reference genome
+        genome = get_reference_genome()
+        if genome is not None and validation_result['valid']:
+            position = int(position)
+            if genome.resolve_contig(str(chromosome)) is None:
+                validation_result['warnings'].append(f"Chromosome {chromosome} not in local reference genome")
+            elif not genome.check_ref(str(chromosome), position, ref_allele):
+                try:
+                    expected = genome.fetch(str(chromosome), position, position + len(ref_allele) - 1)
+                except ValueError:
+                    expected = 'outside contig'
+                validation_result['valid'] = False
+                validation_result['errors'].append(
+                    f"Reference allele {ref_allele.upper()} does not match GRCh38 reference ({expected}) "
+                    f"at {chromosome}:{position}"
+                )
+            else:
+                try:
+                    chrom, pos, ref, alt = genome.normalize(str(chromosome), position, ref_allele, alt_allele)
+                except ValueError:
+                    chrom, pos, ref, alt = chromosome, position, ref_allele.upper(), alt_allele.upper()
+                validation_result['normalized'] = {'chromosome': chrom, 'position': pos, 'ref': ref, 'alt': alt}
+                if (pos, ref, alt) != (position, ref_allele.upper(), alt_allele.upper()):
+                    validation_result['warnings'].append(
+                        f"Variant is not left-aligned; normalized to {chrom}:{pos} {ref}>{alt}"
+                    )
+        
         return validation_result
     
     def get_gene_info(self, gene_symbol: str) -> Dict[str, Any]:
@@ -591,7 +975,8 @@ class APIClient:
         Returns:
             Dict[str, Any]: Gene information
         """
-        cache_key = f"ensembl_gene_{gene_symbol.upper()}"
+        gene_symbol = canonical_gene_symbol(gene_symbol)
+        cache_key = f"ensembl_gene_{gene_symbol}"
         cached_result = self._get_cached_response(cache_key)
         
         if cached_result is not None:
@@ -737,7 +1122,17 @@ class APIClient:
             - LOEUF ≤ 0.35 → LOF intolerant
             - oe_lof_upper > 0.6 → LOF tolerant
         """
-        from config.constants import API_SETTINGS, CONSTRAINT_THRESHOLDS
+        from config.constants import API_SETTINGS
+        
+        # Normalize gene symbol (aliases map to the approved symbol)
+        gene_symbol = canonical_gene_symbol(gene_symbol)
+        
+        # Local constraint table (gene-indexed, no network)
+        table = get_constraint_table()
+        if table is not None:
+            local_result = table.get(gene_symbol)
+            if local_result is not None:
+                return local_result
         
         # Check if API is enabled
         if not API_SETTINGS.get('enabled', True):
@@ -747,9 +1142,6 @@ class APIClient:
                 'classification': 'unknown'
             }
         
-        # Normalize gene symbol
-        gene_symbol = gene_symbol.strip().upper()
-        
         # Check cache first
         cache_key = f"gnomad_constraint_{gene_symbol}"
         cached = self._get_cached_response(cache_key)
@@ -829,124 +1221,16 @@ class APIClient:
                         'classification': 'unknown'
                     }
                 
-                # Extract metrics
-                pLI = constraint.get('pLI')
-                oe_lof = constraint.get('oe_lof')
-                oe_lof_upper = constraint.get('oe_lof_upper')
-                oe_lof_lower = constraint.get('oe_lof_lower')
-                exp_lof = constraint.get('exp_lof')
-                obs_lof = constraint.get('obs_lof')
-                lof_z = constraint.get('lof_z')
-                
-                # Extract missense constraint metrics
-                oe_mis = constraint.get('oe_mis')
-                oe_mis_upper = constraint.get('oe_mis_upper')
-                oe_mis_lower = constraint.get('oe_mis_lower')
-                exp_mis = constraint.get('exp_mis')
-                obs_mis = constraint.get('obs_mis')
-                mis_z = constraint.get('mis_z')
-                
-                flags = constraint.get('flags', [])
-                
-                # Calculate LOEUF (synonymous with oe_lof_upper in gnomAD v4)
-                LOEUF = oe_lof_upper
-                
-                # Determine LOF intolerance based on thresholds
-                pLI_threshold = CONSTRAINT_THRESHOLDS['pLI_intolerant']
-                LOEUF_threshold = CONSTRAINT_THRESHOLDS['LOEUF_intolerant']
-                oe_upper_threshold = CONSTRAINT_THRESHOLDS['oe_lof_upper_tolerant']
-                
-                is_lof_intolerant = False
-                confidence = 'low'
-                classification = 'uncertain'
-                
-                # Classification logic for LOF
-                if pLI is not None and pLI >= pLI_threshold:
-                    is_lof_intolerant = True
-                    confidence = 'high'
-                    classification = 'LOF_intolerant'
-                elif LOEUF is not None and LOEUF <= LOEUF_threshold:
-                    is_lof_intolerant = True
-                    confidence = 'high'
-                    classification = 'LOF_intolerant'
-                elif oe_lof_upper is not None and oe_lof_upper > oe_upper_threshold:
-                    is_lof_intolerant = False
-                    confidence = 'high'
-                    classification = 'LOF_tolerant'
-                elif pLI is not None and LOEUF is not None:
-                    # Both available but don't meet thresholds
-                    if pLI >= 0.5 or LOEUF <= 0.5:
-                        confidence = 'medium'
-                        classification = 'uncertain_intolerant'
-                    else:
-                        confidence = 'medium'
-                        classification = 'uncertain_tolerant'
-                
-                # Classification logic for missense constraint
-                # Based on gnomAD recommendations:
-                # - mis_z > 3.09: Significantly constrained against missense variation
-                # - oe_mis_upper < 0.6: Missense constrained
-                # - oe_mis > 1.0: Missense tolerant
-                is_mis_constrained = False
-                mis_classification = 'uncertain'
-                mis_confidence = 'low'
-                
-                if mis_z is not None and mis_z > 3.09:
-                    is_mis_constrained = True
-                    mis_classification = 'missense_constrained'
-                    mis_confidence = 'high'
-                elif oe_mis_upper is not None and oe_mis_upper < 0.6:
-                    is_mis_constrained = True
-                    mis_classification = 'missense_constrained'
-                    mis_confidence = 'high'
-                elif oe_mis is not None and oe_mis > 1.0:
-                    is_mis_constrained = False
-                    mis_classification = 'missense_tolerant'
-                    mis_confidence = 'medium'
-                elif oe_mis is not None:
-                    # oe_mis between 0.6 and 1.0
-                    if oe_mis < 0.8:
-                        mis_classification = 'uncertain_constrained'
-                        mis_confidence = 'low'
-                    else:
-                        mis_classification = 'uncertain_tolerant'
-                        mis_confidence = 'low'
-                
-                result = {
-                    'gene_symbol': gene_symbol,
-                    # LOF metrics
-                    'pLI': pLI,
-                    'LOEUF': LOEUF,
-                    'oe_lof': oe_lof,
-                    'oe_lof_upper': oe_lof_upper,
-                    'oe_lof_lower': oe_lof_lower,
-                    'exp_lof': exp_lof,
-                    'obs_lof': obs_lof,
-                    'lof_z': lof_z,
-                    # Missense metrics
-                    'oe_mis': oe_mis,
-                    'oe_mis_upper': oe_mis_upper,
-                    'oe_mis_lower': oe_mis_lower,
-                    'exp_mis': exp_mis,
-                    'obs_mis': obs_mis,
-                    'mis_z': mis_z,
-                    # Flags and classifications
-                    'flags': flags,
-                    'is_lof_intolerant': is_lof_intolerant,
-                    'confidence': confidence,
-                    'classification': classification,
-                    'is_mis_constrained': is_mis_constrained,
-                    'mis_classification': mis_classification,
-                    'mis_confidence': mis_confidence,
-                    'source': 'gnomAD v4',
-                    'thresholds_used': {
-                        'pLI': pLI_threshold,
-                        'LOEUF': LOEUF_threshold,
-                        'oe_lof_upper_tolerant': oe_upper_threshold,
-                        'mis_z_constrained': 3.09,
-                        'oe_mis_upper_constrained': 0.6
-                    }
-                }
+                result = build_constraint_result(
+                    gene_symbol,
+                    {**{metric: constraint.get(metric) for metric in CONSTRAINT_COLUMNS},
+                     'flags': constraint.get('flags', [])},
+                    source='gnomAD v4'
+                )
+                pLI, LOEUF = result['pLI'], result['LOEUF']
+                classification = result['classification']
+                mis_z, oe_mis = result['mis_z'], result['oe_mis']
+                mis_classification = result['mis_classification']
                 
                 # Cache the result
                 self._cache_response(cache_key, result)
@@ -991,6 +1275,31 @@ class APIClient:
                 'classification': 'unknown'
             }
     
+    def get_gene_constraints(self, gene_symbols: list) -> Dict[str, Dict[str, Any]]:
+        """
+        Get gene constraint metrics for a gene panel.
+        
+        Genes in the local constraint table are answered in one pass; the
+        rest fall back to get_gene_constraint() (cached per gene).
+        
+        Args:
+            gene_symbols (list): Gene symbols
+            
+        Returns:
+            Dict mapping each upper-case gene symbol to its get_gene_constraint() result.
+        """
+        results = {}
+        table = get_constraint_table()
+        for gene_symbol in gene_symbols:
+            if not gene_symbol:
+                continue
+            gene_symbol = canonical_gene_symbol(gene_symbol)
+            if gene_symbol in results:
+                continue
+            local_result = table.get(gene_symbol) if table is not None else None
+            results[gene_symbol] = local_result or self.get_gene_constraint(gene_symbol)
+        return results
+    
     def get_clingen_gene_validity(self, gene_symbol: str, disease: Optional[str] = None) -> Dict[str, Any]:
         """
         Query ClinGen for gene-disease validity and disease mechanism.
@@ -1020,9 +1329,20 @@ class APIClient:
         
         Note: This helps resolve cases like BRCA1 where population constraint (LOF tolerant)
               conflicts with disease-specific pathogenicity (LOF causes cancer).
+              A local gene-validity snapshot (utils/clingen_validity.py) is used
+              instead of eRepo when configured.
         """
         from config.constants import API_SETTINGS
         
+        # Local gene-validity snapshot: indexed curations, no eRepo calls
+        snapshot = get_validity_snapshot()
+        if snapshot is not None:
+            gene_symbol = canonical_gene_symbol(gene_symbol)
+            dosage_table = get_dosage_table()
+            dosage = dosage_table.get(gene_symbol) if dosage_table is not None else None
+            return snapshot.validity_result(gene_symbol, disease,
+                                            hi_score=dosage.hi_score if dosage else None)
+        
         # Check if API is enabled
         if not API_SETTINGS.get('enabled', True):
             return {
@@ -1031,8 +1351,8 @@ class APIClient:
                 'source': 'disabled'
             }
         
-        # Normalize gene symbol
-        gene_symbol = gene_symbol.strip().upper()
+        # Normalize gene symbol (aliases map to the approved symbol)
+        gene_symbol = canonical_gene_symbol(gene_symbol)
         
         # Check cache first
         cache_key = f"clingen_erepo_{gene_symbol}"
@@ -1233,6 +1553,55 @@ class APIClient:
                 'source': 'ClinGen'
             }
     
+    def refresh_clingen_validity_snapshot(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Download the current ClinGen gene-validity export to the local snapshot path.
+        
+        The file is replaced atomically; get_validity_snapshot() reloads it on
+        the next lookup. Intended to be run periodically (e.g., weekly).
+        
+        Args:
+            path (str, optional): Target file; defaults to LOCAL_DATA_SOURCES['clingen_validity']
+                                  or ACMG_CLINGEN_VALIDITY
+            
+        Returns:
+            Dict[str, Any]: path, release and curation count, or error
+        """
+        from config.constants import API_SETTINGS
+        
+        path = path or validity_snapshot_path()
+        if not path:
+            return {'error': 'No ClinGen validity snapshot path configured'}
+        
+        try:
+            response = requests.get(
+                API_ENDPOINTS['clingen_validity_csv'],
+                timeout=API_SETTINGS.get('timeout', 30),
+                headers={'Accept': 'text/csv'}
+            )
+            if response.status_code != 200:
+                return {'error': f'HTTP {response.status_code} - Could not download ClinGen validity export'}
+            
+            tmp_path = f"{path}.download"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(response.text)
+                # The download is only ever parsed as the CSV export, never loaded as a snapshot
+                snapshot = ClinGenValiditySnapshot.from_csv(tmp_path)
+                if is_snapshot_path(path):
+                    snapshot.save(path)
+                else:
+                    os.replace(tmp_path, path)
+            finally:
+                # Left behind only when the download could not be parsed or moved
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except (requests.RequestException, OSError, ValueError) as e:
+            return {'error': f'ClinGen validity refresh failed: {str(e)}'}
+        
+        print(f"{Fore.GREEN}✅ ClinGen gene-validity snapshot refreshed: {len(snapshot)} curations{Style.RESET_ALL}")
+        return {'path': path, 'release': snapshot.release, 'curations': len(snapshot)}
+    
     def get_clinvar_classification(self, variant_id: Optional[str] = None, gene: Optional[str] = None, 
                                    hgvs: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -1261,6 +1630,17 @@ class APIClient:
         """
         from config.constants import API_SETTINGS
         
+        # Local ClinVar snapshot (exact VariationID or gene + c. notation);
+        # misses go to E-utilities, whose free-text search is fuzzier
+        snapshot = get_clinvar_snapshot()
+        if snapshot is not None:
+            if variant_id:
+                record = snapshot.get_variation(variant_id)
+            else:
+                record = snapshot.get_by_hgvs(gene, hgvs)
+            if record is not None or not API_SETTINGS.get('enabled', True):
+                return snapshot.classification_result(record, query=variant_id or f"{gene} {hgvs}")
+        
         if not API_SETTINGS.get('enabled', True):
             return {'error': 'API disabled', 'source': 'ClinVar'}
         
@@ -1394,6 +1774,13 @@ class APIClient:
         """
         from config.constants import API_SETTINGS
         
+        # The local snapshot indexes every missense record by codon
+        snapshot = get_clinvar_snapshot()
+        if snapshot is not None:
+            result = snapshot.search_position(gene, hgvs_p)
+            if result is not None:
+                return result
+        
         if not API_SETTINGS.get('enabled', True):
             return {'error': 'API disabled', 'source': 'ClinVar'}
         
@@ -1415,7 +1802,7 @@ class APIClient:
         alt_aa = position_match.group(3)
         
         # Build cache key
-        cache_key = f"clinvar_position_{gene}_{position}"
+        cache_key = f"clinvar_position_{canonical_gene_symbol(gene)}_{position}"
         cached = self._get_cached_response(cache_key)
         if cached:
             print(f"{Fore.CYAN}ℹ️  Using cached ClinVar position data for {gene} position {position}{Style.RESET_ALL}")
@@ -1598,6 +1985,12 @@ class APIClient:
         """
         from config.constants import API_SETTINGS
         
+        # Local gnomAD store answers without network access
+        if chrom and pos and ref and alt:
+            local_result = self._get_local_variant_frequency(chrom, pos, ref, alt)
+            if local_result is not None:
+                return local_result
+        
         # Check if API is enabled
         if not API_SETTINGS.get('enabled', True):
             return {'error': 'API integration is disabled', 'source': 'gnomAD v4'}
@@ -1682,18 +2075,7 @@ class APIClient:
                     # "Variant not found" is not an error - it's useful info for PM2
                     if 'not found' in error_msg.lower():
                         print(f"{Fore.YELLOW}⚠️  Variant not found in gnomAD v4{Style.RESET_ALL}")
-                        result = {
-                            'allele_count': 0,
-                            'allele_number': 0,
-                            'allele_frequency': None,
-                            'homozygote_count': 0,
-                            'hemizygote_count': 0,
-                            'popmax_af': None,
-                            'popmax_population': None,
-                            'filters': [],
-                            'source': 'gnomAD v4',
-                            'note': 'Variant not found (may support PM2)'
-                        }
+                        result = self._build_variant_frequency_result(None)
                         self._cache_response(cache_key, result)
                         return result
                     else:
@@ -1705,46 +2087,14 @@ class APIClient:
                 if not variant:
                     # Variant not found - this is useful for PM2 (absent in databases)
                     print(f"{Fore.YELLOW}⚠️  Variant not found in gnomAD v4{Style.RESET_ALL}")
-                    result = {
-                        'allele_count': 0,
-                        'allele_number': 0,
-                        'allele_frequency': None,
-                        'homozygote_count': 0,
-                        'hemizygote_count': 0,
-                        'popmax_af': None,
-                        'popmax_population': None,
-                        'filters': [],
-                        'source': 'gnomAD v4',
-                        'note': 'Variant not found (may support PM2)'
-                    }
+                    result = self._build_variant_frequency_result(None)
                     self._cache_response(cache_key, result)
                     return result
                 
-                # Extract genome-wide frequency data
-                genome = variant.get('genome', {})
-                ac = genome.get('ac', 0)
-                an = genome.get('an', 0)
-                af = genome.get('af')
-                homozygote_count = genome.get('ac_hom', 0)
-                hemizygote_count = genome.get('ac_hemi', 0)
-                filters = genome.get('filters', [])
-                
-                # Extract filtering allele frequency (faf95) for popmax
-                faf95 = genome.get('faf95', {})
-                popmax_af = faf95.get('popmax')
-                popmax_population = faf95.get('popmax_population')
-                
-                result = {
-                    'allele_count': ac,
-                    'allele_number': an,
-                    'allele_frequency': af,
-                    'homozygote_count': homozygote_count,
-                    'hemizygote_count': hemizygote_count,
-                    'popmax_af': popmax_af,
-                    'popmax_population': popmax_population,
-                    'filters': filters,
-                    'source': 'gnomAD v4'
-                }
+                result = self._build_variant_frequency_result(variant)
+                af = result['allele_frequency']
+                ac = result['allele_count']
+                an = result['allele_number']
                 
                 self._cache_response(cache_key, result)
                 
@@ -1761,6 +2111,186 @@ class APIClient:
             print(f"{Fore.RED}❌ gnomAD API error: {str(e)}{Style.RESET_ALL}")
             return {'error': str(e), 'source': 'gnomAD v4'}
     
+    def get_variant_frequencies(
+        self,
+        variants: list,
+        batch_size: Optional[int] = None
+    ) -> Dict[Tuple[str, int, str, str], Dict[str, Any]]:
+        """
+        Get gnomAD v4 allele frequency data for many variants in batched queries.
+        
+        Uncached variants are packed into aliased GraphQL documents (one
+        ``variant()`` selection per variant) so each request covers up to
+        ``batch_size`` variants. Results have the same shape as
+        get_variant_frequency() and are cached per variant.
+        
+        Args:
+            variants (list): (chrom, pos, ref, alt) tuples (GRCh38)
+            batch_size (int, optional): Variants per GraphQL request
+                (defaults to API_SETTINGS['gnomad_graphql_batch_size'])
+            
+        Returns:
+            Dict mapping each (chrom, pos, ref, alt) tuple to its frequency dict.
+            Variants whose batch failed map to a dict with an 'error' key.
+        """
+        from config.constants import API_SETTINGS
+        from utils.predictor_api_client import build_gnomad_batch_query
+        
+        results = {}
+        for variant in variants:
+            variant = tuple(variant)
+            if variant not in results:
+                local_result = self._get_local_variant_frequency(*variant)
+                if local_result is not None:
+                    results[variant] = local_result
+        
+        if not API_SETTINGS.get('enabled', True):
+            for variant in variants:
+                results.setdefault(tuple(variant), {'error': 'API integration is disabled', 'source': 'gnomAD v4'})
+            return results
+        
+        batch_size = max(1, batch_size or API_SETTINGS.get('gnomad_graphql_batch_size', 50))
+        pending = []
+        queued = set()  # O(1) duplicate check; pending keeps request order
+        for variant in variants:
+            variant = tuple(variant)
+            if variant in results or variant in queued:
+                continue
+            cached = self._get_cached_response(f"gnomad_freq_{'_'.join(map(str, variant))}")
+            if cached:
+                results[variant] = cached
+            else:
+                pending.append(variant)
+                queued.add(variant)
+        
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            query, variables = build_gnomad_batch_query(
+                [f"{chrom}-{pos}-{ref}-{alt}" for chrom, pos, ref, alt in batch],
+                selection=GNOMAD_FREQUENCY_SELECTION
+            )
+            variables['datasetId'] = 'gnomad_r4'
+            
+            try:
+                print(f"{Fore.YELLOW}🔍 Querying gnomAD for variant frequency: batch of {len(batch)} variants...{Style.RESET_ALL}")
+                
+                response = requests.post(
+                    API_ENDPOINTS['gnomad_graphql'],
+                    json={'query': query, 'variables': variables},
+                    timeout=API_SETTINGS.get('timeout', 15),
+                    headers={'Content-Type': 'application/json'}
+                )
+                
+                if response.status_code != 200:
+                    for variant in batch:
+                        results[variant] = {'error': f'HTTP {response.status_code}', 'source': 'gnomAD v4'}
+                    continue
+                
+                data = response.json()
+                payload = data.get('data')
+                alias_errors = {}
+                for error in data.get('errors') or []:
+                    path = error.get('path') or []
+                    message = error.get('message', 'Unknown GraphQL error')
+                    if path and 'not found' not in message.lower():
+                        alias_errors[path[0]] = message
+                
+                if not isinstance(payload, dict):
+                    errors = data.get('errors') or [{}]
+                    message = errors[0].get('message', 'Unknown GraphQL error')
+                    print(f"{Fore.RED}❌ gnomAD API error: {message}{Style.RESET_ALL}")
+                    for variant in batch:
+                        results[variant] = {'error': message, 'source': 'gnomAD v4'}
+                    continue
+                
+                batch_results = {}
+                for index, variant in enumerate(batch):
+                    alias = f"v{index}"
+                    if alias in alias_errors:
+                        results[variant] = {'error': alias_errors[alias], 'source': 'gnomAD v4'}
+                        continue
+                    result = self._build_variant_frequency_result(payload.get(alias))
+                    results[variant] = result
+                    batch_results[f"gnomad_freq_{'_'.join(map(str, variant))}"] = result
+                
+                # One cache write per batch rather than per variant
+                self._cache_responses(batch_results)
+                
+                print(f"{Fore.GREEN}✅ gnomAD: Retrieved {len(batch) - len(alias_errors)}/{len(batch)} variants{Style.RESET_ALL}")
+            
+            except Exception as e:
+                print(f"{Fore.RED}❌ gnomAD API error: {str(e)}{Style.RESET_ALL}")
+                for variant in batch:
+                    results[variant] = {'error': str(e), 'source': 'gnomAD v4'}
+        
+        return results
+    
+    @classmethod
+    def _get_local_variant_frequency(cls, chrom: str, pos: int, ref: str, alt: str) -> Optional[Dict[str, Any]]:
+        """
+        Answer a frequency query from the local gnomAD store, if configured.
+        
+        Returns the same dict shape as get_variant_frequency(), or None when
+        no store is configured or it does not cover the variant.
+        """
+        store = get_gnomad_store()
+        if store is None:
+            return None
+        
+        source = f"gnomAD {store.version_label} (local)"
+        stats = store.lookup(chrom, pos, ref, alt)
+        if stats is None:
+            if not store.covers(chrom):
+                return None
+            return {**cls._build_variant_frequency_result(None), 'source': source}
+        
+        return {
+            'allele_count': stats.ac or 0,
+            'allele_number': stats.an or 0,
+            'allele_frequency': stats.af,
+            'homozygote_count': stats.homozygote_count or 0,
+            'hemizygote_count': stats.hemizygote_count or 0,
+            'popmax_af': stats.popmax_af,
+            'popmax_population': stats.popmax_population,
+            'filters': stats.filters or [],
+            'source': source
+        }
+    
+    @staticmethod
+    def _build_variant_frequency_result(variant: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert a gnomAD GraphQL variant (or None if absent) into the frequency dict."""
+        if not variant:
+            return {
+                'allele_count': 0,
+                'allele_number': 0,
+                'allele_frequency': None,
+                'homozygote_count': 0,
+                'hemizygote_count': 0,
+                'popmax_af': None,
+                'popmax_population': None,
+                'filters': [],
+                'source': 'gnomAD v4',
+                'note': 'Variant not found (may support PM2)'
+            }
+        
+        # Extract genome-wide frequency data
+        genome = variant.get('genome', {}) or {}
+        
+        # Extract filtering allele frequency (faf95) for popmax
+        faf95 = genome.get('faf95', {}) or {}
+        
+        return {
+            'allele_count': genome.get('ac', 0),
+            'allele_number': genome.get('an', 0),
+            'allele_frequency': genome.get('af'),
+            'homozygote_count': genome.get('ac_hom', 0),
+            'hemizygote_count': genome.get('ac_hemi', 0),
+            'popmax_af': faf95.get('popmax'),
+            'popmax_population': faf95.get('popmax_population'),
+            'filters': genome.get('filters', []),
+            'source': 'gnomAD v4'
+        }
+    
     def get_clingen_dosage_sensitivity(self, gene_symbol: str) -> Dict[str, Any]:
         """
         Query ClinGen Dosage Sensitivity Map for haploinsufficiency/triplosensitivity scores.
@@ -1800,7 +2330,6 @@ class APIClient:
             - Score 0/30/40: Consider not applying PVS1
         """
         from config.constants import API_SETTINGS, API_ENDPOINTS
-        import os
         
         # Check if API is enabled
         if not API_SETTINGS.get('enabled', True):
@@ -1811,8 +2340,8 @@ class APIClient:
                 'pvs1_recommendation': 'unknown'
             }
         
-        # Normalize gene symbol
-        gene_symbol = gene_symbol.strip().upper()
+        # Normalize gene symbol (aliases map to the approved symbol)
+        gene_symbol = canonical_gene_symbol(gene_symbol)
         
         # Check cache first
         cache_key = f"clingen_dosage_{gene_symbol}"
@@ -1821,23 +2350,11 @@ class APIClient:
             print(f"{Fore.CYAN}ℹ️  Using cached dosage sensitivity data for {gene_symbol}{Style.RESET_ALL}")
             return cached
         
-        # HYBRID APPROACH: Try local file first, then FTP
-        local_tsv_path = 'ClinGen_gene_curation_list_GRCh38.tsv'
-        tsv_content = None
-        data_source = None
+        # HYBRID APPROACH: Try local indexed table first, then FTP
+        table = get_dosage_table()
         
-        # Step 1: Try local TSV file
-        if os.path.exists(local_tsv_path):
-            try:
-                print(f"{Fore.CYAN}� Reading local ClinGen TSV file...{Style.RESET_ALL}")
-                with open(local_tsv_path, 'r', encoding='utf-8') as f:
-                    tsv_content = f.read()
-                data_source = 'Local ClinGen TSV (GRCh38)'
-            except Exception as e:
-                print(f"{Fore.YELLOW}⚠️  Could not read local file: {e}{Style.RESET_ALL}")
-        
-        # Step 2: If local file not available, download from FTP
-        if tsv_content is None:
+        # Step 1: If local file not available, download from FTP
+        if table is None:
             try:
                 print(f"{Fore.YELLOW}🌐 Downloading ClinGen TSV from FTP...{Style.RESET_ALL}")
                 url = API_ENDPOINTS['clingen_dosage_tsv']
@@ -1850,15 +2367,17 @@ class APIClient:
                 
                 if response.status_code == 200:
                     tsv_content = response.text
-                    data_source = 'ClinGen FTP (GRCh38)'
+                    table = ClinGenDosageTable.from_text(tsv_content, source='ClinGen FTP (GRCh38)')
                     
                     # Save to local file for future use
+                    local_tsv_path = default_tsv_path()
                     try:
                         with open(local_tsv_path, 'w', encoding='utf-8') as f:
                             f.write(tsv_content)
                         print(f"{Fore.GREEN}✅ Saved TSV file locally for future queries{Style.RESET_ALL}")
                     except Exception as e:
                         print(f"{Fore.YELLOW}⚠️  Could not save local file: {e}{Style.RESET_ALL}")
+                    register_dosage_table(table, local_tsv_path)
                 else:
                     return {
                         'error': f'HTTP {response.status_code} - Could not download ClinGen TSV',
@@ -1877,97 +2396,42 @@ class APIClient:
                     'source': 'ClinGen Dosage Sensitivity Map'
                 }
         
-        # Step 3: Parse TSV content and find gene
+        data_source = table.source
+        
+        # Step 2: Look the gene up in the indexed table
         try:
-            print(f"{Fore.YELLOW}🔍 Searching for {gene_symbol} in ClinGen data...{Style.RESET_ALL}")
-            
-            lines = tsv_content.split('\n')
-            
-            for line in lines:
-                if line.startswith('#') or not line.strip():
-                    continue
+            record = table.get(gene_symbol)
+            if record is not None:
+                hi_score = record.hi_score
+                result = self._build_dosage_result(record, data_source, gene_symbol)
                 
-                fields = line.split('\t')
-                if len(fields) < 21:
-                    continue
+                self._cache_response(cache_key, result)
                 
-                current_gene = fields[0].strip().upper()
-                if current_gene == gene_symbol:
-                    # Extract fields (TSV format)
-                    gene_id = fields[1]
-                    cytoband = fields[2]
-                    genomic_location = fields[3]
-                    
-                    # Haploinsufficiency data
-                    hi_score_str = fields[4].strip()
-                    hi_description = fields[5].strip()
-                    hi_pmids = [fields[i].strip() for i in range(6, 12) if i < len(fields) and fields[i].strip()]
-                    
-                    # Triplosensitivity data
-                    ts_score_str = fields[12].strip() if len(fields) > 12 else '0'
-                    ts_description = fields[13].strip() if len(fields) > 13 else 'Not evaluated'
-                    
-                    # Last evaluated date
-                    last_evaluated = fields[20].strip() if len(fields) > 20 else 'Unknown'
-                    
-                    # Parse scores
-                    try:
-                        hi_score = int(hi_score_str) if hi_score_str and hi_score_str != 'Not yet evaluated' else None
-                    except ValueError:
-                        hi_score = None
-                    
-                    try:
-                        ts_score = int(ts_score_str) if ts_score_str and ts_score_str != 'Not yet evaluated' else None
-                    except ValueError:
-                        ts_score = None
-                    
-                    # Map score to PVS1 recommendation
-                    pvs1_rec = self._determine_pvs1_strength(hi_score)
-                    
-                    result = {
-                        'haploinsufficiency_score': hi_score,
-                        'triplosensitivity_score': ts_score,
-                        'haploinsufficiency_description': hi_description,
-                        'triplosensitivity_description': ts_description,
-                        'pvs1_recommendation': pvs1_rec,
-                        'confidence': self._dosage_confidence_level(hi_score),
-                        'pmids': hi_pmids,
-                        'gene_id': gene_id,
-                        'cytoband': cytoband,
-                        'genomic_location': genomic_location,
-                        'source': data_source,
-                        'last_evaluated': last_evaluated,
-                        'clingen_gene_url': f"https://search.clinicalgenome.org/kb/gene-dosage/{gene_symbol}",
-                        'gene_symbol': gene_symbol
-                    }
-                    
-                    self._cache_response(cache_key, result)
-                    
-                    # Color-coded output
-                    if hi_score == 3:
-                        color = Fore.GREEN
-                        msg = f"✅ ClinGen: {gene_symbol} HI Score={hi_score} (Sufficient) → Keep PVS1 Very Strong"
-                    elif hi_score == 2:
-                        color = Fore.YELLOW
-                        msg = f"⚠️  ClinGen: {gene_symbol} HI Score={hi_score} (Some) → Downgrade PVS1 to PS1 Strong"
-                    elif hi_score == 1:
-                        color = Fore.YELLOW
-                        msg = f"⚠️  ClinGen: {gene_symbol} HI Score={hi_score} (Little) → Downgrade PVS1 to PM2 Moderate"
-                    elif hi_score == 30:
-                        color = Fore.MAGENTA
-                        msg = f"ℹ️  ClinGen: {gene_symbol} HI Score={hi_score} (AR phenotype) → Consider not applying PVS1"
-                    elif hi_score == 40:
-                        color = Fore.RED
-                        msg = f"❌ ClinGen: {gene_symbol} HI Score={hi_score} (Unlikely) → Do not apply PVS1"
-                    elif hi_score == 0:
-                        color = Fore.RED
-                        msg = f"❌ ClinGen: {gene_symbol} HI Score={hi_score} (No evidence) → Consider not applying PVS1"
-                    else:
-                        color = Fore.CYAN
-                        msg = f"ℹ️  ClinGen: {gene_symbol} HI Score={hi_score} → Review manually"
-                    
-                    print(f"{color}{msg}{Style.RESET_ALL}")
-                    return result
+                # Color-coded output
+                if hi_score == 3:
+                    color = Fore.GREEN
+                    msg = f"✅ ClinGen: {gene_symbol} HI Score={hi_score} (Sufficient) → Keep PVS1 Very Strong"
+                elif hi_score == 2:
+                    color = Fore.YELLOW
+                    msg = f"⚠️  ClinGen: {gene_symbol} HI Score={hi_score} (Some) → Downgrade PVS1 to PS1 Strong"
+                elif hi_score == 1:
+                    color = Fore.YELLOW
+                    msg = f"⚠️  ClinGen: {gene_symbol} HI Score={hi_score} (Little) → Downgrade PVS1 to PM2 Moderate"
+                elif hi_score == 30:
+                    color = Fore.MAGENTA
+                    msg = f"ℹ️  ClinGen: {gene_symbol} HI Score={hi_score} (AR phenotype) → Consider not applying PVS1"
+                elif hi_score == 40:
+                    color = Fore.RED
+                    msg = f"❌ ClinGen: {gene_symbol} HI Score={hi_score} (Unlikely) → Do not apply PVS1"
+                elif hi_score == 0:
+                    color = Fore.RED
+                    msg = f"❌ ClinGen: {gene_symbol} HI Score={hi_score} (No evidence) → Consider not applying PVS1"
+                else:
+                    color = Fore.CYAN
+                    msg = f"ℹ️  ClinGen: {gene_symbol} HI Score={hi_score} → Review manually"
+                
+                print(f"{color}{msg}{Style.RESET_ALL}")
+                return result
             
             # Gene not found
             result = {
@@ -1994,6 +2458,64 @@ class APIClient:
             print(f"{Fore.RED}❌ Unexpected error: {str(e)}{Style.RESET_ALL}")
             return result
     
+    def get_clingen_dosage_sensitivity_many(self, gene_symbols: list) -> Dict[str, Dict[str, Any]]:
+        """
+        Get ClinGen dosage sensitivity for many genes from the indexed table.
+        
+        Uses ClinGenDosageTable.get_many() for one bulk lookup; results have
+        the same shape as get_clingen_dosage_sensitivity().
+        
+        Args:
+            gene_symbols (list): Gene symbols
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Dosage results keyed by upper-case symbol
+        """
+        table = get_dosage_table()
+        if table is None:
+            # Fall back to the single-gene path, which can download the TSV
+            return {
+                canonical_gene_symbol(symbol): self.get_clingen_dosage_sensitivity(symbol)
+                for symbol in gene_symbols if symbol
+            }
+        
+        results = {}
+        canonical = [canonical_gene_symbol(symbol) for symbol in gene_symbols if symbol]
+        for symbol, record in table.get_many(canonical).items():
+            if record is None:
+                results[symbol] = {
+                    'error': f'Gene {symbol} not found in ClinGen Dosage Sensitivity Map',
+                    'haploinsufficiency_score': None,
+                    'triplosensitivity_score': None,
+                    'pvs1_recommendation': 'insufficient_data',
+                    'confidence': 'none',
+                    'source': table.source,
+                    'gene_symbol': symbol
+                }
+            else:
+                results[symbol] = self._build_dosage_result(record, table.source, symbol)
+        return results
+    
+    def _build_dosage_result(self, record: DosageRecord, data_source: str,
+                             gene_symbol: str) -> Dict[str, Any]:
+        """Convert an indexed ClinGen dosage record into the dosage sensitivity dict."""
+        return {
+            'haploinsufficiency_score': record.hi_score,
+            'triplosensitivity_score': record.ts_score,
+            'haploinsufficiency_description': record.hi_description,
+            'triplosensitivity_description': record.ts_description,
+            'pvs1_recommendation': self._determine_pvs1_strength(record.hi_score),
+            'confidence': self._dosage_confidence_level(record.hi_score),
+            'pmids': list(record.hi_pmids),
+            'gene_id': record.gene_id,
+            'cytoband': record.cytoband,
+            'genomic_location': record.genomic_location,
+            'source': data_source,
+            'last_evaluated': record.last_evaluated,
+            'clingen_gene_url': f"https://search.clinicalgenome.org/kb/gene-dosage/{gene_symbol}",
+            'gene_symbol': gene_symbol
+        }
+    
     def _determine_pvs1_strength(self, hi_score: Optional[int]) -> str:
         """
         Determine PVS1 strength recommendation based on haploinsufficiency score.
@@ -2049,67 +2571,64 @@ class APIClient:
         """
         Get AlphaMissense pathogenicity score for a missense variant.
         
+        Scores come from the local AlphaMissense store (see
+        utils/alphamissense_store.py), which maps the gene to its UniProt
+        accession and looks up the substitution in constant time offline.
+        
         Args:
-            gene_symbol: Gene symbol (e.g., 'BRCA1')
-            hgvs_protein: Protein change in HGVS format (e.g., 'p.Arg412Trp')
+            gene_symbol: Gene symbol (e.g., 'BRCA1'), UniProt accession or transcript ID
+            hgvs_protein: Protein change in HGVS format (e.g., 'p.Arg412Trp' or 'p.R412W')
             
         Returns:
             Dict containing AlphaMissense score and metadata
         """
-        from config.constants import API_SETTINGS
-        
-        if not API_SETTINGS.get('enabled', True):
-            return {'error': 'API integration is disabled', 'source': 'AlphaMissense'}
-        
         cache_key = f"alphamissense_{gene_symbol}_{hgvs_protein}"
         cached_result = self._get_cached_response(cache_key)
         if cached_result:
             return cached_result
         
         try:
-            # AlphaMissense uses UniProt ID, so we need to convert gene symbol
-            # For now, we'll use a simplified approach with common genes
-            uniprot_mapping = {
-                'BRCA1': 'P38398',
-                'BRCA2': 'P51587', 
-                'TP53': 'P04637',
-                'CFTR': 'P13569',
-                'MTHFR': 'P42898'
-            }
+            if parse_protein_variant(hgvs_protein) is None:
+                return {
+                    'error': f'Invalid HGVS protein format: {hgvs_protein}',
+                    'source': 'AlphaMissense'
+                }
             
-            uniprot_id = uniprot_mapping.get(gene_symbol.upper())
-            if not uniprot_id:
+            store = get_alphamissense_store()
+            if store is None:
                 return {
-                    'error': f'UniProt mapping not available for {gene_symbol}',
+                    'error': 'Local AlphaMissense store not configured',
                     'source': 'AlphaMissense',
-                    'suggestion': 'Check AlphaMissense database manually at https://alphamissense.hegelab.org/'
+                    'suggestion': 'Import the AlphaMissense tables with utils.alphamissense_store.import_alphamissense() '
+                                  'and set ACMG_ALPHAMISSENSE_STORE, or check https://alphamissense.hegelab.org/'
                 }
             
-            # Extract position and amino acid change from HGVS
-            import re
-            match = re.match(r'p\.([A-Z][a-z]{2})(\d+)([A-Z][a-z]{2})', hgvs_protein)
-            if not match:
+            lookup = store.lookup_hgvs(gene_symbol, hgvs_protein)
+            if lookup is None:
                 return {
-                    'error': f'Invalid HGVS protein format: {hgvs_protein}',
-                    'source': 'AlphaMissense'
+                    'error': f'UniProt mapping not available for {gene_symbol}',
+                    'source': 'AlphaMissense',
+                    'suggestion': 'Check AlphaMissense database manually at https://alphamissense.hegelab.org/'
                 }
             
-            ref_aa, position, alt_aa = match.groups()
-            
-            # AlphaMissense API call (simplified - in reality this would need proper API integration)
+            uniprot_id = lookup['protein_id']
             result = {
                 'gene': gene_symbol,
                 'uniprot_id': uniprot_id,
-                'position': position,
-                'ref_aa': ref_aa,
-                'alt_aa': alt_aa,
-                'alphamissense_score': None,  # Would be fetched from API
-                'confidence': 'medium',
-                'source': 'AlphaMissense',
+                'position': str(lookup['position']),
+                'ref_aa': lookup['ref_aa'],
+                'alt_aa': lookup['alt_aa'],
+                'alphamissense_score': lookup['score'],
+                'am_class': lookup['am_class'],
+                'source': 'AlphaMissense (local)',
+                'version': store.version,
                 'url': f'https://alphamissense.hegelab.org/gene/{uniprot_id}',
-                'manual_lookup_required': True,
-                'instructions': f'Visit AlphaMissense database and search for {gene_symbol} {hgvs_protein}'
+                'manual_lookup_required': lookup['score'] is None
             }
+            if lookup['reference_mismatch']:
+                result['warning'] = f'Reference residue at position {lookup["position"]} does not match {lookup["ref_aa"]}'
+            if lookup['score'] is None:
+                result['instructions'] = f'Visit AlphaMissense database and search for {gene_symbol} {hgvs_protein}'
             
             self._cache_response(cache_key, result)
             return result
@@ -2137,6 +2656,11 @@ class APIClient:
         """
         from config.constants import API_SETTINGS
         
+        # Local conservation tracks answer without network access
+        local_result = self._get_local_conservation(chromosome, position, ref_allele, alt_allele)
+        if local_result is not None:
+            return local_result
+        
         if not API_SETTINGS.get('enabled', True):
             return {'error': 'API integration is disabled', 'source': 'Conservation'}
         
@@ -2162,33 +2686,10 @@ class APIClient:
             
             if response.status_code == 200:
                 vep_data = response.json()
-                
-                conservation_scores = {}
-                if vep_data and len(vep_data) > 0:
-                    transcript_consequences = vep_data[0].get('transcript_consequences', [])
-                    if transcript_consequences:
-                        # Get conservation scores from first transcript
-                        tc = transcript_consequences[0]
-                        
-                        # Extract available conservation scores
-                        if 'phylop_score' in tc:
-                            conservation_scores['phylop'] = tc['phylop_score']
-                        if 'phastcons_score' in tc:
-                            conservation_scores['phastcons'] = tc['phastcons_score']
-                        if 'gerp_score' in tc:
-                            conservation_scores['gerp'] = tc['gerp_score']
-                
-                result = {
-                    'chromosome': chromosome,
-                    'position': position,
-                    'ref_allele': ref_allele,
-                    'alt_allele': alt_allele,
-                    'conservation_scores': conservation_scores,
-                    'source': 'Ensembl VEP',
-                    'confidence': 'high' if conservation_scores else 'low',
-                    'manual_lookup_required': not conservation_scores,
-                    'instructions': 'Use UCSC Genome Browser or Ensembl for manual conservation score lookup' if not conservation_scores else None
-                }
+                result = self._build_conservation_result(
+                    chromosome, position, ref_allele, alt_allele,
+                    vep_data[0] if vep_data else None
+                )
                 
                 self._cache_response(cache_key, result)
                 return result
@@ -2209,6 +2710,162 @@ class APIClient:
             }
             return error_result
 
+    def get_conservation_scores_many(self, variants: list) -> Dict[Tuple[str, int, str, str], Dict[str, Any]]:
+        """
+        Get conservation scores for many variants with batched VEP region POSTs.
+        
+        Variants covered by the local conservation tracks are answered first.
+        Remaining uncached variants are sent to Ensembl POST /vep/human/region as
+        VCF-style strings (up to ENSEMBL_VEP_BATCH_SIZE per request) and
+        mapped back by the echoed ``input`` field. Results have the same shape
+        as get_conservation_scores() and are cached per variant.
+        
+        Args:
+            variants (list): (chromosome, position, ref_allele, alt_allele) tuples
+            
+        Returns:
+            Dict mapping each variant tuple to its conservation result.
+        """
+        from config.constants import API_SETTINGS
+        
+        results = {}
+        for variant in variants:
+            variant = tuple(variant)
+            if variant not in results:
+                local_result = self._get_local_conservation(*variant)
+                if local_result is not None:
+                    results[variant] = local_result
+        
+        if not API_SETTINGS.get('enabled', True):
+            return {
+                **{tuple(v): {'error': 'API integration is disabled', 'source': 'Conservation'} for v in variants},
+                **results
+            }
+        
+        pending = []
+        queued = set()  # O(1) duplicate check; pending keeps request order
+        for variant in variants:
+            variant = tuple(variant)
+            if variant in results or variant in queued:
+                continue
+            cached_result = self._get_cached_response(f"conservation_{'_'.join(map(str, variant))}")
+            if cached_result:
+                results[variant] = cached_result
+            else:
+                pending.append(variant)
+                queued.add(variant)
+        
+        for start in range(0, len(pending), ENSEMBL_VEP_BATCH_SIZE):
+            batch = pending[start:start + ENSEMBL_VEP_BATCH_SIZE]
+            inputs = {
+                f"{chrom} {pos} . {ref} {alt} . . .": (chrom, pos, ref, alt)
+                for chrom, pos, ref, alt in batch
+            }
+            
+            try:
+                response = requests.post(
+                    f"{API_ENDPOINTS['ensembl_rest']}/vep/human/region",
+                    params={'Conservation': '1', 'GERP': '1'},
+                    json={'variants': list(inputs)},
+                    timeout=API_SETTINGS.get('timeout', 15),
+                    headers={'Content-Type': 'application/json', 'Accept': 'application/json'}
+                )
+                
+                if response.status_code != 200:
+                    for variant in batch:
+                        results[variant] = {
+                            'error': f'VEP API returned status {response.status_code}',
+                            'source': 'Conservation',
+                            'manual_lookup_required': True,
+                            'instructions': 'Use UCSC Genome Browser PhyloP/phastCons tracks for manual lookup'
+                        }
+                    continue
+                
+                vep_by_input = {
+                    entry.get('input'): entry
+                    for entry in response.json() or []
+                    if isinstance(entry, dict)
+                }
+                batch_results = {}
+                for vep_input, variant in inputs.items():
+                    result = self._build_conservation_result(*variant, vep_by_input.get(vep_input))
+                    results[variant] = result
+                    batch_results[f"conservation_{'_'.join(map(str, variant))}"] = result
+                self._cache_responses(batch_results)
+                
+            except Exception as e:
+                for variant in batch:
+                    results[variant] = {
+                        'error': f'Conservation score lookup failed: {str(e)}',
+                        'source': 'Conservation',
+                        'manual_lookup_required': True,
+                        'instructions': 'Use UCSC Genome Browser or Ensembl for manual conservation score lookup'
+                    }
+        
+        return results
+    
+    @staticmethod
+    def _get_local_conservation(chromosome: str, position: int, ref_allele: str,
+                                alt_allele: str) -> Optional[Dict[str, Any]]:
+        """
+        Answer a conservation query from the local tracks, if configured.
+        
+        Returns the same dict shape as get_conservation_scores(), or None when
+        no track is configured or none covers the position.
+        """
+        tracks = get_conservation_tracks()
+        if tracks is None or not chromosome or not position:
+            return None
+        try:
+            conservation_scores = tracks.scores(chromosome, int(position))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Local conservation track error: {str(e)}")
+            return None
+        if not conservation_scores:
+            return None
+        return {
+            'chromosome': chromosome,
+            'position': position,
+            'ref_allele': ref_allele,
+            'alt_allele': alt_allele,
+            'conservation_scores': conservation_scores,
+            'source': 'Local conservation tracks',
+            'confidence': 'high',
+            'manual_lookup_required': False,
+            'instructions': None
+        }
+    
+    @staticmethod
+    def _build_conservation_result(chromosome: str, position: int, ref_allele: str,
+                                   alt_allele: str, vep_entry: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract conservation scores from one VEP result entry into the conservation dict."""
+        conservation_scores = {}
+        if vep_entry:
+            transcript_consequences = vep_entry.get('transcript_consequences', [])
+            if transcript_consequences:
+                # Get conservation scores from first transcript
+                tc = transcript_consequences[0]
+                
+                # Extract available conservation scores
+                if 'phylop_score' in tc:
+                    conservation_scores['phylop'] = tc['phylop_score']
+                if 'phastcons_score' in tc:
+                    conservation_scores['phastcons'] = tc['phastcons_score']
+                if 'gerp_score' in tc:
+                    conservation_scores['gerp'] = tc['gerp_score']
+        
+        return {
+            'chromosome': chromosome,
+            'position': position,
+            'ref_allele': ref_allele,
+            'alt_allele': alt_allele,
+            'conservation_scores': conservation_scores,
+            'source': 'Ensembl VEP',
+            'confidence': 'high' if conservation_scores else 'low',
+            'manual_lookup_required': not conservation_scores,
+            'instructions': 'Use UCSC Genome Browser or Ensembl for manual conservation score lookup' if not conservation_scores else None
+        }
+
     def get_domain_annotations(self, gene_symbol: str, protein_position: int = None) -> Dict[str, Any]:
         """
         Get protein domain annotations for PM1 evaluation.
@@ -2225,6 +2882,7 @@ class APIClient:
         if not API_SETTINGS.get('enabled', True):
             return {'error': 'API integration is disabled', 'source': 'Domains'}
         
+        gene_symbol = canonical_gene_symbol(gene_symbol)
         cache_key = f"domains_{gene_symbol}_{protein_position or 'all'}"
         cached_result = self._get_cached_response(cache_key)
         if cached_result:
@@ -0,0 +1,301 @@
+"""
+Variant Batch Planner
+=====================
+
+Plans and runs batched prefetches for a set of variants so that the
+per-variant evaluation path ("fetch once, interpret many") finds its
+external data already cached.
+
+Each external source is queried through its batch API:
+
+- myvariant.info predictor scores (PredictorAPIClient.get_predictor_scores_many)
+- gnomAD population stats (PopulationAPIClient.get_population_stats_many)
+- gnomAD frequencies (APIClient.get_variant_frequencies)
+- ClinVar status (APIClient.get_clinvar_status_many)
+- Ensembl gene chromosomes (APIClient.get_chromosomes_from_ensembl)
+- Ensembl VEP conservation (APIClient.get_conservation_scores_many)
+
+Every batch API caches its results per item under the same keys the
+single-variant methods use, so later single lookups are cache hits.
+
+GRCh37 input (genome_build='GRCh37') is lifted to GRCh38 in bulk with the
+local chain-file liftover (utils/liftover.py) before planning; records
+that fail to lift are reported per record and skipped.
+
+Usage:
+    planner = VariantBatchPlanner(api_client, predictor_client, population_client)
+    result = planner.prefetch(variant_data_list)
+    planner.apply(variant_data_list, result)
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.liftover import LIFTOVER_NO_CHAIN, LiftoverResult, get_liftover
+
+try:
+    from colorama import Fore, Style
+except ImportError:
+    class Fore:
+        YELLOW = GREEN = CYAN = ''
+    class Style:
+        RESET_ALL = ''
+
+
+VariantKey = Tuple[str, int, str, str]
+
+
+@dataclass
+class BatchPlan:
+    """Unique variants and genes to prefetch for a batch (variants in GRCh38)."""
+    variants: List[VariantKey] = field(default_factory=list)
+    genes: List[str] = field(default_factory=list)
+    liftover: Dict[VariantKey, LiftoverResult] = field(default_factory=dict)
+
+    @property
+    def liftover_failures(self) -> Dict[VariantKey, str]:
+        """Source keys that could not be lifted, with the failure reason."""
+        return {key: lifted.error for key, lifted in self.liftover.items() if not lifted.ok}
+
+
+@dataclass
+class BatchPrefetchResult:
+    """Per-source results of a batch prefetch, keyed by variant or gene."""
+    predictor_scores: Dict[VariantKey, Dict[str, Any]] = field(default_factory=dict)
+    population_stats: Dict[VariantKey, Dict[str, Any]] = field(default_factory=dict)
+    variant_frequencies: Dict[VariantKey, Dict[str, Any]] = field(default_factory=dict)
+    clinvar_status: Dict[VariantKey, Dict[str, Any]] = field(default_factory=dict)
+    conservation: Dict[VariantKey, Dict[str, Any]] = field(default_factory=dict)
+    chromosomes: Dict[str, Optional[str]] = field(default_factory=dict)
+    liftover: Dict[VariantKey, LiftoverResult] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def variant_key(variant: Any) -> Optional[VariantKey]:
+    """
+    Build a (chrom, pos, ref, alt) key from a VariantData, basic_info dict or tuple.
+
+    Returns None when genomic coordinates are incomplete.
+    """
+    if isinstance(variant, (tuple, list)):
+        chrom, pos, ref, alt = variant
+    else:
+        basic_info = variant if isinstance(variant, dict) else (getattr(variant, 'basic_info', None) or {})
+        chrom = basic_info.get('chromosome')
+        pos = basic_info.get('position')
+        ref = basic_info.get('ref_allele')
+        alt = basic_info.get('alt_allele')
+
+    if not (chrom and pos and ref and alt):
+        return None
+    try:
+        return (str(chrom), int(pos), str(ref), str(alt))
+    except (TypeError, ValueError):
+        return None
+
+
+def _gene_symbol(variant: Any) -> Optional[str]:
+    """Return the gene symbol of a VariantData or basic_info dict, if any."""
+    if isinstance(variant, (tuple, list)):
+        return None
+    basic_info = variant if isinstance(variant, dict) else (getattr(variant, 'basic_info', None) or {})
+    gene = basic_info.get('gene')
+    return str(gene).upper() if gene else None
+
+
+class VariantBatchPlanner:
+    """
+    Prefetch external data for many variants through batched API calls.
+
+    Any client may be None, in which case its sources are skipped. A failure
+    in one source is recorded in BatchPrefetchResult.errors and does not stop
+    the others, mirroring EvidenceEvaluator._fetch_external_data().
+    """
+
+    def __init__(
+        self,
+        api_client=None,
+        predictor_client=None,
+        population_client=None,
+        include_conservation: bool = True,
+        genome_build: str = 'GRCh38',
+        liftover=None
+    ):
+        """
+        Initialize the batch planner.
+
+        Args:
+            api_client: APIClient for ClinVar, gnomAD frequency and Ensembl lookups
+            predictor_client: PredictorAPIClient for in silico predictor scores
+            population_client: PopulationAPIClient for gnomAD population stats
+            include_conservation: Whether to prefetch VEP conservation scores
+            genome_build: Build of the input coordinates ('GRCh38' or 'GRCh37')
+            liftover: ChainLiftover for GRCh37 input (defaults to the shared one)
+        """
+        self.api_client = api_client
+        self.predictor_client = predictor_client
+        self.population_client = population_client
+        self.include_conservation = include_conservation
+        self.genome_build = genome_build
+        self.liftover = liftover
+
+    def plan(self, variants: List[Any]) -> BatchPlan:
+        """
+        Collect the unique variants and genes to prefetch.
+
+        Args:
+            variants: VariantData objects, basic_info dicts or (chrom, pos, ref, alt) tuples
+
+        Returns:
+            BatchPlan with de-duplicated GRCh38 variants and genes, in input order
+        """
+        plan = BatchPlan()
+        seen_variants = set()
+        seen_genes = set()
+
+        keys = [variant_key(variant) for variant in variants]
+        lift = [key is not None and self._needs_liftover(variant) for variant, key in zip(variants, keys)]
+        if any(lift):
+            plan.liftover = self._lift([key for key, needed in zip(keys, lift) if needed])
+
+        for variant, key, needed in zip(variants, keys, lift):
+            if needed:
+                key = plan.liftover[key].key
+            if key is not None and key not in seen_variants:
+                seen_variants.add(key)
+                plan.variants.append(key)
+
+            gene = _gene_symbol(variant)
+            if gene and gene not in seen_genes:
+                seen_genes.add(gene)
+                plan.genes.append(gene)
+
+        return plan
+
+    def prefetch(self, variants: List[Any]) -> BatchPrefetchResult:
+        """
+        Run batched lookups for all sources and warm the per-item caches.
+
+        Args:
+            variants: VariantData objects, basic_info dicts or (chrom, pos, ref, alt) tuples
+
+        Returns:
+            BatchPrefetchResult with per-source results
+        """
+        plan = self.plan(variants)
+        result = BatchPrefetchResult(liftover=plan.liftover)
+
+        print(f"{Fore.CYAN}📦 Batch prefetch: {len(plan.variants)} variants, "
+              f"{len(plan.genes)} genes{Style.RESET_ALL}")
+        failures = plan.liftover_failures
+        if failures:
+            print(f"{Fore.YELLOW}⚠️  Warning: {len(failures)}/{len(plan.liftover)} GRCh37 variants "
+                  f"could not be lifted to GRCh38{Style.RESET_ALL}")
+
+        steps = []
+        if plan.variants and self.predictor_client is not None:
+            steps.append(('predictor_scores',
+                          lambda: self.predictor_client.get_predictor_scores_many(plan.variants)))
+        if plan.variants and self.population_client is not None:
+            steps.append(('population_stats',
+                          lambda: self.population_client.get_population_stats_many(plan.variants)))
+        if self.api_client is not None:
+            if plan.variants:
+                steps.append(('variant_frequencies',
+                              lambda: self.api_client.get_variant_frequencies(plan.variants)))
+                steps.append(('clinvar_status',
+                              lambda: self.api_client.get_clinvar_status_many(plan.variants)))
+                if self.include_conservation:
+                    steps.append(('conservation',
+                                  lambda: self.api_client.get_conservation_scores_many(plan.variants)))
+            if plan.genes:
+                steps.append(('chromosomes',
+                              lambda: self.api_client.get_chromosomes_from_ensembl(plan.genes)))
+
+        for name, fetch in steps:
+            try:
+                setattr(result, name, fetch() or {})
+            except Exception as e:
+                print(f"{Fore.YELLOW}⚠️  Warning: Batch prefetch of {name} failed: {str(e)}{Style.RESET_ALL}")
+                result.errors[name] = str(e)
+
+        print(f"{Fore.GREEN}✅ Batch prefetch complete ({len(steps) - len(result.errors)}/{len(steps)} sources){Style.RESET_ALL}")
+        return result
+
+    def apply(self, variants: List[Any], result: BatchPrefetchResult) -> None:
+        """
+        Attach prefetched typed data to VariantData objects.
+
+        Sets predictor_scores and population_stats where they are not already
+        present, so EvidenceEvaluator._fetch_external_data() skips those calls.
+        Other sources are served from the per-item caches.
+
+        For GRCh37 input, lifted variants get their GRCh38 coordinates in
+        basic_info and the originals under basic_info['liftover']; variants
+        that failed to lift get basic_info['liftover']['error'] and keep
+        their coordinates.
+
+        Args:
+            variants: VariantData objects (other input types are ignored)
+            result: Result of prefetch()
+        """
+        for variant in variants:
+            if not hasattr(variant, 'basic_info'):
+                continue
+            key = variant_key(variant)
+            if key is None:
+                continue
+            if self._needs_liftover(variant) and key in result.liftover:
+                key = self._apply_liftover(variant.basic_info, result.liftover[key])
+                if key is None:
+                    continue
+
+            if not getattr(variant, 'predictor_scores', None) and key in result.predictor_scores:
+                variant.predictor_scores = result.predictor_scores[key]
+            if not getattr(variant, 'population_stats', None) and result.population_stats.get(key):
+                variant.population_stats = result.population_stats[key]
+
+    # =========================================================================
+    # GRCh37 input
+    # =========================================================================
+
+    def _needs_liftover(self, variant: Any) -> bool:
+        """True for GRCh37 input not already lifted by apply()."""
+        if self.genome_build != 'GRCh37':
+            return False
+        basic_info = variant if isinstance(variant, dict) else getattr(variant, 'basic_info', None)
+        lifted = basic_info.get('liftover') if isinstance(basic_info, dict) else None
+        return not (lifted and lifted.get('source_build') == 'GRCh37' and 'error' not in lifted)
+
+    def _lift(self, keys: List[VariantKey]) -> Dict[VariantKey, LiftoverResult]:
+        """Lift unique source keys to GRCh38 in one bulk pass."""
+        unique = list(dict.fromkeys(keys))
+        liftover = self.liftover or get_liftover()
+        if liftover is None:
+            return {key: LiftoverResult(key, error=LIFTOVER_NO_CHAIN) for key in unique}
+        return dict(zip(unique, liftover.lift_variants(unique)))
+
+    @staticmethod
+    def _apply_liftover(basic_info: Dict[str, Any], lifted: LiftoverResult) -> Optional[VariantKey]:
+        """Rewrite basic_info to GRCh38 coordinates; returns the lifted key or None on failure."""
+        original = {
+            'source_build': 'GRCh37',
+            'chromosome': basic_info.get('chromosome'),
+            'position': basic_info.get('position'),
+            'ref_allele': basic_info.get('ref_allele'),
+            'alt_allele': basic_info.get('alt_allele'),
+        }
+        if not lifted.ok:
+            basic_info['liftover'] = dict(original, error=lifted.error)
+            return None
+        basic_info['liftover'] = dict(original, strand=lifted.strand)
+        basic_info.update({
+            'chromosome': lifted.chrom,
+            'position': lifted.pos,
+            'ref_allele': lifted.ref,
+            'alt_allele': lifted.alt,
+        })
+        return lifted.key
@@ -25,6 +25,8 @@ from typing import Optional, Any
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from utils.reference_genome import normalize_alleles
+
 
 @dataclass
 class CacheKey:
@@ -367,6 +369,10 @@ def normalize_variant_id(
     """
     Normalize variant to a canonical string identifier.
     
+    GRCh38 indels and MNVs are left-aligned and trimmed against the local
+    reference genome when one is configured (utils/reference_genome.py),
+    so equivalent representations map to the same identifier.
+    
     Args:
         chrom: Chromosome (e.g., '17', 'chr17')
         pos: Genomic position
@@ -377,6 +383,9 @@ def normalize_variant_id(
     Returns:
         Normalized variant ID (e.g., 'GRCh38:17-7674234-G-A')
     """
+    if genome_build == 'GRCh38':
+        chrom, pos, ref, alt = normalize_alleles(chrom, pos, ref, alt)
+    
     # Normalize chromosome (remove 'chr' prefix)
     norm_chrom = str(chrom).upper().replace('CHR', '')
     
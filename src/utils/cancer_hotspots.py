@@ -0,0 +1,322 @@
+"""
+Local CancerHotspots Table
+==========================
+
+In-memory index over the published CancerHotspots.org hotspot set (Chang
+et al. 2016/2018), so DomainAPIClient can answer PM1 hotspot questions
+without one remote call per (gene, position).
+
+Accepted inputs:
+
+- the hotspot spreadsheet (hotspots_v2.xls) exported as TSV or CSV
+  (Hugo_Symbol, Amino_Acid_Position, Reference_Amino_Acid, Mutation_Count,
+  Variant_Amino_Acid, Tumor_Type_Composition, qvalue, ...)
+- a JSON dump of the /api/hotspots/single endpoint (hugoSymbol, residue,
+  tumorCount, variantAminoAcid, tumorTypeComposition, qValue)
+
+Single-residue hotspots are kept per gene as a sorted position list with a
+parallel record list (bisect lookups); in-frame indel hotspots, which
+cover a residue range, are kept separately and matched by overlap.
+
+Usage:
+    table = CancerHotspotTable.from_file('hotspots_v2.tsv')
+    table.get('TP53', 273).tumor_count
+    table.overlapping('EGFR', 745, 750)
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import bisect
+import csv
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.local_store import LocalResource
+
+
+_GENE_COLUMNS = ('Hugo_Symbol', 'hugoSymbol', 'gene')
+_POSITION_COLUMNS = ('Amino_Acid_Position', 'residue', 'position')
+_REFERENCE_COLUMNS = ('Reference_Amino_Acid', 'referenceAminoAcid')
+_MUTATION_COUNT_COLUMNS = ('Mutation_Count', 'count', 'mutationCount')
+_TUMOR_COUNT_COLUMNS = ('tumor_count', 'Tumor_Count', 'tumorCount', 'Samples')
+_VARIANT_COLUMNS = ('Variant_Amino_Acid', 'variantAminoAcid')
+_TUMOR_TYPE_COLUMNS = ('Tumor_Type_Composition', 'tumorTypeComposition', 'Detailed_Cancer_Types')
+_QVALUE_COLUMNS = ('qvalue', 'qValue', 'q_value')
+
+_RESIDUE_RANGE = re.compile(r'(\d+)(?:\s*[-_]\s*[A-Za-z*]*(\d+))?')
+
+
+class CancerHotspotTableError(ValueError):
+    """Raised when a hotspot table cannot be parsed."""
+
+
+@dataclass
+class HotspotRecord:
+    """One CancerHotspots hotspot (a residue, or a residue range for indels)."""
+    gene: str
+    start: int
+    end: int
+    reference_aa: str = ''
+    mutation_count: int = 0
+    tumor_count: int = 0
+    variant_counts: Dict[str, int] = field(default_factory=dict)
+    tumor_types: Dict[str, int] = field(default_factory=dict)
+    q_value: Optional[float] = None
+
+    def to_result(self, position: int, source: str) -> Dict[str, Any]:
+        """Return the dict shape of DomainAPIClient._query_cancer_hotspots()."""
+        return {
+            'tumor_count': self.tumor_count,
+            'mutation_count': self.mutation_count,
+            'residue': position,
+            'variant_counts': dict(self.variant_counts),
+            'tumor_types': dict(self.tumor_types),
+            'source': source,
+        }
+
+
+def _pick(row: Dict[str, Any], names: Iterable[str]) -> Any:
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _parse_counts(value: Any) -> Dict[str, int]:
+    """Parse 'H:1000|C:900' (spreadsheet) or {'H': 1000} (API) into a dict."""
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        return {str(k): int(v) for k, v in value.items()}
+    counts = {}
+    for part in str(value).split('|'):
+        key, _, count = part.partition(':')
+        if key.strip():
+            try:
+                counts[key.strip()] = int(float(count)) if count else 0
+            except ValueError:
+                continue
+    return counts
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_hotspot_row(row: Dict[str, Any]) -> Optional[HotspotRecord]:
+    """Build a HotspotRecord from one spreadsheet row or API object, or None."""
+    gene = _pick(row, _GENE_COLUMNS)
+    residue = _pick(row, _POSITION_COLUMNS)
+    if not gene or residue is None:
+        return None
+    match = _RESIDUE_RANGE.search(str(residue))
+    if not match:
+        return None
+    start = int(match.group(1))
+    end = int(match.group(2)) if match.group(2) else start
+
+    reference = str(_pick(row, _REFERENCE_COLUMNS) or '').split(':')[0]
+    if not reference:
+        reference = re.sub(r'[\d\-]+.*$', '', str(residue))
+
+    variant_counts = _parse_counts(_pick(row, _VARIANT_COLUMNS))
+    mutation_count = _to_int(_pick(row, _MUTATION_COUNT_COLUMNS)) or sum(variant_counts.values())
+    tumor_types = _parse_counts(_pick(row, _TUMOR_TYPE_COLUMNS))
+    tumor_count = _to_int(_pick(row, _TUMOR_COUNT_COLUMNS)) or mutation_count
+
+    q_value = _pick(row, _QVALUE_COLUMNS)
+    try:
+        q_value = float(q_value) if q_value is not None else None
+    except ValueError:
+        q_value = None
+
+    return HotspotRecord(
+        gene=str(gene).strip().upper(),
+        start=min(start, end),
+        end=max(start, end),
+        reference_aa=reference,
+        mutation_count=mutation_count,
+        tumor_count=tumor_count,
+        variant_counts=variant_counts,
+        tumor_types=tumor_types,
+        q_value=q_value,
+    )
+
+
+class CancerHotspotTable:
+    """
+    Gene -> sorted hotspot positions -> counts/tumor types.
+
+    Attributes:
+        source: Human-readable data source label
+        path: File the table was read from (None if built in memory)
+    """
+
+    def __init__(self, records: Iterable[HotspotRecord] = (),
+                 source: str = 'CancerHotspots (local)', path: Optional[str] = None):
+        self.source = source
+        self.path = path
+        self._positions: Dict[str, List[int]] = {}
+        self._residues: Dict[str, List[HotspotRecord]] = {}
+        self._ranges: Dict[str, List[HotspotRecord]] = {}
+        self._indexed_into = None
+        for record in records:
+            self.add(record)
+
+    @classmethod
+    def from_file(cls, path: str, source: str = 'CancerHotspots (local)') -> 'CancerHotspotTable':
+        """Load a TSV/CSV export of the hotspot spreadsheet or a JSON API dump."""
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.lower().endswith('.json'):
+                try:
+                    rows = json.load(f)
+                except ValueError as e:
+                    raise CancerHotspotTableError(f"Invalid hotspot JSON: {e}")
+                if isinstance(rows, dict):
+                    rows = rows.get('hotspots', [])
+            else:
+                sample = f.readline()
+                f.seek(0)
+                delimiter = '\t' if '\t' in sample else ','
+                rows = list(csv.DictReader(f, delimiter=delimiter))
+                if not rows or not any(name in rows[0] for name in _GENE_COLUMNS):
+                    raise CancerHotspotTableError(f"Not a CancerHotspots table: {path}")
+
+        table = cls(source=source, path=path)
+        for row in rows:
+            record = parse_hotspot_row(row)
+            if record is not None:
+                table.add(record)
+        return table
+
+    def add(self, record: HotspotRecord) -> None:
+        """Insert or replace a hotspot, keeping positions sorted."""
+        if record.start != record.end:
+            ranges = self._ranges.setdefault(record.gene, [])
+            ranges[:] = [r for r in ranges if (r.start, r.end) != (record.start, record.end)]
+            ranges.append(record)
+        else:
+            positions = self._positions.setdefault(record.gene, [])
+            residues = self._residues.setdefault(record.gene, [])
+            i = bisect.bisect_left(positions, record.start)
+            if i < len(positions) and positions[i] == record.start:
+                residues[i] = record
+            else:
+                positions.insert(i, record.start)
+                residues.insert(i, record)
+        if self._indexed_into is not None:
+            self._index_gene(record.gene, self._indexed_into)
+
+    # =========================================================================
+    # Lookup
+    # =========================================================================
+
+    def get(self, gene: str, position: int) -> Optional[HotspotRecord]:
+        """Return the single-residue hotspot at a position, or None."""
+        gene_key = gene.strip().upper()
+        positions = self._positions.get(gene_key)
+        if positions:
+            i = bisect.bisect_left(positions, int(position))
+            if i < len(positions) and positions[i] == int(position):
+                return self._residues[gene_key][i]
+        return None
+
+    def overlapping(self, gene: str, start: int, end: Optional[int] = None) -> List[HotspotRecord]:
+        """Return residue and indel hotspots overlapping [start, end]."""
+        gene_key = gene.strip().upper()
+        end = start if end is None else end
+        positions = self._positions.get(gene_key, [])
+        lo = bisect.bisect_left(positions, start)
+        hi = bisect.bisect_right(positions, end)
+        hits = list(self._residues.get(gene_key, [])[lo:hi])
+        hits.extend(r for r in self._ranges.get(gene_key, []) if r.start <= end and r.end >= start)
+        return hits
+
+    def lookup(self, gene: str, position: int) -> Optional[Dict[str, Any]]:
+        """Return the _query_cancer_hotspots() dict for a residue, or None."""
+        record = self.get(gene, position)
+        if record is None:
+            ranges = self.overlapping(gene, position)
+            record = ranges[0] if ranges else None
+        return record.to_result(position, self.source) if record else None
+
+    def positions(self, gene: str) -> List[int]:
+        """Return the sorted single-residue hotspot positions of a gene."""
+        return list(self._positions.get(gene.strip().upper(), []))
+
+    def records(self, gene: str) -> List[HotspotRecord]:
+        """Return all hotspots of a gene (residues in position order, then ranges)."""
+        gene_key = gene.strip().upper()
+        return list(self._residues.get(gene_key, [])) + list(self._ranges.get(gene_key, []))
+
+    def genes(self) -> List[str]:
+        return sorted(set(self._positions) | set(self._ranges))
+
+    def index_regions(self, index=None) -> None:
+        """
+        Register every gene's hotspots with the shared domain index (PM1/in-frame queries).
+
+        Runs once per index (again only after the shared index is rebuilt);
+        hotspots added afterwards are indexed by add().
+        """
+        from utils.domain_index import get_domain_index
+        index = index or get_domain_index()
+        if index is self._indexed_into:
+            return
+        for gene in self.genes():
+            self._index_gene(gene, index)
+        self._indexed_into = index
+
+    def _index_gene(self, gene: str, index) -> None:
+        from utils.domain_index import SOURCE_CANCER_HOTSPOTS, DomainRegion
+        index.add_regions(gene, SOURCE_CANCER_HOTSPOTS, [
+            DomainRegion(record.start, record.end, f"{gene} {record.reference_aa}{record.start}",
+                         'hotspot', SOURCE_CANCER_HOTSPOTS,
+                         {'tumor_count': record.tumor_count, 'mutation_count': record.mutation_count})
+            for record in self.records(gene)
+        ])
+
+    def __contains__(self, gene: str) -> bool:
+        gene_key = gene.strip().upper()
+        return gene_key in self._positions or gene_key in self._ranges
+
+    def __len__(self) -> int:
+        return sum(len(p) for p in self._positions.values()) + sum(len(r) for r in self._ranges.values())
+
+
+# =============================================================================
+# Shared table resolution
+# =============================================================================
+
+def _open_table(path: str) -> CancerHotspotTable:
+    table = CancerHotspotTable.from_file(path)
+    table.index_regions()
+    return table
+
+
+# ValueError covers CancerHotspotTableError and undecodable (non-UTF-8) files
+_tables = LocalResource('cancer_hotspots', 'ACMG_CANCER_HOTSPOTS', _open_table,
+                       label='Local CancerHotspots table', errors=(ValueError, csv.Error))
+
+
+def get_cancer_hotspot_table(path: Optional[str] = None) -> Optional[CancerHotspotTable]:
+    """
+    Return the shared hotspot table, loading it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['cancer_hotspots'], then
+    the ACMG_CANCER_HOTSPOTS environment variable. Returns None when nothing
+    is configured or the file cannot be loaded.
+    """
+    return _tables.get(path)
+
+
+def clear_cancer_hotspot_tables() -> None:
+    """Drop all shared tables (e.g. after the file is replaced)."""
+    _tables.clear()
@@ -0,0 +1,287 @@
+"""
+ClinGen Dosage Sensitivity Table
+================================
+
+Indexed, memory-resident view of the ClinGen gene curation list
+(ClinGen_gene_curation_list_GRCh38.tsv).
+
+The TSV is parsed once into a dictionary keyed by upper-case gene symbol,
+so lookups are O(1) instead of a scan of the file for every gene. The
+parsed table can optionally be persisted as a JSON snapshot (gzip-compressed
+for .json.gz paths) next to the TSV and is reloaded from it while it is
+newer than the TSV.
+
+Both APIClient.get_clingen_dosage_sensitivity() and
+utils.gene_rules_engine.build_gene_specific_thresholds_from_clingen()
+share the same index through get_dosage_table().
+
+Usage:
+    table = get_dosage_table()
+    record = table.get('BRCA1')
+    records = table.get_many(['TP53', 'DMD'])
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field, astuple
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils.local_store import load_snapshot, save_snapshot
+
+
+CLINGEN_TSV_FILENAME = 'ClinGen_gene_curation_list_GRCh38.tsv'
+
+# Bumped whenever DosageRecord or the snapshot layout changes
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+@dataclass
+class DosageRecord:
+    """
+    One gene row of the ClinGen dosage sensitivity curation list.
+
+    gene_symbol keeps the TSV spelling; the table index is upper-case.
+    Scores are None when the TSV reports 'Not yet evaluated' or a
+    non-numeric value.
+    """
+    gene_symbol: str
+    gene_id: str = ''
+    cytoband: str = ''
+    genomic_location: str = ''
+    hi_score: Optional[int] = None
+    hi_description: str = ''
+    hi_pmids: List[str] = field(default_factory=list)
+    ts_score: Optional[int] = None
+    ts_description: str = 'Not evaluated'
+    last_evaluated: str = 'Unknown'
+
+
+def _parse_score(value: str) -> Optional[int]:
+    """Parse a ClinGen dosage score column."""
+    value = value.strip()
+    if not value or value == 'Not yet evaluated':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def parse_dosage_line(line: str) -> Optional[DosageRecord]:
+    """
+    Parse one TSV line into a DosageRecord.
+
+    Returns None for comments, blank lines and rows without a score column.
+    """
+    if line.startswith('#') or not line.strip():
+        return None
+
+    fields = line.rstrip('\r\n').split('\t')
+    if len(fields) < 5 or not fields[0].strip():
+        return None
+
+    def column(index: int, default: str = '') -> str:
+        return fields[index].strip() if index < len(fields) else default
+
+    return DosageRecord(
+        gene_symbol=fields[0].strip(),
+        gene_id=column(1),
+        cytoband=column(2),
+        genomic_location=column(3),
+        hi_score=_parse_score(fields[4]),
+        hi_description=column(5),
+        hi_pmids=[column(i) for i in range(6, 12) if column(i)],
+        ts_score=_parse_score(column(12, '0')),
+        ts_description=column(13, 'Not evaluated') or 'Not evaluated',
+        last_evaluated=column(20, 'Unknown') or 'Unknown',
+    )
+
+
+class ClinGenDosageTable:
+    """
+    Gene-symbol index over the ClinGen dosage sensitivity curation list.
+
+    Attributes:
+        source: Human-readable data source label
+        path: TSV path the table was built from (None if built from text)
+    """
+
+    def __init__(
+        self,
+        records: Optional[Dict[str, DosageRecord]] = None,
+        source: str = 'Local ClinGen TSV (GRCh38)',
+        path: Optional[Path] = None
+    ):
+        self._records: Dict[str, DosageRecord] = records or {}
+        self.source = source
+        self.path = path
+
+    @classmethod
+    def from_text(cls, tsv_content: str, source: str = 'ClinGen FTP (GRCh38)') -> 'ClinGenDosageTable':
+        """Build a table from TSV text (e.g., a fresh FTP download)."""
+        return cls(cls._index(tsv_content.splitlines()), source=source)
+
+    @classmethod
+    def from_tsv(cls, path: os.PathLike, source: str = 'Local ClinGen TSV (GRCh38)') -> 'ClinGenDosageTable':
+        """Build a table by parsing a TSV file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            records = cls._index(f)
+        return cls(records, source=source, path=Path(path))
+
+    @staticmethod
+    def _index(lines: Iterable[str]) -> Dict[str, DosageRecord]:
+        records = {}
+        for line in lines:
+            record = parse_dosage_line(line)
+            # First row wins, matching the previous linear scan
+            if record is not None and record.gene_symbol.upper() not in records:
+                records[record.gene_symbol.upper()] = record
+        return records
+
+    # =========================================================================
+    # Lookup
+    # =========================================================================
+
+    def get(self, gene_symbol: str) -> Optional[DosageRecord]:
+        """Return the record for a gene symbol (case-insensitive), or None."""
+        if not gene_symbol:
+            return None
+        return self._records.get(gene_symbol.strip().upper())
+
+    def get_many(self, gene_symbols: Iterable[str]) -> Dict[str, Optional[DosageRecord]]:
+        """Return records for many genes, keyed by upper-case symbol."""
+        return {
+            symbol.strip().upper(): self._records.get(symbol.strip().upper())
+            for symbol in gene_symbols if symbol
+        }
+
+    def genes(self) -> List[str]:
+        """Return all gene symbols as spelled in the TSV."""
+        return [record.gene_symbol for record in self._records.values()]
+
+    def records(self) -> Iterable[DosageRecord]:
+        """Iterate over all records."""
+        return self._records.values()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, gene_symbol: str) -> bool:
+        return self.get(gene_symbol) is not None
+
+    # =========================================================================
+    # Snapshot persistence
+    # =========================================================================
+
+    def save(self, path: os.PathLike) -> None:
+        """Persist the table as JSON (gzip-compressed unless the path ends in .json)."""
+        save_snapshot(path, 'clingen_dosage', SNAPSHOT_FORMAT_VERSION, source=self.source,
+                      rows=[astuple(record) for record in self._records.values()])
+
+    @classmethod
+    def load(cls, path: os.PathLike) -> Optional['ClinGenDosageTable']:
+        """Load a table saved with save(); returns None if missing or incompatible."""
+        payload = load_snapshot(path, 'clingen_dosage', SNAPSHOT_FORMAT_VERSION)
+        if payload is None:
+            return None
+
+        records = {}
+        try:
+            for row in payload.get('rows', []):
+                record = DosageRecord(*row)
+                records[record.gene_symbol.upper()] = record
+        except (TypeError, AttributeError):
+            return None
+        return cls(records, source=payload.get('source', 'Local ClinGen TSV (GRCh38)'))
+
+
+# =============================================================================
+# Shared table resolution
+# =============================================================================
+
+_tables: Dict[str, ClinGenDosageTable] = {}
+_tables_lock = threading.Lock()
+
+
+def default_tsv_path() -> Path:
+    """
+    Locate the ClinGen TSV independently of the current working directory.
+
+    Checks ACMG_CLINGEN_TSV, the project root, src/, then the working
+    directory; returns the project-root path if none exists yet.
+    """
+    env_path = os.environ.get('ACMG_CLINGEN_TSV')
+    possible_paths = [
+        Path(env_path) if env_path else None,
+        Path(__file__).resolve().parent.parent.parent / CLINGEN_TSV_FILENAME,
+        Path(__file__).resolve().parent.parent / CLINGEN_TSV_FILENAME,
+        Path(CLINGEN_TSV_FILENAME),
+    ]
+
+    for path in possible_paths:
+        if path is not None and path.exists():
+            return path
+
+    return possible_paths[1]
+
+
+def get_dosage_table(
+    tsv_path: Optional[os.PathLike] = None,
+    binary_path: Optional[os.PathLike] = None
+) -> Optional[ClinGenDosageTable]:
+    """
+    Return the shared dosage table for a TSV, parsing it at most once per process.
+
+    Args:
+        tsv_path: TSV location (defaults to default_tsv_path())
+        binary_path: Optional JSON snapshot copy. Used instead of the TSV
+                     while it is newer; (re)written after parsing the TSV.
+
+    Returns:
+        ClinGenDosageTable, or None if the TSV does not exist
+    """
+    path = Path(tsv_path) if tsv_path else default_tsv_path()
+    key = str(path.resolve()) if path.exists() else str(path)
+
+    with _tables_lock:
+        if key in _tables:
+            return _tables[key]
+
+        if not path.exists():
+            return None
+
+        table = None
+        if binary_path and os.path.exists(binary_path) \
+                and os.path.getmtime(binary_path) >= os.path.getmtime(path):
+            table = ClinGenDosageTable.load(binary_path)
+            if table is not None:
+                table.path = path
+
+        if table is None:
+            table = ClinGenDosageTable.from_tsv(path)
+            if binary_path:
+                try:
+                    table.save(binary_path)
+                except OSError:
+                    pass
+
+        _tables[key] = table
+        return table
+
+
+def register_dosage_table(table: ClinGenDosageTable, tsv_path: Optional[os.PathLike] = None) -> None:
+    """Make a table (e.g., built from a fresh download) the shared table for a TSV path."""
+    path = Path(tsv_path) if tsv_path else default_tsv_path()
+    key = str(path.resolve()) if path.exists() else str(path)
+    with _tables_lock:
+        _tables[key] = table
+
+
+def clear_dosage_tables() -> None:
+    """Drop all shared tables (used by tests and after the TSV is replaced)."""
+    with _tables_lock:
+        _tables.clear()
@@ -0,0 +1,384 @@
+"""
+ClinGen Gene-Disease Validity Snapshot
+======================================
+
+Local, indexed copy of the ClinGen gene-disease validity curations, so
+PVS1's disease-mechanism check (_check_clingen_validity) resolves without
+eRepo calls and without parsing up to 100 interpretations per gene.
+
+Accepted input is the curation export from
+https://search.clinicalgenome.org/kb/gene-validity/download (CSV with a
+short banner: "FILE CREATED: <date>", a "+++" separated header row with
+GENE SYMBOL, GENE ID (HGNC), DISEASE LABEL, DISEASE ID (MONDO), MOI, SOP,
+CLASSIFICATION, ONLINE REPORT, CLASSIFICATION DATE, GCEP). An optional
+MECHANISM column (e.g. added from GenCC or the curation reports) is used
+when present.
+
+Curations are indexed by gene symbol and by MONDO disease ID, and the
+per-gene result dict is computed once and reused. The export does not
+state the disease mechanism, so without a MECHANISM column a curation is
+treated as loss of function when ClinGen's dosage map reports sufficient
+evidence for haploinsufficiency (HI score 3, or 30 for autosomal
+recessive disease).
+
+A parsed snapshot can be saved as gzip-compressed JSON (a ``.json.gz``
+path); get_validity_snapshot() accepts either file, chosen by extension,
+and reloads it when it is replaced, so a periodic re-download
+(APIClient.refresh_clingen_validity_snapshot()) takes effect without
+restarting.
+
+Usage:
+    snapshot = ClinGenValiditySnapshot.from_csv('Clingen-Gene-Disease-Summary.csv')
+    snapshot.get_gene('BRCA1')
+    snapshot.get_disease('MONDO:0011450')
+    snapshot.validity_result('BRCA1', hi_score=3)
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import csv
+import re
+from dataclasses import astuple, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.local_store import LocalResource, is_snapshot_path, load_snapshot, save_snapshot
+
+
+# Bumped whenever ValidityCuration or the snapshot layout changes
+SNAPSHOT_FORMAT_VERSION = 2
+
+# ClinGen validity classifications, strongest first
+CLASSIFICATION_RANK = {
+    'Definitive': 6,
+    'Strong': 5,
+    'Moderate': 4,
+    'Limited': 3,
+    'No Known Disease Relationship': 2,
+    'Disputed': 1,
+    'Refuted': 0,
+}
+
+# Minimum classification for a curation to establish a disease mechanism
+ESTABLISHED_CLASSIFICATIONS = ('Definitive', 'Strong', 'Moderate')
+
+LOF_MECHANISM = 'loss_of_function'
+
+_CSV_COLUMNS = {
+    'gene': 'GENE SYMBOL',
+    'hgnc_id': 'GENE ID (HGNC)',
+    'disease_label': 'DISEASE LABEL',
+    'disease_id': 'DISEASE ID (MONDO)',
+    'moi': 'MOI',
+    'sop': 'SOP',
+    'classification': 'CLASSIFICATION',
+    'report_url': 'ONLINE REPORT',
+    'classification_date': 'CLASSIFICATION DATE',
+    'gcep': 'GCEP',
+    'mechanism': 'MECHANISM',
+}
+
+_MONDO_ID = re.compile(r'MONDO[_:]?(\d+)', re.IGNORECASE)
+_FILE_CREATED = re.compile(r'FILE CREATED:\s*(\S+)', re.IGNORECASE)
+
+
+class ValiditySnapshotError(ValueError):
+    """Raised when a file is not a ClinGen gene-validity export."""
+
+
+def normalize_mondo_id(value: str) -> Optional[str]:
+    """Return 'MONDO:0011450' for MONDO:0011450, MONDO_0011450 or mondo0011450, else None."""
+    match = _MONDO_ID.search(value or '')
+    return f"MONDO:{match.group(1).zfill(7)}" if match else None
+
+
+def normalize_mechanism(value: str) -> str:
+    """Map free-text mechanism labels to snake case ('Loss of function' -> 'loss_of_function')."""
+    value = (value or '').strip().lower().replace('-', ' ')
+    if value in ('lof', 'haploinsufficiency'):
+        return LOF_MECHANISM
+    return re.sub(r'\s+', '_', value)
+
+
+@dataclass(frozen=True)
+class ValidityCuration:
+    """One ClinGen gene-disease validity curation."""
+    gene: str
+    hgnc_id: str
+    disease_label: str
+    disease_id: str
+    moi: str
+    sop: str
+    classification: str
+    report_url: str = ''
+    classification_date: str = ''
+    gcep: str = ''
+    mechanism: str = ''
+
+    @property
+    def is_established(self) -> bool:
+        """True for Definitive, Strong and Moderate curations."""
+        return self.classification in ESTABLISHED_CLASSIFICATIONS
+
+    @property
+    def is_recessive(self) -> bool:
+        return self.moi.upper() in ('AR', 'XLR') or 'recessive' in self.moi.lower()
+
+    def to_dict(self, mechanism: Optional[str] = None) -> Dict[str, Any]:
+        """Return the curation entry of get_clingen_gene_validity()['curations']."""
+        return {
+            'disease_label': self.disease_label,
+            'disease_id': self.disease_id,
+            'classification': self.classification,
+            'mechanism': mechanism if mechanism is not None else (self.mechanism or 'unknown'),
+            'moi': self.moi,
+            'pmids': [],
+            'classification_date': self.classification_date,
+            'gcep': self.gcep,
+            'report_url': self.report_url,
+        }
+
+
+def iter_validity_csv(path: str) -> Tuple[str, List[ValidityCuration]]:
+    """Parse a gene-validity CSV export; returns (release date, curations)."""
+    release = ''
+    curations = []
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = None
+        for row in reader:
+            if not row or not any(cell.strip() for cell in row):
+                continue
+            first = row[0].strip()
+            if header is None:
+                created = _FILE_CREATED.search(first)
+                if created:
+                    release = created.group(1)
+                elif first.upper() == _CSV_COLUMNS['gene']:
+                    header = {name.strip().upper(): i for i, name in enumerate(row)}
+                continue
+            if first.startswith('+'):
+                continue
+
+            def column(key: str) -> str:
+                index = header.get(_CSV_COLUMNS[key])
+                return row[index].strip() if index is not None and index < len(row) else ''
+
+            gene = column('gene')
+            if not gene:
+                continue
+            curations.append(ValidityCuration(
+                gene=gene.upper(),
+                hgnc_id=column('hgnc_id'),
+                disease_label=column('disease_label'),
+                disease_id=normalize_mondo_id(column('disease_id')) or column('disease_id'),
+                moi=column('moi'),
+                sop=column('sop'),
+                classification=column('classification'),
+                report_url=column('report_url'),
+                classification_date=column('classification_date')[:10],
+                gcep=column('gcep'),
+                mechanism=normalize_mechanism(column('mechanism')),
+            ))
+
+    if header is None:
+        raise ValiditySnapshotError(f"Not a ClinGen gene-validity export: {path}")
+    return release, curations
+
+
+class ClinGenValiditySnapshot:
+    """
+    Gene and MONDO disease index over ClinGen gene-validity curations.
+
+    Attributes:
+        release: Export date ('FILE CREATED' line), or '' if unknown
+        path: File the snapshot was read from (None if built in memory)
+    """
+
+    def __init__(self, curations: Iterable[ValidityCuration] = (), release: str = '',
+                 path: Optional[str] = None):
+        self.release = release
+        self.path = path
+        self._curations: List[ValidityCuration] = []
+        self._by_gene: Dict[str, List[int]] = {}
+        self._by_disease: Dict[str, List[int]] = {}
+        self._results: Dict[Tuple[str, Optional[int]], Dict[str, Any]] = {}
+        for curation in curations:
+            index = len(self._curations)
+            self._curations.append(curation)
+            self._by_gene.setdefault(curation.gene, []).append(index)
+            if curation.disease_id:
+                self._by_disease.setdefault(curation.disease_id, []).append(index)
+
+    @classmethod
+    def from_csv(cls, path: str) -> 'ClinGenValiditySnapshot':
+        """Build a snapshot from the gene-validity CSV download."""
+        release, curations = iter_validity_csv(path)
+        return cls(curations, release=release, path=path)
+
+    @property
+    def source(self) -> str:
+        return f"ClinGen Gene Validity {self.release} (local)" if self.release else 'ClinGen Gene Validity (local)'
+
+    # =========================================================================
+    # Lookup
+    # =========================================================================
+
+    def get_gene(self, gene_symbol: str) -> List[ValidityCuration]:
+        """Return all curations of a gene (case-insensitive), in file order."""
+        if not gene_symbol:
+            return []
+        return [self._curations[i] for i in self._by_gene.get(gene_symbol.strip().upper(), [])]
+
+    def get_disease(self, disease_id: str) -> List[ValidityCuration]:
+        """Return all curations for a MONDO disease ID."""
+        key = normalize_mondo_id(disease_id)
+        return [self._curations[i] for i in self._by_disease.get(key, [])] if key else []
+
+    def get_curations(self, gene_symbol: str, disease: Optional[str] = None) -> List[ValidityCuration]:
+        """Return a gene's curations, optionally restricted to a MONDO ID or disease name."""
+        curations = self.get_gene(gene_symbol)
+        if not disease:
+            return curations
+        mondo_id = normalize_mondo_id(disease)
+        if mondo_id:
+            return [c for c in curations if c.disease_id == mondo_id]
+        disease = disease.strip().lower()
+        return [c for c in curations if disease in c.disease_label.lower()]
+
+    def validity_result(self, gene_symbol: str, disease: Optional[str] = None,
+                        hi_score: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return the APIClient.get_clingen_gene_validity() dict for a gene.
+
+        Args:
+            gene_symbol: Gene symbol
+            disease: Optional MONDO ID or disease name to restrict curations
+            hi_score: ClinGen dosage haploinsufficiency score, used as the
+                      mechanism for curations without a MECHANISM value
+
+        Returns:
+            Result dict; gene-wide results are computed once and reused
+        """
+        gene_symbol = gene_symbol.strip().upper()
+        memo_key = (gene_symbol, hi_score)
+        if not disease and memo_key in self._results:
+            return self._results[memo_key]
+
+        curations = self.get_curations(gene_symbol, disease)
+        entries = []
+        lof_curations = []
+        mechanisms = {}
+        for curation in curations:
+            mechanism = curation.mechanism
+            if not mechanism and hi_score in (3, 30):
+                # HI 30 is "gene associated with autosomal recessive phenotype"
+                if hi_score == 3 or curation.is_recessive:
+                    mechanism = LOF_MECHANISM
+            entries.append(curation.to_dict(mechanism or 'unknown'))
+            if curation.is_established and mechanism:
+                mechanisms[mechanism] = mechanisms.get(mechanism, 0) + 1
+                if mechanism == LOF_MECHANISM:
+                    lof_curations.append(curation)
+
+        if lof_curations:
+            supports_lof = True
+            best = max(CLASSIFICATION_RANK.get(c.classification, 0) for c in lof_curations)
+            confidence = 'high' if best >= CLASSIFICATION_RANK['Strong'] else 'medium'
+        elif mechanisms:
+            # Established curations with a stated, non-LOF mechanism
+            supports_lof = False
+            confidence = 'medium'
+        else:
+            supports_lof = None
+            confidence = 'low' if curations else 'no_data'
+
+        result = {
+            'gene_symbol': gene_symbol,
+            'curations': entries,
+            'total_curations': len(entries),
+            'lof_diseases': list(dict.fromkeys(c.disease_label for c in lof_curations)),
+            'primary_mechanism': max(mechanisms, key=mechanisms.get) if mechanisms else 'unknown',
+            'supports_lof_pathogenicity': supports_lof,
+            'confidence': confidence,
+            'source': self.source,
+        }
+        if not curations:
+            result['message'] = f'No gene-validity curations found for {gene_symbol}'
+        if not disease:
+            self._results[memo_key] = result
+        return result
+
+    def genes(self) -> List[str]:
+        return list(self._by_gene)
+
+    def diseases(self) -> List[str]:
+        return list(self._by_disease)
+
+    def __len__(self) -> int:
+        return len(self._curations)
+
+    def __contains__(self, gene_symbol: str) -> bool:
+        return bool(gene_symbol) and gene_symbol.strip().upper() in self._by_gene
+
+    # =========================================================================
+    # Snapshot persistence
+    # =========================================================================
+
+    def save(self, path: str) -> None:
+        """Persist the snapshot as JSON (gzip-compressed for .json.gz paths)."""
+        save_snapshot(path, 'clingen_validity', SNAPSHOT_FORMAT_VERSION, release=self.release,
+                      rows=[astuple(curation) for curation in self._curations])
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ClinGenValiditySnapshot']:
+        """Load a snapshot saved with save(); returns None if missing or incompatible."""
+        payload = load_snapshot(path, 'clingen_validity', SNAPSHOT_FORMAT_VERSION)
+        if payload is None:
+            return None
+        try:
+            curations = [ValidityCuration(*row) for row in payload.get('rows', [])]
+        except TypeError:
+            return None
+        return cls(curations, release=payload.get('release', ''), path=path)
+
+
+def open_validity_snapshot(path: str) -> ClinGenValiditySnapshot:
+    """Open a saved snapshot (.json.gz / .json) or parse any other file as the CSV export."""
+    if not is_snapshot_path(path):
+        return ClinGenValiditySnapshot.from_csv(path)
+    snapshot = ClinGenValiditySnapshot.load(path)
+    if snapshot is None:
+        raise ValiditySnapshotError(f"Not a version {SNAPSHOT_FORMAT_VERSION} ClinGen validity snapshot: {path}")
+    return snapshot
+
+
+# =============================================================================
+# Shared snapshot resolution
+# =============================================================================
+
+_snapshots = LocalResource('clingen_validity', 'ACMG_CLINGEN_VALIDITY', open_validity_snapshot,
+                           label='Local ClinGen validity snapshot', reload_on_change=True,
+                           errors=(UnicodeDecodeError, ValiditySnapshotError))
+
+
+def validity_snapshot_path() -> Optional[str]:
+    """Return the configured snapshot path (LOCAL_DATA_SOURCES, then ACMG_CLINGEN_VALIDITY)."""
+    return _snapshots.configured_path()
+
+
+def get_validity_snapshot(path: Optional[str] = None) -> Optional[ClinGenValiditySnapshot]:
+    """
+    Return the shared snapshot, loading it once per file version.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['clingen_validity'], then
+    the ACMG_CLINGEN_VALIDITY environment variable. The file is reloaded
+    when its modification time changes (a refreshed download). Returns None
+    when nothing is configured or the file cannot be loaded.
+    """
+    return _snapshots.get(path)
+
+
+def clear_validity_snapshots() -> None:
+    """Drop all shared snapshots (e.g. after the file is replaced)."""
+    _snapshots.clear()
@@ -0,0 +1,508 @@
+"""
+Local ClinVar Snapshot
+======================
+
+Offline index over one ClinVar release, answering the PS1/PM5 ("same amino
+acid change pathogenic", "other pathogenic amino acid at this codon") and
+PP5/BP6 (classification + review status) questions without E-utilities.
+
+A release is streamed once from either public download:
+
+- variant_summary.txt.gz: one row per allele and assembly; the Name column
+  carries the transcript, c. and p. notation used for the codon index
+- clinvar.vcf.gz: genomic alleles with CLNSIG/CLNREVSTAT/GENEINFO; it has
+  no protein notation, so it only feeds the allele index and codon queries
+  (search_position) return None to defer to E-utilities
+
+and saved as a JSON snapshot (record rows, gzip-compressed for .json.gz).
+Loading rebuilds four dictionary indexes:
+
+    allele    (chrom, pos, ref, alt)    -> record
+    codon     (GENE, protein position)  -> records (missense only)
+    hgvs      (GENE, c. notation)       -> record
+    variation VariationID               -> record
+
+so every query is one or two hash lookups. A new release is picked up by
+rebuilding the snapshot file; get_clinvar_snapshot() reloads it when the
+file changes.
+
+Usage:
+    build_clinvar_snapshot('variant_summary.txt.gz', 'clinvar.json.gz', release='2024-05')
+    snapshot = ClinVarSnapshot.load('clinvar.json.gz')
+    snapshot.search_position('TP53', 'p.Arg273His')
+    snapshot.get_by_hgvs('TP53', 'c.818G>A')
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import gzip
+import os
+import re
+from dataclasses import astuple, dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils.alphamissense_store import AA_THREE_TO_ONE, parse_protein_variant
+from utils.local_store import LocalResource, load_snapshot, save_snapshot
+
+
+SNAPSHOT_FORMAT_VERSION = 3
+
+# Review status -> star rating (ClinVar's published mapping)
+REVIEW_STATUS_STARS = {
+    'practice guideline': 4,
+    'reviewed by expert panel': 3,
+    'criteria provided, multiple submitters, no conflicts': 2,
+    'criteria provided, single submitter': 1,
+    'criteria provided, conflicting interpretations': 1,
+    'criteria provided, conflicting classifications': 1,
+    'no assertion provided': 0,
+    'no assertion criteria provided': 0,
+    'no classification provided': 0,
+}
+
+_AA_ONE_TO_THREE = {code: name for name, code in AA_THREE_TO_ONE.items()}
+
+_NAME_GENE = re.compile(r'\(([A-Za-z0-9\-\.]+)\):')
+_NAME_HGVS_C = re.compile(r':(c\.[^\s(]+)')
+_NAME_HGVS_P = re.compile(r'\((p\.[^)\s]+)\)')
+
+# variant_summary column names (older and current releases)
+_SIGNIFICANCE_COLUMNS = ('ClinicalSignificance', 'GermlineClassification')
+_LAST_EVALUATED_COLUMNS = ('LastEvaluated', 'GermlineDateLastEvaluated')
+_REVIEW_STATUS_COLUMNS = ('ReviewStatus', 'GermlineReviewStatus')
+
+
+class ClinVarSnapshotError(ValueError):
+    """Raised when a ClinVar release file cannot be parsed."""
+
+
+@dataclass(frozen=True)
+class ClinVarRecord:
+    """One ClinVar allele (germline classification)."""
+    variation_id: str
+    gene: str
+    chrom: str
+    pos: int
+    ref: str
+    alt: str
+    hgvs_c: str
+    hgvs_p: str
+    classification: str
+    review_status: str
+    last_evaluated: str
+    title: str
+
+    @property
+    def star_rating(self) -> int:
+        return REVIEW_STATUS_STARS.get(self.review_status.lower(), 0)
+
+    @property
+    def is_pathogenic(self) -> bool:
+        """Same rule as the E-utilities search: pathogenic and not benign."""
+        classification = self.classification.lower()
+        return 'pathogenic' in classification and 'benign' not in classification
+
+    @property
+    def protein_change(self) -> Optional[Tuple[str, int, str]]:
+        """(ref_aa, position, alt_aa) in one-letter code for missense records."""
+        return parse_protein_variant(self.hgvs_p) if self.hgvs_p else None
+
+
+# =============================================================================
+# Release parsing
+# =============================================================================
+
+def _open_text(path: str):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def _normalize_contig(chrom: str) -> str:
+    chrom = str(chrom).strip()
+    if chrom.lower().startswith('chr'):
+        chrom = chrom[3:]
+    return 'MT' if chrom.upper() == 'M' else chrom.upper()
+
+
+def _format_date(value: str) -> str:
+    """Convert 'Jun 29, 2015' (variant_summary) to 'YYYY/MM/DD'; '' if missing."""
+    value = (value or '').strip()
+    if not value or value == '-':
+        return ''
+    for fmt in ('%b %d, %Y', '%Y-%m-%d', '%Y/%m/%d'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y/%m/%d')
+        except ValueError:
+            continue
+    return value
+
+
+def _first_column(header: Dict[str, int], names: Iterable[str]) -> Optional[int]:
+    for name in names:
+        if name in header:
+            return header[name]
+    return None
+
+
+def iter_variant_summary(path: str, assembly: str = 'GRCh38') -> Iterator[ClinVarRecord]:
+    """Stream records for one assembly from variant_summary.txt(.gz)."""
+    with _open_text(path) as handle:
+        header_line = handle.readline().rstrip('\n')
+        header = {name.lstrip('#'): i for i, name in enumerate(header_line.split('\t'))}
+        required = ('Name', 'GeneSymbol', 'Assembly', 'Chromosome', 'VariationID')
+        missing = [name for name in required if name not in header]
+        significance_col = _first_column(header, _SIGNIFICANCE_COLUMNS)
+        if missing or significance_col is None:
+            raise ClinVarSnapshotError(f"Not a ClinVar variant_summary file (missing {missing or 'significance'})")
+
+        review_col = _first_column(header, _REVIEW_STATUS_COLUMNS)
+        evaluated_col = _first_column(header, _LAST_EVALUATED_COLUMNS)
+        pos_col = header.get('PositionVCF', header.get('Start'))
+        ref_col = header.get('ReferenceAlleleVCF', header.get('ReferenceAllele'))
+        alt_col = header.get('AlternateAlleleVCF', header.get('AlternateAllele'))
+
+        for line in handle:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < len(header) or fields[header['Assembly']] != assembly:
+                continue
+
+            def column(index: Optional[int]) -> str:
+                value = fields[index] if index is not None else ''
+                return '' if value in ('-', 'na') else value
+
+            name = fields[header['Name']]
+            gene_match = _NAME_GENE.search(name)
+            gene = gene_match.group(1) if gene_match else column(header['GeneSymbol']).split(';')[0]
+            hgvs_c = _NAME_HGVS_C.search(name)
+            hgvs_p = _NAME_HGVS_P.search(name)
+            try:
+                pos = int(column(pos_col) or 0)
+            except ValueError:
+                pos = 0
+
+            yield ClinVarRecord(
+                variation_id=fields[header['VariationID']],
+                gene=gene.upper(),
+                chrom=_normalize_contig(fields[header['Chromosome']]),
+                pos=pos,
+                ref=column(ref_col).upper(),
+                alt=column(alt_col).upper(),
+                hgvs_c=hgvs_c.group(1) if hgvs_c else '',
+                hgvs_p=hgvs_p.group(1) if hgvs_p else '',
+                classification=fields[significance_col],
+                review_status=column(review_col),
+                last_evaluated=_format_date(column(evaluated_col)),
+                title=name,
+            )
+
+
+def _vcf_text(value: str) -> str:
+    """CLNSIG/CLNREVSTAT use '_' for spaces (e.g. criteria_provided,_single_submitter)."""
+    return value.replace('_', ' ')
+
+
+def iter_clinvar_vcf(path: str) -> Iterator[ClinVarRecord]:
+    """Stream records from clinvar.vcf(.gz); protein notation is not available."""
+    with _open_text(path) as handle:
+        for line in handle:
+            if line.startswith('#'):
+                continue
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 8:
+                raise ClinVarSnapshotError(f"Malformed VCF line: {line[:80]}")
+
+            info = {}
+            for entry in fields[7].split(';'):
+                key, _, value = entry.partition('=')
+                info[key] = value
+            if 'CLNSIG' not in info:
+                continue
+
+            gene = info.get('GENEINFO', '').split('|')[0].split(':')[0]
+            hgvs_g = info.get('CLNHGVS', '')
+            for alt in fields[4].split(','):
+                yield ClinVarRecord(
+                    variation_id=fields[2],
+                    gene=gene.upper(),
+                    chrom=_normalize_contig(fields[0]),
+                    pos=int(fields[1]),
+                    ref=fields[3].upper(),
+                    alt=alt.upper(),
+                    hgvs_c='',
+                    hgvs_p='',
+                    classification=_vcf_text(info['CLNSIG']),
+                    review_status=_vcf_text(info.get('CLNREVSTAT', '')),
+                    last_evaluated='',
+                    title=hgvs_g,
+                )
+
+
+def _vcf_file_date(path: str) -> Optional[str]:
+    with _open_text(path) as handle:
+        for line in handle:
+            if not line.startswith('##'):
+                break
+            if line.startswith('##fileDate='):
+                return line.split('=', 1)[1].strip()
+    return None
+
+
+# =============================================================================
+# Snapshot
+# =============================================================================
+
+class ClinVarSnapshot:
+    """
+    In-memory indexes over one ClinVar release.
+
+    Attributes:
+        release: Release label (e.g. the VCF fileDate)
+        path: File the snapshot was loaded from (None if built in memory)
+        has_codon_index: Whether the source carried protein notation, i.e.
+            whether an empty codon lookup means "no ClinVar record"
+    """
+
+    def __init__(self, records: Iterable[ClinVarRecord], release: str = 'unknown',
+                 path: Optional[str] = None, has_codon_index: bool = True):
+        self.release = release
+        self.path = path
+        self.has_codon_index = has_codon_index
+        self._records: List[ClinVarRecord] = []
+        self._by_allele: Dict[Tuple[str, int, str, str], ClinVarRecord] = {}
+        self._by_codon: Dict[Tuple[str, int], List[ClinVarRecord]] = {}
+        self._by_hgvs: Dict[Tuple[str, str], ClinVarRecord] = {}
+        self._by_variation: Dict[str, ClinVarRecord] = {}
+
+        for record in records:
+            if record.variation_id in self._by_variation:
+                continue
+            self._records.append(record)
+            self._by_variation[record.variation_id] = record
+            if record.pos and record.ref and record.alt:
+                self._by_allele.setdefault((record.chrom, record.pos, record.ref, record.alt), record)
+            if record.gene and record.hgvs_c:
+                self._by_hgvs.setdefault((record.gene, record.hgvs_c), record)
+            change = record.protein_change
+            if record.gene and change is not None:
+                self._by_codon.setdefault((record.gene, change[1]), []).append(record)
+
+    @classmethod
+    def from_variant_summary(cls, path: str, release: Optional[str] = None,
+                             assembly: str = 'GRCh38') -> 'ClinVarSnapshot':
+        """Build a snapshot from variant_summary.txt(.gz)."""
+        if release is None:
+            release = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d')
+        return cls(iter_variant_summary(path, assembly=assembly), release=release)
+
+    @classmethod
+    def from_vcf(cls, path: str, release: Optional[str] = None) -> 'ClinVarSnapshot':
+        """Build a snapshot (allele index only) from clinvar.vcf(.gz)."""
+        if release is None:
+            release = _vcf_file_date(path) or 'unknown'
+        return cls(iter_clinvar_vcf(path), release=release, has_codon_index=False)
+
+    # =========================================================================
+    # Lookup
+    # =========================================================================
+
+    def get_allele(self, chrom: str, pos: int, ref: str, alt: str) -> Optional[ClinVarRecord]:
+        """Return the record for a GRCh38 allele, or None."""
+        return self._by_allele.get((_normalize_contig(chrom), int(pos), ref.upper(), alt.upper()))
+
+    def get_variation(self, variation_id: str) -> Optional[ClinVarRecord]:
+        """Return the record for a VariationID ('12345' or 'VCV000012345')."""
+        key = str(variation_id).strip()
+        if key.upper().startswith('VCV'):
+            key = key[3:].split('.')[0].lstrip('0')
+        return self._by_variation.get(key)
+
+    def get_by_hgvs(self, gene: str, hgvs: str) -> Optional[ClinVarRecord]:
+        """Return the record for a gene and c. notation (e.g. 'c.818G>A')."""
+        if not gene or not hgvs:
+            return None
+        hgvs = hgvs.strip()
+        if ':' in hgvs:
+            hgvs = hgvs.split(':', 1)[1]
+        return self._by_hgvs.get((gene.strip().upper(), hgvs))
+
+    def get_codon(self, gene: str, position: int) -> List[ClinVarRecord]:
+        """Return all missense records at a protein position."""
+        return list(self._by_codon.get((gene.strip().upper(), int(position)), ()))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # =========================================================================
+    # APIClient-shaped results
+    # =========================================================================
+
+    def classification_result(self, record: Optional[ClinVarRecord],
+                              query: str = '') -> Dict[str, Any]:
+        """Return the get_clinvar_classification() dict for a record (or not found)."""
+        source = f"ClinVar {self.release} (local)"
+        if record is None:
+            return {
+                'classification': 'not_found',
+                'review_status': 'not_found',
+                'star_rating': 0,
+                'source': source,
+                'message': f'No ClinVar entry found for {query}'
+            }
+        return {
+            'variation_id': record.variation_id,
+            'classification': record.classification,
+            'review_status': record.review_status,
+            'star_rating': record.star_rating,
+            'conflicts': 'conflict' in record.review_status.lower(),
+            'date_last_evaluated': record.last_evaluated or 'Unknown',
+            'source': source,
+            'gene': record.gene or 'Unknown'
+        }
+
+    def status_result(self, record: Optional[ClinVarRecord]) -> Dict[str, Any]:
+        """Return the get_clinvar_status() dict for a record (or not found)."""
+        if record is None:
+            return {'status': 'not_found', 'significance': None, 'review_status': None}
+        return {
+            'status': 'found',
+            'clinvar_id': record.variation_id,
+            'significance': record.classification,
+            'review_status': record.review_status,
+            'star_rating': record.star_rating,
+            'last_evaluated': record.last_evaluated,
+            'title': record.title,
+            'url': f"https://www.ncbi.nlm.nih.gov/clinvar/variation/{record.variation_id}/"
+        }
+
+    def search_position(self, gene: str, hgvs_p: str) -> Optional[Dict[str, Any]]:
+        """
+        Answer the PS1/PM5 codon question for a missense change.
+
+        Returns the search_clinvar_variants_at_position() dict, or None if
+        hgvs_p is not a missense change or the snapshot has no codon index
+        (built from the VCF), so the caller falls back to E-utilities.
+        """
+        if not self.has_codon_index:
+            return None
+        query = parse_protein_variant(hgvs_p)
+        if query is None:
+            return None
+        ref_aa, position, alt_aa = query
+
+        same_aa_pathogenic = False
+        different_aa_pathogenic = []
+        variants = []
+        for record in self._by_codon.get((gene.strip().upper(), position), ()):
+            rec_ref, _, rec_alt = record.protein_change
+            specific_change = f"{rec_ref}{position}{rec_alt}"
+            variant_info = {
+                'clinvar_id': record.variation_id,
+                'protein_change': specific_change,
+                'classification': record.classification,
+                'is_pathogenic': record.is_pathogenic,
+                'title': record.title
+            }
+            variants.append(variant_info)
+
+            # Ref amino acid must match (same codon, same transcript numbering)
+            if not record.is_pathogenic or rec_ref != ref_aa:
+                continue
+            if rec_alt == alt_aa:
+                same_aa_pathogenic = True
+            else:
+                different_aa_pathogenic.append({
+                    **variant_info,
+                    'specific_change': specific_change,
+                    'full_hgvs': f"p.{_AA_ONE_TO_THREE[rec_ref]}{position}{_AA_ONE_TO_THREE[rec_alt]}"
+                })
+
+        return {
+            'same_aa_pathogenic': same_aa_pathogenic,
+            'different_aa_pathogenic': different_aa_pathogenic,
+            'variants': variants,
+            'position': str(position),
+            'gene': gene,
+            'query_hgvs': hgvs_p,
+            'source': f"ClinVar {self.release} (local)"
+        }
+
+    # =========================================================================
+    # Snapshot persistence
+    # =========================================================================
+
+    def save(self, path: str) -> None:
+        """Persist the snapshot as JSON (gzip-compressed unless the path ends in .json)."""
+        save_snapshot(path, 'clinvar_snapshot', SNAPSHOT_FORMAT_VERSION, release=self.release,
+                      has_codon_index=self.has_codon_index,
+                      rows=[astuple(record) for record in self._records])
+
+    @classmethod
+    def load(cls, path: str) -> Optional['ClinVarSnapshot']:
+        """Load a snapshot saved with save(); returns None if missing or incompatible."""
+        payload = load_snapshot(path, 'clinvar_snapshot', SNAPSHOT_FORMAT_VERSION)
+        if payload is None:
+            return None
+
+        try:
+            records = [ClinVarRecord(*row) for row in payload.get('rows', [])]
+        except TypeError:
+            return None
+        return cls(records, release=payload.get('release', 'unknown'), path=path,
+                   has_codon_index=payload.get('has_codon_index', True))
+
+
+def build_clinvar_snapshot(source_path: str, out_path: str, release: Optional[str] = None,
+                           assembly: str = 'GRCh38') -> int:
+    """
+    Stream a ClinVar release (variant_summary or VCF) into a snapshot file.
+
+    Returns:
+        Number of records written
+    """
+    name = os.path.basename(source_path).lower()
+    if '.vcf' in name:
+        snapshot = ClinVarSnapshot.from_vcf(source_path, release=release)
+    else:
+        snapshot = ClinVarSnapshot.from_variant_summary(source_path, release=release, assembly=assembly)
+    snapshot.save(out_path)
+    return len(snapshot)
+
+
+# =============================================================================
+# Shared snapshot resolution
+# =============================================================================
+
+def _open_snapshot(path: str) -> ClinVarSnapshot:
+    snapshot = ClinVarSnapshot.load(path)
+    if snapshot is None:
+        raise ClinVarSnapshotError("not a ClinVar snapshot of this version")
+    return snapshot
+
+
+_snapshots = LocalResource('clinvar', 'ACMG_CLINVAR_SNAPSHOT', _open_snapshot, label='Local ClinVar snapshot',
+                           errors=(ClinVarSnapshotError,), reload_on_change=True)
+
+
+def get_clinvar_snapshot(path: Optional[str] = None) -> Optional[ClinVarSnapshot]:
+    """
+    Return the shared snapshot, loading it once per release.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['clinvar'], then the
+    ACMG_CLINVAR_SNAPSHOT environment variable. The file is reloaded when
+    its modification time changes (a rebuilt release). Returns None when
+    nothing is configured or the file cannot be loaded.
+    """
+    return _snapshots.get(path)
+
+
+def register_clinvar_snapshot(snapshot: ClinVarSnapshot, path: Optional[str] = None) -> None:
+    """Make a snapshot (e.g., just built from a new release) the shared one for a path."""
+    _snapshots.register(snapshot, path or snapshot.path)
+
+
+def clear_clinvar_snapshots() -> None:
+    """Drop all shared snapshots."""
+    _snapshots.clear()
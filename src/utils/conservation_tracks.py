@@ -0,0 +1,454 @@
+"""
+Local Conservation Tracks
+=========================
+
+Random-access readers for locally stored phyloP, phastCons and GERP
+tracks, so conservation lookups need no Ensembl VEP call.
+
+Supported formats:
+
+- bigWig (UCSC hg38.phyloP100way.bw, hg38.phastCons100way.bw,
+  gerp_conservation_scores.homo_sapiens.GRCh38.bw): the file is opened
+  with mmap and each lookup walks the R-tree index to the one data block
+  covering the position, so only that block (usually a few KB, zlib
+  compressed) is read. Recently used blocks are kept decoded, so batches
+  of nearby variants touch the disk once per block.
+- bedGraph (plain or gzip): loaded into per-contig sorted arrays and
+  searched with bisect. Suited to small extracts only.
+
+Contig names are matched with or without the 'chr' prefix, and M/MT are
+treated as the same contig. Positions are 1-based.
+
+Usage:
+    tracks = get_conservation_tracks()       # LOCAL_DATA_SOURCES['phylop'] etc.
+    tracks.scores('17', 43092919)            # {'phylop': 7.9, 'phastcons': 1.0, 'gerp': 5.6}
+    track = open_track('hg38.phyloP100way.bw')
+    track.value_at('chr17', 43092919)
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import array
+import gzip
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.local_store import LocalResource
+
+
+BIGWIG_MAGIC = 0x888FFC26
+_CHROM_TREE_MAGIC = 0x78CA8C91
+_RTREE_MAGIC = 0x2468ACE0
+
+_SECTION_BEDGRAPH, _SECTION_VARIABLE_STEP, _SECTION_FIXED_STEP = 1, 2, 3
+
+# Decoded data blocks kept per bigWig file
+BLOCK_CACHE_SIZE = 256
+
+# Score name -> (LOCAL_DATA_SOURCES key, environment variable)
+CONSERVATION_TRACKS = {
+    'phylop': ('phylop', 'ACMG_PHYLOP_TRACK'),
+    'phastcons': ('phastcons', 'ACMG_PHASTCONS_TRACK'),
+    'gerp': ('gerp', 'ACMG_GERP_TRACK'),
+}
+
+
+class ConservationTrackError(ValueError):
+    """Raised for unreadable or malformed track files."""
+
+
+def _contig_names(chrom: str) -> List[str]:
+    """Candidate names for a contig: as given, with/without 'chr', M <-> MT."""
+    chrom = str(chrom).strip()
+    bare = chrom[3:] if chrom.lower().startswith('chr') else chrom
+    names = [chrom, f"chr{bare}", bare]
+    if bare.upper() in ('M', 'MT'):
+        names += ['chrM', 'MT', 'M', 'chrMT']
+    return names
+
+
+# =============================================================================
+# bigWig
+# =============================================================================
+
+class BigWigFile:
+    """
+    Memory-mapped bigWig reader (full-resolution data; zoom levels are not used).
+
+    Attributes:
+        path: Track file
+        chroms: Contig name -> (chrom id, size)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ConservationTrackError(f"{path} is empty")
+
+        try:
+            self._read_header()
+        except (struct.error, ConservationTrackError) as e:
+            self.close()
+            raise ConservationTrackError(f"{path} is not a bigWig file: {e}")
+        self._nodes: Dict[int, Tuple] = {}
+        self._blocks: 'OrderedDict[int, Tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _read_header(self) -> None:
+        for endian in '<>':
+            if struct.unpack_from(f'{endian}I', self._mm, 0)[0] == BIGWIG_MAGIC:
+                self._endian = endian
+                break
+        else:
+            raise ConservationTrackError("bad magic")
+        (_, self.version, _, chrom_tree_offset, _, index_offset, _, _, _, _,
+         self._uncompress_size) = struct.unpack_from(f'{self._endian}IHHQQQHHQQI', self._mm, 0)
+        self.chroms = self._read_chrom_tree(chrom_tree_offset)
+        if struct.unpack_from(f'{self._endian}I', self._mm, index_offset)[0] != _RTREE_MAGIC:
+            raise ConservationTrackError("bad R-tree index")
+        self._index_root = index_offset + 48
+
+    def _read_chrom_tree(self, offset: int) -> Dict[str, Tuple[int, int]]:
+        e = self._endian
+        magic, _, key_size, _, _ = struct.unpack_from(f'{e}IIIIQ', self._mm, offset)
+        if magic != _CHROM_TREE_MAGIC:
+            raise ConservationTrackError("bad chromosome tree")
+        chroms = {}
+        stack = [offset + 32]
+        while stack:
+            node = stack.pop()
+            is_leaf, _, count = struct.unpack_from(f'{e}BBH', self._mm, node)
+            item = node + 4
+            for _ in range(count):
+                key = self._mm[item:item + key_size].rstrip(b'\0').decode('ascii')
+                if is_leaf:
+                    chroms[key] = struct.unpack_from(f'{e}II', self._mm, item + key_size)
+                    item += key_size + 8
+                else:
+                    stack.append(struct.unpack_from(f'{e}Q', self._mm, item + key_size)[0])
+                    item += key_size + 8
+        return chroms
+
+    def resolve_contig(self, chrom: str) -> Optional[str]:
+        for name in _contig_names(chrom):
+            if name in self.chroms:
+                return name
+        return None
+
+    def _node(self, offset: int) -> Tuple[bool, List[Tuple[int, int]], List[Tuple[int, int]], List]:
+        """Decode one R-tree node into (is_leaf, item starts, item ends, payloads); cached."""
+        node = self._nodes.get(offset)
+        if node is not None:
+            return node
+        e = self._endian
+        is_leaf, _, count = struct.unpack_from(f'{e}BBH', self._mm, offset)
+        item_size = 32 if is_leaf else 24
+        starts, ends, payloads = [], [], []
+        for item in range(offset + 4, offset + 4 + count * item_size, item_size):
+            start_chrom, start_base, end_chrom, end_base = struct.unpack_from(f'{e}IIII', self._mm, item)
+            starts.append((start_chrom, start_base))
+            ends.append((end_chrom, end_base))
+            payloads.append(struct.unpack_from(f'{e}QQ', self._mm, item + 16) if is_leaf
+                            else struct.unpack_from(f'{e}Q', self._mm, item + 16)[0])
+        node = self._nodes[offset] = (bool(is_leaf), starts, ends, payloads)
+        return node
+
+    def _find_blocks(self, chrom_id: int, start: int, end: int) -> List[Tuple[int, int]]:
+        """Return (offset, size) of the data blocks overlapping [start, end) on a contig."""
+        blocks = []
+        stack = [self._index_root]
+        while stack:
+            is_leaf, starts, ends, payloads = self._node(stack.pop())
+            # Items are sorted and disjoint: candidates start before the query end
+            hi = bisect_left(starts, (chrom_id, end))
+            for i in range(hi - 1, -1, -1):
+                if ends[i] <= (chrom_id, start):
+                    break
+                if is_leaf:
+                    blocks.append(payloads[i])
+                else:
+                    stack.append(payloads[i])
+        return blocks
+
+    def _block(self, offset: int, size: int) -> Tuple[int, array.array, array.array, array.array]:
+        """Decode one data block into (chrom id, starts, ends, values); cached."""
+        with self._lock:
+            cached = self._blocks.get(offset)
+            if cached is not None:
+                self._blocks.move_to_end(offset)
+                return cached
+
+        data = self._mm[offset:offset + size]
+        if self._uncompress_size:
+            data = zlib.decompress(data)
+        e = self._endian
+        chrom_id, chrom_start, _, step, span, kind, _, count = struct.unpack_from(f'{e}IIIIIBBH', data, 0)
+        starts, ends, values = array.array('l'), array.array('l'), array.array('f')
+        if kind == _SECTION_BEDGRAPH:
+            for i in range(count):
+                item_start, item_end, value = struct.unpack_from(f'{e}IIf', data, 24 + 12 * i)
+                starts.append(item_start)
+                ends.append(item_end)
+                values.append(value)
+        elif kind == _SECTION_VARIABLE_STEP:
+            for i in range(count):
+                item_start, value = struct.unpack_from(f'{e}If', data, 24 + 8 * i)
+                starts.append(item_start)
+                ends.append(item_start + span)
+                values.append(value)
+        elif kind == _SECTION_FIXED_STEP:
+            values.frombytes(data[24:24 + 4 * count])
+            if (e == '>') != (sys.byteorder == 'big'):
+                values.byteswap()
+            for i in range(count):
+                starts.append(chrom_start + i * step)
+                ends.append(chrom_start + i * step + span)
+        else:
+            raise ConservationTrackError(f"Unknown bigWig section type {kind} in {self.path}")
+
+        block = (chrom_id, starts, ends, values)
+        with self._lock:
+            self._blocks[offset] = block
+            if len(self._blocks) > BLOCK_CACHE_SIZE:
+                self._blocks.popitem(last=False)
+        return block
+
+    def value_at(self, chrom: str, pos: int) -> Optional[float]:
+        """Return the track value at a 1-based position, or None if not covered."""
+        name = self.resolve_contig(chrom)
+        if name is None:
+            return None
+        chrom_id = self.chroms[name][0]
+        pos0 = int(pos) - 1
+        for offset, size in self._find_blocks(chrom_id, pos0, pos0 + 1):
+            block_chrom, starts, ends, values = self._block(offset, size)
+            if block_chrom != chrom_id:
+                continue
+            i = bisect_right(starts, pos0) - 1
+            if i >= 0 and ends[i] > pos0:
+                return float(values[i])
+        return None
+
+    def intervals(self, chrom: str, start: int, end: int) -> List[Tuple[int, int, float]]:
+        """Return (start, end, value) intervals (0-based, half-open) overlapping [start, end)."""
+        name = self.resolve_contig(chrom)
+        if name is None:
+            return []
+        chrom_id = self.chroms[name][0]
+        result = []
+        for offset, size in self._find_blocks(chrom_id, start, end):
+            block_chrom, starts, ends, values = self._block(offset, size)
+            if block_chrom != chrom_id:
+                continue
+            for i in range(max(bisect_right(starts, start) - 1, 0), len(starts)):
+                if starts[i] >= end:
+                    break
+                if ends[i] > start:
+                    result.append((starts[i], ends[i], float(values[i])))
+        return sorted(result)
+
+    def close(self) -> None:
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self) -> 'BigWigFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_bigwig(path: str, chrom_sizes: Dict[str, int], entries: Iterable[Tuple[str, int, int, float]],
+                 items_per_block: int = 512, compress: bool = True) -> None:
+    """
+    Write bedGraph-style entries (chrom, 0-based start, end, value) as a bigWig file.
+
+    Produces a single-level chromosome tree and R-tree and no zoom levels;
+    enough for extracts and tests (use UCSC bedGraphToBigWig for genome-wide tracks).
+    """
+    names = sorted(chrom_sizes)
+    chrom_ids = {name: i for i, name in enumerate(names)}
+    rows = sorted((chrom_ids[chrom], int(start), int(end), float(value)) for chrom, start, end, value in entries)
+
+    sections = []
+    for row in rows:
+        if not sections or len(sections[-1]) >= items_per_block or sections[-1][0][0] != row[0]:
+            sections.append([])
+        sections[-1].append(row)
+
+    key_size = max((len(name) for name in names), default=1)
+    header_size = 64
+    chrom_tree = struct.pack('<IIIIQQ', _CHROM_TREE_MAGIC, max(len(names), 1), key_size, 8, len(names), 0)
+    chrom_tree += struct.pack('<BBH', 1, 0, len(names))
+    for name in names:
+        chrom_tree += name.encode('ascii').ljust(key_size, b'\0') + struct.pack('<II', chrom_ids[name], chrom_sizes[name])
+
+    data_offset = header_size + len(chrom_tree)
+    data = struct.pack('<Q', len(sections))
+    leaves = []
+    max_raw = 0
+    for section in sections:
+        chrom_id, first, last = section[0][0], section[0][1], max(row[2] for row in section)
+        raw = struct.pack('<IIIIIBBH', chrom_id, first, last, 0, 0, _SECTION_BEDGRAPH, 0, len(section))
+        raw += b''.join(struct.pack('<IIf', start, end, value) for _, start, end, value in section)
+        max_raw = max(max_raw, len(raw))
+        block = zlib.compress(raw) if compress else raw
+        leaves.append((chrom_id, first, chrom_id, last, data_offset + len(data), len(block)))
+        data += block
+
+    index_offset = data_offset + len(data)
+    bounds = (leaves[0][0], leaves[0][1], leaves[-1][2], leaves[-1][3]) if leaves else (0, 0, 0, 0)
+    index = struct.pack('<IIQIIIIQII', _RTREE_MAGIC, max(len(leaves), 1), len(leaves), *bounds,
+                        index_offset, items_per_block, 0)
+    index += struct.pack('<BBH', 1, 0, len(leaves))
+    index += b''.join(struct.pack('<IIIIQQ', *leaf) for leaf in leaves)
+
+    header = struct.pack('<IHHQQQHHQQIQ', BIGWIG_MAGIC, 4, 0, header_size, data_offset, index_offset,
+                         0, 0, 0, 0, max_raw if compress else 0, 0)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header + chrom_tree + data + index)
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# bedGraph
+# =============================================================================
+
+class BedGraphTrack:
+    """
+    In-memory bedGraph track (0-based, half-open intervals) with bisect lookups.
+
+    Attributes:
+        path: Track file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        rows: Dict[str, List[Tuple[int, int, float]]] = {}
+        opener = gzip.open if path.endswith(('.gz', '.bgz')) else open
+        with opener(path, 'rt', encoding='ascii') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip() or line.startswith(('#', 'track', 'browser')):
+                    continue
+                fields = line.split()
+                try:
+                    rows.setdefault(fields[0], []).append((int(fields[1]), int(fields[2]), float(fields[3])))
+                except (IndexError, ValueError):
+                    raise ConservationTrackError(f"Malformed bedGraph line {line_number} in {path}")
+        self._contigs = {}
+        for chrom, intervals in rows.items():
+            intervals.sort()
+            self._contigs[chrom] = (
+                array.array('l', (row[0] for row in intervals)),
+                array.array('l', (row[1] for row in intervals)),
+                array.array('f', (row[2] for row in intervals)),
+            )
+
+    def resolve_contig(self, chrom: str) -> Optional[str]:
+        for name in _contig_names(chrom):
+            if name in self._contigs:
+                return name
+        return None
+
+    def value_at(self, chrom: str, pos: int) -> Optional[float]:
+        """Return the track value at a 1-based position, or None if not covered."""
+        name = self.resolve_contig(chrom)
+        if name is None:
+            return None
+        starts, ends, values = self._contigs[name]
+        pos0 = int(pos) - 1
+        i = bisect_right(starts, pos0) - 1
+        return float(values[i]) if i >= 0 and ends[i] > pos0 else None
+
+    def close(self) -> None:
+        self._contigs = {}
+
+
+def open_track(path: str):
+    """Open a bigWig (detected by its magic number) or bedGraph track."""
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if len(head) == 4 and BIGWIG_MAGIC in (struct.unpack('<I', head)[0], struct.unpack('>I', head)[0]):
+        return BigWigFile(path)
+    return BedGraphTrack(path)
+
+
+class ConservationTracks:
+    """
+    Named conservation tracks queried together.
+
+    Usage:
+        tracks = ConservationTracks({'phylop': open_track('hg38.phyloP100way.bw')})
+        tracks.scores('17', 43092919)        # {'phylop': 7.9}
+    """
+
+    def __init__(self, tracks: Dict[str, object]):
+        self.tracks = dict(tracks)
+
+    def scores(self, chrom: str, pos: int) -> Dict[str, float]:
+        """Return the scores covering a 1-based position (uncovered tracks are omitted)."""
+        result = {}
+        for name, track in self.tracks.items():
+            value = track.value_at(chrom, pos)
+            if value is not None:
+                result[name] = value
+        return result
+
+    def scores_many(self, positions: Iterable[Tuple[str, int]]) -> Dict[Tuple[str, int], Dict[str, float]]:
+        """Score many (chrom, pos) pairs; visited in genomic order so neighbours share decoded blocks."""
+        positions = list(dict.fromkeys((str(chrom), int(pos)) for chrom, pos in positions))
+        return {key: self.scores(*key) for key in sorted(positions)}
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+
+# =============================================================================
+# Shared track resolution
+# =============================================================================
+
+_tracks = LocalResource(None, None, open_track, label='Local conservation track',
+                        errors=(UnicodeDecodeError, ConservationTrackError))
+
+
+def get_conservation_tracks(paths: Optional[Dict[str, str]] = None) -> Optional[ConservationTracks]:
+    """
+    Return the configured conservation tracks, opening each file at most once per process.
+
+    Each score ('phylop', 'phastcons', 'gerp') is resolved from ``paths``,
+    LOCAL_DATA_SOURCES, then its ACMG_*_TRACK environment variable. Returns
+    None when no track is configured or none can be opened.
+    """
+    if paths is None:
+        from config.constants import LOCAL_DATA_SOURCES
+        paths = {
+            name: LOCAL_DATA_SOURCES.get(source_key) or os.environ.get(env_var)
+            for name, (source_key, env_var) in CONSERVATION_TRACKS.items()
+        }
+    tracks = {}
+    for name, path in paths.items():
+        if path:
+            track = _tracks.get(path)
+            if track is not None:
+                tracks[name] = track
+    return ConservationTracks(tracks) if tracks else None
+
+
+def clear_conservation_tracks() -> None:
+    """Close and drop all shared tracks (e.g. after files are replaced)."""
+    _tracks.clear()
@@ -0,0 +1,230 @@
+"""
+Local dbNSFP Predictor Backend
+==============================
+
+Offline source of in silico predictor scores read from a local
+bgzip-compressed, tabix-indexed dbNSFP extract.
+
+Each lookup reads only the BGZF block(s) holding the variant's position
+(see utils.tabix), so predictor throughput is bounded by disk rather than
+by network, and evaluation works on air-gapped nodes.
+
+The extract may contain any subset of the dbNSFP columns as long as it
+keeps the standard header names, e.g.:
+
+    #chr  pos(1-based)  ref  alt  REVEL_score  CADD_phred  SIFT_score  ...
+
+Multi-transcript values ("0.1;0.3;.") are averaged, matching how
+myvariant.info list values are handled by PredictorAPIClient.
+
+Preparing an extract:
+    zcat dbNSFP4.4a_variant.chr*.gz | cut -f1-4,<score columns> > extract.tsv
+    (sort by chromosome and position, keeping the header line first)
+    bgzip extract.tsv && tabix -s 1 -b 2 -e 2 extract.tsv.gz
+or, without htslib, utils.tabix.bgzip_file() and build_tabix_index().
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from config.predictors import (
+    PredictorScore,
+    INVERTED_PREDICTORS,
+    validate_predictor_score,
+)
+from utils.tabix import TabixFile, TabixError
+
+
+DBNSFP_SOURCE = 'dbNSFP_local'
+
+# Predictor name -> dbNSFP column name(s), first present column wins
+DBNSFP_COLUMN_MAP = {
+    'revel': ('REVEL_score',),
+    'cadd_phred': ('CADD_phred', 'CADD_phred_hg19'),
+    'alphamissense': ('AlphaMissense_score',),
+    'sift': ('SIFT_score',),
+    'polyphen2': ('Polyphen2_HDIV_score',),
+    'metasvm': ('MetaSVM_score',),
+    'vest4': ('VEST4_score',),
+    'fathmm': ('FATHMM_score',),
+    'bayesdel': ('BayesDel_addAF_score',),
+    'primateai': ('PrimateAI_score',),
+    'mpc': ('MPC_score',),
+}
+
+# Coordinate columns (dbNSFP 4.x names, with generic fallbacks)
+DBNSFP_CHROM_COLUMNS = ('#chr', 'chr', '#CHROM', 'CHROM')
+DBNSFP_POS_COLUMNS = ('pos(1-based)', 'pos', 'POS')
+DBNSFP_REF_COLUMNS = ('ref', 'REF')
+DBNSFP_ALT_COLUMNS = ('alt', 'ALT')
+
+
+def _find_column(columns: List[str], candidates: Tuple[str, ...]) -> Optional[int]:
+    for name in candidates:
+        if name in columns:
+            return columns.index(name)
+    return None
+
+
+def parse_dbnsfp_value(value: str) -> Optional[float]:
+    """
+    Parse a dbNSFP score cell.
+
+    Missing values ('.', '') are skipped; multiple transcript values
+    separated by ';' are averaged.
+    """
+    numbers = []
+    for part in value.split(';'):
+        part = part.strip()
+        if not part or part == '.':
+            continue
+        try:
+            numbers.append(float(part))
+        except ValueError:
+            continue
+    if not numbers:
+        return None
+    return numbers[0] if len(numbers) == 1 else sum(numbers) / len(numbers)
+
+
+class LocalDbNSFPClient:
+    """
+    Predictor score lookups against a local tabix-indexed dbNSFP extract.
+
+    Usage:
+        backend = LocalDbNSFPClient('dbNSFP_extract.tsv.gz')
+        scores = backend.get_predictor_scores('17', 43092919, 'G', 'A')
+        # Returns: {'revel': PredictorScore(...), ...} or {} if not in the extract
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None, version: str = '4.x'):
+        """
+        Open a dbNSFP extract.
+
+        Args:
+            path: bgzip-compressed extract
+            index_path: tabix index (defaults to ``path + '.tbi'``)
+            version: dbNSFP release recorded on returned scores
+
+        Raises:
+            TabixError: if the file has no usable header or index
+        """
+        self.path = path
+        self.version = version
+        self._tabix = TabixFile(path, index_path)
+
+        header = self._tabix.header
+        if not header:
+            raise TabixError(f"{path} has no dbNSFP header line")
+        columns = header[-1].split('\t')
+
+        self._chrom_col = _find_column(columns, DBNSFP_CHROM_COLUMNS)
+        self._pos_col = _find_column(columns, DBNSFP_POS_COLUMNS)
+        self._ref_col = _find_column(columns, DBNSFP_REF_COLUMNS)
+        self._alt_col = _find_column(columns, DBNSFP_ALT_COLUMNS)
+        if None in (self._chrom_col, self._pos_col, self._ref_col, self._alt_col):
+            raise TabixError(f"{path} header lacks chr/pos/ref/alt columns")
+
+        self._score_cols = {}
+        for predictor, names in DBNSFP_COLUMN_MAP.items():
+            index = _find_column(columns, names)
+            if index is not None:
+                self._score_cols[predictor] = index
+
+        # dbNSFP uses bare chromosome names; follow whatever the index uses
+        self._chr_prefix = any(name.startswith('chr') for name in self._tabix.contigs)
+
+    @property
+    def predictors(self) -> List[str]:
+        """Predictors with a column in this extract."""
+        return list(self._score_cols)
+
+    def _contig(self, chrom: str) -> str:
+        chrom = str(chrom)
+        bare = chrom[3:] if chrom.lower().startswith('chr') else chrom
+        if bare == 'MT':
+            bare = 'M' if self._chr_prefix else 'MT'
+        return f"chr{bare}" if self._chr_prefix else bare
+
+    def _build_scores(self, fields: List[str]) -> Dict[str, PredictorScore]:
+        scores = {}
+        for predictor, index in self._score_cols.items():
+            if index >= len(fields):
+                continue
+            value = parse_dbnsfp_value(fields[index])
+            if value is not None and validate_predictor_score(predictor, value):
+                scores[predictor] = PredictorScore(
+                    predictor=predictor,
+                    value=value,
+                    source=DBNSFP_SOURCE,
+                    version=self.version,
+                    is_inverted=(predictor in INVERTED_PREDICTORS)
+                )
+        return scores
+
+    def get_predictor_scores(
+        self,
+        chrom: str,
+        pos: int,
+        ref: str,
+        alt: str
+    ) -> Dict[str, PredictorScore]:
+        """
+        Look up predictor scores for one variant.
+
+        Returns:
+            Predictor name -> PredictorScore for predictors with a value,
+            or {} if the variant is not in the extract.
+        """
+        pos = int(pos)
+        for fields in self._tabix.fetch(self._contig(chrom), pos - 1, pos):
+            if (fields[self._pos_col] == str(pos)
+                    and fields[self._ref_col] == ref
+                    and fields[self._alt_col] == alt):
+                return self._build_scores(fields)
+        return {}
+
+    def get_predictor_scores_many(
+        self,
+        variants: List[Tuple[str, int, str, str]]
+    ) -> Dict[Tuple[str, int, str, str], Dict[str, PredictorScore]]:
+        """
+        Look up many variants, sorted by position so neighbouring variants
+        share decompressed blocks.
+
+        Returns:
+            (chrom, pos, ref, alt) -> scores, for variants found in the extract
+        """
+        results = {}
+        for variant in sorted(set(variants), key=lambda v: (self._contig(v[0]), int(v[1]))):
+            scores = self.get_predictor_scores(*variant)
+            if scores:
+                results[variant] = scores
+        return results
+
+    def close(self) -> None:
+        self._tabix.close()
+
+
+def open_local_dbnsfp(path: Optional[str] = None) -> Optional[LocalDbNSFPClient]:
+    """
+    Open the configured local dbNSFP extract, if any.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['dbnsfp'], then the
+    ACMG_DBNSFP_PATH environment variable. Returns None when nothing is
+    configured or the extract cannot be opened.
+    """
+    if path is None:
+        from config.constants import LOCAL_DATA_SOURCES
+        path = LOCAL_DATA_SOURCES.get('dbnsfp') or os.environ.get('ACMG_DBNSFP_PATH')
+    if not path:
+        return None
+
+    try:
+        return LocalDbNSFPClient(path)
+    except (OSError, TabixError) as e:
+        print(f"⚠️  Warning: Local dbNSFP extract unavailable ({path}): {str(e)}")
+        return None
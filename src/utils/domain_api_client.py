@@ -23,11 +23,20 @@ License: MIT License
 
 import requests
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 import json
 import os
 
+from utils.domain_index import (
+    SOURCE_CANCER_HOTSPOTS,
+    SOURCE_UNIPROT,
+    DomainRegion,
+    get_domain_index,
+)
+from utils.cancer_hotspots import HotspotRecord, get_cancer_hotspot_table
+from utils.hgnc_index import canonical_gene_symbol, get_hgnc_index
+
 
 @dataclass
 class HotspotAnnotation:
@@ -105,18 +114,33 @@ class DomainAPIClient:
         'functional_region_types': {'Region', 'Motif'},
     }
     
-    def __init__(self, cache_enabled: bool = True, timeout: int = 10):
+    def __init__(self, cache_enabled: bool = True, timeout: int = 10, hotspot_table=None):
         """
         Initialize domain API client with caching.
         
         Args:
             cache_enabled: Whether to cache API responses locally
             timeout: HTTP request timeout in seconds
+            hotspot_table: Optional CancerHotspotTable. Defaults to the shared
+                           local table (LOCAL_DATA_SOURCES['cancer_hotspots'] or
+                           ACMG_CANCER_HOTSPOTS); when one is available, hotspot
+                           lookups are answered locally without remote calls.
         """
         self.cache_enabled = cache_enabled
         self.timeout = timeout
         self.cache: Dict[str, Any] = {}
         
+        if hotspot_table is None:
+            hotspot_table = get_cancer_hotspot_table()
+        if hotspot_table is not None:
+            # No-op unless the table is new or the shared domain index was rebuilt
+            hotspot_table.index_regions()
+        self.hotspot_table = hotspot_table
+        
+        # Per-gene UniProt feature tables for this session (gene -> table or
+        # None when the gene has no accession); filled even if cache is disabled
+        self._uniprot_tables: Dict[str, Optional[Dict[str, Any]]] = {}
+        
         # Cache file in temp directory to avoid permission issues
         import tempfile
         cache_dir = os.path.join(tempfile.gettempdir(), 'acmg_assistant')
@@ -225,8 +249,11 @@ class DomainAPIClient:
         if position is None and hgvs_p:
             position = self._extract_position_from_hgvs_p(hgvs_p)
         
+        # Aliases share the approved symbol's cache entries
+        gene = canonical_gene_symbol(gene)
+        
         # Check cache first
-        cache_key = f"annotation_{gene.upper()}_{position or 'none'}"
+        cache_key = f"annotation_{gene}_{position or 'none'}"
         cached = self._get_cached_response(cache_key)
         if cached:
             return HotspotAnnotation(**cached)
@@ -243,7 +270,7 @@ class DomainAPIClient:
                 annotation.hotspot_count = hotspot_result.get('mutation_count', 0)
                 annotation.tumor_count = hotspot_result.get('tumor_count', 0)
                 annotation.raw_api_response['cancer_hotspots'] = hotspot_result
-                sources.append('CancerHotspots.org')
+                sources.append(hotspot_result.get('source', 'CancerHotspots.org'))
                 
                 # Calculate confidence based on tumor count
                 if annotation.tumor_count >= self.CONFIDENCE_THRESHOLDS['high_hotspot_tumor_count']:
@@ -366,7 +393,11 @@ class DomainAPIClient:
     
     def _query_cancer_hotspots(self, gene: str, position: int) -> Optional[Dict[str, Any]]:
         """
-        Query CancerHotspots.org API for mutation hotspots.
+        Look up a residue in the CancerHotspots hotspot set.
+        
+        Answered from the local hotspot table when one is loaded (a miss
+        means "not a hotspot"); otherwise the CancerHotspots.org API is
+        queried.
         
         Args:
             gene: Gene symbol
@@ -375,6 +406,33 @@ class DomainAPIClient:
         Returns:
             Dict with hotspot data or None if not a hotspot/error
         """
+        if self.hotspot_table is not None:
+            return self.hotspot_table.lookup(gene, position)
+        return self._query_remote_cancer_hotspots(gene, position)
+    
+    def refresh_hotspot(self, gene: str, position: int) -> Optional[Dict[str, Any]]:
+        """
+        Re-query CancerHotspots.org for a residue and update the local table.
+        
+        Args:
+            gene: Gene symbol
+            position: Amino acid position
+        
+        Returns:
+            Dict with hotspot data from the API, or None if not a hotspot/error
+        """
+        hotspot = self._query_remote_cancer_hotspots(gene, position)
+        if hotspot and self.hotspot_table is not None:
+            # Keep the residue, variant and tumor-type detail the API does not return
+            record = self.hotspot_table.get(gene, position) or HotspotRecord(
+                gene=gene.upper(), start=position, end=position)
+            self.hotspot_table.add(replace(
+                record, mutation_count=hotspot['mutation_count'], tumor_count=hotspot['tumor_count']
+            ))
+        return hotspot
+    
+    def _query_remote_cancer_hotspots(self, gene: str, position: int) -> Optional[Dict[str, Any]]:
+        """Query the CancerHotspots.org API for one residue."""
         try:
             url = f"{self.CANCER_HOTSPOTS_BASE_URL}/hotspots/single/{gene.upper()}/{position}"
             response = requests.get(url, timeout=self.timeout)
@@ -382,11 +440,16 @@ class DomainAPIClient:
             if response.status_code == 200:
                 data = response.json()
                 if data and len(data) > 0:
-                    return {
+                    hotspot = {
                         'tumor_count': data[0].get('tumorCount', 0),
                         'mutation_count': data[0].get('count', 0),
                         'residue': position,
                     }
+                    get_domain_index().add_regions(gene, SOURCE_CANCER_HOTSPOTS, [DomainRegion(
+                        position, position, f"{gene.upper()} {position}", 'hotspot',
+                        SOURCE_CANCER_HOTSPOTS, dict(hotspot)
+                    )], replace=False)
+                    return hotspot
         except (requests.RequestException, KeyError, IndexError, ValueError):
             # API unavailable or error - return None (no fallback to hardcoded data)
             pass
@@ -401,6 +464,10 @@ class DomainAPIClient:
         """
         Query UniProt REST API for protein domain information.
         
+        The accession and parsed feature table are fetched once per gene
+        (see _get_uniprot_feature_table); position membership is then
+        answered locally, so new residues in the same gene need no calls.
+        
         Args:
             gene: Gene symbol
             position: Optional amino acid position to check domain membership
@@ -408,6 +475,57 @@ class DomainAPIClient:
         Returns:
             Dict with domain data or None if error
         """
+        feature_table = self._get_uniprot_feature_table(gene)
+        if not feature_table:
+            return None
+        
+        result = {
+            'accession': feature_table['accession'],
+            'domains': feature_table['domains'],
+            'in_domain': False,
+            'domain_name': None,
+            'domain_type': None,
+        }
+        
+        # Check if position is in any domain (first in UniProt feature order)
+        if position:
+            hits = get_domain_index().query(gene, position, sources=(SOURCE_UNIPROT,))
+            if hits:
+                result['in_domain'] = True
+                result['domain_name'] = hits[0].name
+                result['domain_type'] = hits[0].attributes['type']
+        
+        return result
+    
+    def _index_feature_table(self, gene: str, feature_table: Dict[str, Any]) -> None:
+        """Add a UniProt feature table to the shared domain index."""
+        critical_types = self.CONFIDENCE_THRESHOLDS['critical_domain_types']
+        get_domain_index().add_regions(gene, SOURCE_UNIPROT, [
+            DomainRegion(
+                int(domain['start']), int(domain['end']), domain['description'],
+                'domain' if domain['type'] in critical_types else 'region', SOURCE_UNIPROT,
+                {'type': domain['type'], 'accession': feature_table['accession']}
+            )
+            for domain in feature_table['domains']
+        ])
+    
+    def _get_uniprot_accession(self, gene: str) -> Optional[str]:
+        """
+        Resolve a gene symbol to its human UniProt accession, cached per gene.
+        
+        The local HGNC index answers first; otherwise UniProt is searched.
+        A search with no results is cached as well; request failures are not.
+        """
+        hgnc_index = get_hgnc_index()
+        record = hgnc_index.resolve(gene) if hgnc_index is not None else None
+        if record is not None and record.uniprot_ids:
+            return record.uniprot_ids[0]
+        
+        cache_key = f"uniprot_accession_{gene.upper()}"
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            return cached.get('accession')
+        
         try:
             # Search for UniProt accession using gene name
             search_url = (
@@ -420,14 +538,43 @@ class DomainAPIClient:
                 return None
             
             search_data = response.json()
-            if not search_data.get('results'):
-                return None
+            results = search_data.get('results') or []
             
             # Get primary accession
-            accession = search_data['results'][0].get('primaryAccession')
+            accession = results[0].get('primaryAccession') if results else None
             if not accession:
-                return None
-            
+                self._uniprot_tables[gene.upper()] = None
+            self._cache_response(cache_key, {'accession': accession})
+            return accession
+        
+        except (requests.RequestException, KeyError, ValueError, TypeError):
+            # API unavailable or error - return None
+            return None
+    
+    def _get_uniprot_feature_table(self, gene: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch and parse the UniProt domain feature table for a gene, cached per gene.
+        
+        Returns:
+            Dict with 'accession' and 'domains' (type, description, start, end),
+            or None if the gene has no accession or the API is unavailable
+        """
+        gene_key = gene.upper()
+        if gene_key in self._uniprot_tables:
+            return self._uniprot_tables[gene_key]
+        
+        cache_key = f"uniprot_features_{gene_key}"
+        cached = self._get_cached_response(cache_key)
+        if cached:
+            self._uniprot_tables[gene_key] = cached
+            self._index_feature_table(gene_key, cached)
+            return cached
+        
+        accession = self._get_uniprot_accession(gene)
+        if not accession:
+            return None
+        
+        try:
             # Fetch detailed entry
             entry_url = f"{self.UNIPROT_BASE_URL}/uniprotkb/{accession}.json"
             response = requests.get(entry_url, timeout=self.timeout)
@@ -461,24 +608,11 @@ class DomainAPIClient:
                             'end': end,
                         })
             
-            result = {
-                'accession': accession,
-                'domains': domains,
-                'in_domain': False,
-                'domain_name': None,
-                'domain_type': None,
-            }
-            
-            # Check if position is in any domain
-            if position:
-                for domain in domains:
-                    if domain['start'] <= position <= domain['end']:
-                        result['in_domain'] = True
-                        result['domain_name'] = domain['description']
-                        result['domain_type'] = domain['type']
-                        break
-            
-            return result
+            feature_table = {'accession': accession, 'domains': domains}
+            self._uniprot_tables[gene_key] = feature_table
+            self._index_feature_table(gene_key, feature_table)
+            self._cache_response(cache_key, feature_table)
+            return feature_table
         
         except (requests.RequestException, KeyError, ValueError, TypeError):
             # API unavailable or error - return None
@@ -0,0 +1,296 @@
+"""
+Protein Domain and Hotspot Interval Index
+=========================================
+
+Per-gene interval trees over protein regions (amino acid coordinates),
+shared by PM1 (DomainAPIClient / GeneSpecificRules), InframeAnalyzer and
+MissenseEvaluator so that domain, hotspot and repeat membership is an
+O(log n + k) overlap query instead of a linear scan of every region.
+
+Regions are grouped by source:
+
+- protein_domains: data/domain_annotations/protein_domains.json
+  (domains, functional regions, repeat regions)
+- gene_rules: data/gene_rules/gene_specific_rules.json
+  (hotspot regions, critical regions)
+- UniProt: feature tables, added by DomainAPIClient once fetched
+- CancerHotspots: hotspot residues, added by DomainAPIClient once fetched
+
+The local JSON sources are loaded once per process by get_domain_index();
+remote sources are added as they arrive. Each (gene, source) pair has its
+own static tree, rebuilt only when that source changes.
+
+Usage:
+    index = get_domain_index()
+    index.query('TP53', 273)                       # point
+    index.query('TP53', 240, 250, kinds=('critical', 'hotspot'))   # range
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+SOURCE_PROTEIN_DOMAINS = 'protein_domains'
+SOURCE_GENE_RULES = 'gene_rules'
+SOURCE_UNIPROT = 'UniProt'
+SOURCE_CANCER_HOTSPOTS = 'CancerHotspots'
+
+_DATA_DIR = Path(__file__).resolve().parent.parent.parent / 'data'
+PROTEIN_DOMAINS_PATH = _DATA_DIR / 'domain_annotations' / 'protein_domains.json'
+GENE_RULES_PATH = _DATA_DIR / 'gene_rules' / 'gene_specific_rules.json'
+
+
+@dataclass
+class DomainRegion:
+    """
+    One protein region (1-based, inclusive amino acid coordinates).
+
+    Attributes:
+        kind: 'domain', 'region', 'repeat', 'critical' or 'hotspot'
+        attributes: Remaining fields from the source record
+    """
+    start: int
+    end: int
+    name: str
+    kind: str
+    source: str
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class IntervalTree:
+    """
+    Static interval tree over closed intervals.
+
+    Intervals are sorted by start and stored as an implicit balanced binary
+    tree (the middle element of each slice is the node), with the maximum
+    end of every subtree precomputed for pruning. Query results keep the
+    order in which intervals were given.
+    """
+
+    __slots__ = ('_starts', '_ends', '_order', '_items', '_max_end')
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, Any]] = ()):
+        entries = sorted(
+            (int(start), int(end), order, item)
+            for order, (start, end, item) in enumerate(intervals)
+        )
+        self._starts = [entry[0] for entry in entries]
+        self._ends = [entry[1] for entry in entries]
+        self._order = [entry[2] for entry in entries]
+        self._items = [entry[3] for entry in entries]
+        self._max_end = list(self._ends)
+
+        # Bottom-up subtree maxima: process slices from smallest to largest
+        stack = [(0, len(entries), False)]
+        while stack:
+            lo, hi, children_done = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if not children_done:
+                stack.append((lo, hi, True))
+                stack.append((lo, mid, False))
+                stack.append((mid + 1, hi, False))
+                continue
+            best = self._ends[mid]
+            if lo < mid:
+                best = max(best, self._max_end[(lo + mid) // 2])
+            if mid + 1 < hi:
+                best = max(best, self._max_end[(mid + 1 + hi) // 2])
+            self._max_end[mid] = best
+
+    def overlap(self, start: int, end: Optional[int] = None) -> List[Any]:
+        """Return items whose interval overlaps [start, end] (end defaults to start)."""
+        if end is None:
+            end = start
+        hits = []
+        stack = [(0, len(self._starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_end[mid] < start:
+                continue
+            stack.append((lo, mid))
+            if self._starts[mid] <= end:
+                if self._ends[mid] >= start:
+                    hits.append(mid)
+                stack.append((mid + 1, hi))
+        hits.sort(key=self._order.__getitem__)
+        return [self._items[i] for i in hits]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in sorted(range(len(self._items)), key=self._order.__getitem__):
+            yield self._items[i]
+
+
+# =============================================================================
+# Region parsing for the bundled JSON files
+# =============================================================================
+
+def _region(record: Dict[str, Any], name_key: str, kind: str, source: str) -> Optional[DomainRegion]:
+    start, end = record.get('start'), record.get('end')
+    if start is None or end is None:
+        return None
+    attributes = {k: v for k, v in record.items() if k not in ('start', 'end', name_key)}
+    return DomainRegion(int(start), int(end), str(record.get(name_key, '')), kind, source, attributes)
+
+
+def regions_from_protein_domains(data: Dict[str, Any]) -> Dict[str, List[DomainRegion]]:
+    """Map genes to regions from protein_domains.json content."""
+    regions: Dict[str, List[DomainRegion]] = {}
+    for gene, entry in (data.get('protein_domains') or {}).items():
+        for key, kind in (('domains', 'domain'), ('functional_regions', 'region')):
+            for record in entry.get(key, []):
+                region = _region(record, 'name', kind, SOURCE_PROTEIN_DOMAINS)
+                if region is not None:
+                    regions.setdefault(gene.upper(), []).append(region)
+    for gene, records in (data.get('repeat_regions') or {}).items():
+        for record in records:
+            region = _region(record, 'name', 'repeat', SOURCE_PROTEIN_DOMAINS)
+            if region is not None:
+                regions.setdefault(gene.upper(), []).append(region)
+    return regions
+
+
+def regions_from_gene_rules(data: Dict[str, Any]) -> Dict[str, List[DomainRegion]]:
+    """Map genes to hotspot and critical regions from gene_specific_rules.json content."""
+    regions: Dict[str, List[DomainRegion]] = {}
+    for gene, entry in data.items():
+        if not isinstance(entry, dict):
+            continue
+        for record in entry.get('hotspot_regions', []):
+            region = _region(record, 'description', 'hotspot', SOURCE_GENE_RULES)
+            if region is not None:
+                regions.setdefault(gene.upper(), []).append(region)
+        for record in entry.get('critical_regions', []):
+            region = _region(record, 'type', 'critical', SOURCE_GENE_RULES)
+            if region is not None:
+                regions.setdefault(gene.upper(), []).append(region)
+    return regions
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+class DomainIndex:
+    """Per-gene, per-source interval trees over protein regions."""
+
+    def __init__(self):
+        self._trees: Dict[str, Dict[str, IntervalTree]] = {}
+        self._lock = threading.Lock()
+
+    def add_regions(self, gene: str, source: str, regions: Iterable[DomainRegion],
+                    replace: bool = True) -> None:
+        """
+        Index regions for a gene under a source.
+
+        Args:
+            replace: Replace the source's regions for the gene; if False,
+                     merge with them (duplicates by start/end/name are dropped)
+        """
+        gene_key = gene.strip().upper()
+        regions = list(regions)
+        with self._lock:
+            trees = self._trees.setdefault(gene_key, {})
+            if not replace and source in trees:
+                seen = {(r.start, r.end, r.name) for r in trees[source]}
+                regions = list(trees[source]) + [
+                    r for r in regions if (r.start, r.end, r.name) not in seen
+                ]
+            trees[source] = IntervalTree((r.start, r.end, r) for r in regions)
+
+    def load_json(self, path: Path, parser) -> int:
+        """Index a bundled JSON file with one of the regions_from_* parsers; returns gene count."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        by_gene = parser(data)
+        for gene, regions in by_gene.items():
+            self.add_regions(gene, regions[0].source, regions)
+        return len(by_gene)
+
+    def query(self, gene: str, start: int, end: Optional[int] = None,
+              sources: Optional[Sequence[str]] = None,
+              kinds: Optional[Sequence[str]] = None) -> List[DomainRegion]:
+        """
+        Return regions of a gene overlapping a position or range.
+
+        Args:
+            gene: Gene symbol (case-insensitive)
+            start: Amino acid position, or first position of a range
+            end: Last position of a range (inclusive); defaults to start
+            sources: Restrict to these sources, in this order
+            kinds: Restrict to these region kinds
+
+        Returns:
+            Matching regions, grouped by source in index order
+        """
+        if not gene or start is None:
+            return []
+        trees = self._trees.get(gene.strip().upper())
+        if not trees:
+            return []
+        hits = []
+        for source in (sources if sources is not None else list(trees)):
+            tree = trees.get(source)
+            if tree is None:
+                continue
+            for region in tree.overlap(start, end):
+                if kinds is None or region.kind in kinds:
+                    hits.append(region)
+        return hits
+
+    def has_source(self, gene: str, source: str) -> bool:
+        """Return True if regions for the gene were indexed under source."""
+        return source in self._trees.get(gene.strip().upper(), {})
+
+    def regions(self, gene: str, source: Optional[str] = None) -> List[DomainRegion]:
+        """Return all regions of a gene (optionally one source) in index order."""
+        trees = self._trees.get(gene.strip().upper(), {})
+        selected = [trees[source]] if source in trees else ([] if source else trees.values())
+        return [region for tree in selected for region in tree]
+
+    def genes(self) -> List[str]:
+        """Return all indexed gene symbols."""
+        return list(self._trees)
+
+
+# =============================================================================
+# Shared index
+# =============================================================================
+
+_index: Optional[DomainIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_domain_index() -> DomainIndex:
+    """Return the process-wide index, loading the bundled JSON sources on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = DomainIndex()
+            index.load_json(PROTEIN_DOMAINS_PATH, regions_from_protein_domains)
+            index.load_json(GENE_RULES_PATH, regions_from_gene_rules)
+            _index = index
+        return _index
+
+
+def clear_domain_index() -> None:
+    """Drop the shared index (used by tests); it is rebuilt on next use."""
+    global _index
+    with _index_lock:
+        _index = None
@@ -26,8 +26,10 @@ This module provides FUNCTION-BASED utilities for:
 See also: core/gene_rules_engine.py for class-based rule application.
 """
 
+import os
 from typing import Dict, Any, Optional
 from config.constants import GENE_SPECIFIC_THRESHOLDS
+from utils.clingen_dosage import get_dosage_table
 
 def get_gene_specific_thresholds(gene: str, hi_score: Optional[int] = None, 
                                    clingen_dosage_data: Optional[Dict] = None) -> Dict[str, float]:
@@ -117,66 +119,38 @@ def build_gene_specific_thresholds_from_clingen(clingen_tsv_path: str = None) ->
     dictionary based on all ClinGen dosage sensitivity data.
     
     Args:
-        clingen_tsv_path (str, optional): Path to ClinGen TSV file
+        clingen_tsv_path (str, optional): Path to ClinGen TSV file. Defaults to
+            the shared table located by utils.clingen_dosage.default_tsv_path()
     
     Returns:
         Dict mapping gene symbols to threshold dictionaries
     """
-    import os
-    
-    if clingen_tsv_path is None:
-        # Try to find local TSV file
-        possible_paths = [
-            'ClinGen_gene_curation_list_GRCh38.tsv',
-            '../ClinGen_gene_curation_list_GRCh38.tsv',
-            '../../ClinGen_gene_curation_list_GRCh38.tsv'
-        ]
-        for path in possible_paths:
-            if os.path.exists(path):
-                clingen_tsv_path = path
-                break
-    
-    if clingen_tsv_path is None or not os.path.exists(clingen_tsv_path):
+    # Shared indexed table (parsed once per process, CWD-independent default path)
+    table = None
+    if clingen_tsv_path is None or os.path.exists(clingen_tsv_path):
+        try:
+            table = get_dosage_table(clingen_tsv_path)
+        except Exception as e:
+            print(f"❌ Error parsing ClinGen TSV: {e}")
+            return GENE_SPECIFIC_THRESHOLDS.copy()
+    
+    if table is None:
         print(f"⚠️  ClinGen TSV file not found. Using default thresholds.")
         return GENE_SPECIFIC_THRESHOLDS.copy()
     
-    # Parse ClinGen TSV
     gene_thresholds = {}
+    for record in table.records():
+        if record.hi_score is not None and record.gene_symbol:
+            # Generate thresholds based on HI score
+            thresholds = get_gene_specific_thresholds(record.gene_symbol, hi_score=record.hi_score)
+            gene_thresholds[record.gene_symbol] = thresholds
     
-    try:
-        with open(clingen_tsv_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Skip header
-        for line in lines[1:]:
-            parts = line.strip().split('\t')
-            if len(parts) < 5:
-                continue
-            
-            gene_symbol = parts[0].strip()
-            hi_score_str = parts[4].strip()
-            
-            # Parse HI score
-            try:
-                hi_score = int(hi_score_str) if hi_score_str.isdigit() else None
-            except:
-                hi_score = None
-            
-            if hi_score is not None and gene_symbol:
-                # Generate thresholds based on HI score
-                thresholds = get_gene_specific_thresholds(gene_symbol, hi_score=hi_score)
-                gene_thresholds[gene_symbol] = thresholds
-        
-        print(f"✅ Generated thresholds for {len(gene_thresholds)} genes from ClinGen data")
-        
-        # Add default
-        gene_thresholds['default'] = GENE_SPECIFIC_THRESHOLDS['default'].copy()
-        
-        return gene_thresholds
+    print(f"✅ Generated thresholds for {len(gene_thresholds)} genes from ClinGen data")
     
-    except Exception as e:
-        print(f"❌ Error parsing ClinGen TSV: {e}")
-        return GENE_SPECIFIC_THRESHOLDS.copy()
+    # Add default
+    gene_thresholds['default'] = GENE_SPECIFIC_THRESHOLDS['default'].copy()
+    
+    return gene_thresholds
 
 
 def get_threshold_explanation(gene: str, hi_score: Optional[int] = None) -> str:
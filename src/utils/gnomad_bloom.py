@@ -0,0 +1,310 @@
+"""
+gnomAD Site Bloom Filter
+========================
+
+Prebuilt, memory-mapped Bloom filter over the (chrom, pos, ref, alt) keys
+of every gnomAD site, so "absent from gnomAD" (PM2) can be decided
+without a population round-trip for the novel variants that make up most
+diagnostic batches.
+
+A Bloom filter has no false negatives: when it reports a variant as
+definitely absent, the variant is not in the sites VCF it was built from
+and an absent PopulationStats is returned without any network call. A
+"maybe present" answer (a true hit or a false positive, at the configured
+rate) falls through to the local store or the gnomAD API as before.
+Absence is only reported when the builder is told its input is complete
+(``complete=True``), and then only for the contigs it was built from: pass
+the exomes and the genomes sites VCFs of every contig, all sites (no
+``pass_only``). The datasets a filter covers are recorded in its metadata.
+
+File layout:
+
+    header   56 bytes    magic, version, hash count, bit count, site count,
+                         false-positive rate, meta offset/size
+    bits     m/8 bytes   the bit array (bit i = byte i >> 3, bit i & 7)
+    meta     JSON        dataset labels, covered datasets and contigs,
+                         completeness flag
+
+Bit positions use double hashing over one BLAKE2b digest per key. The
+false-positive rate is chosen at build time (``fpr`` or
+API_SETTINGS['gnomad_bloom_fpr']); 0.1% costs about 14.4 bits per site.
+
+Usage:
+    build_gnomad_bloom(['gnomad.exomes.v4.1.sites.chr17.vcf.bgz',
+                        'gnomad.genomes.v4.1.sites.chr17.vcf.bgz'],
+                       'gnomad_chr17.bloom', fpr=0.001, complete=True)
+    bloom = GnomADBloomFilter('gnomad_chr17.bloom')
+    bloom.definitely_absent('17', 43092919, 'G', 'T')
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from config.predictors import PopulationStats
+from utils.gnomad_store import _normalize_contig, iter_sites_vcf
+from utils.local_store import LocalResource
+
+
+GNOMAD_BLOOM_MAGIC = b'ACMGBLOM'
+GNOMAD_BLOOM_VERSION = 1
+
+_HEADER = struct.Struct('<8sIIQQdQQ')
+
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+
+
+class GnomADBloomError(ValueError):
+    """Raised for malformed or incompatible Bloom filter files."""
+
+
+def site_key(chrom: str, pos: int, ref: str, alt: str) -> bytes:
+    """Return the hashed key of a site ('17:43092919:G:A')."""
+    return f"{_normalize_contig(chrom)}:{int(pos)}:{ref.upper()}:{alt.upper()}".encode()
+
+
+def _hash_pair(key: bytes) -> Tuple[int, int]:
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    # Odd step so the k probes never collapse onto one bit
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+def bloom_parameters(sites: int, fpr: float) -> Tuple[int, int]:
+    """Return the optimal (bit count, hash count) for ``sites`` keys at false-positive rate ``fpr``."""
+    if not 0 < fpr < 1:
+        raise GnomADBloomError(f"False-positive rate must be between 0 and 1, got {fpr}")
+    sites = max(int(sites), 1)
+    bits = max(math.ceil(-sites * math.log(fpr) / (math.log(2) ** 2)), 8)
+    hashes = max(round(bits / sites * math.log(2)), 1)
+    return bits, hashes
+
+
+class BloomFilterBuilder:
+    """
+    In-memory Bloom filter sized for an expected number of sites.
+
+    Usage:
+        builder = BloomFilterBuilder(expected_sites=1_000_000, fpr=0.001)
+        builder.add('17', 43092919, 'G', 'A')
+        builder.write('gnomad.bloom', contigs=['17'], complete=True)
+    """
+
+    def __init__(self, expected_sites: int, fpr: Optional[float] = None):
+        if fpr is None:
+            fpr = default_false_positive_rate()
+        self.fpr = fpr
+        self.num_bits, self.num_hashes = bloom_parameters(expected_sites, fpr)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def add(self, chrom: str, pos: int, ref: str, alt: str) -> None:
+        h1, h2 = _hash_pair(site_key(chrom, pos, ref, alt))
+        bits, m = self._bits, self.num_bits
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % m
+            bits[bit >> 3] |= 1 << (bit & 7)
+        self.count += 1
+
+    def write(self, out_path: str, contigs: Iterable[str] = (), dataset_id: str = 'gnomad_r4',
+              version_label: str = 'v4.1', complete: bool = False,
+              datasets: Iterable[str] = ()) -> None:
+        meta = json.dumps({
+            'dataset_id': dataset_id,
+            'version_label': version_label,
+            'complete': complete,
+            'datasets': sorted(set(datasets)),
+            'contigs': sorted({_normalize_contig(contig) for contig in contigs}),
+        }).encode()
+        meta_offset = _HEADER.size + len(self._bits)
+        tmp_path = f"{out_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(GNOMAD_BLOOM_MAGIC, GNOMAD_BLOOM_VERSION, self.num_hashes,
+                                 self.num_bits, self.count, self.fpr, meta_offset, len(meta)))
+            f.write(self._bits)
+            f.write(meta)
+        os.replace(tmp_path, out_path)
+
+
+def default_false_positive_rate() -> float:
+    from config.constants import API_SETTINGS
+    return float(API_SETTINGS.get('gnomad_bloom_fpr', DEFAULT_FALSE_POSITIVE_RATE))
+
+
+def _dataset_label(vcf_path: str) -> str:
+    """'exomes' or 'genomes' for gnomAD sites VCF names, else the file name."""
+    name = os.path.basename(vcf_path).lower()
+    for label in ('exomes', 'genomes'):
+        if label[:-1] in name:
+            return label
+    return name
+
+
+def build_gnomad_bloom(
+    vcf_paths: Union[str, Sequence[str]],
+    out_path: str,
+    fpr: Optional[float] = None,
+    expected_sites: Optional[int] = None,
+    dataset_id: str = 'gnomad_r4',
+    version_label: str = 'v4.1',
+    complete: bool = False,
+    pass_only: bool = False
+) -> int:
+    """
+    Build a Bloom filter of all site keys in one or more sites VCFs.
+
+    Args:
+        vcf_paths: gnomAD sites VCF(s) (plain, gzip or bgzip), e.g. the exomes
+                   and genomes VCFs of each chromosome
+        out_path: Destination filter file
+        fpr: False-positive rate (defaults to API_SETTINGS['gnomad_bloom_fpr'])
+        expected_sites: Number of ALT alleles in the VCFs; counted with an extra pass if omitted
+        dataset_id: gnomAD dataset the VCFs belong to ('gnomad_r4', 'gnomad_r3')
+        version_label: Version recorded on returned PopulationStats
+        complete: True if the VCFs hold every site of their contigs across
+                  all gnomAD datasets, so a variant missing from the filter
+                  is absent from gnomAD; without it nothing is reported absent
+        pass_only: Skip sites that did not pass quality filters (cannot be
+                   combined with complete)
+
+    Returns:
+        Number of sites added (a site in several VCFs is added once per VCF)
+    """
+    if isinstance(vcf_paths, str):
+        vcf_paths = [vcf_paths]
+    if complete and pass_only:
+        raise GnomADBloomError("A PASS-only filter omits gnomAD sites and cannot be marked complete")
+
+    def sites():
+        for vcf_path in vcf_paths:
+            for chrom, pos, ref, alt, filters, _, _ in iter_sites_vcf(vcf_path):
+                if pass_only and filters not in ('PASS', '.', ''):
+                    continue
+                yield chrom, pos, ref, alt
+
+    if expected_sites is None:
+        expected_sites = sum(1 for _ in sites())
+    builder = BloomFilterBuilder(expected_sites, fpr)
+    contigs = set()
+    for chrom, pos, ref, alt in sites():
+        builder.add(chrom, pos, ref, alt)
+        contigs.add(chrom)
+    builder.write(out_path, contigs, dataset_id=dataset_id, version_label=version_label,
+                  complete=complete, datasets=[_dataset_label(path) for path in vcf_paths])
+    return builder.count
+
+
+class GnomADBloomFilter:
+    """
+    Read-only, memory-mapped Bloom filter of gnomAD site keys.
+
+    Usage:
+        bloom = GnomADBloomFilter('gnomad_v4.bloom')
+        if bloom.definitely_absent('17', 43092919, 'G', 'T'):
+            stats = bloom.absent_stats()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise GnomADBloomError(f"{path} is empty")
+
+        if len(self._mm) < _HEADER.size:
+            self.close()
+            raise GnomADBloomError(f"{path} is not a gnomAD Bloom filter")
+        (magic, version, self.num_hashes, self.num_bits, self.count, self.fpr,
+         meta_offset, meta_size) = _HEADER.unpack_from(self._mm, 0)
+        if magic != GNOMAD_BLOOM_MAGIC or version != GNOMAD_BLOOM_VERSION:
+            self.close()
+            raise GnomADBloomError(f"{path} is not a version {GNOMAD_BLOOM_VERSION} gnomAD Bloom filter")
+        if meta_offset != _HEADER.size + (self.num_bits + 7) // 8 or len(self._mm) < meta_offset + meta_size:
+            self.close()
+            raise GnomADBloomError(f"{path} is truncated")
+
+        meta = json.loads(self._mm[meta_offset:meta_offset + meta_size].decode())
+        self.dataset_id = meta.get('dataset_id', 'gnomad_r4')
+        self.version_label = meta.get('version_label', '')
+        self.complete = bool(meta.get('complete', False))
+        self.datasets: List[str] = meta.get('datasets', [])
+        self._contigs = frozenset(meta.get('contigs', []))
+
+        self.population = 'gnomad_v4' if self.dataset_id == 'gnomad_r4' else 'gnomad_v3'
+        self.source = f"gnomAD_bloom_{self.dataset_id}"
+
+    def __len__(self) -> int:
+        return self.count
+
+    def covers(self, chrom: str) -> bool:
+        """True if the filter was built complete for this chromosome (misses mean absent)."""
+        return self.complete and _normalize_contig(chrom) in self._contigs
+
+    def might_contain(self, chrom: str, pos: int, ref: str, alt: str) -> bool:
+        """True if the site may be in gnomAD (present, or a false positive)."""
+        h1, h2 = _hash_pair(site_key(chrom, pos, ref, alt))
+        mm, m, offset = self._mm, self.num_bits, _HEADER.size
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % m
+            if not mm[offset + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def definitely_absent(self, chrom: str, pos: int, ref: str, alt: str) -> bool:
+        """True only if the filter is complete for the contig and the site is not in it."""
+        return self.covers(chrom) and not self.might_contain(chrom, pos, ref, alt)
+
+    def absent_stats(self) -> PopulationStats:
+        """Zero-count stats for a variant the filter reports as absent."""
+        return PopulationStats(
+            population=self.population,
+            af=0.0,
+            an=0,
+            ac=0,
+            source=self.source,
+            version=self.version_label
+        )
+
+    def close(self) -> None:
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self) -> 'GnomADBloomFilter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# =============================================================================
+# Shared filter resolution
+# =============================================================================
+
+_filters = LocalResource('gnomad_bloom', 'ACMG_GNOMAD_BLOOM', GnomADBloomFilter,
+                         label='Local gnomAD Bloom filter', errors=(GnomADBloomError,))
+
+
+def get_gnomad_bloom(path: Optional[str] = None) -> Optional[GnomADBloomFilter]:
+    """
+    Return the shared Bloom filter, opening it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['gnomad_bloom'], then the
+    ACMG_GNOMAD_BLOOM environment variable. Returns None when nothing is
+    configured or the filter cannot be opened.
+    """
+    return _filters.get(path)
+
+
+def clear_gnomad_blooms() -> None:
+    """Close and drop all shared filters (e.g. after a rebuild)."""
+    _filters.clear()
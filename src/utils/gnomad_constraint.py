@@ -0,0 +1,322 @@
+"""
+Local gnomAD Gene Constraint Table
+==================================
+
+Gene-indexed, in-memory copy of the gnomAD constraint metrics release,
+replacing the per-gene GraphQL query behind APIClient.get_gene_constraint()
+(PVS1, PP2 and BP1).
+
+Accepted inputs (plain or .bgz/.gz):
+
+- gnomAD v4.x: gnomad.v4.1.constraint_metrics.tsv (one row per transcript;
+  columns such as lof.pLI, lof.oe_ci.upper, mis.z_score, mane_select)
+- gnomAD v2.1.1: gnomad.v2.1.1.lof_metrics.by_gene.txt (one row per gene;
+  columns such as pLI, oe_lof_upper, mis_z)
+
+For v4 files the MANE Select transcript is preferred, then the canonical
+transcript, then the first row seen for the gene.
+
+build_constraint_result() turns raw metrics into the get_gene_constraint()
+dict (is_lof_intolerant, classification, missense classification, ...) and
+is shared by the API and local paths so both classify identically.
+
+Usage:
+    table = GnomADConstraintTable.from_tsv('gnomad.v4.1.constraint_metrics.tsv')
+    table.get('BRCA1')['classification']
+    table.get_many(['BRCA1', 'TP53', 'PTEN'])
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import gzip
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.local_store import LocalResource
+
+
+# Metric -> column names (gnomAD v4.x, then v2.1.1)
+CONSTRAINT_COLUMNS = {
+    'pLI': ('lof.pLI', 'pLI'),
+    'oe_lof': ('lof.oe', 'oe_lof'),
+    'oe_lof_lower': ('lof.oe_ci.lower', 'oe_lof_lower'),
+    'oe_lof_upper': ('lof.oe_ci.upper', 'oe_lof_upper'),
+    'exp_lof': ('lof.exp', 'exp_lof'),
+    'obs_lof': ('lof.obs', 'obs_lof'),
+    'lof_z': ('lof.z_score', 'lof_z'),
+    'oe_mis': ('mis.oe', 'oe_mis'),
+    'oe_mis_lower': ('mis.oe_ci.lower', 'oe_mis_lower'),
+    'oe_mis_upper': ('mis.oe_ci.upper', 'oe_mis_upper'),
+    'exp_mis': ('mis.exp', 'exp_mis'),
+    'obs_mis': ('mis.obs', 'obs_mis'),
+    'mis_z': ('mis.z_score', 'mis_z'),
+}
+
+_GENE_COLUMNS = ('gene', 'gene_symbol')
+_FLAG_COLUMNS = ('constraint_flags', 'constraint_flag')
+_INTEGER_METRICS = {'obs_lof', 'obs_mis'}
+
+# Missense constraint cut-offs (gnomAD recommendations)
+MIS_Z_CONSTRAINED = 3.09
+OE_MIS_UPPER_CONSTRAINED = 0.6
+
+
+class ConstraintTableError(ValueError):
+    """Raised when a constraint metrics file cannot be parsed."""
+
+
+def build_constraint_result(gene_symbol: str, metrics: Dict[str, Any],
+                            source: str = 'gnomAD v4') -> Dict[str, Any]:
+    """
+    Classify raw constraint metrics into the get_gene_constraint() dict.
+
+    Args:
+        gene_symbol: Upper-case gene symbol
+        metrics: pLI, oe_lof, oe_lof_upper, ..., mis_z and flags
+        source: Data source label
+
+    Returns:
+        Dict with the LOF and missense metrics, flags, is_lof_intolerant,
+        confidence, classification and missense classification
+    """
+    from config.constants import CONSTRAINT_THRESHOLDS
+
+    pLI = metrics.get('pLI')
+    oe_lof_upper = metrics.get('oe_lof_upper')
+    oe_mis = metrics.get('oe_mis')
+    oe_mis_upper = metrics.get('oe_mis_upper')
+    mis_z = metrics.get('mis_z')
+
+    # LOEUF is synonymous with oe_lof_upper in gnomAD v4
+    LOEUF = oe_lof_upper
+
+    pLI_threshold = CONSTRAINT_THRESHOLDS['pLI_intolerant']
+    LOEUF_threshold = CONSTRAINT_THRESHOLDS['LOEUF_intolerant']
+    oe_upper_threshold = CONSTRAINT_THRESHOLDS['oe_lof_upper_tolerant']
+
+    is_lof_intolerant = False
+    confidence = 'low'
+    classification = 'uncertain'
+
+    # Classification logic for LOF
+    if pLI is not None and pLI >= pLI_threshold:
+        is_lof_intolerant = True
+        confidence = 'high'
+        classification = 'LOF_intolerant'
+    elif LOEUF is not None and LOEUF <= LOEUF_threshold:
+        is_lof_intolerant = True
+        confidence = 'high'
+        classification = 'LOF_intolerant'
+    elif oe_lof_upper is not None and oe_lof_upper > oe_upper_threshold:
+        is_lof_intolerant = False
+        confidence = 'high'
+        classification = 'LOF_tolerant'
+    elif pLI is not None and LOEUF is not None:
+        # Both available but don't meet thresholds
+        confidence = 'medium'
+        if pLI >= 0.5 or LOEUF <= 0.5:
+            classification = 'uncertain_intolerant'
+        else:
+            classification = 'uncertain_tolerant'
+
+    # Classification logic for missense constraint
+    # - mis_z > 3.09: Significantly constrained against missense variation
+    # - oe_mis_upper < 0.6: Missense constrained
+    # - oe_mis > 1.0: Missense tolerant
+    is_mis_constrained = False
+    mis_classification = 'uncertain'
+    mis_confidence = 'low'
+
+    if mis_z is not None and mis_z > MIS_Z_CONSTRAINED:
+        is_mis_constrained = True
+        mis_classification = 'missense_constrained'
+        mis_confidence = 'high'
+    elif oe_mis_upper is not None and oe_mis_upper < OE_MIS_UPPER_CONSTRAINED:
+        is_mis_constrained = True
+        mis_classification = 'missense_constrained'
+        mis_confidence = 'high'
+    elif oe_mis is not None and oe_mis > 1.0:
+        mis_classification = 'missense_tolerant'
+        mis_confidence = 'medium'
+    elif oe_mis is not None:
+        # oe_mis between 0.6 and 1.0
+        mis_classification = 'uncertain_constrained' if oe_mis < 0.8 else 'uncertain_tolerant'
+
+    return {
+        'gene_symbol': gene_symbol,
+        # LOF metrics
+        'pLI': pLI,
+        'LOEUF': LOEUF,
+        'oe_lof': metrics.get('oe_lof'),
+        'oe_lof_upper': oe_lof_upper,
+        'oe_lof_lower': metrics.get('oe_lof_lower'),
+        'exp_lof': metrics.get('exp_lof'),
+        'obs_lof': metrics.get('obs_lof'),
+        'lof_z': metrics.get('lof_z'),
+        # Missense metrics
+        'oe_mis': oe_mis,
+        'oe_mis_upper': oe_mis_upper,
+        'oe_mis_lower': metrics.get('oe_mis_lower'),
+        'exp_mis': metrics.get('exp_mis'),
+        'obs_mis': metrics.get('obs_mis'),
+        'mis_z': mis_z,
+        # Flags and classifications
+        'flags': metrics.get('flags') or [],
+        'is_lof_intolerant': is_lof_intolerant,
+        'confidence': confidence,
+        'classification': classification,
+        'is_mis_constrained': is_mis_constrained,
+        'mis_classification': mis_classification,
+        'mis_confidence': mis_confidence,
+        'source': source,
+        'thresholds_used': {
+            'pLI': pLI_threshold,
+            'LOEUF': LOEUF_threshold,
+            'oe_lof_upper_tolerant': oe_upper_threshold,
+            'mis_z_constrained': MIS_Z_CONSTRAINED,
+            'oe_mis_upper_constrained': OE_MIS_UPPER_CONSTRAINED
+        }
+    }
+
+
+def _parse_metric(value: str, integer: bool = False) -> Optional[float]:
+    if value in ('', 'NA', 'NaN', 'nan', '.', None):
+        return None
+    try:
+        return int(float(value)) if integer else float(value)
+    except ValueError:
+        return None
+
+
+def _parse_flags(value: str) -> List[str]:
+    value = (value or '').strip().strip('[]')
+    if not value or value == 'NA':
+        return []
+    return [flag.strip().strip('"\'') for flag in value.split(',') if flag.strip().strip('"\'')]
+
+
+def _open_text(path: str):
+    if str(path).endswith(('.gz', '.bgz')):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+class GnomADConstraintTable:
+    """
+    Gene-symbol index over a gnomAD constraint metrics release.
+
+    Attributes:
+        version: Release label used in the result source (e.g. 'v4.1')
+        path: File the table was read from (None if built in memory)
+    """
+
+    def __init__(self, metrics: Optional[Dict[str, Dict[str, Any]]] = None,
+                 version: str = 'v4', path: Optional[str] = None):
+        self._metrics: Dict[str, Dict[str, Any]] = metrics or {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self.version = version
+        self.path = path
+
+    @property
+    def source(self) -> str:
+        return f"gnomAD {self.version} (local)"
+
+    @classmethod
+    def from_tsv(cls, path: str, version: Optional[str] = None) -> 'GnomADConstraintTable':
+        """Parse a gnomAD v2.1.1 or v4.x constraint metrics file."""
+        metrics: Dict[str, Dict[str, Any]] = {}
+        ranks: Dict[str, int] = {}
+        with _open_text(path) as handle:
+            header = handle.readline().rstrip('\n').split('\t')
+            columns = {name: i for i, name in enumerate(header)}
+            gene_col = next((columns[c] for c in _GENE_COLUMNS if c in columns), None)
+            metric_cols = {
+                metric: next((columns[c] for c in candidates if c in columns), None)
+                for metric, candidates in CONSTRAINT_COLUMNS.items()
+            }
+            if gene_col is None or metric_cols['pLI'] is None:
+                raise ConstraintTableError(f"Not a gnomAD constraint metrics file: {path}")
+            flag_col = next((columns[c] for c in _FLAG_COLUMNS if c in columns), None)
+            mane_col = columns.get('mane_select')
+            canonical_col = columns.get('canonical', columns.get('canonical_transcript'))
+
+            for line in handle:
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) <= gene_col or not fields[gene_col]:
+                    continue
+                gene = fields[gene_col].strip().upper()
+
+                # Transcript preference: MANE Select > canonical > first seen
+                rank = 0
+                if mane_col is not None and mane_col < len(fields) and fields[mane_col].lower() == 'true':
+                    rank = 2
+                elif canonical_col is not None and canonical_col < len(fields) \
+                        and fields[canonical_col].lower() == 'true':
+                    rank = 1
+                if gene in ranks and ranks[gene] >= rank:
+                    continue
+
+                row = {
+                    metric: _parse_metric(fields[col], metric in _INTEGER_METRICS)
+                    if col is not None and col < len(fields) else None
+                    for metric, col in metric_cols.items()
+                }
+                row['flags'] = _parse_flags(fields[flag_col]) if flag_col is not None and flag_col < len(fields) else []
+                metrics[gene] = row
+                ranks[gene] = rank
+
+        if version is None:
+            version = 'v4' if 'lof.pLI' in columns else 'v2.1.1'
+        return cls(metrics, version=version, path=path)
+
+    # =========================================================================
+    # Lookup
+    # =========================================================================
+
+    def get(self, gene_symbol: str) -> Optional[Dict[str, Any]]:
+        """Return the get_gene_constraint() dict for a gene, or None if absent."""
+        if not gene_symbol:
+            return None
+        gene = gene_symbol.strip().upper()
+        result = self._results.get(gene)
+        if result is None and gene in self._metrics:
+            result = build_constraint_result(gene, self._metrics[gene], source=self.source)
+            self._results[gene] = result
+        return result
+
+    def get_many(self, gene_symbols: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Return results for a gene panel, keyed by upper-case symbol (None if absent)."""
+        return {symbol.strip().upper(): self.get(symbol) for symbol in gene_symbols if symbol}
+
+    def genes(self) -> List[str]:
+        return list(self._metrics)
+
+    def __len__(self) -> int:
+        return len(self._metrics)
+
+    def __contains__(self, gene_symbol: str) -> bool:
+        return bool(gene_symbol) and gene_symbol.strip().upper() in self._metrics
+
+
+# =============================================================================
+# Shared table resolution
+# =============================================================================
+
+_tables = LocalResource('gnomad_constraint', 'ACMG_GNOMAD_CONSTRAINT', GnomADConstraintTable.from_tsv,
+                        label='Local gnomAD constraint table', errors=(ConstraintTableError,))
+
+
+def get_constraint_table(path: Optional[str] = None) -> Optional[GnomADConstraintTable]:
+    """
+    Return the shared constraint table, parsing it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['gnomad_constraint'], then
+    the ACMG_GNOMAD_CONSTRAINT environment variable. Returns None when
+    nothing is configured or the file cannot be parsed.
+    """
+    return _tables.get(path)
+
+
+def clear_constraint_tables() -> None:
+    """Drop all shared tables (e.g. after the file is replaced)."""
+    _tables.clear()
@@ -0,0 +1,389 @@
+"""
+Local gnomAD Frequency Store
+============================
+
+Compact, memory-mapped binary store of gnomAD sites data for offline
+population lookups (PM2, BA1, BS1).
+
+The store is built once from a gnomAD sites VCF (or any sites VCF with
+AC/AN/AF INFO fields) and answers lookups by binary search over a sorted
+column of packed position keys, without parsing any text:
+
+    header   64 bytes      magic, version, record count, section offsets
+    keys     8 bytes/rec   (contig index << 32) | position, sorted
+    records  44 bytes/rec  allele offset/length, AC, AN, hom, hemi, AF,
+                           popmax AF, popmax population, filters
+    heap     variable      "REF\\tALT" allele strings
+    meta     JSON          contigs, string table, dataset labels
+
+Only the pages touched by a lookup are read from disk, so stores covering
+hundreds of millions of sites open instantly.
+
+Usage:
+    build_gnomad_store('gnomad.genomes.v4.1.sites.chr17.vcf.bgz', 'gnomad_chr17.bin')
+    store = LocalGnomADStore('gnomad_chr17.bin')
+    stats = store.get_population_stats('17', 43092919, 'G', 'A')
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import gzip
+import json
+import math
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config.predictors import PopulationStats
+from utils.local_store import LocalResource
+
+
+GNOMAD_STORE_MAGIC = b'ACMGGNAD'
+GNOMAD_STORE_VERSION = 1
+
+_HEADER = struct.Struct('<8sIIQQQQQQ')
+_KEY = struct.Struct('<Q')
+_RECORD = struct.Struct('<IIIIIIddHH')
+
+_U32_NONE = 0xFFFFFFFF
+_U16_NONE = 0xFFFF
+
+# INFO tags read from the sites VCF (first present tag wins)
+GNOMAD_INFO_TAGS = {
+    'ac': ('AC',),
+    'an': ('AN',),
+    'af': ('AF',),
+    'homozygote_count': ('nhomalt',),
+    'hemizygote_count': ('nhemi', 'AC_hemi'),
+    'popmax_af': ('fafmax_faf95_max', 'faf95_popmax', 'AF_grpmax', 'AF_popmax'),
+    'popmax_population': ('fafmax_faf95_max_gen_anc', 'grpmax', 'popmax'),
+}
+
+# Per-allele (Number=A) INFO tags; all others are per-site
+_PER_ALLELE_FIELDS = {'ac', 'af', 'homozygote_count', 'hemizygote_count', 'popmax_af', 'popmax_population'}
+
+
+class GnomADStoreError(ValueError):
+    """Raised for malformed or incompatible store files."""
+
+
+def _normalize_contig(chrom: str) -> str:
+    chrom = str(chrom)
+    if chrom.lower().startswith('chr'):
+        chrom = chrom[3:]
+    return 'MT' if chrom in ('M', 'm') else chrom
+
+
+def _parse_info(info: str) -> Dict[str, str]:
+    values = {}
+    for item in info.split(';'):
+        key, sep, value = item.partition('=')
+        values[key] = value if sep else '1'
+    return values
+
+
+def _info_value(info: Dict[str, str], field: str, allele_index: int) -> Optional[str]:
+    for tag in GNOMAD_INFO_TAGS[field]:
+        if tag in info:
+            value = info[tag]
+            if field in _PER_ALLELE_FIELDS:
+                parts = value.split(',')
+                value = parts[allele_index] if allele_index < len(parts) else ''
+            return None if value in ('', '.') else value
+    return None
+
+
+def _to_int(value: Optional[str]) -> int:
+    try:
+        return int(value) if value is not None else _U32_NONE
+    except ValueError:
+        return _U32_NONE
+
+
+def _to_float(value: Optional[str]) -> float:
+    try:
+        return float(value) if value is not None else math.nan
+    except ValueError:
+        return math.nan
+
+
+def iter_sites_vcf(path: str) -> Iterator[Tuple[str, int, str, str, str, Dict[str, str], int]]:
+    """
+    Yield (chrom, pos, ref, alt, filter, info, allele_index) per ALT allele.
+
+    Plain, gzip and bgzip VCFs are supported.
+    """
+    opener = gzip.open if path.endswith(('.gz', '.bgz')) else open
+    with opener(path, 'rt') as f:
+        for line in f:
+            if line.startswith('#'):
+                continue
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 8:
+                continue
+            info = _parse_info(fields[7])
+            for allele_index, alt in enumerate(fields[4].split(',')):
+                if alt in ('.', '*'):
+                    continue
+                yield fields[0], int(fields[1]), fields[3], alt, fields[6], info, allele_index
+
+
+def build_gnomad_store(
+    vcf_path: str,
+    out_path: str,
+    dataset_id: str = 'gnomad_r4',
+    version_label: str = 'v4.1',
+    complete: bool = False,
+    pass_only: bool = False
+) -> int:
+    """
+    Build a binary store from a sites VCF.
+
+    Args:
+        vcf_path: gnomAD sites VCF (plain, gzip or bgzip)
+        out_path: Destination store file
+        dataset_id: gnomAD dataset the VCF belongs to ('gnomad_r4', 'gnomad_r3')
+        version_label: Version recorded on returned PopulationStats
+        complete: True if the VCF holds every site of its contigs, so a
+                  variant missing from the store is absent from gnomAD
+        pass_only: Skip sites that did not pass quality filters
+
+    Returns:
+        Number of records written
+    """
+    contigs: List[str] = []
+    contig_ids: Dict[str, int] = {}
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def string_id(value: Optional[str]) -> int:
+        if not value:
+            return _U16_NONE
+        if value not in string_ids:
+            if len(strings) >= _U16_NONE:
+                raise GnomADStoreError("Too many distinct population/filter labels")
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    rows = []
+    for chrom, pos, ref, alt, filters, info, allele_index in iter_sites_vcf(vcf_path):
+        passed = filters in ('PASS', '.', '')
+        if pass_only and not passed:
+            continue
+        contig = _normalize_contig(chrom)
+        if contig not in contig_ids:
+            contig_ids[contig] = len(contigs)
+            contigs.append(contig)
+        rows.append((
+            (contig_ids[contig] << 32) | pos,
+            f"{ref}\t{alt}".encode(),
+            _to_int(_info_value(info, 'ac', allele_index)),
+            _to_int(_info_value(info, 'an', allele_index)),
+            _to_int(_info_value(info, 'homozygote_count', allele_index)),
+            _to_int(_info_value(info, 'hemizygote_count', allele_index)),
+            _to_float(_info_value(info, 'af', allele_index)),
+            _to_float(_info_value(info, 'popmax_af', allele_index)),
+            string_id(_info_value(info, 'popmax_population', allele_index)),
+            _U16_NONE if passed else string_id(filters),
+        ))
+    rows.sort(key=lambda row: (row[0], row[1]))
+
+    meta = json.dumps({
+        'dataset_id': dataset_id,
+        'version_label': version_label,
+        'complete': complete,
+        'contigs': contigs,
+        'strings': strings,
+    }).encode()
+
+    n = len(rows)
+    keys_offset = _HEADER.size
+    records_offset = keys_offset + n * _KEY.size
+    heap_offset = records_offset + n * _RECORD.size
+
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(b'\0' * _HEADER.size)
+        for row in rows:
+            f.write(_KEY.pack(row[0]))
+        heap_size = 0
+        for row in rows:
+            f.write(_RECORD.pack(heap_size, len(row[1]), *row[2:]))
+            heap_size += len(row[1])
+        for row in rows:
+            f.write(row[1])
+        meta_offset = heap_offset + heap_size
+        f.write(meta)
+        f.seek(0)
+        f.write(_HEADER.pack(GNOMAD_STORE_MAGIC, GNOMAD_STORE_VERSION, 0, n,
+                             keys_offset, records_offset, heap_offset, meta_offset, len(meta)))
+    os.replace(tmp_path, out_path)
+    return n
+
+
+class LocalGnomADStore:
+    """
+    Read-only, memory-mapped gnomAD frequency store.
+
+    Usage:
+        store = LocalGnomADStore('gnomad_v4.bin')
+        stats = store.get_population_stats('17', 43092919, 'G', 'A')
+        # Returns: PopulationStats(...), absent stats, or None if not covered
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise GnomADStoreError(f"{path} is empty")
+
+        if len(self._mm) < _HEADER.size:
+            self.close()
+            raise GnomADStoreError(f"{path} is not a gnomAD store")
+        (magic, version, _, self._count, self._keys_offset, self._records_offset,
+         self._heap_offset, meta_offset, meta_size) = _HEADER.unpack_from(self._mm, 0)
+        if magic != GNOMAD_STORE_MAGIC or version != GNOMAD_STORE_VERSION:
+            self.close()
+            raise GnomADStoreError(f"{path} is not a version {GNOMAD_STORE_VERSION} gnomAD store")
+
+        meta = json.loads(self._mm[meta_offset:meta_offset + meta_size].decode())
+        self.dataset_id = meta.get('dataset_id', 'gnomad_r4')
+        self.version_label = meta.get('version_label', '')
+        self.complete = bool(meta.get('complete', False))
+        self._contig_ids = {name: i for i, name in enumerate(meta.get('contigs', []))}
+        self._strings = meta.get('strings', [])
+
+        self.population = 'gnomad_v4' if self.dataset_id == 'gnomad_r4' else 'gnomad_v3'
+        self.source = f"gnomAD_local_{self.dataset_id}"
+
+    def __len__(self) -> int:
+        return self._count
+
+    def covers(self, chrom: str) -> bool:
+        """True if the store is complete for this chromosome (misses mean absent)."""
+        return self.complete and _normalize_contig(chrom) in self._contig_ids
+
+    def _key_at(self, index: int) -> int:
+        return _KEY.unpack_from(self._mm, self._keys_offset + index * _KEY.size)[0]
+
+    def _find(self, key: int) -> int:
+        """Index of the first record with key >= ``key`` (binary search)."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, chrom: str, pos: int, ref: str, alt: str) -> Optional[PopulationStats]:
+        """Return stats for a variant present in the store, else None."""
+        contig_id = self._contig_ids.get(_normalize_contig(chrom))
+        if contig_id is None:
+            return None
+
+        key = (contig_id << 32) | int(pos)
+        alleles = f"{ref}\t{alt}".encode()
+        index = self._find(key)
+        while index < self._count and self._key_at(index) == key:
+            record = _RECORD.unpack_from(self._mm, self._records_offset + index * _RECORD.size)
+            start = self._heap_offset + record[0]
+            if self._mm[start:start + record[1]] == alleles:
+                return self._build_stats(record)
+            index += 1
+        return None
+
+    def _build_stats(self, record: tuple) -> PopulationStats:
+        _, _, ac, an, hom, hemi, af, popmax_af, popmax_pop, filters = record
+        ac = None if ac == _U32_NONE else ac
+        an = None if an == _U32_NONE else an
+        if math.isnan(af):
+            af = ac / an if ac is not None and an else None
+        return PopulationStats(
+            population=self.population,
+            af=af,
+            an=an,
+            ac=ac,
+            homozygote_count=None if hom == _U32_NONE else hom,
+            hemizygote_count=None if hemi == _U32_NONE else hemi,
+            popmax_af=None if math.isnan(popmax_af) else popmax_af,
+            popmax_population=None if popmax_pop == _U16_NONE else self._strings[popmax_pop],
+            filters=[] if filters == _U16_NONE else self._strings[filters].split(';'),
+            source=self.source,
+            version=self.version_label
+        )
+
+    def get_population_stats(self, chrom: str, pos: int, ref: str, alt: str) -> Optional[PopulationStats]:
+        """
+        Look up a variant with gnomAD absence semantics.
+
+        Returns:
+            PopulationStats if present; zero-count stats if the store is
+            complete for the chromosome (absent from gnomAD); None otherwise.
+        """
+        stats = self.lookup(chrom, pos, ref, alt)
+        if stats is None and self.covers(chrom):
+            stats = PopulationStats(
+                population=self.population,
+                af=0.0,
+                an=0,
+                ac=0,
+                source=self.source,
+                version=self.version_label
+            )
+        return stats
+
+    def get_population_stats_many(
+        self,
+        variants: List[Tuple[str, int, str, str]]
+    ) -> Dict[Tuple[str, int, str, str], PopulationStats]:
+        """Look up many variants; variants the store cannot answer are omitted."""
+        results = {}
+        for variant in variants:
+            stats = self.get_population_stats(*variant)
+            if stats is not None:
+                results[variant] = stats
+        return results
+
+    def close(self) -> None:
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self) -> 'LocalGnomADStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# =============================================================================
+# Shared store resolution
+# =============================================================================
+
+_stores = LocalResource('gnomad', 'ACMG_GNOMAD_STORE', LocalGnomADStore,
+                        label='Local gnomAD store', errors=(GnomADStoreError,))
+
+
+def get_gnomad_store(path: Optional[str] = None) -> Optional[LocalGnomADStore]:
+    """
+    Return the shared store, opening it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['gnomad'], then the
+    ACMG_GNOMAD_STORE environment variable. Returns None when nothing is
+    configured or the store cannot be opened.
+    """
+    return _stores.get(path)
+
+
+def clear_gnomad_stores() -> None:
+    """Close and drop all shared stores (e.g. after a rebuild)."""
+    _stores.clear()
@@ -0,0 +1,262 @@
+"""
+HGNC Gene Symbol Index
+======================
+
+Local index over the HGNC complete set (hgnc_complete_set.txt from
+https://www.genenames.org/download/) that resolves approved symbols,
+aliases, previous symbols, HGNC IDs and Ensembl gene IDs to the approved
+gene record (chromosome, cytoband, Ensembl/UniProt/Entrez IDs) with one
+dictionary lookup.
+
+Lookups are case-insensitive. When several genes share an alias or a
+previous symbol, names are resolved in the order approved symbol, previous
+symbol, alias; names that remain ambiguous within the same tier are not
+resolved (candidates() lists them).
+
+canonical_gene_symbol() is the shared normalization for gene-keyed cache
+entries: aliases map to the approved symbol, so 'p53' and 'TP53' share
+one entry. Without a configured index it falls back to the upper-case
+input, the previous behaviour.
+
+Usage:
+    index = get_hgnc_index()
+    index.resolve('FANCS').symbol        # 'BRCA1'
+    index.chromosome('p53')              # '17'
+    canonical_gene_symbol('c9orf72')     # 'C9ORF72'
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import csv
+import gzip
+import re
+from dataclasses import astuple, dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.local_store import LocalResource, is_snapshot_path, load_snapshot, save_snapshot
+
+
+# Bumped whenever GeneRecord or the snapshot layout changes
+SNAPSHOT_FORMAT_VERSION = 2
+
+# Resolution tiers, highest priority first
+_TIER_SYMBOL, _TIER_PREVIOUS, _TIER_ALIAS = 0, 1, 2
+
+_CHROMOSOME = re.compile(r'^(\d{1,2}|X|Y)(?=[pqc ]|$|\s)', re.IGNORECASE)
+
+
+class HGNCIndexError(ValueError):
+    """Raised when a file is not an HGNC complete set export."""
+
+
+@dataclass(frozen=True)
+class GeneRecord:
+    """One approved HGNC gene (symbol keeps HGNC spelling, e.g. 'C9orf72')."""
+    hgnc_id: str
+    symbol: str
+    name: str = ''
+    chromosome: Optional[str] = None
+    location: str = ''
+    locus_group: str = ''
+    ensembl_gene_id: str = ''
+    uniprot_ids: Tuple[str, ...] = ()
+    entrez_id: str = ''
+    aliases: Tuple[str, ...] = ()
+    previous_symbols: Tuple[str, ...] = ()
+
+
+def chromosome_from_location(location: str) -> Optional[str]:
+    """Return the chromosome of an HGNC cytogenetic location ('17q21.31' -> '17', 'mitochondria' -> 'MT')."""
+    location = (location or '').strip()
+    if location.lower().startswith('mitochondria'):
+        return 'MT'
+    match = _CHROMOSOME.match(location)
+    return match.group(1).upper() if match else None
+
+
+def _split(value: str) -> Tuple[str, ...]:
+    """Split HGNC multi-value fields ('"A|B"', 'A|B')."""
+    value = (value or '').strip().strip('"')
+    return tuple(part.strip() for part in value.split('|') if part.strip())
+
+
+def iter_hgnc_complete_set(path: str) -> Iterable[GeneRecord]:
+    """Yield approved genes from hgnc_complete_set.txt (plain or gzip)."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f, delimiter='\t')
+        if not reader.fieldnames or 'symbol' not in reader.fieldnames or 'hgnc_id' not in reader.fieldnames:
+            raise HGNCIndexError(f"Not an HGNC complete set file: {path}")
+        for row in reader:
+            if (row.get('status') or 'Approved') != 'Approved' or not row.get('symbol'):
+                continue
+            location = (row.get('location') or '').strip()
+            yield GeneRecord(
+                hgnc_id=row['hgnc_id'].strip(),
+                symbol=row['symbol'].strip(),
+                name=(row.get('name') or '').strip(),
+                chromosome=chromosome_from_location(location),
+                location=location,
+                locus_group=(row.get('locus_group') or '').strip(),
+                ensembl_gene_id=(row.get('ensembl_gene_id') or '').strip(),
+                uniprot_ids=_split(row.get('uniprot_ids')),
+                entrez_id=(row.get('entrez_id') or '').strip(),
+                aliases=_split(row.get('alias_symbol')),
+                previous_symbols=_split(row.get('prev_symbol')),
+            )
+
+
+class HGNCIndex:
+    """
+    Case-insensitive name -> approved gene index.
+
+    Attributes:
+        path: File the index was read from (None if built in memory)
+    """
+
+    def __init__(self, records: Iterable[GeneRecord] = (), path: Optional[str] = None):
+        self.path = path
+        self._records: Dict[str, GeneRecord] = {}
+        # name -> (tier, approved symbol keys); several keys = ambiguous
+        self._names: Dict[str, Tuple[int, List[str]]] = {}
+        for record in records:
+            self.add(record)
+
+    @classmethod
+    def from_tsv(cls, path: str) -> 'HGNCIndex':
+        """Build the index from hgnc_complete_set.txt."""
+        return cls(iter_hgnc_complete_set(path), path=path)
+
+    def add(self, record: GeneRecord) -> None:
+        key = record.symbol.upper()
+        self._records[key] = record
+        self._register(key, key, _TIER_SYMBOL)
+        self._register(record.hgnc_id.upper(), key, _TIER_SYMBOL)
+        if record.ensembl_gene_id:
+            self._register(record.ensembl_gene_id.upper(), key, _TIER_SYMBOL)
+        for name in record.previous_symbols:
+            self._register(name.upper(), key, _TIER_PREVIOUS)
+        for name in record.aliases:
+            self._register(name.upper(), key, _TIER_ALIAS)
+
+    def _register(self, name: str, key: str, tier: int) -> None:
+        current = self._names.get(name)
+        if current is None or tier < current[0]:
+            self._names[name] = (tier, [key])
+        elif tier == current[0] and key not in current[1]:
+            current[1].append(key)
+
+    # =========================================================================
+    # Lookup
+    # =========================================================================
+
+    def resolve(self, name: str) -> Optional[GeneRecord]:
+        """Return the approved gene for a symbol, alias, previous symbol, HGNC or Ensembl ID."""
+        if not name:
+            return None
+        entry = self._names.get(name.strip().upper())
+        if entry is None or len(entry[1]) != 1:
+            return None
+        return self._records[entry[1][0]]
+
+    def candidates(self, name: str) -> List[GeneRecord]:
+        """Return every approved gene a name may refer to (more than one if ambiguous)."""
+        entry = self._names.get((name or '').strip().upper())
+        return [self._records[key] for key in entry[1]] if entry else []
+
+    def canonical_symbol(self, name: str) -> Optional[str]:
+        """Return the approved symbol (HGNC spelling) for a name, or None."""
+        record = self.resolve(name)
+        return record.symbol if record else None
+
+    def chromosome(self, name: str) -> Optional[str]:
+        record = self.resolve(name)
+        return record.chromosome if record else None
+
+    def is_known(self, name: str) -> bool:
+        """True if the name is a symbol, alias or ID of any gene (even if ambiguous)."""
+        return bool(name) and name.strip().upper() in self._names
+
+    def records(self) -> Iterable[GeneRecord]:
+        return self._records.values()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    # =========================================================================
+    # Snapshot persistence
+    # =========================================================================
+
+    def save(self, path: str) -> None:
+        """Persist the index as JSON (gzip-compressed for .json.gz paths)."""
+        save_snapshot(path, 'hgnc_index', SNAPSHOT_FORMAT_VERSION,
+                      rows=[astuple(record) for record in self._records.values()])
+
+    @classmethod
+    def load(cls, path: str) -> Optional['HGNCIndex']:
+        """Load an index saved with save(); returns None if missing or incompatible."""
+        payload = load_snapshot(path, 'hgnc_index', SNAPSHOT_FORMAT_VERSION)
+        if payload is None:
+            return None
+        try:
+            # JSON arrays back to the tuple fields (aliases, previous symbols, UniProt IDs)
+            records = [GeneRecord(*(tuple(value) if isinstance(value, list) else value for value in row))
+                       for row in payload.get('rows', [])]
+        except TypeError:
+            return None
+        return cls(records, path=path)
+
+
+def open_hgnc_index(path: str) -> HGNCIndex:
+    """Open a saved index (.json.gz / .json) or parse any other file as hgnc_complete_set.txt."""
+    if not is_snapshot_path(path):
+        return HGNCIndex.from_tsv(path)
+    index = HGNCIndex.load(path)
+    if index is None:
+        raise HGNCIndexError(f"Not a version {SNAPSHOT_FORMAT_VERSION} HGNC index snapshot: {path}")
+    return index
+
+
+# =============================================================================
+# Shared index resolution
+# =============================================================================
+
+_indexes = LocalResource('hgnc', 'ACMG_HGNC_PATH', open_hgnc_index,
+                         label='Local HGNC index', errors=(UnicodeDecodeError, HGNCIndexError))
+
+
+def get_hgnc_index(path: Optional[str] = None) -> Optional[HGNCIndex]:
+    """
+    Return the shared HGNC index, loading it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['hgnc'], then the
+    ACMG_HGNC_PATH environment variable. Returns None when nothing is
+    configured or the file cannot be loaded.
+    """
+    return _indexes.get(path)
+
+
+def canonical_gene_symbol(gene_symbol: str) -> str:
+    """
+    Return the upper-case approved symbol for a gene name, for cache keys and lookups.
+
+    Aliases and previous symbols are mapped through the shared HGNC index;
+    unknown or ambiguous names (and every name when no index is configured)
+    are returned stripped and upper-cased.
+    """
+    gene_symbol = (gene_symbol or '').strip()
+    index = get_hgnc_index()
+    if index is not None:
+        record = index.resolve(gene_symbol)
+        if record is not None:
+            return record.symbol.upper()
+    return gene_symbol.upper()
+
+
+def clear_hgnc_indexes() -> None:
+    """Drop all shared indexes (e.g. after the file is replaced)."""
+    _indexes.clear()
@@ -9,10 +9,16 @@ Supported formats:
 - Full HGVS: NM_000546.6:c.1528C>T
 - cDNA only: c.1528C>T
 - Position only: 1528C>T
+
+c. variants can be projected to GRCh38 with HGVSParser.to_genomic() when a
+local transcript index is configured (see utils/transcript_index.py).
 """
 
 import re
-from typing import Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
+
+
+_COMPLEMENT = str.maketrans('ACGTN', 'TGCAN')
 
 
 class HGVSParser:
@@ -195,6 +201,55 @@ class HGVSParser:
         
         return f"{refseq}:{simple}"
 
+    @classmethod
+    def to_genomic(cls, variant_string: str, refseq_id: Optional[str] = None,
+                   gene: Optional[str] = None, index=None) -> Optional[Dict[str, Any]]:
+        """
+        Project a c. variant to GRCh38 with the local transcript index.
+
+        Args:
+            variant_string: The variant string to project
+            refseq_id: Transcript to use if the string has none
+            gene: Gene whose preferred (MANE Select) transcript is used as a fallback
+            index: TranscriptIndex (defaults to the shared index, if configured)
+
+        Returns:
+            Dict with 'transcript', 'chromosome', 'start', 'end' and 'strand';
+            substitutions also carry genomic 'ref' and 'alt'. None if the
+            variant cannot be parsed or projected.
+        """
+        parsed = cls.parse(variant_string)
+        if not parsed or parsed.get('notation_type', 'c').lower() != 'c':
+            return None
+        if index is None:
+            from utils.transcript_index import get_transcript_index
+            index = get_transcript_index()
+            if index is None:
+                return None
+
+        model = index.resolve(parsed.get('refseq_id', refseq_id), gene)
+        if model is None:
+            return None
+
+        first, _, last = parsed['position'].partition('_')
+        start, end = model.c_to_g(first), model.c_to_g(last or first)
+        if start is None or end is None:
+            return None
+
+        result = {
+            'transcript': model.transcript_id,
+            'chromosome': model.chrom,
+            'start': min(start, end),
+            'end': max(start, end),
+            'strand': model.strand
+        }
+        if parsed.get('variant_type') == 'substitution':
+            ref, alt = parsed.get('ref_base', '').upper(), parsed.get('alt_base', '').upper()
+            if model.strand == '-':
+                ref, alt = ref.translate(_COMPLEMENT)[::-1], alt.translate(_COMPLEMENT)[::-1]
+            result['ref'], result['alt'] = ref, alt
+        return result
+
 
 def parse_hgvs_variant(variant_string: str) -> Optional[Dict[str, str]]:
     """
@@ -0,0 +1,375 @@
+"""
+HPO Ontology
+============
+
+Loads the Human Phenotype Ontology (hp.obo) into compact integer-ID arrays
+for ancestor-aware phenotype similarity.
+
+Every current term gets an integer index. Alternative and obsolete IDs map
+to the index of their current term. The ancestor closure of each term,
+including the term itself, is precomputed once as a bitset: a Python int
+with bit i set for ancestor i. It is also kept as a flat index array with
+per-term offsets, so similarity can be computed with numpy instead of
+walking the graph for each pair.
+
+Information content (IC) is -log(p), where p is the fraction of annotated
+items (diseases or genes) carrying the term or one of its descendants.
+Annotations come from a phenotype.hpoa file or from any gene -> terms
+mapping such as data/gene_phenotypes.json. Without annotations, IC comes
+from the ontology structure (the fraction of terms below each term).
+
+Similarity between two term sets is the best-match average (BMA) of a
+pairwise measure:
+
+    resnik   IC of the most informative common ancestor (MICA)
+    lin      2 * IC(MICA) / (IC(a) + IC(b)), in [0, 1]
+
+Usage:
+    ontology = HPOOntology.from_obo('hp.obo')
+    ontology.annotate(load_hpoa('phenotype.hpoa'), source='phenotype.hpoa')
+    ontology.similarity(['HP:0003002'], ['HP:0100013', 'HP:0000137'])
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.local_store import LocalResource
+
+
+SIMILARITY_MEASURES = ('resnik', 'lin')
+
+
+class HPOOntologyError(ValueError):
+    """Raised for malformed ontology files."""
+
+
+def iter_obo_terms(path: str) -> Iterable[Dict]:
+    """
+    Yield the [Term] stanzas of an OBO file as dicts.
+
+    Each dict has 'id', 'name', 'synonyms', 'is_a', 'alt_ids', 'obsolete'
+    and 'replaced_by'.
+    """
+    term = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('['):
+                if term is not None and term['id']:
+                    yield term
+                term = None
+                if line == '[Term]':
+                    term = {'id': None, 'name': '', 'synonyms': [], 'is_a': [],
+                            'alt_ids': [], 'obsolete': False, 'replaced_by': None}
+                continue
+            if term is None or ':' not in line:
+                continue
+            tag, value = line.split(':', 1)
+            value = value.split(' ! ', 1)[0].strip()
+            if tag == 'id':
+                term['id'] = value
+            elif tag == 'name':
+                term['name'] = value
+            elif tag == 'synonym' and value.startswith('"'):
+                term['synonyms'].append(value[1:value.find('"', 1)])
+            elif tag == 'is_a':
+                term['is_a'].append(value.split()[0])
+            elif tag == 'alt_id':
+                term['alt_ids'].append(value)
+            elif tag == 'is_obsolete':
+                term['obsolete'] = value == 'true'
+            elif tag == 'replaced_by':
+                term['replaced_by'] = value
+    if term is not None and term['id']:
+        yield term
+
+
+def load_hpoa(path: str) -> Dict[str, Set[str]]:
+    """
+    Read a phenotype.hpoa file into {disease ID: set of HPO IDs}.
+
+    Only phenotypic abnormality annotations (aspect P) are kept and
+    NOT-qualified annotations are skipped.
+    """
+    columns = {'database_id': 0, 'qualifier': 2, 'hpo_id': 3, 'aspect': 10}
+    annotations: Dict[str, Set[str]] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('#') or not line.strip():
+                continue
+            fields = line.rstrip('\n').split('\t')
+            if fields[0] == 'database_id' or fields[0] == 'DatabaseID':
+                header = [field.lower() for field in fields]
+                columns = {name: header.index(name) for name in columns if name in header}
+                continue
+            try:
+                disease = fields[columns['database_id']]
+                term = fields[columns['hpo_id']]
+            except (KeyError, IndexError):
+                raise HPOOntologyError(f"{path} is not a phenotype.hpoa file")
+            qualifier = fields[columns['qualifier']] if 'qualifier' in columns and len(fields) > columns['qualifier'] else ''
+            aspect = fields[columns['aspect']] if 'aspect' in columns and len(fields) > columns['aspect'] else 'P'
+            if qualifier.upper() == 'NOT' or aspect not in ('P', ''):
+                continue
+            annotations.setdefault(disease, set()).add(term)
+    return annotations
+
+
+class HPOOntology:
+    """
+    HPO terms with precomputed ancestor closures and information content.
+
+    Usage:
+        ontology = HPOOntology.from_obo('hp.obo')
+        ontology.is_ancestor('HP:0000118', 'HP:0003002')
+        ontology.similarity(patient_terms, gene_terms, measure='lin')
+    """
+
+    def __init__(self, terms: Iterable[Dict], path: Optional[str] = None):
+        self.path = path
+        terms = list(terms)
+        current = [term for term in terms if not term['obsolete']]
+        if not current:
+            raise HPOOntologyError(f"{path or 'ontology'} has no terms")
+
+        self.ids: List[str] = [term['id'] for term in current]
+        self.names: List[str] = [term['name'] for term in current]
+        self.synonyms: List[Tuple[str, ...]] = [tuple(term['synonyms']) for term in current]
+        self._index: Dict[str, int] = {term_id: i for i, term_id in enumerate(self.ids)}
+        for i, term in enumerate(current):
+            for alt_id in term['alt_ids']:
+                self._index.setdefault(alt_id, i)
+
+        self.parents: List[Tuple[int, ...]] = [
+            tuple(self._index[p] for p in term['is_a'] if p in self._index) for term in current
+        ]
+        self.ancestors = self._ancestor_closure(self.parents)
+
+        # Flat ancestor index arrays (CSR layout) for vectorized similarity
+        closure = [_bit_indices(bits) for bits in self.ancestors]
+        self._ancestor_offsets = np.zeros(len(closure) + 1, dtype=np.int64)
+        np.cumsum([len(indices) for indices in closure], out=self._ancestor_offsets[1:])
+        self._ancestor_flat = np.concatenate(closure).astype(np.int32)
+
+        # Obsolete IDs resolve to their replacement where the OBO names one
+        for term in terms:
+            if term['obsolete'] and term['replaced_by'] in self._index:
+                self._index.setdefault(term['id'], self._index[term['replaced_by']])
+
+        descendants = np.bincount(self._ancestor_flat, minlength=len(self.ids))
+        self.ic = _information_content(descendants, len(self.ids))
+        self.ic_source = 'structure'
+
+    @classmethod
+    def from_obo(cls, path: str) -> 'HPOOntology':
+        return cls(iter_obo_terms(path), path=path)
+
+    @staticmethod
+    def _ancestor_closure(parents: List[Tuple[int, ...]]) -> List[int]:
+        """Ancestor bitset of every term, propagated from parents to children in topological order."""
+        children: List[List[int]] = [[] for _ in parents]
+        pending = [len(p) for p in parents]
+        for child, term_parents in enumerate(parents):
+            for parent in term_parents:
+                children[parent].append(child)
+
+        ancestors = [1 << i for i in range(len(parents))]
+        queue = [i for i, count in enumerate(pending) if count == 0]
+        done = 0
+        while queue:
+            term = queue.pop()
+            done += 1
+            bits = ancestors[term]
+            for child in children[term]:
+                ancestors[child] |= bits
+                pending[child] -= 1
+                if pending[child] == 0:
+                    queue.append(child)
+        if done != len(parents):
+            raise HPOOntologyError("Ontology is_a graph has a cycle")
+        return ancestors
+
+    # -------------------------------------------------------------------------
+    # Term lookup
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._index
+
+    def index_of(self, term: str) -> Optional[int]:
+        """Integer index of a term, alternative or replaced ID."""
+        return self._index.get(term)
+
+    def to_indices(self, terms: Iterable[str]) -> np.ndarray:
+        """Sorted unique indices of the known terms (unknown terms and TEXT: tokens are dropped)."""
+        indices = {self._index[term] for term in terms if term in self._index}
+        return np.fromiter(sorted(indices), dtype=np.int32, count=len(indices))
+
+    def name(self, term: str) -> Optional[str]:
+        i = self._index.get(term)
+        return self.names[i] if i is not None else None
+
+    def ancestor_indices(self, index: int) -> np.ndarray:
+        return self._ancestor_flat[self._ancestor_offsets[index]:self._ancestor_offsets[index + 1]]
+
+    def ancestors_of(self, term: str) -> Set[str]:
+        """IDs of the term and all of its ancestors."""
+        i = self._index.get(term)
+        if i is None:
+            return set()
+        return {self.ids[a] for a in self.ancestor_indices(i)}
+
+    def is_ancestor(self, ancestor: str, term: str) -> bool:
+        """True if ``ancestor`` is ``term`` or one of its ancestors."""
+        a, t = self._index.get(ancestor), self._index.get(term)
+        return a is not None and t is not None and bool(self.ancestors[t] >> a & 1)
+
+    # -------------------------------------------------------------------------
+    # Information content
+    # -------------------------------------------------------------------------
+
+    def annotation_ic(self, annotations: Mapping[str, Iterable[str]]) -> np.ndarray:
+        """
+        Information content from annotation frequencies.
+
+        Args:
+            annotations: Item (disease or gene) -> annotated HPO IDs
+
+        Returns:
+            IC per term index; terms annotated to no item get the maximum IC
+        """
+        counts = np.zeros(len(self.ids), dtype=np.int64)
+        items = 0
+        for terms in annotations.values():
+            bits = 0
+            for term in terms:
+                i = self._index.get(term)
+                if i is not None:
+                    bits |= self.ancestors[i]
+            if bits:
+                counts[_bit_indices(bits)] += 1
+                items += 1
+        if not items:
+            raise HPOOntologyError("No annotations reference terms of this ontology")
+        return _information_content(counts, items)
+
+    def annotate(self, annotations: Mapping[str, Iterable[str]], source: str = 'annotations') -> None:
+        """Replace the structural IC with IC from annotation frequencies."""
+        self.ic = self.annotation_ic(annotations)
+        self.ic_source = source
+
+    # -------------------------------------------------------------------------
+    # Similarity
+    # -------------------------------------------------------------------------
+
+    def resnik_matrix(self, a: np.ndarray, b: np.ndarray, ic: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Pairwise Resnik similarity (IC of the MICA) of term indices ``a`` x ``b``.
+
+        Each row marks one term's ancestors in a boolean mask and takes the
+        maximum IC over every ``b`` term's ancestors in one reduceat pass.
+        """
+        ic = self.ic if ic is None else ic
+        offsets, flat = self._ancestor_offsets, self._ancestor_flat
+        b_ancestors = np.concatenate([flat[offsets[j]:offsets[j + 1]] for j in b])
+        b_starts = np.cumsum(np.concatenate(([0], offsets[b + 1] - offsets[b])))[:-1]
+        b_ic = ic[b_ancestors]
+
+        mask = np.zeros(len(self.ids), dtype=bool)
+        matrix = np.empty((len(a), len(b)), dtype=np.float64)
+        for row, i in enumerate(a):
+            own = flat[offsets[i]:offsets[i + 1]]
+            mask[own] = True
+            matrix[row] = np.maximum.reduceat(np.where(mask[b_ancestors], b_ic, 0.0), b_starts)
+            mask[own] = False
+        return matrix
+
+    def similarity_matrix(self, a: np.ndarray, b: np.ndarray, measure: str = 'lin',
+                          ic: Optional[np.ndarray] = None) -> np.ndarray:
+        if measure not in SIMILARITY_MEASURES:
+            raise ValueError(f"Unknown similarity measure {measure!r}, expected one of {SIMILARITY_MEASURES}")
+        ic = self.ic if ic is None else ic
+        matrix = self.resnik_matrix(a, b, ic)
+        if measure == 'lin':
+            denominator = ic[a][:, None] + ic[b][None, :]
+            identical = a[:, None] == b[None, :]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                matrix = np.where(denominator > 0, 2 * matrix / denominator, identical.astype(np.float64))
+        return matrix
+
+    def similarity(self, terms_a: Iterable[str], terms_b: Iterable[str], measure: str = 'lin',
+                   ic: Optional[np.ndarray] = None) -> float:
+        """
+        Best-match average similarity of two term sets.
+
+        Terms unknown to the ontology are ignored; returns 0.0 if either set
+        has no known terms.
+        """
+        a, b = self.to_indices(terms_a), self.to_indices(terms_b)
+        if not len(a) or not len(b):
+            return 0.0
+        matrix = self.similarity_matrix(a, b, measure, ic)
+        return float((matrix.max(axis=1).mean() + matrix.max(axis=0).mean()) / 2)
+
+
+def _bit_indices(bits: int) -> np.ndarray:
+    """Indices of the set bits of a Python int bitset (one step per set bit)."""
+    indices = []
+    while bits:
+        low = bits & -bits
+        indices.append(low.bit_length() - 1)
+        bits ^= low
+    return np.array(indices, dtype=np.int32)
+
+
+def _information_content(counts: np.ndarray, total: int) -> np.ndarray:
+    # Unannotated terms are treated as seen once, i.e. the most specific possible
+    counts = np.maximum(counts, 1)
+    return np.clip(-np.log(counts / float(total)), 0.0, None)
+
+
+# =============================================================================
+# Shared ontology resolution
+# =============================================================================
+
+def _open_ontology(path: str, annotations_path: Optional[str]) -> HPOOntology:
+    ontology = HPOOntology.from_obo(path)
+    if annotations_path:
+        ontology.annotate(load_hpoa(annotations_path), source=os.path.basename(annotations_path))
+    return ontology
+
+
+_ontologies = LocalResource('hpo_ontology', 'ACMG_HPO_OBO', _open_ontology,
+                            label='Local HPO ontology', errors=(ValueError,))
+
+
+def get_hpo_ontology(path: Optional[str] = None, annotations_path: Optional[str] = None) -> Optional[HPOOntology]:
+    """
+    Return the shared HPO ontology, loading it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['hpo_ontology'], then the
+    ACMG_HPO_OBO environment variable (annotations: ``annotations_path``,
+    LOCAL_DATA_SOURCES['hpo_annotations'], then ACMG_HPO_ANNOTATIONS).
+    Returns None when no ontology is configured or it cannot be loaded.
+    """
+    path = path or _ontologies.configured_path()
+    if not path:
+        return None
+    if annotations_path is None:
+        from config.constants import LOCAL_DATA_SOURCES
+        annotations_path = LOCAL_DATA_SOURCES.get('hpo_annotations') or os.environ.get('ACMG_HPO_ANNOTATIONS')
+
+    return _ontologies.get(path, os.path.abspath(annotations_path) if annotations_path else None)
+
+
+def clear_hpo_ontologies() -> None:
+    """Drop all shared ontologies (e.g. after the files are replaced)."""
+    _ontologies.clear()
@@ -0,0 +1,285 @@
+"""
+HPO Text Matcher
+================
+
+Finds HPO phenotype mentions in free-text clinical notes with an
+Aho-Corasick automaton built once over every HPO label and synonym.
+
+The automaton runs over normalized word tokens rather than characters, so
+matches always start and end on word boundaries and a note is scanned in
+one pass regardless of how many phrases are indexed. Tokens are lowercased
+and have British spellings and simple plurals folded ("Tumours" and "tumor",
+"generalised" and "generalized" are the same token), and the same
+normalization is applied to every phrase.
+
+Overlapping matches resolve leftmost-longest: "breast cancer" wins over
+"cancer". A mention preceded in its sentence by a negation cue ("no",
+"denies", "negative for", ...) is flagged as negated and left out of
+extract_terms, so "no seizures" does not count as a seizure phenotype.
+The negation scope ends at sentence punctuation, at "but"/"however", and
+at a comma unless the comma continues a list closed by "or"/"nor"/"and"
+("no fever, chills or rash"); "No fever, seizures since age 2" keeps the
+seizures.
+
+Usage:
+    matcher = HPOTextMatcher.from_sources(synonyms={'breast cancer': 'HP:0003002'}, ontology=ontology)
+    for mention in matcher.find(note):
+        print(mention.hpo_id, note[mention.start:mention.end], mention.negated)
+    matcher.extract_terms(note)
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+
+# Negation cues and the number of preceding words (per list item) they
+# reach; "negative" only negates as "negative for" ("triple negative breast
+# cancer" is not)
+NEGATION_CUES = frozenset({'no', 'not', 'denies', 'denied', 'deny', 'without', 'absent', 'absence', 'nor'})
+NEGATION_PHRASES = frozenset({('negative', 'for')})
+NEGATION_WINDOW = 5
+
+# Words that end a negation scope within a sentence ("no fever but seizures")
+_SCOPE_TERMINATORS = frozenset({'but', 'however', 'although', 'except'})
+
+# Words that close a list, letting a negation reach across its commas when
+# only list items (matched phrases) and commas come before them
+_LIST_COORDINATORS = frozenset({'or', 'nor', 'and'})
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+|[.,;:!?\n]")
+
+_SPELLINGS = {
+    'tumour': 'tumor', 'haemorrhage': 'hemorrhage', 'anaemia': 'anemia', 'oedema': 'edema',
+    'oesophageal': 'esophageal', 'haematuria': 'hematuria', 'leukaemia': 'leukemia',
+    'paediatric': 'pediatric', 'foetal': 'fetal', 'behaviour': 'behavior',
+}
+
+# British -ise/-ised/-ising/-isation endings, folded to -iz on longer words ("raise" is kept)
+_ISE_SUFFIX = re.compile(r'is(e|ed|ing|ation)$')
+
+
+def normalize_token(token: str) -> str:
+    """Lowercase a word, fold British spellings and strip simple plural endings."""
+    token = token.lower()
+    if len(token) > 4 and token.endswith('ies'):
+        token = token[:-3] + 'y'
+    elif len(token) > 4 and token.endswith(('sses', 'xes', 'ches', 'shes')):
+        token = token[:-2]
+    elif len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        token = token[:-1]
+    if len(token) > 6:
+        token = _ISE_SUFFIX.sub(r'iz\1', token)
+    return _SPELLINGS.get(token, token)
+
+
+def tokenize(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Split text into (normalized token, start, end) triples.
+
+    Sentence punctuation is kept as a '.' token and commas as ',' so
+    negation scopes can end at them; neither matches a phrase token.
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        word = match.group()
+        if word == ',':
+            token = ','
+        else:
+            token = '.' if not word[0].isalnum() else normalize_token(word)
+        tokens.append((token, match.start(), match.end()))
+    return tokens
+
+
+@dataclass(frozen=True)
+class PhenotypeMention:
+    """An HPO phenotype found in text; start/end are character offsets."""
+    hpo_id: str
+    text: str
+    start: int
+    end: int
+    negated: bool = False
+
+
+class HPOTextMatcher:
+    """
+    Token-level Aho-Corasick automaton over HPO labels and synonyms.
+
+    Usage:
+        matcher = HPOTextMatcher([('seizure', 'HP:0001250'), ('breast cancer', 'HP:0003002')])
+        matcher.find('Recurrent seizures; no breast cancer.')
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, str]]):
+        """
+        Build the automaton.
+
+        Args:
+            phrases: (phrase, HPO ID) pairs; when two phrases normalize to the
+                     same tokens, the first one keeps its HPO ID
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Optional[Tuple[int, str]]] = [None]
+        self.phrase_count = 0
+
+        for phrase, hpo_id in phrases:
+            words = [token for token, _, _ in tokenize(phrase) if token not in ('.', ',')]
+            if not words:
+                continue
+            node = 0
+            for word in words:
+                next_node = self._goto[node].get(word)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][word] = next_node
+                    self._goto.append({})
+                    self._output.append(None)
+                node = next_node
+            if self._output[node] is None:
+                self._output[node] = (len(words), hpo_id)
+                self.phrase_count += 1
+
+        self._build_links()
+
+    def _build_links(self) -> None:
+        """Breadth-first failure links plus output links to the nearest proper suffix with a phrase."""
+        self._fail = [0] * len(self._goto)
+        self._output_link = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                suffix = self._fail[child]
+                self._output_link[child] = suffix if self._output[suffix] is not None else self._output_link[suffix]
+                queue.append(child)
+
+    @classmethod
+    def from_sources(cls, synonyms: Optional[Mapping[str, str]] = None, ontology=None) -> 'HPOTextMatcher':
+        """
+        Build a matcher from a text -> HPO ID synonym table and/or an HPOOntology.
+
+        Curated synonyms come first, then ontology labels, then ontology
+        synonyms. Root terms are skipped so the label "All" never matches.
+        """
+        def phrases():
+            for text, hpo_id in (synonyms or {}).items():
+                yield text, hpo_id
+            if ontology is not None:
+                terms = [i for i, parents in enumerate(ontology.parents) if parents]
+                for i in terms:
+                    yield ontology.names[i], ontology.ids[i]
+                for i in terms:
+                    for synonym in ontology.synonyms[i]:
+                        yield synonym, ontology.ids[i]
+
+        return cls(phrases())
+
+    def __len__(self) -> int:
+        return self.phrase_count
+
+    def scan(self, tokens: List[Tuple[str, int, int]]) -> List[Tuple[int, int, str]]:
+        """All phrase matches in a token list as (first token, last token, HPO ID)."""
+        goto, fail, output, output_link = self._goto, self._fail, self._output, self._output_link
+        matches = []
+        node = 0
+        for position, (token, _, _) in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            hit = node if output[node] is not None else output_link[node]
+            while hit:
+                length, hpo_id = output[hit]
+                matches.append((position - length + 1, position, hpo_id))
+                hit = output_link[hit]
+        return matches
+
+    def find(self, text: str, include_negated: bool = True) -> List[PhenotypeMention]:
+        """
+        Phenotype mentions in text, leftmost-longest and non-overlapping.
+
+        Args:
+            text: Free text (clinical note, phenotype description)
+            include_negated: Also return mentions flagged as negated
+
+        Returns:
+            List of PhenotypeMention in text order
+        """
+        if not text:
+            return []
+        tokens = tokenize(text)
+        matches = sorted(self.scan(tokens), key=lambda match: (match[0], match[0] - match[1]))
+
+        # Token positions inside any phrase match: the items of a negated list
+        items = {position for first, last, _ in matches for position in range(first, last + 1)}
+
+        mentions = []
+        next_free = 0
+        for first, last, hpo_id in matches:
+            if first < next_free:
+                continue
+            next_free = last + 1
+            negated = _is_negated(tokens, first, items)
+            if negated and not include_negated:
+                continue
+            start, end = tokens[first][1], tokens[last][2]
+            mentions.append(PhenotypeMention(hpo_id, text[start:end], start, end, negated))
+        return mentions
+
+    def extract_terms(self, text: str) -> Set[str]:
+        """HPO IDs of the non-negated mentions in text."""
+        return {mention.hpo_id for mention in self.find(text, include_negated=False)}
+
+
+def _is_negated(tokens: List[Tuple[str, int, int]], first: int, items: Set[int]) -> bool:
+    words = 0
+    position = first - 1
+    while position >= 0 and words < NEGATION_WINDOW:
+        token = tokens[position][0]
+        if token == '.' or token in _SCOPE_TERMINATORS:
+            return False
+        if token == ',':
+            if not _continues_list(tokens, position, items):
+                return False
+            # Each list item gets its own window back to the cue
+            words = 0
+        elif token in NEGATION_CUES:
+            return True
+        elif position and (tokens[position - 1][0], token) in NEGATION_PHRASES:
+            return True
+        else:
+            words += 1
+        position -= 1
+    return False
+
+
+def _continues_list(tokens: List[Tuple[str, int, int]], comma: int, items: Set[int]) -> bool:
+    """
+    True if the comma separates items of a list closed by "or"/"nor"/"and".
+
+    Only list items (tokens of matched phrases) and further commas may come
+    between the comma and the coordinator, each item at most NEGATION_WINDOW
+    words, so "No fever, seizures since age 2 and delay" ends the scope.
+    """
+    words = 0
+    for position in range(comma + 1, len(tokens)):
+        token = tokens[position][0]
+        if token in _LIST_COORDINATORS:
+            return True
+        if token == ',':
+            if not words:
+                return False
+            words = 0
+        elif position in items and words < NEGATION_WINDOW:
+            words += 1
+        else:
+            return False
+    return False
@@ -0,0 +1,454 @@
+"""
+HTTP Cassette Record/Replay
+===========================
+
+Record real upstream HTTP responses into an on-disk cassette store and
+replay them from a local stand-in HTTP server.
+
+This lets the real request, parsing, caching and retry paths of the API
+clients (``PredictorAPIClient``, ``PopulationAPIClient``, ``APIClient``,
+``DomainAPIClient``) be exercised and benchmarked on machines without
+network access.
+
+Key Design Principles:
+- Cassettes are keyed by method, URL (with canonically sorted query) and body
+- One JSON file per recorded interaction, organised by upstream host
+- Replay goes through a real local socket, so ``requests`` still parses
+  status codes, headers and JSON exactly as it would upstream
+- Latency and error injection are configurable on the replay server
+
+Usage:
+    store = CassetteStore('./cassettes')
+
+    # Record once (network required)
+    with record_http(store):
+        client.get_predictor_scores(chrom='17', pos=7674220, ref='C', alt='T')
+
+    # Replay anywhere (no network)
+    with replay_http(store, latency=0.05, error_rate=0.1) as server:
+        client.get_predictor_scores(chrom='17', pos=7674220, ref='C', alt='T')
+        print(server.get_stats())
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+import requests
+
+
+# =============================================================================
+# Request Canonicalisation
+# =============================================================================
+
+def canonicalize_request(
+    method: str,
+    url: str,
+    body: Optional[Any] = None
+) -> Dict[str, str]:
+    """
+    Build the canonical representation of an HTTP request.
+
+    Query parameters are sorted and JSON bodies are re-serialised with
+    sorted keys, so the same logical request always maps to the same
+    cassette entry regardless of parameter order.
+
+    Args:
+        method: HTTP method (e.g., 'GET', 'POST')
+        url: Full URL including any query string
+        body: Request body (bytes, str or None)
+
+    Returns:
+        Dict with 'method', 'url' and 'body' strings
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    canonical_url = urlunsplit(
+        (parts.scheme, parts.netloc.lower(), unquote(parts.path), query, '')
+    )
+
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    body = body or ''
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(',', ':'))
+        except (ValueError, TypeError):
+            pass
+
+    return {'method': method.upper(), 'url': canonical_url, 'body': body}
+
+
+def request_key(method: str, url: str, body: Optional[Any] = None) -> str:
+    """Generate the cassette key for a request."""
+    canonical = canonicalize_request(method, url, body)
+    key_string = f"{canonical['method']} {canonical['url']}\n{canonical['body']}"
+    return hashlib.sha256(key_string.encode()).hexdigest()[:32]
+
+
+# =============================================================================
+# Cassette Store
+# =============================================================================
+
+class CassetteStore:
+    """
+    On-disk store of recorded HTTP interactions.
+
+    Each interaction is a JSON file holding the canonical request and the
+    recorded response (status, content type, body text). Files are grouped
+    by upstream host so a store can be inspected or pruned per service.
+    """
+
+    def __init__(self, cassette_dir: str):
+        """
+        Initialize the cassette store.
+
+        Args:
+            cassette_dir: Directory to read/write cassette files
+        """
+        self.cassette_dir = Path(cassette_dir)
+        self.cassette_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Path]] = None
+
+    def _entry_path(self, key: str, url: str) -> Path:
+        """Get the file path for an entry."""
+        host = urlsplit(url).netloc or 'unknown'
+        return self.cassette_dir / host.replace(':', '_') / f"{key}.json"
+
+    def _load_index(self) -> Dict[str, Path]:
+        """Index all cassette files by key (built lazily, once)."""
+        if self._index is None:
+            self._index = {p.stem: p for p in self.cassette_dir.rglob('*.json')}
+        return self._index
+
+    def save(
+        self,
+        method: str,
+        url: str,
+        status_code: int,
+        body: str,
+        request_body: Optional[Any] = None,
+        content_type: str = 'application/json'
+    ) -> str:
+        """
+        Save a recorded interaction.
+
+        Args:
+            method: HTTP method
+            url: Full request URL including query string
+            status_code: Recorded response status
+            body: Recorded response body text
+            request_body: Request body (for POST requests)
+            content_type: Recorded response content type
+
+        Returns:
+            Cassette key of the saved entry
+        """
+        key = request_key(method, url, request_body)
+        entry = {
+            'request': canonicalize_request(method, url, request_body),
+            'response': {
+                'status_code': status_code,
+                'content_type': content_type,
+                'body': body,
+            },
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+
+        with self._lock:
+            path = self._entry_path(key, url)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, indent=2)
+            self._load_index()[key] = path
+
+        return key
+
+    def load(
+        self,
+        method: str,
+        url: str,
+        request_body: Optional[Any] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up the recorded response for a request.
+
+        Returns:
+            Response dict (status_code, content_type, body) or None if the
+            request was never recorded or the entry is unreadable
+        """
+        key = request_key(method, url, request_body)
+        with self._lock:
+            path = self._load_index().get(key)
+            if path is None:
+                return None
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)['response']
+            except (OSError, json.JSONDecodeError, KeyError):
+                return None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load_index())
+
+
+# =============================================================================
+# Recording
+# =============================================================================
+
+@contextmanager
+def record_http(store: CassetteStore) -> Iterator[CassetteStore]:
+    """
+    Record every ``requests.get``/``requests.post`` call into a store.
+
+    Requests still go to the real upstream; responses are returned to the
+    caller unchanged. Only completed responses are recorded - timeouts and
+    connection errors propagate as usual and leave no entry.
+    """
+    original_get = requests.get
+    original_post = requests.post
+
+    def _record(method: str, send, url: str, **kwargs):
+        response = send(url, **kwargs)
+        prepared = requests.Request(
+            method, url,
+            params=kwargs.get('params'),
+            json=kwargs.get('json'),
+            data=kwargs.get('data')
+        ).prepare()
+        store.save(
+            method,
+            prepared.url,
+            response.status_code,
+            response.text,
+            request_body=prepared.body,
+            content_type=response.headers.get('Content-Type', 'application/json')
+        )
+        return response
+
+    def _get(url, params=None, **kwargs):
+        return _record('GET', original_get, url, params=params, **kwargs)
+
+    def _post(url, data=None, json=None, **kwargs):
+        return _record('POST', original_post, url, data=data, json=json, **kwargs)
+
+    requests.get = _get
+    requests.post = _post
+    try:
+        yield store
+    finally:
+        requests.get = original_get
+        requests.post = original_post
+
+
+# =============================================================================
+# Replay Server
+# =============================================================================
+
+class CassetteReplayServer:
+    """
+    Local stand-in HTTP server that replays recorded cassette responses.
+
+    Upstream URLs are mapped onto the server as
+    ``http://127.0.0.1:<port>/<scheme>/<host>/<path>?<query>``; the server
+    rebuilds the original URL, looks up the cassette entry and serves it.
+
+    Attributes:
+        latency: Fixed delay in seconds added to every response
+        jitter: Additional uniformly random delay (0..jitter seconds)
+        error_rate: Probability (0-1) of replacing a response with an error
+        error_status: HTTP status returned for injected errors
+        miss_status: HTTP status returned when no cassette entry exists
+    """
+
+    def __init__(
+        self,
+        store: CassetteStore,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        miss_status: int = 502,
+        seed: Optional[int] = None,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.miss_status = miss_status
+        self._random = random.Random(seed)
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'hits': 0, 'misses': 0, 'injected_errors': 0}
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def proxy_url(self, url: str) -> str:
+        """Map an upstream URL onto this server."""
+        parts = urlsplit(url)
+        proxied = f"{self.base_url}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+        if parts.query:
+            proxied += f"?{parts.query}"
+        return proxied
+
+    def start(self) -> 'CassetteReplayServer':
+        """Start serving in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and release the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> 'CassetteReplayServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get request/hit/miss/error counters."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def _resolve(self, method: str, path: str, body: bytes) -> tuple[int, str, str]:
+        """Resolve a proxied request to (status, content_type, body)."""
+        self._count('requests')
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self._count('injected_errors')
+            return self.error_status, 'application/json', json.dumps({'error': 'injected'})
+
+        # /<scheme>/<host>/<path>?<query> -> <scheme>://<host>/<path>?<query>
+        scheme, _, rest = path.lstrip('/').partition('/')
+        upstream_url = f"{scheme}://{rest}"
+
+        entry = self.store.load(method, upstream_url, body or None)
+        if entry is None:
+            self._count('misses')
+            return self.miss_status, 'application/json', json.dumps(
+                {'error': 'no cassette entry', 'url': upstream_url}
+            )
+
+        self._count('hits')
+        return entry['status_code'], entry.get('content_type', 'application/json'), entry['body']
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def _serve(self, method: str) -> None:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, content_type, payload = server._resolve(method, self.path, body)
+                data = payload.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve('GET')
+
+            def do_POST(self):
+                self._serve('POST')
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        return _Handler
+
+
+@contextmanager
+def replay_http(store: CassetteStore, **server_options) -> Iterator[CassetteReplayServer]:
+    """
+    Serve a cassette store locally and route ``requests.get``/``post`` to it.
+
+    Args:
+        store: CassetteStore with recorded interactions
+        **server_options: Passed to CassetteReplayServer (latency, jitter,
+            error_rate, error_status, miss_status, seed)
+
+    Yields:
+        The running CassetteReplayServer (for stats)
+    """
+    original_get = requests.get
+    original_post = requests.post
+
+    with CassetteReplayServer(store, **server_options) as server:
+        requests.get = lambda url, *args, **kwargs: original_get(
+            server.proxy_url(url), *args, **kwargs
+        )
+        requests.post = lambda url, *args, **kwargs: original_post(
+            server.proxy_url(url), *args, **kwargs
+        )
+        try:
+            yield server
+        finally:
+            requests.get = original_get
+            requests.post = original_post
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve recorded API cassettes locally')
+    parser.add_argument('cassette_dir', help='Cassette store directory')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay per response (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra delay (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Injected error probability')
+    parser.add_argument('--error-status', type=int, default=503)
+    args = parser.parse_args()
+
+    replay_server = CassetteReplayServer(
+        CassetteStore(args.cassette_dir),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        port=args.port
+    )
+    print(f"Replaying {len(replay_server.store)} cassette entries on {replay_server.base_url}")
+    try:
+        replay_server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        replay_server._httpd.server_close()
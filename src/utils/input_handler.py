@@ -16,6 +16,7 @@ from config.constants import (
     TEST_SCENARIOS, VALIDATION_PATTERNS, ALIASES, ALL_VARIANT_CONSEQUENCES
 )
 from utils.hgvs_parser import HGVSParser, parse_hgvs_variant
+from utils.hgnc_index import get_hgnc_index
 
 # Initialize colorama
 init()
@@ -169,6 +170,13 @@ class InputHandler:
             required=True
         )
         
+        # Canonicalize aliases/previous symbols to the approved HGNC symbol
+        hgnc_index = get_hgnc_index()
+        record = hgnc_index.resolve(basic_info['gene']) if hgnc_index is not None else None
+        if record is not None and record.symbol.upper() != basic_info['gene'].strip().upper():
+            self.print_info(f"{basic_info['gene']} is an alias of {record.symbol} (HGNC); using {record.symbol}")
+            basic_info['gene'] = record.symbol
+        
         # Chromosome - automatically fetch from Ensembl
         chromosome = None
         if self.api_client:
@@ -260,6 +268,21 @@ class InputHandler:
                         self.print_success(f"Extracted alternate allele: {parsed_hgvs['alt_base']}")
                 
                 self.print_success("HGVS variant parsed successfully!")
+
+                # Fill missing genomic coordinates from the local transcript index
+                if not basic_info.get('position'):
+                    projected = HGVSParser.to_genomic(cdna_input, gene=basic_info.get('gene'))
+                    if projected:
+                        basic_info['chromosome'] = basic_info.get('chromosome') or projected['chromosome']
+                        basic_info['position'] = projected['start']
+                        basic_info.setdefault('transcript', projected['transcript'])
+                        if 'ref' in projected:
+                            basic_info['ref_allele'] = projected['ref']
+                            basic_info['alt_allele'] = projected['alt']
+                        self.print_success(
+                            f"Projected to chr{projected['chromosome']}:{projected['start']} "
+                            f"({projected['transcript']}, {projected['strand']} strand)"
+                        )
             else:
                 basic_info['cdna_change'] = cdna_input
                 self.print_warning("Could not parse HGVS format - stored as-is")
@@ -1392,8 +1415,11 @@ class InputHandler:
     
     # Validation methods
     def _validate_gene_symbol(self, value: str) -> bool:
-        """Validate gene symbol format."""
-        return bool(re.match(VALIDATION_PATTERNS['gene_symbol'], value.upper()))
+        """Validate gene symbol format, and that HGNC knows it when a local index is configured."""
+        if not re.match(VALIDATION_PATTERNS['gene_symbol'], value.upper()):
+            return False
+        hgnc_index = get_hgnc_index()
+        return hgnc_index is None or hgnc_index.is_known(value)
     
     def _validate_chromosome(self, value: str) -> bool:
         """Validate chromosome format."""
@@ -0,0 +1,287 @@
+"""
+Local GRCh37 -> GRCh38 Liftover
+===============================
+
+In-process coordinate conversion with UCSC chain files (e.g.
+hg19ToHg38.over.chain.gz), so legacy GRCh37 variants can be ingested
+without a remote conversion step.
+
+The aligned blocks of every chain are loaded into one static interval
+tree per source contig (utils.domain_index.IntervalTree); a position is
+lifted with one overlap query. Variants are lifted by mapping the first
+and last REF base, which must land in the same chain without a gap.
+Minus-strand hits are reverse complemented; indels on the minus strand
+are re-anchored on the left with the local GRCh38 reference genome
+(utils/reference_genome.py).
+
+Failures are reported per record, never raised:
+
+- unmapped:      a REF base is not covered by any chain
+- multiple:      the position maps to more than one target location
+- split:         the REF span crosses a chain gap or chain boundary
+- ref_mismatch:  the lifted REF differs from the GRCh38 reference
+- no_reference:  minus-strand indel and no reference genome configured
+- invalid:       malformed coordinates or alleles
+- no_chain:      no chain file configured (reported by batch callers)
+
+Usage:
+    liftover = ChainLiftover.from_chain_file('hg19ToHg38.over.chain.gz')
+    result = liftover.lift_variant('17', 41245466, 'G', 'A')
+    results = liftover.lift_variants(grch37_records)
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import gzip
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.domain_index import IntervalTree
+from utils.local_store import LocalResource
+
+
+_COMPLEMENT = str.maketrans('ACGTNacgtn', 'TGCANtgcan')
+
+LIFTOVER_UNMAPPED = 'unmapped'
+LIFTOVER_MULTIPLE = 'multiple'
+LIFTOVER_SPLIT = 'split'
+LIFTOVER_REF_MISMATCH = 'ref_mismatch'
+LIFTOVER_NO_REFERENCE = 'no_reference'
+LIFTOVER_INVALID = 'invalid'
+LIFTOVER_NO_CHAIN = 'no_chain'
+
+
+class ChainFileError(ValueError):
+    """Raised when a chain file cannot be parsed."""
+
+
+def reverse_complement(sequence: str) -> str:
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+
+def _bare_contig(chrom: str) -> str:
+    chrom = str(chrom).strip()
+    bare = chrom[3:] if chrom.lower().startswith('chr') else chrom
+    return 'MT' if bare.upper() in ('M', 'MT') else bare
+
+
+@dataclass(frozen=True)
+class ChainBlock:
+    """One ungapped aligned block (0-based, half-open source start; query on its own strand)."""
+    source_start: int
+    target_contig: str
+    target_start: int
+    target_strand: str
+    target_size: int
+    chain_id: int
+
+    def map(self, pos0: int) -> int:
+        """Return the 0-based forward-strand target coordinate of a source position in this block."""
+        offset = self.target_start + (pos0 - self.source_start)
+        return offset if self.target_strand == '+' else self.target_size - 1 - offset
+
+
+@dataclass(frozen=True)
+class LiftoverResult:
+    """
+    Liftover of one record.
+
+    Attributes:
+        source: The input (chrom, pos, ref, alt)
+        chrom, pos, ref, alt: Lifted GRCh38 coordinates (None on failure)
+        strand: '+' or '-' relative to the source
+        error: Failure reason (see module docstring), or None
+    """
+    source: Tuple[str, int, str, str]
+    chrom: Optional[str] = None
+    pos: Optional[int] = None
+    ref: Optional[str] = None
+    alt: Optional[str] = None
+    strand: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def key(self) -> Optional[Tuple[str, int, str, str]]:
+        """The lifted (chrom, pos, ref, alt), or None on failure."""
+        return (self.chrom, self.pos, self.ref, self.alt) if self.ok else None
+
+
+def iter_chain_blocks(path: str) -> Iterable[Tuple[str, int, int, ChainBlock]]:
+    """Yield (source contig, source start, source end, block) for every aligned block of a chain file."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='ascii') as f:
+        header = None
+        for line_number, line in enumerate(f, 1):
+            fields = line.split()
+            if not fields:
+                header = None
+                continue
+            if fields[0] == 'chain':
+                if len(fields) < 12:
+                    raise ChainFileError(f"Malformed chain header at line {line_number}")
+                if fields[4] != '+':
+                    raise ChainFileError(f"Unsupported source strand at line {line_number}")
+                header = {
+                    'source': _bare_contig(fields[2]),
+                    'source_pos': int(fields[5]),
+                    'target': _bare_contig(fields[7]),
+                    'target_size': int(fields[8]),
+                    'target_strand': fields[9],
+                    'target_pos': int(fields[10]),
+                    'id': int(fields[12]) if len(fields) > 12 else line_number,
+                }
+                continue
+            if header is None:
+                raise ChainFileError(f"Alignment data outside a chain at line {line_number}")
+            size = int(fields[0])
+            block = ChainBlock(header['source_pos'], header['target'], header['target_pos'],
+                               header['target_strand'], header['target_size'], header['id'])
+            yield header['source'], header['source_pos'], header['source_pos'] + size, block
+            header['source_pos'] += size
+            header['target_pos'] += size
+            if len(fields) >= 3:
+                header['source_pos'] += int(fields[1])
+                header['target_pos'] += int(fields[2])
+
+
+class ChainLiftover:
+    """
+    Chain-file liftover with one interval tree of aligned blocks per source contig.
+
+    Attributes:
+        path: Chain file the index was built from
+        target_build: Label of the target assembly
+    """
+
+    def __init__(self, blocks: Iterable[Tuple[str, int, int, ChainBlock]] = (),
+                 path: Optional[str] = None, target_build: str = 'GRCh38'):
+        self.path = path
+        self.target_build = target_build
+        by_contig: Dict[str, List[Tuple[int, int, ChainBlock]]] = {}
+        for contig, start, end, block in blocks:
+            # Trees hold closed intervals of 0-based positions
+            by_contig.setdefault(contig, []).append((start, end - 1, block))
+        self._trees = {contig: IntervalTree(intervals) for contig, intervals in by_contig.items()}
+        self._contig_names: Dict[str, str] = {}
+
+    @classmethod
+    def from_chain_file(cls, path: str, target_build: str = 'GRCh38') -> 'ChainLiftover':
+        """Build the index from a UCSC chain file (plain or gzip)."""
+        return cls(iter_chain_blocks(path), path=path, target_build=target_build)
+
+    def contigs(self) -> List[str]:
+        return list(self._trees)
+
+    def _blocks(self, chrom: str, pos0: int) -> List[ChainBlock]:
+        contig = self._contig_names.get(chrom)
+        if contig is None:
+            contig = self._contig_names[chrom] = _bare_contig(chrom)
+        tree = self._trees.get(contig)
+        return tree.overlap(pos0) if tree is not None else []
+
+    def lift_position(self, chrom: str, pos: int) -> List[Tuple[str, int, str]]:
+        """Return every (contig, 1-based position, strand) a source position maps to."""
+        return [(block.target_contig, block.map(pos - 1) + 1, block.target_strand)
+                for block in self._blocks(chrom, pos - 1)]
+
+    def lift_variant(self, chrom: str, pos: int, ref: str, alt: str, reference=None) -> LiftoverResult:
+        """
+        Lift one VCF-style variant.
+
+        Args:
+            reference: Target ReferenceGenome for REF checks and minus-strand
+                       indel anchoring (defaults to the shared reference, if any)
+
+        Returns:
+            LiftoverResult; failures carry an error instead of coordinates
+        """
+        if reference is None:
+            from utils.reference_genome import get_reference_genome
+            reference = get_reference_genome()
+        return self._lift_variant(chrom, pos, ref, alt, reference)
+
+    def _lift_variant(self, chrom: str, pos: int, ref: str, alt: str, reference) -> LiftoverResult:
+        source = (chrom, pos, ref, alt)
+        try:
+            pos = int(pos)
+            ref, alt = str(ref).upper(), str(alt).upper()
+        except (TypeError, ValueError):
+            return LiftoverResult(source, error=LIFTOVER_INVALID)
+        if pos < 1 or not ref or not alt:
+            return LiftoverResult(source, error=LIFTOVER_INVALID)
+
+        first = self._blocks(chrom, pos - 1)
+        last = first if len(ref) == 1 else self._blocks(chrom, pos + len(ref) - 2)
+        if not first or not last:
+            return LiftoverResult(source, error=LIFTOVER_UNMAPPED)
+        if len(first) > 1 or len(last) > 1:
+            return LiftoverResult(source, error=LIFTOVER_MULTIPLE)
+        block, end_block = first[0], last[0]
+        start0, end0 = block.map(pos - 1), end_block.map(pos + len(ref) - 2)
+        if end_block.chain_id != block.chain_id or abs(end0 - start0) != len(ref) - 1:
+            return LiftoverResult(source, error=LIFTOVER_SPLIT)
+
+        contig, strand = block.target_contig, block.target_strand
+        if strand == '+':
+            new_pos, new_ref, new_alt = start0 + 1, ref, alt
+        else:
+            new_pos, new_ref, new_alt = end0 + 1, reverse_complement(ref), reverse_complement(alt)
+            if len(ref) != len(alt) and new_ref[-1] == new_alt[-1]:
+                # The VCF anchor base is now on the right: replace it with the base on the left
+                if reference is None:
+                    return LiftoverResult(source, strand=strand, error=LIFTOVER_NO_REFERENCE)
+                try:
+                    anchor = reference.fetch(contig, new_pos - 1)
+                except ValueError:
+                    return LiftoverResult(source, strand=strand, error=LIFTOVER_REF_MISMATCH)
+                new_ref, new_alt, new_pos = anchor + new_ref[:-1], anchor + new_alt[:-1], new_pos - 1
+
+        if reference is not None and not reference.check_ref(contig, new_pos, new_ref):
+            return LiftoverResult(source, contig, new_pos, new_ref, new_alt, strand, LIFTOVER_REF_MISMATCH)
+        return LiftoverResult(source, contig, new_pos, new_ref, new_alt, strand)
+
+    def lift_variants(self, records: Sequence[Tuple[str, int, str, str]], reference=None) -> List[LiftoverResult]:
+        """Lift many (chrom, pos, ref, alt) records; one result per record, in input order."""
+        if reference is None:
+            from utils.reference_genome import get_reference_genome
+            reference = get_reference_genome()
+        lift = self._lift_variant
+        results = []
+        for record in records:
+            try:
+                chrom, pos, ref, alt = record
+            except (TypeError, ValueError):
+                results.append(LiftoverResult(tuple(record) if isinstance(record, (list, tuple)) else (record,),
+                                              error=LIFTOVER_INVALID))
+                continue
+            results.append(lift(chrom, pos, ref, alt, reference))
+        return results
+
+
+# =============================================================================
+# Shared liftover resolution
+# =============================================================================
+
+_liftovers = LocalResource('liftover_chain', 'ACMG_LIFTOVER_CHAIN', ChainLiftover.from_chain_file,
+                           label='Local liftover chain', errors=(ValueError,))
+
+
+def get_liftover(path: Optional[str] = None) -> Optional[ChainLiftover]:
+    """
+    Return the shared GRCh37 -> GRCh38 liftover, loading the chain file at most once.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['liftover_chain'], then the
+    ACMG_LIFTOVER_CHAIN environment variable. Returns None when nothing is
+    configured or the file cannot be loaded.
+    """
+    return _liftovers.get(path)
+
+
+def clear_liftovers() -> None:
+    """Drop all shared liftovers (e.g. after the chain file is replaced)."""
+    _liftovers.clear()
@@ -0,0 +1,173 @@
+"""
+Shared Local Resources
+======================
+
+Process-wide cache for the local data files that stand in for API calls
+(gnomAD store, ClinVar snapshot, HGNC index, reference genome, ...).
+
+Each module creates one LocalResource with the LOCAL_DATA_SOURCES key and
+environment variable its file is configured by, and a function that opens
+the file. get() resolves the path (argument, LOCAL_DATA_SOURCES, then the
+environment variable), opens each file at most once, and remembers a
+failure as None so per-variant callers print the warning only once.
+Resources built from files that are refreshed in place (ClinVar and ClinGen
+snapshots) pass ``reload_on_change=True`` and are reopened when the file's
+modification time changes.
+
+Indexes parsed from text downloads (ClinGen, HGNC, ClinVar, transcripts)
+are saved as snapshots: gzip-compressed JSON tagged with a kind and a
+format version, never pickle, so loading a replaced or downloaded file
+cannot execute code. Whether a configured path is a saved snapshot or a
+source download is decided by its extension (is_snapshot_path()).
+
+Usage:
+    _stores = LocalResource('gnomad', 'ACMG_GNOMAD_STORE', LocalGnomADStore,
+                            label='Local gnomAD store', errors=(GnomADStoreError,))
+    store = _stores.get()
+    _stores.clear()
+
+    save_snapshot('hgnc.json.gz', 'hgnc_index', 1, rows=rows)
+    payload = load_snapshot('hgnc.json.gz', 'hgnc_index', 1)
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import gzip
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Type
+
+
+# Extensions of saved snapshots; any other file is parsed as a source download
+SNAPSHOT_SUFFIXES = ('.json.gz', '.json')
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def is_snapshot_path(path: str) -> bool:
+    """True if a path names a saved snapshot (by extension) rather than a source file."""
+    return str(path).lower().endswith(SNAPSHOT_SUFFIXES)
+
+
+def save_snapshot(path: str, kind: str, version: int, **fields: Any) -> None:
+    """Atomically write a snapshot (gzip-compressed unless the path ends in .json)."""
+    payload = dict(fields, kind=kind, version=version)
+    tmp_path = f"{path}.tmp"
+    opener = open if str(path).lower().endswith('.json') else gzip.open
+    with opener(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, kind: str, version: int) -> Optional[Dict[str, Any]]:
+    """
+    Read a snapshot written by save_snapshot().
+
+    Returns the payload dict, or None if the file is missing, is not JSON,
+    or holds another kind or format version.
+    """
+    try:
+        with open(path, 'rb') as f:
+            compressed = f.read(2) == _GZIP_MAGIC
+        opener = gzip.open if compressed else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, EOFError, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get('kind') != kind or payload.get('version') != version:
+        return None
+    return payload
+
+
+class LocalResource:
+    """
+    Shared, lazily opened local data files of one kind, keyed by absolute path.
+
+    Attributes:
+        config_key: LOCAL_DATA_SOURCES key of the configured path (or None)
+        env_var: Environment variable consulted after LOCAL_DATA_SOURCES (or None)
+        label: Name used in the "unavailable" warning
+    """
+
+    def __init__(
+        self,
+        config_key: Optional[str],
+        env_var: Optional[str],
+        opener: Callable[..., Any],
+        label: str,
+        errors: Iterable[Type[BaseException]] = (),
+        reload_on_change: bool = False
+    ):
+        self.config_key = config_key
+        self.env_var = env_var
+        self.label = label
+        self._opener = opener
+        self._errors = (OSError,) + tuple(errors)
+        self._reload_on_change = reload_on_change
+        self._cache: Dict[Tuple[str, ...], Tuple[Optional[float], Any]] = {}
+        self._lock = threading.Lock()
+
+    def configured_path(self) -> Optional[str]:
+        """Return the path from LOCAL_DATA_SOURCES, then the environment variable."""
+        path = None
+        if self.config_key:
+            from config.constants import LOCAL_DATA_SOURCES
+            path = LOCAL_DATA_SOURCES.get(self.config_key)
+        if not path and self.env_var:
+            path = os.environ.get(self.env_var)
+        return path or None
+
+    def _mtime(self, path: str) -> Optional[float]:
+        if not self._reload_on_change:
+            return None
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def get(self, path: Optional[str] = None, *args: str) -> Any:
+        """
+        Return the shared resource for a path, opening it on first use.
+
+        Extra arguments (e.g. a companion annotation file) are passed to the
+        opener and are part of the cache key. Returns None when no path is
+        configured or the file cannot be opened.
+        """
+        path = path or self.configured_path()
+        if not path:
+            return None
+
+        key = (os.path.abspath(path),) + args
+        mtime = self._mtime(key[0])
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+            resource = None
+            try:
+                if self._reload_on_change and mtime is None:
+                    raise OSError('file not found')
+                resource = self._opener(*key)
+            except self._errors as e:
+                # Remember the failure so per-variant callers warn only once
+                print(f"⚠️  Warning: {self.label} unavailable ({path}): {str(e)}")
+            self._cache[key] = (mtime, resource)
+            return resource
+
+    def register(self, resource: Any, path: str, *args: str) -> None:
+        """Make an already opened resource (e.g. one just rebuilt) the shared one for a path."""
+        key = (os.path.abspath(path),) + args
+        with self._lock:
+            self._cache[key] = (self._mtime(key[0]), resource)
+
+    def clear(self) -> None:
+        """Close and drop every cached resource (used by tests and after files are replaced)."""
+        with self._lock:
+            for _, resource in self._cache.values():
+                close = getattr(resource, 'close', None)
+                if close is not None:
+                    close()
+            self._cache.clear()
@@ -18,17 +18,21 @@ Key Design Principles:
 - Graceful degradation when predictors are unavailable
 
 Supported Sources:
+- Local dbNSFP extract (tabix-indexed, optional): Offline, queried first
+- Local AlphaMissense store (optional): Offline AlphaMissense scores
 - dbNSFP (via myvariant.info): Most comprehensive source
 - AlphaMissense API: Official Google DeepMind API
 - CADD API: Official CADD scoring service
-- VEP (Ensembl): Variant Effect Predictor annotations
+- VEP (Ensembl): Variant Effect Predictor annotations; batched AlphaMissense/CADD
+  fallback for get_predictor_scores_many()
+- Local gnomAD store (memory-mapped, optional): Offline population data
 
 Author: Can Sevilmiş
 License: MIT License
 """
 
 import requests
-from typing import Optional, Any, Union
+from typing import TYPE_CHECKING, Optional, Any, Union
 from dataclasses import dataclass
 
 try:
@@ -64,6 +68,12 @@ except ImportError:
     CACHE_AVAILABLE = False
     ResultCache = None
 
+if TYPE_CHECKING:
+    from utils.dbnsfp_backend import LocalDbNSFPClient
+    from utils.gnomad_store import LocalGnomADStore
+    from utils.gnomad_bloom import GnomADBloomFilter
+    from utils.alphamissense_store import LocalAlphaMissenseStore
+
 
 # =============================================================================
 # API Endpoints Configuration
@@ -81,8 +91,86 @@ PREDICTOR_API_ENDPOINTS = {
     
     # Ensembl VEP REST API
     'vep': 'https://rest.ensembl.org/vep/human/hgvs',
+    'vep_region': 'https://rest.ensembl.org/vep/human/region',
 }
 
+# dbNSFP fields requested from myvariant.info (single GET and batch POST)
+MYVARIANT_FIELDS = (
+    'dbnsfp.revel.score,dbnsfp.cadd.phred,dbnsfp.alphamissense.score,'
+    'dbnsfp.sift.score,dbnsfp.polyphen2.hdiv.score,dbnsfp.metasvm.score,'
+    'dbnsfp.vest4.score,dbnsfp.fathmm.score,dbnsfp.bayesdel.addaf_score,'
+    'dbnsfp.primateai.score,dbnsfp.mpc.score'
+)
+
+# myvariant.info accepts up to 1000 IDs per batch POST
+MYVARIANT_BATCH_SIZE = 1000
+
+# Ensembl accepts up to 200 variants per POST /vep/human/region
+VEP_BATCH_SIZE = 200
+
+# gnomAD GraphQL selection set for population frequency (batch queries)
+GNOMAD_VARIANT_SELECTION = """{
+    variant_id
+    genome {
+      ac
+      an
+      af
+      ac_hom
+      ac_hemi
+      filters
+      faf95 {
+        popmax
+        popmax_population
+      }
+      populations {
+        id
+        ac
+        an
+      }
+    }
+  }"""
+
+# gnomAD rejects overly complex documents; keep aliased batches modest
+GNOMAD_GRAPHQL_BATCH_SIZE = API_SETTINGS.get('gnomad_graphql_batch_size', 50)
+
+
+def build_gnomad_batch_query(
+    variant_ids: list[str],
+    selection: str = GNOMAD_VARIANT_SELECTION
+) -> tuple[str, dict[str, str]]:
+    """
+    Build one aliased gnomAD GraphQL document for several variants.
+    
+    Each variant becomes a ``v<i>: variant(variantId: $v<i>, dataset: $datasetId)``
+    selection, so a single POST returns all of them keyed by alias. Variant
+    IDs are passed as variables rather than interpolated into the document.
+    
+    Args:
+        variant_ids: gnomAD variant IDs (``chrom-pos-ref-alt``)
+        selection: GraphQL selection set applied to every variant
+        
+    Returns:
+        Tuple of (query document, variables). The caller adds ``datasetId``
+        to the variables; alias ``v<i>`` corresponds to ``variant_ids[i]``.
+    """
+    declarations = ['$datasetId: DatasetId!']
+    selections = []
+    variables = {}
+    for index, variant_id in enumerate(variant_ids):
+        alias = f"v{index}"
+        declarations.append(f"${alias}: String!")
+        selections.append(
+            f"{alias}: variant(variantId: ${alias}, dataset: $datasetId) {selection}"
+        )
+        variables[alias] = variant_id
+    
+    query = (
+        f"query VariantFrequencyBatch({', '.join(declarations)}) {{\n  "
+        + "\n  ".join(selections)
+        + "\n}"
+    )
+    return query, variables
+
 
 class PredictorAPIClient:
     """
@@ -111,7 +199,9 @@ class PredictorAPIClient:
         timeout: int = 15,
         cache: Optional[dict] = None,
         test_mode: bool = False,
-        result_cache: Optional['ResultCache'] = None
+        result_cache: Optional['ResultCache'] = None,
+        local_backend: Optional['LocalDbNSFPClient'] = None,
+        alphamissense_store: Optional['LocalAlphaMissenseStore'] = None
     ):
         """
         Initialize the predictor API client.
@@ -122,10 +212,16 @@ class PredictorAPIClient:
             cache: Optional cache dictionary for API responses (legacy)
             test_mode: If True, return mock data instead of API calls
             result_cache: Optional ResultCache instance for validated caching
+            local_backend: Optional LocalDbNSFPClient; variants found in the
+                           local extract are served without network access
+            alphamissense_store: Optional LocalAlphaMissenseStore, used for
+                                 AlphaMissense before the remote API
         """
         self.api_enabled = api_enabled
         self.timeout = timeout
         self.test_mode = test_mode
+        self.local_backend = local_backend
+        self.alphamissense_store = alphamissense_store
         
         # Use ResultCache if provided, otherwise fall back to simple dict
         if result_cache is not None and CACHE_AVAILABLE:
@@ -226,18 +322,20 @@ class PredictorAPIClient:
             Dictionary mapping predictor names to PredictorScore objects.
             Missing predictors will have value=None.
         """
-        if not self.api_enabled:
-            return self._get_empty_scores()
-        
         # Initialize result with empty scores for all configured predictors
-        results = {}
-        for predictor in INSILICO_WEIGHTS.keys():
-            results[predictor] = PredictorScore(
-                predictor=predictor,
-                value=None,
-                source=None,
-                is_inverted=(predictor in INVERTED_PREDICTORS)
-            )
+        results = self._get_empty_scores()
+        
+        # Local dbNSFP extract: a hit is served without any network access
+        if self.local_backend is not None and chrom and pos and ref and alt:
+            local_scores = self._fetch_from_local(chrom, pos, ref, alt)
+            if local_scores:
+                self._merge_scores(results, local_scores)
+                self._fill_local_alphamissense(results, chrom, pos, ref, alt)
+                return results
+        
+        if not self.api_enabled:
+            self._fill_local_alphamissense(results, chrom, pos, ref, alt)
+            return results
         
         if self.test_mode:
             return self._get_mock_scores()
@@ -247,6 +345,209 @@ class PredictorAPIClient:
             myvariant_scores = self._fetch_from_myvariant(chrom, pos, ref, alt)
             self._merge_scores(results, myvariant_scores)
         
+        self._fetch_fallback_scores(results, chrom, pos, ref, alt)
+        
+        return results
+    
+    def get_predictor_scores_many(
+        self,
+        variants: list[tuple[str, int, str, str]],
+        batch_size: int = MYVARIANT_BATCH_SIZE
+    ) -> dict[tuple[str, int, str, str], dict[str, PredictorScore]]:
+        """
+        Fetch predictor scores for many variants with batched myvariant.info calls.
+        
+        Variants found in the local dbNSFP extract (if configured) are served
+        from it. Cached variants are served from the cache; the remaining
+        variants are sent to myvariant.info as batch POSTs of up to
+        ``batch_size`` IDs, and each result is cached individually.
+        AlphaMissense and CADD gaps are then filled from the local
+        AlphaMissense store and, for the rest, from batched Ensembl VEP
+        region POSTs (see _fetch_fallback_scores_many) rather than one
+        dedicated-API call per variant.
+        
+        Args:
+            variants: List of (chrom, pos, ref, alt) tuples (GRCh38)
+            batch_size: Maximum IDs per myvariant.info request (max 1000)
+            
+        Returns:
+            Dictionary mapping each (chrom, pos, ref, alt) tuple to its
+            predictor name -> PredictorScore dictionary.
+        """
+        results = {}
+        if self.local_backend is not None:
+            try:
+                local_scores = self.local_backend.get_predictor_scores_many(variants)
+            except Exception as e:
+                print(f"{Fore.YELLOW}⚠️  Local dbNSFP lookup error: {str(e)}{Style.RESET_ALL}")
+                local_scores = {}
+            for variant, scores in local_scores.items():
+                results[variant] = self._get_empty_scores()
+                self._merge_scores(results[variant], scores)
+                self._fill_local_alphamissense(results[variant], *variant)
+        
+        remaining = [variant for variant in variants if variant not in results]
+        
+        if not self.api_enabled:
+            for variant in remaining:
+                results[variant] = self._get_empty_scores()
+                self._fill_local_alphamissense(results[variant], *variant)
+            return results
+        
+        if self.test_mode:
+            results.update({variant: self._get_mock_scores() for variant in remaining})
+            return results
+        
+        myvariant_scores = self._fetch_from_myvariant_many(remaining, batch_size) if remaining else {}
+        
+        fetched = {}
+        for variant in remaining:
+            if variant in results or variant in fetched:
+                continue
+            scores = self._get_empty_scores()
+            self._merge_scores(scores, myvariant_scores.get(variant, {}))
+            fetched[variant] = scores
+        
+        self._fetch_fallback_scores_many(fetched)
+        results.update(fetched)
+        return results
+    
+    def _fetch_fallback_scores_many(
+        self,
+        results: dict[tuple[str, int, str, str], dict[str, PredictorScore]]
+    ) -> None:
+        """
+        Fill AlphaMissense/CADD gaps of many variants with batched VEP calls.
+        
+        The local AlphaMissense store is tried first. Variants still missing
+        either score are sent to Ensembl POST /vep/human/region with the
+        AlphaMissense and CADD plugins, up to VEP_BATCH_SIZE per request, and
+        mapped back by the echoed ``input`` field. Answers are cached per
+        variant under the 'VEP' source; a failed request leaves the gaps empty.
+        """
+        pending = {}  # VEP input string -> variant tuple
+        for variant, scores in results.items():
+            chrom, pos, ref, alt = variant
+            self._fill_local_alphamissense(scores, chrom, pos, ref, alt)
+            if not (chrom and pos and ref and alt) or not self._missing_fallback(scores):
+                continue
+            
+            legacy_cache_key = f"vep_{chrom}_{pos}_{ref}_{alt}"
+            if self._use_validated_cache:
+                cached_data = self._get_cached_predictor_data('VEP', chrom, pos, ref, alt)
+                if cached_data:
+                    self._merge_vep_scores(scores, cached_data)
+                    continue
+            elif legacy_cache_key in self.cache:
+                self._merge_vep_scores(scores, self.cache[legacy_cache_key])
+                continue
+            
+            pending[f"{chrom} {pos} . {ref} {alt} . . ."] = variant
+        
+        inputs = list(pending)
+        for start in range(0, len(inputs), VEP_BATCH_SIZE):
+            batch = inputs[start:start + VEP_BATCH_SIZE]
+            try:
+                print(f"{Fore.YELLOW}🔍 Querying Ensembl VEP for AlphaMissense/CADD: "
+                      f"batch of {len(batch)} variants...{Style.RESET_ALL}")
+                
+                response = requests.post(
+                    PREDICTOR_API_ENDPOINTS['vep_region'],
+                    params={'AlphaMissense': '1', 'CADD': '1'},
+                    json={'variants': batch},
+                    timeout=self.timeout,
+                    headers={'Content-Type': 'application/json', 'Accept': 'application/json'}
+                )
+                
+                if response.status_code != 200:
+                    print(f"{Fore.RED}❌ Ensembl VEP batch error: HTTP {response.status_code}{Style.RESET_ALL}")
+                    continue
+                
+                vep_by_input = {
+                    entry.get('input'): entry
+                    for entry in response.json() or []
+                    if isinstance(entry, dict)
+                }
+                for vep_input in batch:
+                    if vep_input not in vep_by_input:
+                        continue
+                    variant = pending[vep_input]
+                    chrom, pos, ref, alt = variant
+                    data = self._parse_vep_fallback(vep_by_input[vep_input])
+                    self._merge_vep_scores(results[variant], data)
+                    
+                    if self._use_validated_cache:
+                        if data:
+                            self._set_cached_predictor_data('VEP', chrom, pos, ref, alt, data)
+                    else:
+                        self.cache[f"vep_{chrom}_{pos}_{ref}_{alt}"] = data
+                
+            except requests.exceptions.Timeout:
+                print(f"{Fore.RED}❌ Ensembl VEP batch timeout{Style.RESET_ALL}")
+            except Exception as e:
+                print(f"{Fore.RED}❌ Ensembl VEP batch error: {str(e)}{Style.RESET_ALL}")
+    
+    @staticmethod
+    def _missing_fallback(results: dict[str, PredictorScore]) -> bool:
+        """True if the AlphaMissense or CADD score of a variant is still missing."""
+        return any(
+            predictor in results and results[predictor].value is None
+            for predictor in ('alphamissense', 'cadd_phred')
+        )
+    
+    @staticmethod
+    def _parse_vep_fallback(entry: dict) -> dict[str, float]:
+        """
+        AlphaMissense and CADD PHRED scores from one VEP result entry.
+        
+        The canonical transcript is preferred; other transcripts fill a score
+        it lacks. Invalid values are dropped.
+        """
+        data = {}
+        consequences = sorted(
+            entry.get('transcript_consequences') or [],
+            key=lambda consequence: not consequence.get('canonical')
+        )
+        for consequence in consequences:
+            alphamissense = consequence.get('alphamissense')
+            if isinstance(alphamissense, dict):
+                alphamissense = alphamissense.get('am_pathogenicity')
+            for predictor, value in (('alphamissense', alphamissense),
+                                     ('cadd_phred', consequence.get('cadd_phred'))):
+                if predictor in data or value is None:
+                    continue
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    continue
+                if validate_predictor_score(predictor, value):
+                    data[predictor] = value
+        return data
+    
+    @staticmethod
+    def _merge_vep_scores(results: dict[str, PredictorScore], data: dict) -> None:
+        """Fill missing AlphaMissense/CADD scores from VEP data (fresh or cached)."""
+        for predictor, value in (data or {}).items():
+            if predictor in results and results[predictor].value is None and value is not None:
+                results[predictor] = PredictorScore(
+                    predictor=predictor,
+                    value=float(value),
+                    source='VEP',
+                    version='Ensembl',
+                    is_inverted=False
+                )
+    
+    def _fetch_fallback_scores(
+        self,
+        results: dict[str, PredictorScore],
+        chrom: Optional[str],
+        pos: Optional[int],
+        ref: Optional[str],
+        alt: Optional[str]
+    ) -> None:
+        """Fill AlphaMissense/CADD gaps from the local store and their dedicated APIs."""
+        self._fill_local_alphamissense(results, chrom, pos, ref, alt)
+        
         # Secondary source: AlphaMissense API for alphamissense specifically
         if 'alphamissense' in results and results['alphamissense'].value is None:
             if chrom and pos and ref and alt:
@@ -260,8 +561,49 @@ class PredictorAPIClient:
                 cadd_score = self._fetch_cadd(chrom, pos, ref, alt)
                 if cadd_score:
                     results['cadd_phred'] = cadd_score
+    
+    def _fetch_from_local(
+        self,
+        chrom: str,
+        pos: int,
+        ref: str,
+        alt: str
+    ) -> dict[str, PredictorScore]:
+        """Fetch scores from the local dbNSFP extract ({} on miss or error)."""
+        try:
+            return self.local_backend.get_predictor_scores(chrom, pos, ref, alt)
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️  Local dbNSFP lookup error: {str(e)}{Style.RESET_ALL}")
+            return {}
+    
+    def _fill_local_alphamissense(
+        self,
+        results: dict[str, PredictorScore],
+        chrom: Optional[str],
+        pos: Optional[int],
+        ref: Optional[str],
+        alt: Optional[str]
+    ) -> None:
+        """Fill a missing AlphaMissense score from the local store, if configured."""
+        if self.alphamissense_store is None or not (chrom and pos and ref and alt):
+            return
+        if 'alphamissense' not in results or results['alphamissense'].value is not None:
+            return
         
-        return results
+        try:
+            score = self.alphamissense_store.get_genomic_score(chrom, pos, ref, alt)
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️  Local AlphaMissense lookup error: {str(e)}{Style.RESET_ALL}")
+            return
+        
+        if score is not None and validate_predictor_score('alphamissense', score):
+            results['alphamissense'] = PredictorScore(
+                predictor='alphamissense',
+                value=score,
+                source='AlphaMissense_local',
+                version=self.alphamissense_store.version,
+                is_inverted=False
+            )
     
     def _fetch_from_myvariant(
         self,
@@ -296,12 +638,7 @@ class PredictorAPIClient:
             print(f"{Fore.YELLOW}🔍 Querying myvariant.info for predictor scores: {variant_id}...{Style.RESET_ALL}")
             
             # Request dbNSFP fields
-            params = {
-                'fields': 'dbnsfp.revel.score,dbnsfp.cadd.phred,dbnsfp.alphamissense.score,'
-                         'dbnsfp.sift.score,dbnsfp.polyphen2.hdiv.score,dbnsfp.metasvm.score,'
-                         'dbnsfp.vest4.score,dbnsfp.fathmm.score,dbnsfp.bayesdel.addaf_score,'
-                         'dbnsfp.primateai.score,dbnsfp.mpc.score',
-            }
+            params = {'fields': MYVARIANT_FIELDS}
             
             response = requests.get(
                 f"{PREDICTOR_API_ENDPOINTS['myvariant']}/{variant_id}",
@@ -340,6 +677,95 @@ class PredictorAPIClient:
         
         return scores
     
+    def _fetch_from_myvariant_many(
+        self,
+        variants: list[tuple[str, int, str, str]],
+        batch_size: int = MYVARIANT_BATCH_SIZE
+    ) -> dict[tuple[str, int, str, str], dict[str, PredictorScore]]:
+        """
+        Fetch dbNSFP scores for many variants via myvariant.info batch POST.
+        
+        The batch endpoint takes a comma-separated ``ids`` list and returns
+        one hit per ID, echoing the requested ID in ``query``. IDs that are
+        not found come back with ``notfound: true`` and are left uncached,
+        matching the single-variant 404 behaviour.
+        """
+        scores = {}
+        pending = {}  # myvariant ID -> variant tuple
+        
+        for variant in variants:
+            if variant in scores:
+                continue
+            chrom, pos, ref, alt = variant
+            variant_id = f"chr{chrom}:g.{pos}{ref}>{alt}"
+            legacy_cache_key = f"myvariant_{variant_id}"
+            
+            if self._use_validated_cache:
+                cached_data = self._get_cached_predictor_data('dbNSFP', chrom, pos, ref, alt)
+                if cached_data:
+                    scores[variant] = self._parse_myvariant_response(cached_data)
+                    continue
+            elif legacy_cache_key in self.cache:
+                scores[variant] = self._parse_myvariant_response(self.cache[legacy_cache_key])
+                continue
+            
+            pending[variant_id] = variant
+        
+        ids = list(pending)
+        batch_size = max(1, min(batch_size, MYVARIANT_BATCH_SIZE))
+        
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            try:
+                print(f"{Fore.YELLOW}🔍 Querying myvariant.info for predictor scores: "
+                      f"batch of {len(batch)} variants...{Style.RESET_ALL}")
+                
+                response = requests.post(
+                    PREDICTOR_API_ENDPOINTS['myvariant'],
+                    data={'ids': ','.join(batch), 'fields': MYVARIANT_FIELDS},
+                    timeout=self.timeout
+                )
+                
+                if response.status_code != 200:
+                    print(f"{Fore.RED}❌ myvariant.info batch error: HTTP {response.status_code}{Style.RESET_ALL}")
+                    continue
+                
+                hits = response.json()
+                if isinstance(hits, dict):
+                    hits = [hits]
+                
+                found = 0
+                for hit in hits:
+                    if not isinstance(hit, dict) or hit.get('notfound'):
+                        continue
+                    variant = pending.get(hit.get('query'))
+                    if variant is None or variant in scores:
+                        continue
+                    
+                    chrom, pos, ref, alt = variant
+                    variant_scores = self._parse_myvariant_response(hit)
+                    scores[variant] = variant_scores
+                    found += 1
+                    
+                    if self._use_validated_cache:
+                        cache_data = {
+                            name: score.value
+                            for name, score in variant_scores.items()
+                            if score.value is not None
+                        }
+                        self._set_cached_predictor_data('dbNSFP', chrom, pos, ref, alt, cache_data)
+                    else:
+                        self.cache[f"myvariant_{hit.get('query')}"] = hit
+                
+                print(f"{Fore.GREEN}✅ myvariant.info: Retrieved scores for {found}/{len(batch)} variants{Style.RESET_ALL}")
+                
+            except requests.exceptions.Timeout:
+                print(f"{Fore.RED}❌ myvariant.info batch timeout{Style.RESET_ALL}")
+            except Exception as e:
+                print(f"{Fore.RED}❌ myvariant.info batch error: {str(e)}{Style.RESET_ALL}")
+        
+        return scores
+    
     def _parse_myvariant_response(self, data: dict) -> dict[str, PredictorScore]:
         """
         Parse myvariant.info response into PredictorScore objects.
@@ -694,7 +1120,9 @@ class PopulationAPIClient:
         timeout: int = 15,
         cache: Optional[dict] = None,
         test_mode: bool = False,
-        result_cache: Optional['ResultCache'] = None
+        result_cache: Optional['ResultCache'] = None,
+        local_store: Optional['LocalGnomADStore'] = None,
+        bloom_filter: Optional['GnomADBloomFilter'] = None
     ):
         """
         Initialize the population API client.
@@ -705,10 +1133,17 @@ class PopulationAPIClient:
             cache: Optional cache dictionary for API responses (legacy)
             test_mode: If True, return mock data instead of API calls
             result_cache: Optional ResultCache instance for validated caching
+            local_store: Optional LocalGnomADStore; variants it can answer
+                         are served without network access
+            bloom_filter: Optional GnomADBloomFilter of gnomAD site keys;
+                          variants it reports as definitely absent get
+                          absent stats without any other lookup
         """
         self.api_enabled = api_enabled
         self.timeout = timeout
         self.test_mode = test_mode
+        self.local_store = local_store
+        self.bloom_filter = bloom_filter
         
         # Use ResultCache if provided, otherwise fall back to simple dict
         if result_cache is not None and CACHE_AVAILABLE:
@@ -799,6 +1234,18 @@ class PopulationAPIClient:
         Returns:
             Dictionary mapping population names to PopulationStats objects.
         """
+        # Bloom filter fast path: definitely absent from gnomAD
+        if self.bloom_filter is not None and chrom and pos and ref and alt:
+            absent_stats = self._bloom_absent_stats(chrom, pos, ref, alt)
+            if absent_stats is not None:
+                return {absent_stats.population: absent_stats}
+        
+        # Local gnomAD store: a hit (or a covered absence) needs no network
+        if self.local_store is not None and chrom and pos and ref and alt:
+            local_stats = self._fetch_local(chrom, pos, ref, alt)
+            if local_stats is not None:
+                return {local_stats.population: local_stats}
+        
         if not self.api_enabled:
             return {}
         
@@ -826,6 +1273,106 @@ class PopulationAPIClient:
         
         return results
     
+    def get_population_stats_many(
+        self,
+        variants: list[tuple[str, int, str, str]],
+        batch_size: int = GNOMAD_GRAPHQL_BATCH_SIZE
+    ) -> dict[tuple[str, int, str, str], dict[str, PopulationStats]]:
+        """
+        Fetch population frequency data for many variants with batched gnomAD queries.
+        
+        Mirrors get_population_stats(): the gnomAD Bloom filter and the local
+        gnomAD store (if configured) first, then gnomAD v4, then gnomAD v3 for variants without v4 data,
+        with each dataset fetched in aliased GraphQL batches of up to
+        ``batch_size`` variants.
+        
+        Args:
+            variants: List of (chrom, pos, ref, alt) tuples (GRCh38)
+            batch_size: Maximum variant() selections per GraphQL request
+            
+        Returns:
+            Dictionary mapping each (chrom, pos, ref, alt) tuple to its
+            population name -> PopulationStats dictionary.
+        """
+        local_results = {}
+        if self.bloom_filter is not None:
+            for variant in variants:
+                absent_stats = self._bloom_absent_stats(*variant)
+                if absent_stats is not None:
+                    local_results[variant] = {absent_stats.population: absent_stats}
+        
+        if self.local_store is not None:
+            try:
+                local_stats = self.local_store.get_population_stats_many(
+                    [variant for variant in variants if variant not in local_results]
+                )
+            except Exception as e:
+                print(f"{Fore.YELLOW}⚠️  Local gnomAD store error: {str(e)}{Style.RESET_ALL}")
+                local_stats = {}
+            local_results.update({variant: {stats.population: stats} for variant, stats in local_stats.items()})
+        
+        remaining = [variant for variant in variants if variant not in local_results]
+        
+        if not self.api_enabled:
+            return {**{variant: {} for variant in remaining}, **local_results}
+        
+        if self.test_mode:
+            return {**{variant: self._get_mock_population_stats() for variant in remaining}, **local_results}
+        
+        results = {variant: {} for variant in remaining}
+        results.update(local_results)
+        if not remaining:
+            return results
+        
+        v4_stats = self._fetch_gnomad_many(
+            remaining, dataset_id='gnomad_r4', version_label='v4.1', batch_size=batch_size
+        )
+        for variant, stats in v4_stats.items():
+            results[variant]['gnomad_v4'] = stats
+        
+        # Fallback: gnomAD v3 when v4 has no data
+        needs_v3 = [
+            variant for variant in remaining
+            if not (variant in v4_stats and (v4_stats[variant].an or v4_stats[variant].ac))
+        ]
+        if needs_v3:
+            v3_stats = self._fetch_gnomad_many(
+                needs_v3, dataset_id='gnomad_r3', version_label='v3', batch_size=batch_size
+            )
+            for variant, stats in v3_stats.items():
+                results[variant]['gnomad_v3'] = stats
+        
+        return results
+    
+    def _bloom_absent_stats(
+        self,
+        chrom: str,
+        pos: int,
+        ref: str,
+        alt: str
+    ) -> Optional[PopulationStats]:
+        """Absent stats if the Bloom filter rules the variant out of gnomAD, else None."""
+        try:
+            if self.bloom_filter.definitely_absent(chrom, pos, ref, alt):
+                return self.bloom_filter.absent_stats()
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️  gnomAD Bloom filter error: {str(e)}{Style.RESET_ALL}")
+        return None
+    
+    def _fetch_local(
+        self,
+        chrom: str,
+        pos: int,
+        ref: str,
+        alt: str
+    ) -> Optional[PopulationStats]:
+        """Fetch stats from the local gnomAD store (None if it cannot answer)."""
+        try:
+            return self.local_store.get_population_stats(chrom, pos, ref, alt)
+        except Exception as e:
+            print(f"{Fore.YELLOW}⚠️  Local gnomAD store error: {str(e)}{Style.RESET_ALL}")
+            return None
+    
     def _fetch_gnomad(
         self,
         chrom: str,
@@ -843,33 +1390,9 @@ class PopulationAPIClient:
         """
         from config.api_config import API_ENDPOINTS
         
-        legacy_cache_key = f"gnomad_pop_{dataset_id}_{chrom}_{pos}_{ref}_{alt}"
-        
-        # Check validated cache first
-        if self._use_validated_cache:
-            cache_source = f"gnomAD_GraphQL_{dataset_id}"
-            cached_data = self._get_cached_population_data(cache_source, chrom, pos, ref, alt)
-            if cached_data:
-                # Reconstruct PopulationStats from cached data
-                if validate_population_stats(
-                    af=cached_data.get('af'),
-                    an=cached_data.get('an'),
-                    ac=cached_data.get('ac')
-                ):
-                    return PopulationStats(
-                        population='gnomad_v4',
-                        af=cached_data.get('af'),
-                        an=cached_data.get('an'),
-                        ac=cached_data.get('ac'),
-                        homozygote_count=cached_data.get('homozygote_count'),
-                        hemizygote_count=cached_data.get('hemizygote_count'),
-                        popmax_af=cached_data.get('popmax_af'),
-                        popmax_population=cached_data.get('popmax_population'),
-                        source=cache_source,
-                        version=f"{version_label}_cached"
-                    )
-        elif legacy_cache_key in self.cache:
-            return self.cache[legacy_cache_key]
+        cached_stats = self._get_cached_gnomad(chrom, pos, ref, alt, dataset_id, version_label)
+        if cached_stats is not None:
+            return cached_stats
         
         graphql_query = """
         query VariantFrequency($variantId: String!, $datasetId: DatasetId!) {
@@ -918,90 +1441,13 @@ class PopulationAPIClient:
             if response.status_code == 200:
                 data = response.json()
                 
-                # Check for variant not found
                 variant = data.get('data', {}).get('variant')
+                stats = self._build_gnomad_stats(variant, chrom, pos, ref, alt, dataset_id, version_label)
+                
                 if not variant:
-                    # Variant not found - return zero frequency
-                    stats = PopulationStats(
-                        population='gnomad_v4' if dataset_id == 'gnomad_r4' else 'gnomad_v3',
-                        af=0.0,
-                        an=0,
-                        ac=0,
-                        source=f"gnomAD_GraphQL_{dataset_id}",
-                        version=version_label
-                    )
-                    
-                    # Cache absent variant data
-                    if self._use_validated_cache:
-                        self._set_cached_population_data(
-                            f"gnomAD_GraphQL_{dataset_id}", chrom, pos, ref, alt,
-                            {'af': 0.0, 'an': 0, 'ac': 0}
-                        )
-                    else:
-                        self.cache[legacy_cache_key] = stats
-                        
                     print(f"{Fore.YELLOW}⚠️  Variant not found in gnomAD v4 (may support PM2){Style.RESET_ALL}")
-                    return stats
-                
-                # Parse genome-wide data
-                genome = variant.get('genome', {})
-                
-                # Parse sub-populations
-                subpop = {}
-                for pop in genome.get('populations', []):
-                    pop_id = pop.get('id', 'unknown')
-                    pop_ac = pop.get('ac')
-                    pop_an = pop.get('an')
-                    pop_af = None
-                    if pop_ac is not None and pop_an:
-                        try:
-                            pop_af = pop_ac / pop_an
-                        except (TypeError, ZeroDivisionError):
-                            pop_af = None
-                    subpop[pop_id] = {
-                        'af': pop_af,
-                        'ac': pop_ac,
-                        'an': pop_an
-                    }
-                
-                faf95 = genome.get('faf95', {}) or {}
-                
-                stats = PopulationStats(
-                        population='gnomad_v4' if dataset_id == 'gnomad_r4' else 'gnomad_v3',
-                    af=genome.get('af'),
-                    an=genome.get('an'),
-                    ac=genome.get('ac'),
-                    homozygote_count=genome.get('ac_hom'),
-                    hemizygote_count=genome.get('ac_hemi'),
-                    subpop=subpop if subpop else None,
-                    popmax_af=faf95.get('popmax'),
-                    popmax_population=faf95.get('popmax_population'),
-                    filters=genome.get('filters'),
-                        source=f"gnomAD_GraphQL_{dataset_id}",
-                        version=version_label,
-                    raw=variant
-                )
-                
-                # Cache validated population data
-                if self._use_validated_cache:
-                    cache_data = {
-                        'af': stats.af,
-                        'an': stats.an,
-                        'ac': stats.ac,
-                        'homozygote_count': stats.homozygote_count,
-                        'hemizygote_count': stats.hemizygote_count,
-                        'popmax_af': stats.popmax_af,
-                        'popmax_population': stats.popmax_population,
-                    }
-                    self._set_cached_population_data(
-                        f"gnomAD_GraphQL_{dataset_id}", chrom, pos, ref, alt, cache_data
-                    )
-                else:
-                    self.cache[legacy_cache_key] = stats
-                
-                af = stats.af
-                if af:
-                    print(f"{Fore.GREEN}✅ gnomAD: AF={af:.6f} (AC={stats.ac}, AN={stats.an}){Style.RESET_ALL}")
+                elif stats.af:
+                    print(f"{Fore.GREEN}✅ gnomAD: AF={stats.af:.6f} (AC={stats.ac}, AN={stats.an}){Style.RESET_ALL}")
                 else:
                     print(f"{Fore.GREEN}✅ gnomAD: Variant found, AF=0{Style.RESET_ALL}")
                 
@@ -1017,6 +1463,234 @@ class PopulationAPIClient:
         
         return None
     
+    def _get_cached_gnomad(
+        self,
+        chrom: str,
+        pos: int,
+        ref: str,
+        alt: str,
+        dataset_id: str,
+        version_label: str
+    ) -> Optional[PopulationStats]:
+        """Return cached gnomAD stats for one variant/dataset, or None on a miss."""
+        legacy_cache_key = f"gnomad_pop_{dataset_id}_{chrom}_{pos}_{ref}_{alt}"
+        
+        # Check validated cache first
+        if self._use_validated_cache:
+            cache_source = f"gnomAD_GraphQL_{dataset_id}"
+            cached_data = self._get_cached_population_data(cache_source, chrom, pos, ref, alt)
+            if cached_data:
+                # Reconstruct PopulationStats from cached data
+                if validate_population_stats(
+                    af=cached_data.get('af'),
+                    an=cached_data.get('an'),
+                    ac=cached_data.get('ac')
+                ):
+                    return PopulationStats(
+                        population='gnomad_v4',
+                        af=cached_data.get('af'),
+                        an=cached_data.get('an'),
+                        ac=cached_data.get('ac'),
+                        homozygote_count=cached_data.get('homozygote_count'),
+                        hemizygote_count=cached_data.get('hemizygote_count'),
+                        popmax_af=cached_data.get('popmax_af'),
+                        popmax_population=cached_data.get('popmax_population'),
+                        source=cache_source,
+                        version=f"{version_label}_cached"
+                    )
+        elif legacy_cache_key in self.cache:
+            return self.cache[legacy_cache_key]
+        
+        return None
+    
+    def _build_gnomad_stats(
+        self,
+        variant: Optional[dict],
+        chrom: str,
+        pos: int,
+        ref: str,
+        alt: str,
+        dataset_id: str,
+        version_label: str
+    ) -> PopulationStats:
+        """
+        Convert one gnomAD GraphQL ``variant`` result into PopulationStats and cache it.
+        
+        A missing variant (None) is treated as absent from gnomAD and cached
+        with zero counts, matching the single-variant query behaviour.
+        """
+        legacy_cache_key = f"gnomad_pop_{dataset_id}_{chrom}_{pos}_{ref}_{alt}"
+        
+        population = 'gnomad_v4' if dataset_id == 'gnomad_r4' else 'gnomad_v3'
+        source = f"gnomAD_GraphQL_{dataset_id}"
+        
+        if not variant:
+            # Variant not found - return zero frequency
+            stats = PopulationStats(
+                population=population,
+                af=0.0,
+                an=0,
+                ac=0,
+                source=source,
+                version=version_label
+            )
+            
+            # Cache absent variant data
+            if self._use_validated_cache:
+                self._set_cached_population_data(
+                    source, chrom, pos, ref, alt,
+                    {'af': 0.0, 'an': 0, 'ac': 0}
+                )
+            else:
+                self.cache[legacy_cache_key] = stats
+            
+            return stats
+        
+        # Parse genome-wide data
+        genome = variant.get('genome', {}) or {}
+        
+        # Parse sub-populations
+        subpop = {}
+        for pop in genome.get('populations', []) or []:
+            pop_id = pop.get('id', 'unknown')
+            pop_ac = pop.get('ac')
+            pop_an = pop.get('an')
+            pop_af = None
+            if pop_ac is not None and pop_an:
+                try:
+                    pop_af = pop_ac / pop_an
+                except (TypeError, ZeroDivisionError):
+                    pop_af = None
+            subpop[pop_id] = {
+                'af': pop_af,
+                'ac': pop_ac,
+                'an': pop_an
+            }
+        
+        faf95 = genome.get('faf95', {}) or {}
+        
+        stats = PopulationStats(
+            population=population,
+            af=genome.get('af'),
+            an=genome.get('an'),
+            ac=genome.get('ac'),
+            homozygote_count=genome.get('ac_hom'),
+            hemizygote_count=genome.get('ac_hemi'),
+            subpop=subpop if subpop else None,
+            popmax_af=faf95.get('popmax'),
+            popmax_population=faf95.get('popmax_population'),
+            filters=genome.get('filters'),
+            source=source,
+            version=version_label,
+            raw=variant
+        )
+        
+        # Cache validated population data
+        if self._use_validated_cache:
+            cache_data = {
+                'af': stats.af,
+                'an': stats.an,
+                'ac': stats.ac,
+                'homozygote_count': stats.homozygote_count,
+                'hemizygote_count': stats.hemizygote_count,
+                'popmax_af': stats.popmax_af,
+                'popmax_population': stats.popmax_population,
+            }
+            self._set_cached_population_data(source, chrom, pos, ref, alt, cache_data)
+        else:
+            self.cache[legacy_cache_key] = stats
+        
+        return stats
+    
+    def _fetch_gnomad_many(
+        self,
+        variants: list[tuple[str, int, str, str]],
+        dataset_id: str = 'gnomad_r4',
+        version_label: str = 'v4.1',
+        batch_size: int = GNOMAD_GRAPHQL_BATCH_SIZE
+    ) -> dict[tuple[str, int, str, str], PopulationStats]:
+        """
+        Fetch gnomAD population stats for many variants with aliased GraphQL batches.
+        
+        Cached variants are served from the cache. The rest are packed into
+        documents of up to ``batch_size`` aliased ``variant()`` selections
+        (see build_gnomad_batch_query) and each sub-result is cached
+        individually. Variants whose batch failed, or whose alias carried an
+        error other than "not found", are left out of the result.
+        """
+        from config.api_config import API_ENDPOINTS
+        
+        results = {}
+        pending = []
+        queued = set()  # O(1) duplicate check; pending keeps request order
+        for variant in variants:
+            if variant in results or variant in queued:
+                continue
+            cached_stats = self._get_cached_gnomad(*variant, dataset_id, version_label)
+            if cached_stats is not None:
+                results[variant] = cached_stats
+            else:
+                pending.append(variant)
+                queued.add(variant)
+        
+        batch_size = max(1, batch_size)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            query, variables = build_gnomad_batch_query(
+                [f"{chrom}-{pos}-{ref}-{alt}" for chrom, pos, ref, alt in batch]
+            )
+            variables['datasetId'] = dataset_id
+            
+            try:
+                print(f"{Fore.YELLOW}🔍 Querying gnomAD ({dataset_id}) for population data: "
+                      f"batch of {len(batch)} variants...{Style.RESET_ALL}")
+                
+                response = requests.post(
+                    API_ENDPOINTS.get('gnomad_graphql', 'https://gnomad.broadinstitute.org/api'),
+                    json={'query': query, 'variables': variables},
+                    timeout=self.timeout,
+                    headers={
+                        'Content-Type': 'application/json',
+                        'User-Agent': 'ACMG_Assistant/1.0'
+                    }
+                )
+                
+                if response.status_code != 200:
+                    response_text = response.text[:500] if response.text else ""
+                    print(
+                        f"{Fore.YELLOW}⚠️  gnomAD API returned status {response.status_code}: {response_text}{Style.RESET_ALL}"
+                    )
+                    continue
+                
+                data = response.json()
+                payload = data.get('data')
+                if not isinstance(payload, dict):
+                    errors = data.get('errors') or [{}]
+                    print(f"{Fore.RED}❌ gnomAD batch error: {errors[0].get('message', 'no data')}{Style.RESET_ALL}")
+                    continue
+                
+                # Aliases with real errors are skipped; "not found" means absent
+                failed_aliases = set()
+                for error in data.get('errors') or []:
+                    path = error.get('path') or []
+                    if path and 'not found' not in str(error.get('message', '')).lower():
+                        failed_aliases.add(path[0])
+                
+                for index, (chrom, pos, ref, alt) in enumerate(batch):
+                    alias = f"v{index}"
+                    if alias in failed_aliases:
+                        continue
+                    results[(chrom, pos, ref, alt)] = self._build_gnomad_stats(
+                        payload.get(alias), chrom, pos, ref, alt, dataset_id, version_label
+                    )
+                
+                print(f"{Fore.GREEN}✅ gnomAD: Retrieved {len(batch) - len(failed_aliases)}/{len(batch)} variants{Style.RESET_ALL}")
+                
+            except Exception as e:
+                print(f"{Fore.RED}❌ gnomAD API error: {str(e)}{Style.RESET_ALL}")
+        
+        return results
+    
     def _get_mock_population_stats(self) -> dict[str, PopulationStats]:
         """Return mock population stats for testing."""
         return {
@@ -0,0 +1,432 @@
+"""
+Local Reference Genome
+======================
+
+Memory-mapped reference sequence access for REF allele checks and indel
+normalization without Ensembl calls.
+
+Supported formats:
+
+- FASTA with a samtools .fai index (uncompressed; the index is built and
+  written next to the file when missing)
+- UCSC .2bit (versions 0 and 1), decoded 2 bits per base with N blocks
+
+Both are opened with mmap, so only the pages holding the requested bases
+are read. Contig names are matched with or without the 'chr' prefix, and
+M/MT are treated as the same contig.
+
+normalize() left-aligns and trims indels and MNVs (Tan et al. 2015, as in
+vt normalize / bcftools norm), so equivalent representations such as
+17-100-CA-C and 17-101-AA-A share one normalized ID.
+
+Usage:
+    genome = get_reference_genome()          # LOCAL_DATA_SOURCES['reference_genome']
+    genome.fetch('17', 7674220, 7674230)
+    genome.check_ref('17', 7674220, 'C')
+    genome.normalize('17', 7674230, 'CT', 'C')
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import bisect
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from utils.local_store import LocalResource
+
+
+TWOBIT_SIGNATURE = 0x1A412743
+
+_TWOBIT_BASES = 'TCAG'
+# Byte value -> the 4 bases it packs (first base in the high bits)
+_TWOBIT_DECODE = [
+    ''.join(_TWOBIT_BASES[(byte >> shift) & 0x3] for shift in (6, 4, 2, 0))
+    for byte in range(256)
+]
+
+
+class ReferenceGenomeError(ValueError):
+    """Raised for unreadable reference files or unknown contigs."""
+
+
+def _contig_aliases(chrom: str) -> List[str]:
+    """Candidate names for a contig: as given, with/without 'chr', M <-> MT."""
+    chrom = str(chrom).strip()
+    bare = chrom[3:] if chrom.lower().startswith('chr') else chrom
+    names = [chrom, bare, f"chr{bare}"]
+    if bare.upper() in ('M', 'MT'):
+        names += ['MT', 'M', 'chrM', 'chrMT']
+    return names
+
+
+class ReferenceGenome:
+    """Common interface of the FASTA and 2bit readers (1-based, inclusive coordinates)."""
+
+    path: str
+
+    def __init__(self):
+        self._names: Dict[str, str] = {}
+
+    def contigs(self) -> List[str]:
+        raise NotImplementedError
+
+    def length(self, chrom: str) -> int:
+        raise NotImplementedError
+
+    def _fetch(self, name: str, start0: int, end0: int) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def resolve_contig(self, chrom: str) -> Optional[str]:
+        """Return the file's name for a contig ('17' -> 'chr17' in UCSC files), or None."""
+        if chrom in self._names:
+            return self._names[chrom]
+        known = set(self.contigs())
+        name = next((alias for alias in _contig_aliases(chrom) if alias in known), None)
+        self._names[chrom] = name
+        return name
+
+    def fetch(self, chrom: str, start: int, end: Optional[int] = None) -> str:
+        """
+        Return upper-case reference bases for chrom:start-end (1-based, inclusive).
+
+        Raises:
+            ReferenceGenomeError: Unknown contig or range outside the contig
+        """
+        name = self.resolve_contig(chrom)
+        if name is None:
+            raise ReferenceGenomeError(f"Contig not in reference: {chrom}")
+        end = start if end is None else end
+        if start < 1 or end < start or end > self.length(name):
+            raise ReferenceGenomeError(f"Range outside {name}: {start}-{end}")
+        return self._fetch(name, start - 1, end)
+
+    def check_ref(self, chrom: str, pos: int, ref: str) -> bool:
+        """True if ref matches the reference at pos (unknown contigs/ranges are False)."""
+        try:
+            return self.fetch(chrom, pos, pos + len(ref) - 1) == ref.upper()
+        except ReferenceGenomeError:
+            return False
+
+    def normalize(self, chrom: str, pos: int, ref: str, alt: str) -> Tuple[str, int, str, str]:
+        """
+        Left-align and trim a variant (parsimonious, left-aligned representation).
+
+        SNVs are returned unchanged without touching the reference.
+
+        Raises:
+            ReferenceGenomeError: Unknown contig, or left extension beyond the contig start
+        """
+        ref, alt = ref.upper(), alt.upper()
+        if (len(ref) == 1 and len(alt) == 1) or ref == alt:
+            return chrom, pos, ref, alt
+
+        changed = True
+        while changed:
+            changed = False
+            if ref and alt and ref[-1] == alt[-1]:
+                ref, alt = ref[:-1], alt[:-1]
+                changed = True
+            if not ref or not alt:
+                base = self.fetch(chrom, pos - 1)
+                ref, alt = base + ref, base + alt
+                pos -= 1
+                changed = True
+
+        while len(ref) > 1 and len(alt) > 1 and ref[0] == alt[0]:
+            ref, alt = ref[1:], alt[1:]
+            pos += 1
+        return chrom, pos, ref, alt
+
+
+# =============================================================================
+# FASTA + .fai
+# =============================================================================
+
+@dataclass(frozen=True)
+class FaiEntry:
+    """One .fai line: contig length, byte offset of its first base, bases/bytes per line."""
+    name: str
+    length: int
+    offset: int
+    line_bases: int
+    line_bytes: int
+
+
+def build_fai(path: str) -> List[FaiEntry]:
+    """Scan a FASTA file and return its .fai entries (requires uniform line lengths per contig)."""
+    entries = []
+    with open(path, 'rb') as f:
+        name = None
+        length = offset = line_bases = line_bytes = 0
+        short_line_seen = False
+        position = 0
+        for line in f:
+            if line.startswith(b'>'):
+                if name is not None:
+                    entries.append(FaiEntry(name, length, offset, line_bases, line_bytes))
+                name = line[1:].split()[0].decode('ascii')
+                length = line_bases = line_bytes = 0
+                short_line_seen = False
+                offset = position + len(line)
+            elif name is not None and line.strip():
+                bases = len(line.rstrip(b'\r\n'))
+                if short_line_seen:
+                    raise ReferenceGenomeError(f"Irregular FASTA line length in {name}")
+                if line_bases == 0:
+                    line_bases, line_bytes = bases, len(line)
+                elif bases > line_bases:
+                    raise ReferenceGenomeError(f"Irregular FASTA line length in {name}")
+                if bases < line_bases:
+                    short_line_seen = True
+                length += bases
+            position += len(line)
+        if name is not None:
+            entries.append(FaiEntry(name, length, offset, line_bases, line_bytes))
+    return entries
+
+
+def read_fai(path: str) -> List[FaiEntry]:
+    entries = []
+    with open(path, 'r', encoding='ascii') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) >= 5:
+                entries.append(FaiEntry(fields[0], int(fields[1]), int(fields[2]),
+                                        int(fields[3]), int(fields[4])))
+    return entries
+
+
+class IndexedFasta(ReferenceGenome):
+    """Memory-mapped FASTA addressed through its .fai index."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        fai_path = f"{path}.fai"
+        if os.path.exists(fai_path):
+            entries = read_fai(fai_path)
+        else:
+            entries = build_fai(path)
+            try:
+                with open(fai_path, 'w', encoding='ascii') as f:
+                    for e in entries:
+                        f.write(f"{e.name}\t{e.length}\t{e.offset}\t{e.line_bases}\t{e.line_bytes}\n")
+            except OSError:
+                pass
+        if not entries:
+            raise ReferenceGenomeError(f"No sequences in FASTA: {path}")
+        self._index = {entry.name: entry for entry in entries}
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def contigs(self) -> List[str]:
+        return list(self._index)
+
+    def length(self, chrom: str) -> int:
+        return self._index[chrom].length
+
+    def _fetch(self, name: str, start0: int, end0: int) -> str:
+        entry = self._index[name]
+
+        def offset(pos0: int) -> int:
+            return entry.offset + (pos0 // entry.line_bases) * entry.line_bytes + pos0 % entry.line_bases
+
+        raw = self._mm[offset(start0):offset(end0 - 1) + 1]
+        return raw.replace(b'\n', b'').replace(b'\r', b'').decode('ascii').upper()
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+# =============================================================================
+# UCSC .2bit
+# =============================================================================
+
+@dataclass
+class _TwoBitSequence:
+    length: int
+    dna_offset: int
+    n_starts: List[int]
+    n_ends: List[int]
+
+
+class TwoBitFile(ReferenceGenome):
+    """Memory-mapped UCSC .2bit reader; sequence headers are parsed on first use."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        signature, = struct.unpack_from('<I', self._mm, 0)
+        if signature == TWOBIT_SIGNATURE:
+            self._endian = '<'
+        elif struct.unpack_from('>I', self._mm, 0)[0] == TWOBIT_SIGNATURE:
+            self._endian = '>'
+        else:
+            self.close()
+            raise ReferenceGenomeError(f"Not a .2bit file: {path}")
+
+        version, count, _ = struct.unpack_from(self._endian + 'III', self._mm, 4)
+        if version not in (0, 1):
+            self.close()
+            raise ReferenceGenomeError(f"Unsupported .2bit version {version}: {path}")
+        offset_format = self._endian + ('Q' if version == 1 else 'I')
+
+        self._offsets: Dict[str, int] = {}
+        cursor = 16
+        for _ in range(count):
+            name_size = self._mm[cursor]
+            name = self._mm[cursor + 1:cursor + 1 + name_size].decode('ascii')
+            cursor += 1 + name_size
+            self._offsets[name], = struct.unpack_from(offset_format, self._mm, cursor)
+            cursor += struct.calcsize(offset_format)
+        self._sequences: Dict[str, _TwoBitSequence] = {}
+
+    def _sequence(self, name: str) -> _TwoBitSequence:
+        sequence = self._sequences.get(name)
+        if sequence is None:
+            u32 = self._endian + 'I'
+            cursor = self._offsets[name]
+            length, n_count = struct.unpack_from(self._endian + 'II', self._mm, cursor)
+            cursor += 8
+            n_starts = list(struct.unpack_from(f"{self._endian}{n_count}I", self._mm, cursor))
+            n_sizes = struct.unpack_from(f"{self._endian}{n_count}I", self._mm, cursor + 4 * n_count)
+            cursor += 8 * n_count
+            mask_count, = struct.unpack_from(u32, self._mm, cursor)
+            cursor += 4 + 8 * mask_count + 4  # mask blocks are not needed (output is upper-case)
+            sequence = _TwoBitSequence(length, cursor, n_starts,
+                                       [start + size for start, size in zip(n_starts, n_sizes)])
+            self._sequences[name] = sequence
+        return sequence
+
+    def contigs(self) -> List[str]:
+        return list(self._offsets)
+
+    def length(self, chrom: str) -> int:
+        return self._sequence(chrom).length
+
+    def _fetch(self, name: str, start0: int, end0: int) -> str:
+        sequence = self._sequence(name)
+        first, last = start0 // 4, (end0 - 1) // 4
+        packed = self._mm[sequence.dna_offset + first:sequence.dna_offset + last + 1]
+        skip = start0 - first * 4
+        bases = ''.join(_TWOBIT_DECODE[byte] for byte in packed)[skip:skip + end0 - start0]
+
+        # Overlay N blocks (sorted by start)
+        i = max(bisect.bisect_right(sequence.n_starts, start0) - 1, 0)
+        if sequence.n_starts and sequence.n_starts[i] < end0:
+            chars = None
+            while i < len(sequence.n_starts) and sequence.n_starts[i] < end0:
+                lo, hi = max(sequence.n_starts[i], start0), min(sequence.n_ends[i], end0)
+                if lo < hi:
+                    chars = chars if chars is not None else list(bases)
+                    chars[lo - start0:hi - start0] = 'N' * (hi - lo)
+                i += 1
+            if chars is not None:
+                bases = ''.join(chars)
+        return bases
+
+    def close(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+
+def write_twobit(path: str, sequences: Dict[str, str]) -> None:
+    """Write sequences as a version 0 .2bit file (N runs become N blocks; no soft-masking)."""
+    codes = {base: i for i, base in enumerate(_TWOBIT_BASES)}
+    names = list(sequences)
+    index_size = 16 + sum(1 + len(name) + 4 for name in names)
+    records = []
+    offset = index_size
+    for name in names:
+        sequence = sequences[name].upper()
+        n_blocks = []
+        start = None
+        for i, base in enumerate(sequence + 'A'):
+            if base == 'N' and start is None:
+                start = i
+            elif base != 'N' and start is not None:
+                n_blocks.append((start, i - start))
+                start = None
+        packed = bytearray()
+        for i in range(0, len(sequence), 4):
+            chunk = sequence[i:i + 4].ljust(4, 'T')
+            value = 0
+            for base in chunk:
+                value = (value << 2) | codes.get(base, 0)
+            packed.append(value)
+        record = struct.pack('<II', len(sequence), len(n_blocks))
+        record += b''.join(struct.pack('<I', s) for s, _ in n_blocks)
+        record += b''.join(struct.pack('<I', n) for _, n in n_blocks)
+        record += struct.pack('<II', 0, 0) + bytes(packed)
+        records.append((offset, record))
+        offset += len(record)
+
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IIII', TWOBIT_SIGNATURE, 0, len(names), 0))
+        for name, (record_offset, _) in zip(names, records):
+            f.write(bytes([len(name)]) + name.encode('ascii') + struct.pack('<I', record_offset))
+        for _, record in records:
+            f.write(record)
+
+
+def open_reference(path: str) -> ReferenceGenome:
+    """Open a .2bit file or an (uncompressed) FASTA by extension."""
+    if path.lower().endswith('.2bit'):
+        return TwoBitFile(path)
+    if path.lower().endswith(('.gz', '.bgz')):
+        raise ReferenceGenomeError(f"Compressed FASTA is not supported; decompress or convert to .2bit: {path}")
+    return IndexedFasta(path)
+
+
+# =============================================================================
+# Shared reference resolution
+# =============================================================================
+
+_genomes = LocalResource('reference_genome', 'ACMG_REFERENCE_GENOME', open_reference,
+                         label='Local reference genome', errors=(ValueError,))
+
+
+def get_reference_genome(path: Optional[str] = None) -> Optional[ReferenceGenome]:
+    """
+    Return the shared GRCh38 reference, opening it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['reference_genome'], then
+    the ACMG_REFERENCE_GENOME environment variable. Returns None when nothing
+    is configured or the file cannot be opened.
+    """
+    return _genomes.get(path)
+
+
+def normalize_alleles(chrom: str, pos: int, ref: str, alt: str) -> Tuple[str, int, str, str]:
+    """
+    Left-align and trim against the shared reference when the REF allele matches it.
+
+    Returns the input unchanged (alleles upper-cased) when no reference is
+    configured, the variant is an SNV, or the REF allele does not match.
+    """
+    ref, alt = str(ref).upper(), str(alt).upper()
+    if len(ref) == 1 and len(alt) == 1:
+        return chrom, pos, ref, alt
+    genome = get_reference_genome()
+    if genome is None or not ref or not alt or not genome.check_ref(chrom, int(pos), ref):
+        return chrom, pos, ref, alt
+    try:
+        return genome.normalize(chrom, int(pos), ref, alt)
+    except ReferenceGenomeError:
+        return chrom, pos, ref, alt
+
+
+def clear_reference_genomes() -> None:
+    """Close and drop all shared references (e.g. after the file is replaced)."""
+    _genomes.clear()
@@ -0,0 +1,558 @@
+"""
+Local Transcript Model Index
+============================
+
+Compact transcript/exon index loaded from a RefSeq or MANE GFF3 file
+(e.g. MANE.GRCh38.v1.3.refseq_genomic.gff.gz, GCF_000001405.40_GRCh38.p14_genomic.gff.gz),
+so HGVS c. positions can be projected to GRCh38 without a remote VEP call.
+
+Every transcript keeps its exons in transcript order together with the
+cumulative transcript offset of each exon and the transcript offsets of
+c.1 and the last CDS base. Projection in either direction is one bisect
+over the exon boundaries followed by arithmetic:
+
+- c. -> g.:   c.1528, c.-12, c.*45, intronic c.1528+5 / c.1529-3
+- g. -> c.:   the same notation, intronic offsets from the nearest exon
+- locate():   exon/intron rank, CDS position, distance to the last
+              exon-exon junction and the NMD prediction used by PVS1
+
+NMD rule: a premature stop codon more than 50 nt upstream of the last
+exon-exon junction is predicted to trigger NMD; stops in the last exon,
+within the last 50 nt of the penultimate exon, or in single-exon
+transcripts are predicted to escape.
+
+Usage:
+    index = get_transcript_index()
+    index.c_to_g('NM_000546.6', '1528')          # ('17', 7670685)
+    index.g_to_c('NM_000546.6', 7670685)         # '1528'
+    index.locate('NM_000546.6', '1528').escapes_nmd
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import gzip
+import re
+from bisect import bisect_right
+from dataclasses import astuple, dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+from utils.domain_index import IntervalTree
+from utils.local_store import LocalResource, is_snapshot_path, load_snapshot, save_snapshot
+
+
+# Bumped whenever TranscriptModel or the snapshot layout changes
+SNAPSHOT_FORMAT_VERSION = 2
+
+# A stop more than this many nt upstream of the last exon-exon junction triggers NMD
+NMD_JUNCTION_DISTANCE = 50
+
+_TRANSCRIPT_TYPES = frozenset(('mRNA', 'transcript', 'ncRNA', 'lnc_RNA'))
+
+_C_POSITION = re.compile(r'^(?P<base>[-*]?\d+)(?P<offset>[+-]\d+)?$')
+
+# RefSeq chromosome accessions (NC_000017.11 -> 17)
+_REFSEQ_CHROMOSOME = re.compile(r'^NC_0000(\d{2})\.\d+$')
+_REFSEQ_MT = 'NC_012920'
+
+
+class TranscriptIndexError(ValueError):
+    """Raised when a file is not a usable GFF3 transcript annotation."""
+
+
+def normalize_contig(seqid: str) -> str:
+    """Return the bare chromosome name of a GFF seqid ('chr17', 'NC_000017.11' -> '17')."""
+    seqid = str(seqid).strip()
+    match = _REFSEQ_CHROMOSOME.match(seqid)
+    if match:
+        number = int(match.group(1))
+        return {23: 'X', 24: 'Y'}.get(number, str(number))
+    if seqid.startswith(_REFSEQ_MT):
+        return 'MT'
+    bare = seqid[3:] if seqid.lower().startswith('chr') else seqid
+    return 'MT' if bare.upper() in ('M', 'MT') else bare
+
+
+def _accession(transcript_id: str) -> str:
+    """Strip the version from a transcript accession ('NM_000546.6' -> 'NM_000546')."""
+    return transcript_id.split('.', 1)[0].upper()
+
+
+@dataclass(frozen=True)
+class TranscriptModel:
+    """
+    Exon structure of one transcript (1-based, closed genomic coordinates).
+
+    Attributes:
+        exons: (start, end) pairs in transcript order (descending on the minus strand)
+        cds_start, cds_end: Genomic extent of the CDS including the stop codon (None if non-coding)
+        mane_select: True for MANE Select transcripts
+    """
+    transcript_id: str
+    gene: str
+    chrom: str
+    strand: str
+    exons: Tuple[Tuple[int, int], ...]
+    cds_start: Optional[int] = None
+    cds_end: Optional[int] = None
+    mane_select: bool = False
+
+    def __post_init__(self):
+        # Transcript offset (1-based) of each exon's first base
+        offsets, total = [], 0
+        for start, end in self.exons:
+            offsets.append(total + 1)
+            total += end - start + 1
+        object.__setattr__(self, '_offsets', tuple(offsets))
+        object.__setattr__(self, '_length', total)
+        # Genomic order for g. lookups: ascending exon starts with their transcript index
+        ascending = sorted(range(len(self.exons)), key=lambda i: self.exons[i][0])
+        object.__setattr__(self, '_genomic_starts', tuple(self.exons[i][0] for i in ascending))
+        object.__setattr__(self, '_genomic_order', tuple(ascending))
+        cds = None
+        if self.cds_start is not None and self.cds_end is not None:
+            first, last = ((self.cds_start, self.cds_end) if self.strand == '+'
+                           else (self.cds_end, self.cds_start))
+            start_t, end_t = self._genomic_to_transcript(first), self._genomic_to_transcript(last)
+            if start_t is not None and end_t is not None and start_t <= end_t:
+                cds = (start_t, end_t)
+        object.__setattr__(self, '_cds', cds)
+
+    # =========================================================================
+    # Properties
+    # =========================================================================
+
+    @property
+    def is_coding(self) -> bool:
+        return self._cds is not None
+
+    @property
+    def exon_count(self) -> int:
+        return len(self.exons)
+
+    @property
+    def length(self) -> int:
+        """Length of the spliced transcript in nt."""
+        return self._length
+
+    @property
+    def cds_length(self) -> Optional[int]:
+        """CDS length in nt including the stop codon (None if non-coding)."""
+        return self._cds[1] - self._cds[0] + 1 if self._cds else None
+
+    @property
+    def span(self) -> Tuple[int, int]:
+        return self._genomic_starts[0], max(end for _, end in self.exons)
+
+    # =========================================================================
+    # Transcript <-> genome
+    # =========================================================================
+
+    def _exon_index(self, g: int) -> Optional[int]:
+        """Return the transcript-order index of the exon containing genomic position g."""
+        slot = bisect_right(self._genomic_starts, g) - 1
+        if slot < 0:
+            return None
+        i = self._genomic_order[slot]
+        return i if g <= self.exons[i][1] else None
+
+    def _genomic_to_transcript(self, g: int) -> Optional[int]:
+        i = self._exon_index(g)
+        if i is None:
+            return None
+        start, end = self.exons[i]
+        return self._offsets[i] + (g - start if self.strand == '+' else end - g)
+
+    def _transcript_to_genomic(self, t: int) -> Optional[int]:
+        if t < 1 or t > self._length:
+            return None
+        i = bisect_right(self._offsets, t) - 1
+        start, end = self.exons[i]
+        return start + (t - self._offsets[i]) if self.strand == '+' else end - (t - self._offsets[i])
+
+    def _c_to_transcript(self, base: str) -> Optional[int]:
+        if self._cds is None:
+            return None
+        if base.startswith('*'):
+            return self._cds[1] + int(base[1:])
+        value = int(base)
+        if value == 0:
+            return None
+        return self._cds[0] + value if value < 0 else self._cds[0] + value - 1
+
+    def _transcript_to_c(self, t: int) -> str:
+        cds_start, cds_end = self._cds
+        if t < cds_start:
+            return str(t - cds_start)
+        if t > cds_end:
+            return f"*{t - cds_end}"
+        return str(t - cds_start + 1)
+
+    def c_to_g(self, position: str) -> Optional[int]:
+        """
+        Project a c. position ('1528', '-12', '*45', '1528+5', '1529-3') to the genome.
+
+        Returns:
+            1-based genomic position, or None if the position is outside the
+            transcript or an intronic offset is not anchored at an exon boundary
+        """
+        match = _C_POSITION.match(str(position).strip().replace('c.', '', 1))
+        if not match:
+            return None
+        t = self._c_to_transcript(match.group('base'))
+        if t is None:
+            return None
+        g = self._transcript_to_genomic(t)
+        if g is None:
+            return None
+        offset = int(match.group('offset') or 0)
+        if offset:
+            i = bisect_right(self._offsets, t) - 1
+            # +N follows the last base of an exon, -N precedes the first base of one
+            if offset > 0 and (t != self._offsets[i] + self.exons[i][1] - self.exons[i][0] or i == len(self.exons) - 1):
+                return None
+            if offset < 0 and (t != self._offsets[i] or i == 0):
+                return None
+            g += offset if self.strand == '+' else -offset
+            if self._exon_index(g) is not None:
+                return None
+        return g
+
+    def g_to_c(self, g: int) -> Optional[str]:
+        """Return the c. position of a genomic position (intronic positions get +/- offsets)."""
+        if self._cds is None:
+            return None
+        t = self._genomic_to_transcript(g)
+        if t is not None:
+            return self._transcript_to_c(t)
+        anchor, offset = self._intron_anchor(g)
+        if anchor is None:
+            return None
+        return f"{self._transcript_to_c(anchor)}{offset:+d}"
+
+    def _intron_anchor(self, g: int) -> Tuple[Optional[int], int]:
+        """Return (transcript offset of the nearest exon base, signed offset) for an intronic g."""
+        lo, hi = self.span
+        if g < lo or g > hi:
+            return None, 0
+        slot = bisect_right(self._genomic_starts, g) - 1
+        left, right = self._genomic_order[slot], self._genomic_order[slot + 1]
+        # Intron flanked by two exons consecutive in transcript order
+        upstream, downstream = (left, right) if self.strand == '+' else (right, left)
+        up_end = self.exons[upstream][1] if self.strand == '+' else self.exons[upstream][0]
+        down_start = self.exons[downstream][0] if self.strand == '+' else self.exons[downstream][1]
+        after_up, before_down = abs(g - up_end), abs(down_start - g)
+        # HGVS: the middle base of an intron is described from the upstream exon
+        if after_up <= before_down:
+            return self._offsets[downstream] - 1, after_up
+        return self._offsets[downstream], -before_down
+
+    # =========================================================================
+    # Exon context
+    # =========================================================================
+
+    def locate(self, position: str, nmd_distance: int = NMD_JUNCTION_DISTANCE) -> Optional['TranscriptPosition']:
+        """Return exon/intron rank, CDS position and NMD context of a c. position."""
+        g = self.c_to_g(position)
+        if g is None:
+            return None
+        t = self._genomic_to_transcript(g)
+        exon = intron = None
+        if t is None:
+            t, offset = self._intron_anchor(g)
+            # Intron k lies between exon k and k+1 (transcript order)
+            rank = bisect_right(self._offsets, t) - 1
+            intron = rank + 1 if offset > 0 else rank
+        else:
+            exon = bisect_right(self._offsets, t)
+        cds_position = None
+        if exon is not None and self._cds and self._cds[0] <= t <= self._cds[1]:
+            cds_position = t - self._cds[0] + 1
+        if len(self.exons) == 1:
+            distance, in_last = None, True
+        else:
+            distance = self._offsets[-1] - t
+            in_last = exon == len(self.exons)
+        escapes = in_last or (distance is not None and distance <= nmd_distance)
+        return TranscriptPosition(
+            transcript_id=self.transcript_id, gene=self.gene, chrom=self.chrom, pos=g,
+            c_position=self.g_to_c(g), exon=exon, intron=intron, exon_count=len(self.exons),
+            cds_position=cds_position, cds_length=self.cds_length,
+            distance_to_last_junction=distance, in_last_exon=in_last, escapes_nmd=escapes,
+        )
+
+
+@dataclass(frozen=True)
+class TranscriptPosition:
+    """
+    Exon context of one transcript position.
+
+    Attributes:
+        exon / intron: 1-based rank of the exon or intron containing the position
+        cds_position: 1-based CDS coordinate (None in UTRs and introns)
+        distance_to_last_junction: nt from the position to the last exon-exon
+            junction (positive upstream, <= 0 in the last exon; None for single-exon transcripts)
+        escapes_nmd: True if a stop codon here is predicted to escape NMD
+    """
+    transcript_id: str
+    gene: str
+    chrom: str
+    pos: int
+    c_position: Optional[str]
+    exon: Optional[int]
+    intron: Optional[int]
+    exon_count: int
+    cds_position: Optional[int]
+    cds_length: Optional[int]
+    distance_to_last_junction: Optional[int]
+    in_last_exon: bool
+    escapes_nmd: bool
+
+    def to_dict(self) -> Dict:
+        return {
+            'transcript': self.transcript_id,
+            'chromosome': self.chrom,
+            'position': self.pos,
+            'c_position': self.c_position,
+            'exon': self.exon,
+            'intron': self.intron,
+            'exon_count': self.exon_count,
+            'cds_position': self.cds_position,
+            'cds_length': self.cds_length,
+            'distance_to_last_junction': self.distance_to_last_junction,
+            'in_last_exon': self.in_last_exon,
+            'escapes_nmd': self.escapes_nmd,
+        }
+
+
+# =============================================================================
+# GFF3 parsing
+# =============================================================================
+
+def _attributes(column: str) -> Dict[str, str]:
+    attributes = {}
+    for part in column.strip().split(';'):
+        if '=' in part:
+            key, value = part.split('=', 1)
+            attributes[key.strip()] = unquote(value.strip())
+    return attributes
+
+
+def iter_gff_transcripts(path: str) -> Iterable[TranscriptModel]:
+    """Yield transcripts with at least one exon from a RefSeq/MANE/Ensembl GFF3 file (plain or gzip)."""
+    opener = gzip.open if path.endswith('.gz') else open
+    transcripts: Dict[str, Dict] = {}
+    exons: Dict[str, List[Tuple[int, int]]] = {}
+    cds: Dict[str, List[int]] = {}
+    saw_feature = False
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip() or line.startswith('#'):
+                continue
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 9:
+                raise TranscriptIndexError(f"Malformed GFF3 line {line_number} in {path}")
+            saw_feature = True
+            kind = fields[2]
+            if kind not in _TRANSCRIPT_TYPES and kind not in ('exon', 'CDS'):
+                continue
+            start, end = int(fields[3]), int(fields[4])
+            attributes = _attributes(fields[8])
+            if kind in _TRANSCRIPT_TYPES:
+                feature_id = attributes.get('ID')
+                if not feature_id:
+                    continue
+                transcript_id = attributes.get('transcript_id') or attributes.get('Name') or feature_id
+                transcript_id = transcript_id.split(':', 1)[-1]
+                if transcript_id.startswith('rna-'):
+                    transcript_id = transcript_id[4:]
+                tags = attributes.get('tag', '')
+                transcripts[feature_id] = {
+                    'transcript_id': transcript_id,
+                    'gene': attributes.get('gene') or attributes.get('gene_name') or '',
+                    'chrom': normalize_contig(fields[0]),
+                    'strand': fields[6],
+                    'mane_select': 'MANE Select' in tags or 'MANE_Select' in tags,
+                }
+                continue
+            for parent in attributes.get('Parent', '').split(','):
+                if kind == 'exon':
+                    exons.setdefault(parent, []).append((start, end))
+                else:
+                    cds.setdefault(parent, []).extend((start, end))
+    if not saw_feature:
+        raise TranscriptIndexError(f"No GFF3 features in {path}")
+
+    for feature_id, info in transcripts.items():
+        blocks = sorted(exons.get(feature_id, ()))
+        if not blocks or info['strand'] not in ('+', '-'):
+            continue
+        if info['strand'] == '-':
+            blocks.reverse()
+        coding = cds.get(feature_id)
+        yield TranscriptModel(
+            transcript_id=info['transcript_id'],
+            gene=info['gene'],
+            chrom=info['chrom'],
+            strand=info['strand'],
+            exons=tuple(blocks),
+            cds_start=min(coding) if coding else None,
+            cds_end=max(coding) if coding else None,
+            mane_select=info['mane_select'],
+        )
+
+
+class TranscriptIndex:
+    """
+    Transcript models by accession, by gene and by genomic span.
+
+    Attributes:
+        path: File the index was read from (None if built in memory)
+    """
+
+    def __init__(self, transcripts: Iterable[TranscriptModel] = (), path: Optional[str] = None):
+        self.path = path
+        self._by_id: Dict[str, TranscriptModel] = {}
+        self._by_accession: Dict[str, TranscriptModel] = {}
+        self._by_gene: Dict[str, List[TranscriptModel]] = {}
+        spans: Dict[str, List[Tuple[int, int, TranscriptModel]]] = {}
+        for model in transcripts:
+            self._by_id[model.transcript_id.upper()] = model
+            accession = _accession(model.transcript_id)
+            current = self._by_accession.get(accession)
+            if current is None or self._version(model) > self._version(current):
+                self._by_accession[accession] = model
+            if model.gene:
+                self._by_gene.setdefault(model.gene.upper(), []).append(model)
+            spans.setdefault(model.chrom, []).append((*model.span, model))
+        self._trees = {chrom: IntervalTree(intervals) for chrom, intervals in spans.items()}
+
+    @staticmethod
+    def _version(model: TranscriptModel) -> int:
+        _, _, version = model.transcript_id.partition('.')
+        return int(version) if version.isdigit() else 0
+
+    @classmethod
+    def from_gff(cls, path: str) -> 'TranscriptIndex':
+        """Build the index from a GFF3 annotation."""
+        return cls(iter_gff_transcripts(path), path=path)
+
+    # =========================================================================
+    # Lookup
+    # =========================================================================
+
+    def get(self, transcript_id: str) -> Optional[TranscriptModel]:
+        """Return a transcript by versioned accession, falling back to the latest version."""
+        if not transcript_id:
+            return None
+        transcript_id = transcript_id.strip().upper()
+        return self._by_id.get(transcript_id) or self._by_accession.get(_accession(transcript_id))
+
+    def for_gene(self, gene: str) -> List[TranscriptModel]:
+        return list(self._by_gene.get((gene or '').strip().upper(), ()))
+
+    def preferred(self, gene: str) -> Optional[TranscriptModel]:
+        """Return the MANE Select transcript of a gene, else its longest coding transcript."""
+        models = self._by_gene.get((gene or '').strip().upper())
+        if not models:
+            return None
+        return max(models, key=lambda m: (m.mane_select, m.is_coding, m.cds_length or 0, m.length))
+
+    def resolve(self, transcript_id: Optional[str] = None, gene: Optional[str] = None) -> Optional[TranscriptModel]:
+        """Return the named transcript, or the preferred transcript of the gene."""
+        model = self.get(transcript_id) if transcript_id else None
+        if model is None and gene:
+            model = self.preferred(gene)
+        return model
+
+    def overlapping(self, chrom: str, pos: int) -> List[TranscriptModel]:
+        """Return every transcript whose genomic span contains the position."""
+        tree = self._trees.get(normalize_contig(chrom))
+        return tree.overlap(int(pos)) if tree is not None else []
+
+    # =========================================================================
+    # Projection shortcuts
+    # =========================================================================
+
+    def c_to_g(self, transcript_id: str, position: str) -> Optional[Tuple[str, int]]:
+        """Return (chromosome, position) of a c. position on a transcript."""
+        model = self.get(transcript_id)
+        g = model.c_to_g(position) if model else None
+        return (model.chrom, g) if g is not None else None
+
+    def g_to_c(self, transcript_id: str, pos: int) -> Optional[str]:
+        model = self.get(transcript_id)
+        return model.g_to_c(int(pos)) if model else None
+
+    def locate(self, transcript_id: Optional[str], position: str,
+               gene: Optional[str] = None) -> Optional[TranscriptPosition]:
+        """Exon context of a c. position (transcript, or the gene's preferred transcript)."""
+        model = self.resolve(transcript_id, gene)
+        return model.locate(position) if model else None
+
+    def transcripts(self) -> Iterable[TranscriptModel]:
+        return self._by_id.values()
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, transcript_id: str) -> bool:
+        return self.get(transcript_id) is not None
+
+    # =========================================================================
+    # Snapshot persistence
+    # =========================================================================
+
+    def save(self, path: str) -> None:
+        """Persist the index as JSON (gzip-compressed for .json.gz paths)."""
+        save_snapshot(path, 'transcript_index', SNAPSHOT_FORMAT_VERSION,
+                      rows=[astuple(model) for model in self._by_id.values()])
+
+    @classmethod
+    def load(cls, path: str) -> Optional['TranscriptIndex']:
+        """Load an index saved with save(); returns None if missing or incompatible."""
+        payload = load_snapshot(path, 'transcript_index', SNAPSHOT_FORMAT_VERSION)
+        if payload is None:
+            return None
+        try:
+            models = [TranscriptModel(transcript_id, gene, chrom, strand,
+                                      tuple((start, end) for start, end in exons), *rest)
+                      for transcript_id, gene, chrom, strand, exons, *rest in payload.get('rows', [])]
+        except (TypeError, ValueError):
+            return None
+        return cls(models, path=path)
+
+
+def open_transcript_index(path: str) -> TranscriptIndex:
+    """Open a saved index (.json.gz / .json) or parse any other file as GFF3."""
+    if not is_snapshot_path(path):
+        return TranscriptIndex.from_gff(path)
+    index = TranscriptIndex.load(path)
+    if index is None:
+        raise TranscriptIndexError(f"Not a version {SNAPSHOT_FORMAT_VERSION} transcript index snapshot: {path}")
+    return index
+
+
+# =============================================================================
+# Shared index resolution
+# =============================================================================
+
+_indexes = LocalResource('transcripts', 'ACMG_TRANSCRIPT_GFF', open_transcript_index,
+                         label='Local transcript index', errors=(ValueError,))
+
+
+def get_transcript_index(path: Optional[str] = None) -> Optional[TranscriptIndex]:
+    """
+    Return the shared transcript index, loading it at most once per process.
+
+    Resolution order: ``path``, LOCAL_DATA_SOURCES['transcripts'], then the
+    ACMG_TRANSCRIPT_GFF environment variable. Returns None when nothing is
+    configured or the file cannot be loaded.
+    """
+    return _indexes.get(path)
+
+
+def clear_transcript_indexes() -> None:
+    """Drop all shared indexes (e.g. after the file is replaced)."""
+    _indexes.clear()
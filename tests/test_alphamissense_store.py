@@ -0,0 +1,171 @@
+"""
+Tests for the Local AlphaMissense Store
+=======================================
+
+Imports small AlphaMissense-format tables and verifies protein, transcript
+and genomic lookups, plus the APIClient and PredictorAPIClient integration.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.alphamissense_store import (
+    AlphaMissenseStoreError,
+    LocalAlphaMissenseStore,
+    classify_alphamissense,
+    clear_alphamissense_stores,
+    import_alphamissense,
+    parse_protein_variant,
+)
+from utils.api_client import APIClient
+from utils.predictor_api_client import PredictorAPIClient
+
+
+COPYRIGHT = '# Copyright 2023 DeepMind Technologies Limited\n#\n'
+
+SUBSTITUTIONS = COPYRIGHT + '\n'.join([
+    'uniprot_id\tprotein_variant\tam_pathogenicity\tam_class',
+    'P04637\tM1A\t0.3012\tlikely_benign',
+    'P04637\tR273H\t0.9876\tlikely_pathogenic',
+    'P04637\tR273C\t0.9912\tlikely_pathogenic',
+    'P38398\tC61G\t0.9990\tlikely_pathogenic',
+    '',
+])
+
+ISOFORMS = COPYRIGHT + '\n'.join([
+    'transcript_id\tprotein_variant\tam_pathogenicity\tam_class',
+    'ENST00000999999.1\tA5V\t0.4500\tambiguous',
+    '',
+])
+
+HG38 = COPYRIGHT + '\n'.join([
+    '#CHROM\tPOS\tREF\tALT\tgenome\tuniprot_id\ttranscript_id\tprotein_variant\tam_pathogenicity\tam_class',
+    'chr17\t7675088\tC\tT\thg38\tP04637\tENST00000269305.9\tR273H\t0.9876\tlikely_pathogenic',
+    'chr17\t7675088\tC\tA\thg38\tP04637\tENST00000269305.9\tR273L\t0.9700\tlikely_pathogenic',
+    'chr17\t43106478\tA\tC\thg38\tP38398\tENST00000357654.9\tC61G\t0.9990\tlikely_pathogenic',
+    '',
+])
+
+GENE_MAP = 'hgnc_id\tsymbol\tuniprot_ids\nHGNC:11998\tTP53\tP04637\nHGNC:1100\tBRCA1\tP38398|Q3B891\n'
+
+
+def _write(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+@pytest.fixture
+def store_path():
+    """Import the sample tables into a store."""
+    temp_dir = tempfile.mkdtemp(prefix='acmg_am_test_')
+    path = os.path.join(temp_dir, 'am.bin')
+    counts = import_alphamissense(
+        path,
+        substitutions_path=_write(temp_dir, 'subs.tsv', SUBSTITUTIONS),
+        hg38_path=_write(temp_dir, 'hg38.tsv', HG38),
+        isoforms_path=_write(temp_dir, 'isoforms.tsv', ISOFORMS),
+        gene_map_path=_write(temp_dir, 'hgnc.tsv', GENE_MAP),
+    )
+    assert counts == {'proteins': 3, 'genomic': 3, 'aliases': 2, 'genes': 2}
+    clear_alphamissense_stores()
+    yield path
+    clear_alphamissense_stores()
+
+
+class TestParsing:
+    """Tests for protein change parsing and classification."""
+
+    def test_parse_protein_variant(self):
+        assert parse_protein_variant('R273H') == ('R', 273, 'H')
+        assert parse_protein_variant('p.Arg273His') == ('R', 273, 'H')
+        assert parse_protein_variant('p.(Arg273His)') == ('R', 273, 'H')
+        assert parse_protein_variant('p.Arg273Ter') is None
+        assert parse_protein_variant('c.817C>T') is None
+
+    def test_classify(self):
+        assert classify_alphamissense(0.2) == 'likely_benign'
+        assert classify_alphamissense(0.5) == 'ambiguous'
+        assert classify_alphamissense(0.9) == 'likely_pathogenic'
+
+
+class TestLocalAlphaMissenseStore:
+    """Tests for store lookups."""
+
+    def test_protein_lookup(self, store_path):
+        with LocalAlphaMissenseStore(store_path) as store:
+            assert store.protein_count == 3
+            assert store.get_protein_score('P04637', 273, 'H') == 0.9876
+            assert store.get_protein_score('P04637', 273, 'H', ref_aa='R') == 0.9876
+            assert store.get_protein_score('P04637', 273, 'H', ref_aa='G') is None
+            assert store.get_protein_score('P04637', 273, 'W') is None
+            assert store.get_protein_score('P04637', 274, 'H') is None
+            assert store.get_reference_residue('P04637', 2) is None
+
+    def test_transcript_and_gene_lookup(self, store_path):
+        with LocalAlphaMissenseStore(store_path) as store:
+            # Isoform table and hg38 transcript aliases, with or without version
+            assert store.get_protein_score('ENST00000999999', 5, 'V') == 0.45
+            assert store.get_protein_score('ENST00000269305.8', 273, 'C') == 0.9912
+            assert store.get_uniprot_accession('brca1') == 'P38398'
+
+            lookup = store.lookup_hgvs('TP53', 'p.Arg273Cys')
+            assert lookup['score'] == 0.9912
+            assert lookup['am_class'] == 'likely_pathogenic'
+            assert store.lookup_hgvs('KRAS', 'p.G12D') is None
+
+    def test_genomic_lookup(self, store_path):
+        with LocalAlphaMissenseStore(store_path) as store:
+            assert store.get_genomic_score('17', 7675088, 'C', 'A') == 0.97
+            assert store.get_genomic_score('chr17', 43106478, 'A', 'C') == 0.999
+            assert store.get_genomic_score('17', 7675088, 'C', 'G') is None
+            assert store.get_genomic_score('1', 7675088, 'C', 'T') is None
+
+    def test_unsorted_genomic_table_rejected(self):
+        temp_dir = tempfile.mkdtemp(prefix='acmg_am_test_')
+        lines = HG38.splitlines()
+        unsorted = '\n'.join(lines[:3] + [lines[5], lines[3]]) + '\n'
+        with pytest.raises(AlphaMissenseStoreError):
+            import_alphamissense(os.path.join(temp_dir, 'am.bin'),
+                                 hg38_path=_write(temp_dir, 'hg38.tsv', unsorted))
+
+
+class TestStoreConsumers:
+    """Tests for APIClient and PredictorAPIClient using the store."""
+
+    def test_api_client_any_gene(self, store_path, monkeypatch):
+        monkeypatch.setenv('ACMG_ALPHAMISSENSE_STORE', store_path)
+        client = APIClient(cache_enabled=False)
+
+        result = client.get_alphamissense_score('BRCA1', 'p.Cys61Gly')
+        assert result['alphamissense_score'] == 0.999
+        assert result['uniprot_id'] == 'P38398'
+        assert result['manual_lookup_required'] is False
+
+        assert 'error' in client.get_alphamissense_score('KRAS', 'p.Gly12Asp')
+
+    @patch('utils.predictor_api_client.requests')
+    def test_predictor_client_offline(self, mock_requests, store_path):
+        client = PredictorAPIClient(api_enabled=False,
+                                    alphamissense_store=LocalAlphaMissenseStore(store_path))
+
+        scores = client.get_predictor_scores(chrom='17', pos=7675088, ref='C', alt='T')
+
+        assert scores['alphamissense'].value == 0.9876
+        assert scores['alphamissense'].source == 'AlphaMissense_local'
+        assert scores['revel'].value is None
+        assert not mock_requests.get.called
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,223 @@
+"""
+Tests for Batched APIClient Lookups
+===================================
+
+Verifies that the batch paths in APIClient resolve many variants with a
+few requests and return the same result shapes as the single-variant
+methods.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import sys
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.api_client import APIClient
+from utils.batch_planner import VariantBatchPlanner, variant_key
+from core.variant_data import VariantData
+
+
+def _json_response(payload: dict, status_code: int = 200) -> Mock:
+    """Build a mocked requests response returning ``payload``."""
+    response = Mock(status_code=status_code)
+    response.json.return_value = payload
+    return response
+
+
+def _clinvar_record(uid: str, chrom: str, start: int, spdi: str, description: str) -> dict:
+    """Minimal ClinVar esummary record."""
+    return {
+        'uid': uid,
+        'title': f'record {uid}',
+        'germline_classification': {
+            'description': description,
+            'review_status': 'reviewed by expert panel',
+            'last_evaluated': '2024/01/01',
+        },
+        'variation_set': [{
+            'canonical_spdi': spdi,
+            'variation_loc': [
+                {'assembly_name': 'GRCh37', 'chr': chrom, 'start': str(start + 1000)},
+                {'assembly_name': 'GRCh38', 'chr': chrom, 'start': str(start)},
+            ],
+        }],
+    }
+
+
+class TestClinVarBatch:
+    """Tests for batched ClinVar E-utilities lookups."""
+
+    @patch('utils.api_client.requests.post')
+    def test_status_many_uses_history_server(self, mock_post):
+        """One esearch plus one esummary page resolve several variants."""
+        search = _json_response({'esearchresult': {
+            'count': '3', 'webenv': 'MCID_1', 'querykey': '1', 'idlist': []
+        }})
+        summary = _json_response({'result': {
+            'uids': ['10', '11', '12'],
+            '10': _clinvar_record('10', '17', 100, 'NC_000017.11:99:G:T', 'Benign'),
+            '11': _clinvar_record('11', '17', 100, 'NC_000017.11:99:G:A', 'Pathogenic'),
+            '12': _clinvar_record('12', '13', 500, 'NC_000013.11:499:C:T', 'Likely benign'),
+        }})
+        mock_post.side_effect = [search, summary]
+
+        client = APIClient(cache_enabled=False)
+        results = client.get_clinvar_status_many([
+            ('17', 100, 'G', 'A'),
+            ('13', 500, 'C', 'T'),
+            ('2', 42, 'A', 'G'),
+        ])
+
+        assert mock_post.call_count == 2
+        search_term = mock_post.call_args_list[0].kwargs['data']['term']
+        assert '(17[chr] AND 100[chrpos])' in search_term
+        assert mock_post.call_args_list[0].kwargs['data']['usehistory'] == 'y'
+        assert mock_post.call_args_list[1].kwargs['data']['WebEnv'] == 'MCID_1'
+
+        # SPDI allele match picks record 11 over record 10 at the same position
+        assert results[('17', 100, 'G', 'A')]['clinvar_id'] == '11'
+        assert results[('17', 100, 'G', 'A')]['significance'] == 'Pathogenic'
+        assert results[('17', 100, 'G', 'A')]['star_rating'] == 3
+        assert results[('13', 500, 'C', 'T')]['clinvar_id'] == '12'
+        assert results[('2', 42, 'A', 'G')]['status'] == 'not_found'
+
+    @patch('utils.api_client.requests.post')
+    def test_status_many_skips_cached_variants(self, mock_post):
+        """Cached variants do not trigger requests."""
+        client = APIClient(cache_enabled=False)
+        client.cache_enabled = True
+        client._save_cache = Mock()
+        client._cache_response('clinvar_17_100_G_A', {'status': 'found', 'clinvar_id': '11'})
+
+        results = client.get_clinvar_status_many([('17', 100, 'G', 'A')])
+
+        assert mock_post.call_count == 0
+        assert results[('17', 100, 'G', 'A')]['clinvar_id'] == '11'
+
+    @patch('utils.api_client.requests.post')
+    def test_status_many_summary_error_is_not_cached(self, mock_post):
+        """A failed esummary page reports the batch as errors and caches nothing."""
+        search = _json_response({'esearchresult': {
+            'count': '1', 'webenv': 'MCID_1', 'querykey': '1', 'idlist': []
+        }})
+        mock_post.side_effect = [search, _json_response({}, status_code=503)]
+
+        client = APIClient(cache_enabled=False)
+        client.cache_enabled = True
+        client._save_cache = Mock()
+        results = client.get_clinvar_status_many([('17', 100, 'G', 'A'), ('2', 42, 'A', 'G')])
+
+        assert all(result['status'] == 'error' for result in results.values())
+        assert client._get_cached_response('clinvar_17_100_G_A') is None
+        assert client._get_cached_response('clinvar_2_42_A_G') is None
+
+    @patch('utils.api_client.requests.post')
+    def test_summaries_for_id_list(self, mock_post):
+        """VCV IDs are normalized and fetched in one esummary call."""
+        mock_post.return_value = _json_response({'result': {
+            'uids': ['55406', '12345'],
+            '55406': _clinvar_record('55406', '17', 1, '', 'Pathogenic'),
+            '12345': _clinvar_record('12345', '17', 2, '', 'Benign'),
+        }})
+
+        client = APIClient(cache_enabled=False)
+        summaries = client.get_clinvar_summaries(['VCV000055406', '12345', '55406'])
+
+        assert mock_post.call_count == 1
+        assert mock_post.call_args.kwargs['data']['id'] == '55406,12345'
+        assert summaries['55406']['significance'] == 'Pathogenic'
+        assert summaries['12345']['significance'] == 'Benign'
+
+
+class TestEnsemblBatch:
+    """Tests for batched Ensembl lookups."""
+
+    @patch('utils.api_client.requests.post')
+    def test_chromosomes_with_mygene_fallback(self, mock_post):
+        """Symbols missing from Ensembl are resolved by one MyGene.info query."""
+        ensembl = _json_response({'BRCA1': {'seq_region_name': '17'}})
+        mygene = _json_response([
+            {'query': 'FAKE1', 'genomic_pos': [{'chr': 'X'}]},
+            {'query': 'FAKE2', 'notfound': True},
+        ])
+        mock_post.side_effect = [ensembl, mygene]
+
+        client = APIClient(cache_enabled=False)
+        results = client.get_chromosomes_from_ensembl(['BRCA1', 'fake1', 'FAKE2', 'brca1'])
+
+        assert mock_post.call_count == 2
+        assert mock_post.call_args_list[0].kwargs['json'] == {'symbols': ['BRCA1', 'FAKE1', 'FAKE2']}
+        assert mock_post.call_args_list[1].kwargs['data']['q'] == 'FAKE1,FAKE2'
+        assert results == {'BRCA1': '17', 'FAKE1': 'X', 'FAKE2': None}
+
+    @patch('utils.api_client.requests.post')
+    def test_conservation_many_maps_by_input(self, mock_post):
+        """VEP region results are matched to variants by their echoed input."""
+        mock_post.return_value = _json_response([
+            {'input': '17 100 . G A . . .',
+             'transcript_consequences': [{'phylop_score': 7.5, 'gerp_score': 5.1}]},
+        ])
+
+        client = APIClient(cache_enabled=False)
+        results = client.get_conservation_scores_many([('17', 100, 'G', 'A'), ('13', 5, 'C', 'T')])
+
+        assert mock_post.call_count == 1
+        assert len(mock_post.call_args.kwargs['json']['variants']) == 2
+        assert results[('17', 100, 'G', 'A')]['conservation_scores'] == {'phylop': 7.5, 'gerp': 5.1}
+        assert results[('13', 5, 'C', 'T')]['manual_lookup_required'] is True
+
+
+class TestVariantBatchPlanner:
+    """Tests for the batch prefetch planner."""
+
+    def _variant(self, chrom, pos, ref, alt, gene):
+        variant = VariantData()
+        variant.basic_info = {
+            'chromosome': chrom, 'position': pos,
+            'ref_allele': ref, 'alt_allele': alt, 'gene': gene
+        }
+        return variant
+
+    def test_plan_deduplicates_variants_and_genes(self):
+        planner = VariantBatchPlanner()
+        plan = planner.plan([
+            self._variant('17', '100', 'G', 'A', 'brca1'),
+            {'chromosome': '17', 'position': 100, 'ref_allele': 'G', 'alt_allele': 'A', 'gene': 'BRCA1'},
+            ('13', 5, 'C', 'T'),
+            {'gene': 'TP53'},
+        ])
+        assert plan.variants == [('17', 100, 'G', 'A'), ('13', 5, 'C', 'T')]
+        assert plan.genes == ['BRCA1', 'TP53']
+        assert variant_key({'chromosome': '1'}) is None
+
+    def test_prefetch_calls_batch_apis_and_applies(self):
+        api_client = Mock()
+        api_client.get_variant_frequencies.return_value = {}
+        api_client.get_clinvar_status_many.side_effect = RuntimeError('down')
+        api_client.get_conservation_scores_many.return_value = {}
+        api_client.get_chromosomes_from_ensembl.return_value = {'BRCA1': '17'}
+        predictor_client = Mock()
+        predictor_client.get_predictor_scores_many.return_value = {('17', 100, 'G', 'A'): {'revel': 'score'}}
+        population_client = Mock()
+        population_client.get_population_stats_many.return_value = {('17', 100, 'G', 'A'): {'gnomad_v4': 'stats'}}
+
+        variants = [self._variant('17', 100, 'G', 'A', 'BRCA1')]
+        planner = VariantBatchPlanner(api_client, predictor_client, population_client)
+        result = planner.prefetch(variants)
+        planner.apply(variants, result)
+
+        predictor_client.get_predictor_scores_many.assert_called_once_with([('17', 100, 'G', 'A')])
+        api_client.get_chromosomes_from_ensembl.assert_called_once_with(['BRCA1'])
+        assert result.chromosomes == {'BRCA1': '17'}
+        assert 'clinvar_status' in result.errors
+        assert variants[0].predictor_scores == {'revel': 'score'}
+        assert variants[0].population_stats == {'gnomad_v4': 'stats'}
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
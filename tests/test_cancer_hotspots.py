@@ -0,0 +1,157 @@
+"""
+Tests for the Local CancerHotspots Table
+========================================
+
+Loads small spreadsheet-export and API-dump tables and verifies residue
+and range lookups, and that DomainAPIClient answers PM1 hotspot queries
+locally with the remote call kept for explicit refreshes.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import json
+import os
+import sys
+import tempfile
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.cancer_hotspots import (
+    CancerHotspotTable,
+    CancerHotspotTableError,
+    clear_cancer_hotspot_tables,
+    get_cancer_hotspot_table,
+)
+from utils.domain_api_client import DomainAPIClient
+from utils.domain_index import SOURCE_CANCER_HOTSPOTS, clear_domain_index, get_domain_index
+
+
+TSV = '\n'.join([
+    'Hugo_Symbol\tAmino_Acid_Position\tReference_Amino_Acid\tMutation_Count\tVariant_Amino_Acid\t'
+    'Tumor_Type_Composition\tqvalue',
+    'TP53\t273\tR:1000\t1000\tH:600|C:400\tbreast:300|lung:700\t0',
+    'TP53\t175\tR:800\t800\tH:800\tcolorectal:800\t0',
+    'KRAS\t12\tG:2000\t2000\tD:1200|V:800\tpancreas:2000\t0',
+    'EGFR\t745-750\tE:50\t50\t\tlung:50\t0.001',
+    '',
+])
+
+API_DUMP = [
+    {'hugoSymbol': 'PIK3CA', 'residue': 'H1047', 'tumorCount': 900,
+     'variantAminoAcid': {'R': 850, 'L': 50}, 'tumorTypeComposition': {'breast': 900}, 'qValue': 0},
+]
+
+
+def _write(name, content):
+    path = os.path.join(tempfile.mkdtemp(prefix='acmg_hotspots_test_'), name)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    clear_cancer_hotspot_tables()
+    clear_domain_index()
+    yield
+    clear_cancer_hotspot_tables()
+    clear_domain_index()
+
+
+class TestCancerHotspotTable:
+    """Tests for loading and querying hotspot tables."""
+
+    def test_tsv_lookup(self):
+        table = CancerHotspotTable.from_file(_write('hotspots.tsv', TSV))
+
+        assert len(table) == 4
+        assert table.positions('tp53') == [175, 273]
+        record = table.get('TP53', 273)
+        assert (record.reference_aa, record.mutation_count) == ('R', 1000)
+        assert record.variant_counts == {'H': 600, 'C': 400}
+        assert record.tumor_types['lung'] == 700
+        assert table.get('TP53', 274) is None
+
+        assert [r.start for r in table.overlapping('TP53', 170, 280)] == [175, 273]
+        assert table.lookup('EGFR', 747)['mutation_count'] == 50
+
+    def test_api_dump(self):
+        table = CancerHotspotTable.from_file(_write('hotspots.json', json.dumps(API_DUMP)))
+
+        record = table.get('PIK3CA', 1047)
+        assert record.reference_aa == 'H'
+        assert record.tumor_count == 900
+        assert record.mutation_count == 900
+
+    def test_rejects_other_files(self):
+        with pytest.raises(CancerHotspotTableError):
+            CancerHotspotTable.from_file(_write('other.tsv', 'a\tb\n1\t2\n'))
+
+
+class TestDomainClientLocalHotspots:
+    """Tests for DomainAPIClient with a local table."""
+
+    @patch('utils.domain_api_client.requests.get')
+    def test_annotation_answered_locally(self, mock_get, monkeypatch):
+        monkeypatch.setenv('ACMG_CANCER_HOTSPOTS', _write('hotspots.tsv', TSV))
+        mock_get.return_value = Mock(status_code=500)
+        client = DomainAPIClient(cache_enabled=False)
+
+        assert client.hotspot_table is get_cancer_hotspot_table()
+        hit = client._query_cancer_hotspots('KRAS', 12)
+        assert hit['tumor_count'] == 2000
+        assert client._query_cancer_hotspots('KRAS', 13) is None
+
+        annotation = client.get_hotspot_annotation('KRAS', position=12)
+        assert annotation.is_hotspot and annotation.confidence == 0.95
+        assert 'CancerHotspots (local)' in annotation.source
+        # Only UniProt was attempted remotely
+        assert all('cancerhotspots' not in str(call) for call in mock_get.call_args_list)
+
+        assert [r.start for r in get_domain_index().query('EGFR', 748, sources=(SOURCE_CANCER_HOTSPOTS,))] == [745]
+
+    @patch('utils.domain_api_client.requests.get')
+    def test_refresh_updates_table(self, mock_get):
+        table = CancerHotspotTable.from_file(_write('hotspots.tsv', TSV))
+        response = Mock(status_code=200)
+        response.json.return_value = [{'tumorCount': 12, 'count': 15}]
+        mock_get.return_value = response
+        client = DomainAPIClient(cache_enabled=False, hotspot_table=table)
+
+        assert client.refresh_hotspot('KRAS', 61)['tumor_count'] == 12
+        assert table.get('KRAS', 61).mutation_count == 15
+        assert table.positions('KRAS') == [12, 61]
+        assert [r.attributes['tumor_count'] for r in get_domain_index().query('KRAS', 61, sources=(SOURCE_CANCER_HOTSPOTS,))] == [12]
+
+        # Refreshing a known hotspot updates its counts and keeps its detail
+        client.refresh_hotspot('TP53', 273)
+        record = table.get('TP53', 273)
+        assert (record.tumor_count, record.mutation_count) == (12, 15)
+        assert record.variant_counts == {'H': 600, 'C': 400} and record.tumor_types['lung'] == 700
+
+    def test_regions_indexed_once_per_domain_index(self):
+        table = CancerHotspotTable.from_file(_write('hotspots.tsv', TSV))
+        with patch.object(table, '_index_gene', wraps=table._index_gene) as index_gene:
+            DomainAPIClient(cache_enabled=False, hotspot_table=table)
+            DomainAPIClient(cache_enabled=False, hotspot_table=table)
+            assert index_gene.call_count == len(table.genes())
+            clear_domain_index()
+            DomainAPIClient(cache_enabled=False, hotspot_table=table)
+            assert index_gene.call_count == 2 * len(table.genes())
+
+    def test_unreadable_table_warns_once(self, monkeypatch, capsys):
+        path = _write('hotspots.tsv', '')
+        with open(path, 'wb') as f:
+            f.write(b'Hugo_Symbol\tAmino_Acid_Position\n\xff\xfeTP53\t273\n')
+        monkeypatch.setenv('ACMG_CANCER_HOTSPOTS', path)
+        assert DomainAPIClient(cache_enabled=False).hotspot_table is None
+        assert DomainAPIClient(cache_enabled=False).hotspot_table is None
+        assert capsys.readouterr().out.count('CancerHotspots table unavailable') == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,118 @@
+"""
+Tests for the Indexed ClinGen Dosage Table
+==========================================
+
+Verifies TSV parsing, bulk lookup, snapshot persistence and that APIClient
+and the gene rules engine share the same index.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.clingen_dosage import (
+    ClinGenDosageTable,
+    clear_dosage_tables,
+    get_dosage_table,
+)
+from utils.api_client import APIClient
+from utils.gene_rules_engine import build_gene_specific_thresholds_from_clingen
+
+
+def _row(gene, hi, ts='0', last='2020-01-01'):
+    fields = [gene, '1', '1p1', 'chr1:1-2', hi, 'HI description',
+              '111', '222', '', '', '', '', ts, 'TS description',
+              '', '', '', '', '', '', last, '', '']
+    return '\t'.join(fields)
+
+
+TSV = '\n'.join([
+    '#ClinGen Gene Curation Results',
+    '#Gene Symbol\tGene ID\tcytoBand\tGenomic Location\tHaploinsufficiency Score',
+    _row('BRCA1', '3'),
+    _row('C9orf72', 'Not yet evaluated'),
+    _row('RAD51C', '30', ts='1'),
+    _row('BRCA1', '0'),
+    '',
+])
+
+
+@pytest.fixture
+def tsv_path():
+    """Write the sample TSV to a temporary file."""
+    temp_dir = tempfile.mkdtemp(prefix='acmg_clingen_test_')
+    path = os.path.join(temp_dir, 'ClinGen_gene_curation_list_GRCh38.tsv')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(TSV)
+    clear_dosage_tables()
+    yield path
+    clear_dosage_tables()
+
+
+class TestClinGenDosageTable:
+    """Tests for parsing and lookup."""
+
+    def test_parse_and_lookup(self):
+        table = ClinGenDosageTable.from_text(TSV)
+        assert len(table) == 3
+
+        brca1 = table.get('brca1')
+        assert brca1.hi_score == 3  # first row wins
+        assert brca1.hi_pmids == ['111', '222']
+        assert brca1.last_evaluated == '2020-01-01'
+        assert table.get('C9ORF72').hi_score is None
+        assert table.get('C9ORF72').gene_symbol == 'C9orf72'
+        assert table.get('RAD51C').ts_score == 1
+        assert 'TP53' not in table
+
+    def test_get_many(self):
+        table = ClinGenDosageTable.from_text(TSV)
+        records = table.get_many(['brca1', 'TP53'])
+        assert records['BRCA1'].hi_score == 3
+        assert records['TP53'] is None
+
+    def test_snapshot_round_trip(self, tsv_path):
+        binary_path = tsv_path + '.json.gz'
+        table = get_dosage_table(tsv_path, binary_path=binary_path)
+        assert os.path.exists(binary_path)
+
+        clear_dosage_tables()
+        reloaded = get_dosage_table(tsv_path, binary_path=binary_path)
+        assert reloaded is not table
+        assert reloaded.get('RAD51C') == table.get('RAD51C')
+
+    def test_table_is_shared(self, tsv_path):
+        assert get_dosage_table(tsv_path) is get_dosage_table(tsv_path)
+        assert get_dosage_table(tsv_path + '.missing') is None
+
+
+class TestSharedIndexConsumers:
+    """Tests for APIClient and gene rules engine using the shared index."""
+
+    def test_api_client_single_and_many(self, tsv_path, monkeypatch):
+        monkeypatch.setenv('ACMG_CLINGEN_TSV', tsv_path)
+        client = APIClient(cache_enabled=False)
+
+        result = client.get_clingen_dosage_sensitivity('rad51c')
+        assert result['haploinsufficiency_score'] == 30
+        assert result['gene_symbol'] == 'RAD51C'
+        assert result['source'] == 'Local ClinGen TSV (GRCh38)'
+
+        many = client.get_clingen_dosage_sensitivity_many(['BRCA1', 'TP53'])
+        assert many['BRCA1']['pvs1_recommendation'] == client._determine_pvs1_strength(3)
+        assert many['TP53']['pvs1_recommendation'] == 'insufficient_data'
+
+    def test_gene_rules_engine_uses_table(self, tsv_path):
+        thresholds = build_gene_specific_thresholds_from_clingen(tsv_path)
+        assert set(thresholds) == {'BRCA1', 'RAD51C', 'default'}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
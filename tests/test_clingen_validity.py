@@ -0,0 +1,178 @@
+"""
+Tests for the ClinGen Gene-Disease Validity Snapshot
+====================================================
+
+Parses a small gene-validity export and verifies the gene and MONDO
+indexes, mechanism derivation and APIClient answering validity queries
+without eRepo calls.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.constants import API_SETTINGS
+from utils.clingen_validity import (
+    ClinGenValiditySnapshot,
+    ValiditySnapshotError,
+    clear_validity_snapshots,
+    get_validity_snapshot,
+    normalize_mondo_id,
+)
+from utils.api_client import APIClient
+
+
+HEADER = ['GENE SYMBOL', 'GENE ID (HGNC)', 'DISEASE LABEL', 'DISEASE ID (MONDO)', 'MOI', 'SOP',
+          'CLASSIFICATION', 'ONLINE REPORT', 'CLASSIFICATION DATE', 'GCEP']
+
+
+def _csv(rows, header=HEADER):
+    def line(cells):
+        return ','.join(f'"{cell}"' for cell in cells)
+    separator = line(['+++++++++++'] * len(header))
+    return '\n'.join([
+        line(['CLINGEN GENE DISEASE VALIDITY CURATIONS'] + [''] * (len(header) - 1)),
+        line(['FILE CREATED: 2024-05-02'] + [''] * (len(header) - 1)),
+        line(['WEBPAGE: https://search.clinicalgenome.org/kb/gene-validity'] + [''] * (len(header) - 1)),
+        separator, line(header), separator,
+    ] + [line(row) for row in rows]) + '\n'
+
+
+ROWS = [
+    ['BRCA1', 'HGNC:1100', 'hereditary breast ovarian cancer syndrome', 'MONDO:0011450', 'AD', 'SOP7',
+     'Definitive', 'https://example.org/1', '2020-01-10T12:00:00.000Z', 'Hereditary Cancer GCEP'],
+    ['BRCA1', 'HGNC:1100', 'Fanconi anemia complementation group S', 'MONDO:0054748', 'AR', 'SOP7',
+     'Limited', 'https://example.org/2', '2021-03-01T12:00:00.000Z', 'Hereditary Cancer GCEP'],
+    ['PALB2', 'HGNC:26144', 'hereditary breast ovarian cancer syndrome', 'MONDO:0011450', 'AD', 'SOP7',
+     'Strong', 'https://example.org/3', '2022-01-10T12:00:00.000Z', 'Hereditary Cancer GCEP'],
+]
+
+
+def _write(name, content):
+    path = os.path.join(tempfile.mkdtemp(prefix='acmg_validity_test_'), name)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+@pytest.fixture
+def export_path():
+    clear_validity_snapshots()
+    yield _write('gene-validity.csv', _csv(ROWS))
+    clear_validity_snapshots()
+
+
+class TestValiditySnapshot:
+    """Tests for parsing and indexed lookup."""
+
+    def test_gene_and_disease_index(self, export_path):
+        snapshot = ClinGenValiditySnapshot.from_csv(export_path)
+        assert snapshot.release == '2024-05-02'
+        assert len(snapshot) == 3
+
+        assert [c.classification for c in snapshot.get_gene('brca1')] == ['Definitive', 'Limited']
+        assert [c.gene for c in snapshot.get_disease('MONDO_0011450')] == ['BRCA1', 'PALB2']
+        assert [c.moi for c in snapshot.get_curations('BRCA1', 'fanconi')] == ['AR']
+        assert snapshot.get_gene('BRCA1')[0].classification_date == '2020-01-10'
+        assert normalize_mondo_id('mondo0011450') == 'MONDO:0011450'
+
+    def test_mechanism_from_dosage_and_column(self, export_path):
+        snapshot = ClinGenValiditySnapshot.from_csv(export_path)
+
+        result = snapshot.validity_result('BRCA1', hi_score=3)
+        assert result['supports_lof_pathogenicity'] is True
+        assert result['confidence'] == 'high'
+        assert result['lof_diseases'] == ['hereditary breast ovarian cancer syndrome']
+        assert snapshot.validity_result('BRCA1', hi_score=3) is result
+
+        unknown = snapshot.validity_result('BRCA1')
+        assert unknown['supports_lof_pathogenicity'] is None and unknown['confidence'] == 'low'
+        assert snapshot.validity_result('NOTAGENE')['confidence'] == 'no_data'
+
+        rows = [ROWS[0] + ['Gain of function']]
+        gof = ClinGenValiditySnapshot.from_csv(_write('gof.csv', _csv(rows, HEADER + ['MECHANISM'])))
+        result = gof.validity_result('BRCA1', hi_score=3)
+        assert result['supports_lof_pathogenicity'] is False
+        assert result['primary_mechanism'] == 'gain_of_function'
+
+    def test_snapshot_round_trip_and_reload(self, export_path):
+        saved = export_path + '.json.gz'
+        ClinGenValiditySnapshot.from_csv(export_path).save(saved)
+        assert get_validity_snapshot(saved).release == '2024-05-02'
+        assert len(get_validity_snapshot(saved).get_gene('BRCA1')) == 2
+
+        ClinGenValiditySnapshot([], release='2024-06-01').save(saved)
+        os.utime(saved, (0, 0))
+        assert get_validity_snapshot(saved).release == '2024-06-01'
+
+        with pytest.raises(ValiditySnapshotError):
+            ClinGenValiditySnapshot.from_csv(_write('other.csv', 'a,b\n1,2\n'))
+
+
+class TestAPIClientValidity:
+    """Tests for APIClient answering from the snapshot."""
+
+    @patch('utils.api_client.requests.get')
+    def test_offline_lookup(self, mock_get, export_path, monkeypatch):
+        monkeypatch.setenv('ACMG_CLINGEN_VALIDITY', export_path)
+        monkeypatch.setitem(API_SETTINGS, 'enabled', False)
+        client = APIClient(cache_enabled=False)
+
+        result = client.get_clingen_gene_validity('palb2', 'MONDO:0011450')
+        assert result['total_curations'] == 1
+        assert result['source'] == 'ClinGen Gene Validity 2024-05-02 (local)'
+        assert 'error' not in result
+        assert not mock_get.called
+
+    @patch('utils.api_client.requests.get')
+    def test_refresh_keeps_snapshot_on_bad_download(self, mock_get, export_path):
+        client = APIClient(cache_enabled=False)
+
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.text = 'not,a\nclingen,export\n'
+        result = client.refresh_clingen_validity_snapshot(export_path)
+        assert 'error' in result
+        assert not os.path.exists(f"{export_path}.download")
+        assert ClinGenValiditySnapshot.from_csv(export_path).release == '2024-05-02'
+
+        mock_get.return_value.text = _csv(ROWS[:1])
+        assert client.refresh_clingen_validity_snapshot(export_path)['curations'] == 1
+        assert not os.path.exists(f"{export_path}.download")
+
+        # A .json.gz target gets the parsed snapshot, not the raw CSV
+        saved = export_path + '.json.gz'
+        assert client.refresh_clingen_validity_snapshot(saved)['curations'] == 1
+        assert ClinGenValiditySnapshot.load(saved).release == '2024-05-02'
+
+    @patch('utils.api_client.requests.get')
+    def test_pickled_content_is_never_loaded(self, mock_get, export_path, tmp_path, monkeypatch):
+        marker = tmp_path / 'unpickled'
+
+        class Payload:
+            def __reduce__(self):
+                return (open, (str(marker), 'w'))
+
+        body = pickle.dumps(Payload(), protocol=0).decode('latin-1')
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.text = body
+        assert 'error' in APIClient(cache_enabled=False).refresh_clingen_validity_snapshot(export_path)
+
+        for name in ('validity.bin', 'validity.json.gz'):
+            path = tmp_path / name
+            path.write_bytes(pickle.dumps(Payload()))
+            monkeypatch.setenv('ACMG_CLINGEN_VALIDITY', str(path))
+            assert get_validity_snapshot() is None
+        assert not marker.exists()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,193 @@
+"""
+Tests for the Local ClinVar Snapshot
+====================================
+
+Builds snapshots from small variant_summary and VCF extracts and verifies
+the allele, codon and c. notation indexes, plus APIClient serving PS1/PM5
+and PP5/BP6 queries without E-utilities.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.constants import API_SETTINGS
+from utils.clinvar_snapshot import (
+    ClinVarSnapshot,
+    ClinVarSnapshotError,
+    build_clinvar_snapshot,
+    clear_clinvar_snapshots,
+    get_clinvar_snapshot,
+)
+from utils.api_client import APIClient
+
+
+SUMMARY_HEADER = ['#AlleleID', 'Type', 'Name', 'GeneID', 'GeneSymbol', 'ClinicalSignificance',
+                  'LastEvaluated', 'Assembly', 'Chromosome', 'ReviewStatus', 'VariationID',
+                  'PositionVCF', 'ReferenceAlleleVCF', 'AlternateAlleleVCF']
+
+
+def _summary_row(name, gene, significance, review, variation_id, pos, ref, alt, assembly='GRCh38'):
+    return ['1', 'single nucleotide variant', name, '7157', gene, significance, 'Jun 29, 2023',
+            assembly, '17', review, variation_id, str(pos), ref, alt]
+
+
+SUMMARY_ROWS = [
+    _summary_row('NM_000546.6(TP53):c.818G>A (p.Arg273His)', 'TP53', 'Pathogenic',
+                 'reviewed by expert panel', '12366', 7675088, 'C', 'T'),
+    _summary_row('NM_000546.6(TP53):c.818G>A (p.Arg273His)', 'TP53', 'Pathogenic',
+                 'reviewed by expert panel', '12366', 7577120, 'C', 'T', assembly='GRCh37'),
+    _summary_row('NM_000546.6(TP53):c.817C>T (p.Arg273Cys)', 'TP53', 'Pathogenic/Likely pathogenic',
+                 'criteria provided, multiple submitters, no conflicts', '12347', 7675089, 'G', 'A'),
+    _summary_row('NM_000546.6(TP53):c.818G>T (p.Arg273Leu)', 'TP53', 'Uncertain significance',
+                 'criteria provided, single submitter', '12348', 7675088, 'C', 'A'),
+    _summary_row('NM_000546.6(TP53):c.819G>A (p.Arg273=)', 'TP53', 'Likely benign',
+                 'criteria provided, single submitter', '12349', 7675087, 'C', 'T'),
+]
+
+VCF = '\n'.join([
+    '##fileformat=VCFv4.1',
+    '##fileDate=2024-05-02',
+    '#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO',
+    '17\t43092919\t55406\tG\tA\t.\t.\tALLELEID=1;CLNSIG=Benign;'
+    'CLNREVSTAT=criteria_provided,_multiple_submitters,_no_conflicts;GENEINFO=BRCA1:672',
+    '17\t43092920\t55407\tG\t.\t.\t.\tALLELEID=2;CLNREVSTAT=no_assertion_provided',
+    '',
+])
+
+
+def _write(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+@pytest.fixture
+def snapshot_path():
+    """Build a snapshot from the sample variant_summary extract."""
+    temp_dir = tempfile.mkdtemp(prefix='acmg_clinvar_test_')
+    lines = ['\t'.join(SUMMARY_HEADER)] + ['\t'.join(row) for row in SUMMARY_ROWS]
+    summary = _write(temp_dir, 'variant_summary.txt', '\n'.join(lines) + '\n')
+    path = os.path.join(temp_dir, 'clinvar.json.gz')
+    assert build_clinvar_snapshot(summary, path, release='2024-05') == 4
+    clear_clinvar_snapshots()
+    yield path
+    clear_clinvar_snapshots()
+
+
+class TestClinVarSnapshot:
+    """Tests for building and querying snapshots."""
+
+    def test_codon_search(self, snapshot_path):
+        snapshot = ClinVarSnapshot.load(snapshot_path)
+        assert snapshot.release == '2024-05'
+
+        result = snapshot.search_position('TP53', 'p.R273H')
+        assert result['same_aa_pathogenic'] is True
+        assert [v['full_hgvs'] for v in result['different_aa_pathogenic']] == ['p.Arg273Cys']
+        assert len(result['variants']) == 3
+        assert result['position'] == '273'
+
+        other = snapshot.search_position('tp53', 'p.Arg273Pro')
+        assert other['same_aa_pathogenic'] is False
+        assert len(other['different_aa_pathogenic']) == 2
+        assert snapshot.search_position('TP53', 'p.Arg273Ter') is None
+
+    def test_allele_and_hgvs_lookup(self, snapshot_path):
+        snapshot = ClinVarSnapshot.load(snapshot_path)
+
+        record = snapshot.get_allele('chr17', 7675088, 'C', 'T')
+        assert record.variation_id == '12366'
+        assert record.star_rating == 3
+        assert record.last_evaluated == '2023/06/29'
+        assert snapshot.get_allele('17', 7577120, 'C', 'T') is None  # GRCh37 row skipped
+
+        assert snapshot.get_by_hgvs('TP53', 'NM_000546.6:c.817C>T').variation_id == '12347'
+        assert snapshot.get_variation('VCV000012349').classification == 'Likely benign'
+
+    def test_vcf_release(self):
+        temp_dir = tempfile.mkdtemp(prefix='acmg_clinvar_test_')
+        snapshot = ClinVarSnapshot.from_vcf(_write(temp_dir, 'clinvar.vcf', VCF))
+
+        assert snapshot.release == '2024-05-02'
+        assert len(snapshot) == 1
+        record = snapshot.get_allele('17', 43092919, 'G', 'A')
+        assert record.gene == 'BRCA1'
+        assert record.star_rating == 2
+
+    def test_rejects_other_files(self):
+        temp_dir = tempfile.mkdtemp(prefix='acmg_clinvar_test_')
+        with pytest.raises(ClinVarSnapshotError):
+            ClinVarSnapshot.from_variant_summary(_write(temp_dir, 'other.tsv', 'a\tb\n1\t2\n'))
+
+    def test_pickled_snapshot_is_never_loaded(self):
+        temp_dir = tempfile.mkdtemp(prefix='acmg_clinvar_test_')
+        marker = os.path.join(temp_dir, 'unpickled')
+
+        class Payload:
+            def __reduce__(self):
+                return (open, (marker, 'w'))
+
+        path = os.path.join(temp_dir, 'clinvar.json.gz')
+        with open(path, 'wb') as f:
+            pickle.dump(Payload(), f)
+        assert ClinVarSnapshot.load(path) is None
+        assert not os.path.exists(marker)
+
+
+class TestSnapshotConsumers:
+    """Tests for APIClient answering from the snapshot."""
+
+    @patch('utils.api_client.requests')
+    def test_api_client_offline(self, mock_requests, snapshot_path, monkeypatch):
+        monkeypatch.setenv('ACMG_CLINVAR_SNAPSHOT', snapshot_path)
+        monkeypatch.setitem(API_SETTINGS, 'enabled', False)
+        client = APIClient(cache_enabled=False)
+
+        assert client.search_clinvar_variants_at_position('TP53', 'p.Arg273Cys')['same_aa_pathogenic']
+
+        classification = client.get_clinvar_classification(gene='TP53', hgvs='c.818G>A')
+        assert classification['classification'] == 'Pathogenic'
+        assert classification['star_rating'] == 3
+        assert classification['source'] == 'ClinVar 2024-05 (local)'
+        assert client.get_clinvar_classification(gene='TP53', hgvs='c.1A>G')['classification'] == 'not_found'
+
+        status = client.get_clinvar_status_many([('17', 7675089, 'G', 'A'), ('17', 1, 'A', 'C')])
+        assert status[('17', 7675089, 'G', 'A')]['significance'] == 'Pathogenic/Likely pathogenic'
+        assert status[('17', 1, 'A', 'C')]['status'] == 'not_found'
+        assert not mock_requests.get.called and not mock_requests.post.called
+
+    @patch('utils.api_client.requests')
+    def test_vcf_snapshot_defers_codon_search(self, mock_requests, monkeypatch):
+        temp_dir = tempfile.mkdtemp(prefix='acmg_clinvar_test_')
+        path = os.path.join(temp_dir, 'clinvar.json.gz')
+        build_clinvar_snapshot(_write(temp_dir, 'clinvar.vcf', VCF), path)
+        assert ClinVarSnapshot.load(path).search_position('BRCA1', 'p.Arg1699Trp') is None
+
+        monkeypatch.setenv('ACMG_CLINVAR_SNAPSHOT', path)
+        mock_requests.get.return_value.status_code = 200
+        mock_requests.get.return_value.json.return_value = {'esearchresult': {'idlist': []}}
+        client = APIClient(cache_enabled=False)
+        client.search_clinvar_variants_at_position('BRCA1', 'p.Arg1699Trp')
+        assert mock_requests.get.called
+        clear_clinvar_snapshots()
+
+    def test_rebuilt_release_is_reloaded(self, snapshot_path):
+        assert get_clinvar_snapshot(snapshot_path).release == '2024-05'
+        ClinVarSnapshot([], release='2024-06').save(snapshot_path)
+        os.utime(snapshot_path, (0, 0))
+        assert get_clinvar_snapshot(snapshot_path).release == '2024-06'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
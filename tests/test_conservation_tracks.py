@@ -0,0 +1,123 @@
+"""
+Tests for the Local Conservation Tracks
+=======================================
+
+Writes small bigWig and bedGraph tracks and verifies indexed random
+access, contig aliasing and that APIClient answers conservation queries
+from local tracks without network access.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import gzip
+import os
+import random
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.constants import API_SETTINGS
+from utils.conservation_tracks import (
+    BedGraphTrack,
+    BigWigFile,
+    clear_conservation_tracks,
+    get_conservation_tracks,
+    open_track,
+    write_bigwig,
+)
+from utils.api_client import APIClient
+
+
+CHROM_SIZES = {'chr17': 5000, 'chrM': 100}
+PHYLOP = [('chr17', pos, pos + 1, round(random.Random(pos).uniform(-5, 8), 2)) for pos in range(1000, 3000)]
+
+
+@pytest.fixture
+def bigwig_path(tmp_path):
+    path = str(tmp_path / 'phylop.bw')
+    write_bigwig(path, CHROM_SIZES, PHYLOP + [('chrM', 10, 20, 0.5)], items_per_block=64)
+    return path
+
+
+@pytest.fixture
+def bedgraph_path(tmp_path):
+    path = str(tmp_path / 'gerp.bedGraph.gz')
+    with gzip.open(path, 'wt') as f:
+        f.write('track type=bedGraph\nchr17\t1999\t2010\t5.25\nchr17\t1000\t1005\t-1.5\n')
+    return path
+
+
+@pytest.fixture(autouse=True)
+def _clear_tracks():
+    clear_conservation_tracks()
+    yield
+    clear_conservation_tracks()
+
+
+class TestTrackReaders:
+    @pytest.mark.parametrize('compress', [True, False])
+    def test_bigwig_random_access(self, tmp_path, compress):
+        path = str(tmp_path / 'track.bw')
+        write_bigwig(path, CHROM_SIZES, PHYLOP, items_per_block=64, compress=compress)
+        with BigWigFile(path) as track:
+            for _, start, _, value in random.Random(3).sample(PHYLOP, 200):
+                assert track.value_at('17', start + 1) == pytest.approx(value, abs=1e-5)
+            assert track.value_at('chr17', 1000) is None
+            assert track.value_at('chr17', 3001) is None
+            assert track.value_at('5', 1500) is None
+            assert [start for start, _, _ in track.intervals('chr17', 1062, 1066)] == [1062, 1063, 1064, 1065]
+
+    def test_bigwig_reads_only_needed_blocks(self, bigwig_path):
+        with open_track(bigwig_path) as track:
+            assert isinstance(track, BigWigFile)
+            assert track.value_at('MT', 15) == 0.5
+            track.value_at('17', 2500)
+            track.value_at('17', 2501)
+            # 2000 sites in blocks of 64: two lookups in one block decode one block
+            assert len(track._blocks) == 2
+
+    def test_bedgraph_track(self, bedgraph_path):
+        track = open_track(bedgraph_path)
+        assert isinstance(track, BedGraphTrack)
+        assert track.value_at('17', 2000) == 5.25
+        assert track.value_at('chr17', 1001) == -1.5
+        assert track.value_at('17', 1006) is None
+
+
+class TestSharedTracks:
+    def test_resolution_from_environment(self, bigwig_path, bedgraph_path, tmp_path, monkeypatch, capsys):
+        monkeypatch.setenv('ACMG_PHYLOP_TRACK', bigwig_path)
+        monkeypatch.setenv('ACMG_GERP_TRACK', bedgraph_path)
+        broken = tmp_path / 'phastcons.bw'
+        broken.write_bytes(b'\x26\xfc\x8f\x88' + b'\0' * 10)
+        monkeypatch.setenv('ACMG_PHASTCONS_TRACK', str(broken))
+
+        tracks = get_conservation_tracks()
+        assert set(tracks.tracks) == {'phylop', 'gerp'}
+        assert tracks.tracks['phylop'] is get_conservation_tracks().tracks['phylop']
+        assert capsys.readouterr().out.count('Local conservation track unavailable') == 1
+
+        scores = tracks.scores_many([('17', 2000), ('chr17', 2000), ('17', 4000)])
+        assert set(scores) == {('17', 2000), ('chr17', 2000), ('17', 4000)}
+        assert scores[('17', 2000)]['gerp'] == 5.25
+        assert scores[('17', 4000)] == {}
+
+    @patch('utils.api_client.requests.post')
+    @patch('utils.api_client.requests.get')
+    def test_api_client_uses_local_tracks(self, mock_get, mock_post, bigwig_path, monkeypatch):
+        monkeypatch.setenv('ACMG_PHYLOP_TRACK', bigwig_path)
+        monkeypatch.setitem(API_SETTINGS, 'enabled', False)
+        client = APIClient(cache_enabled=False)
+
+        result = client.get_conservation_scores('17', 1501, 'A', 'G')
+        assert result['source'] == 'Local conservation tracks'
+        assert result['conservation_scores']['phylop'] == pytest.approx(PHYLOP[500][3], abs=1e-5)
+
+        many = client.get_conservation_scores_many([('17', 1501, 'A', 'G'), ('17', 4500, 'C', 'T')])
+        assert not many[('17', 1501, 'A', 'G')]['manual_lookup_required']
+        assert 'error' in many[('17', 4500, 'C', 'T')]
+        assert not mock_get.called and not mock_post.called
@@ -0,0 +1,137 @@
+"""
+Tests for the Local dbNSFP Backend
+==================================
+
+Builds a small bgzip/tabix-indexed dbNSFP extract with utils.tabix and
+verifies region queries, score parsing and that PredictorAPIClient serves
+local hits without network access.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.tabix import (
+    TabixFile,
+    TabixError,
+    bgzip_file,
+    build_tabix_index,
+    reg2bin,
+    reg2bins,
+)
+from utils.dbnsfp_backend import LocalDbNSFPClient, parse_dbnsfp_value, open_local_dbnsfp
+from utils.predictor_api_client import PredictorAPIClient
+
+
+HEADER = ['#chr', 'pos(1-based)', 'ref', 'alt', 'REVEL_score', 'CADD_phred',
+          'SIFT_score', 'Polyphen2_HDIV_score', 'BayesDel_addAF_score']
+
+
+def _write_extract(rows, header=HEADER):
+    """Write rows as a bgzip-compressed, tabix-indexed extract."""
+    temp_dir = tempfile.mkdtemp(prefix='acmg_dbnsfp_test_')
+    plain = os.path.join(temp_dir, 'extract.tsv')
+    with open(plain, 'w') as f:
+        f.write('\t'.join(header) + '\n')
+        for row in rows:
+            f.write('\t'.join(str(v) for v in row) + '\n')
+    path = bgzip_file(plain)
+    build_tabix_index(path, seq_col=1, begin_col=2, end_col=2)
+    return path
+
+
+@pytest.fixture
+def extract_path():
+    rows = [('13', 100 + i * 50, 'A', 'G', '0.1', '5', '0.5', '0.1', '-0.3') for i in range(5000)]
+    rows += [
+        ('17', 7674220, 'C', 'T', '0.93', '28.1', '0.0;0.02;.', '1.0', '0.45'),
+        ('17', 7674220, 'C', 'A', '.', '27.0', '.', '.', '.'),
+        ('17', 43092919, 'G', 'A', '0.2', '12.3', '0.4', '0.05', '-0.2'),
+    ]
+    return _write_extract(rows)
+
+
+class TestTabix:
+    """Tests for the BGZF/tabix reader and index writer."""
+
+    def test_binning(self):
+        assert reg2bin(0, 1) == 4681
+        assert reg2bin(0, 1 << 15) == 585
+        assert reg2bin(100, 101) in reg2bins(0, 1 << 20)
+
+    def test_fetch_spans_blocks(self, extract_path):
+        with TabixFile(extract_path) as tbx:
+            assert tbx.contigs == ['13', '17']
+            assert tbx.header[0].startswith('#chr')
+
+            rows = list(tbx.fetch('13', 150_000, 160_000))
+            positions = [int(r[1]) for r in rows]
+            assert positions == [p for p in range(100, 100 + 5000 * 50, 50) if 150_000 < p <= 160_000]
+            assert list(tbx.fetch('17', 7674219, 7674220))[1][3] == 'A'
+            assert list(tbx.fetch('X', 0, 1000)) == []
+
+    def test_unsorted_input_rejected(self):
+        with pytest.raises(TabixError):
+            _write_extract([('1', 500, 'A', 'G'), ('1', 100, 'A', 'G')], header=HEADER[:4])
+
+
+class TestLocalDbNSFPClient:
+    """Tests for dbNSFP score lookup."""
+
+    def test_parse_value(self):
+        assert parse_dbnsfp_value('.') is None
+        assert parse_dbnsfp_value('0.2;.;0.4') == pytest.approx(0.3)
+
+    def test_scores_for_variant(self, extract_path):
+        backend = LocalDbNSFPClient(extract_path)
+        scores = backend.get_predictor_scores('chr17', 7674220, 'C', 'T')
+
+        assert scores['revel'].value == 0.93
+        assert scores['revel'].source == 'dbNSFP_local'
+        assert scores['sift'].value == pytest.approx(0.01)
+        assert scores['sift'].is_inverted is True
+        assert scores['bayesdel'].value == 0.45
+        assert set(backend.get_predictor_scores('17', 7674220, 'C', 'A')) == {'cadd_phred'}
+        assert backend.get_predictor_scores('17', 7674220, 'C', 'G') == {}
+
+    def test_open_from_environment(self, extract_path, monkeypatch):
+        monkeypatch.setenv('ACMG_DBNSFP_PATH', extract_path)
+        assert open_local_dbnsfp() is not None
+        assert open_local_dbnsfp(extract_path + '.missing') is None
+
+
+class TestPredictorClientLocalBackend:
+    """Tests for PredictorAPIClient with a local backend."""
+
+    @patch('utils.predictor_api_client.requests')
+    def test_local_hit_needs_no_network(self, mock_requests, extract_path):
+        client = PredictorAPIClient(api_enabled=False, local_backend=LocalDbNSFPClient(extract_path))
+
+        scores = client.get_predictor_scores(chrom='17', pos=43092919, ref='G', alt='A')
+
+        assert scores['revel'].value == 0.2
+        assert scores['metasvm'].value is None
+        assert not mock_requests.get.called and not mock_requests.post.called
+
+    @patch('utils.predictor_api_client.requests')
+    def test_many_falls_back_for_misses(self, mock_requests, extract_path):
+        client = PredictorAPIClient(api_enabled=True, test_mode=True,
+                                    local_backend=LocalDbNSFPClient(extract_path))
+
+        results = client.get_predictor_scores_many([('17', 43092919, 'G', 'A'), ('1', 5, 'A', 'C')])
+
+        assert results[('17', 43092919, 'G', 'A')]['cadd_phred'].source == 'dbNSFP_local'
+        assert results[('1', 5, 'A', 'C')]['revel'].value == client._get_mock_scores()['revel'].value
+        assert not mock_requests.post.called
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
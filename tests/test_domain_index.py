@@ -0,0 +1,157 @@
+"""
+Tests for the Domain and Hotspot Interval Index
+===============================================
+
+Checks interval tree overlap queries against a brute-force scan, loading
+of the bundled domain/gene-rule JSON files, and the consumers that share
+the index (DomainAPIClient, InframeAnalyzer, MissenseEvaluator).
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import random
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.domain_index import (
+    SOURCE_CANCER_HOTSPOTS,
+    SOURCE_UNIPROT,
+    DomainIndex,
+    DomainRegion,
+    IntervalTree,
+    clear_domain_index,
+    get_domain_index,
+)
+from utils.domain_api_client import DomainAPIClient
+from core.evidence_evaluator import InframeAnalyzer, VariantData
+from core.missense_evaluator import MissenseEvaluator
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    clear_domain_index()
+    yield
+    clear_domain_index()
+
+
+class TestIntervalTree:
+    """Tests for the static interval tree."""
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        intervals = []
+        for i in range(300):
+            start = rng.randint(1, 2000)
+            intervals.append((start, start + rng.randint(0, 150), i))
+        tree = IntervalTree(intervals)
+
+        for _ in range(200):
+            start = rng.randint(1, 2200)
+            end = start + rng.randint(0, 40)
+            expected = [item for s, e, item in intervals if s <= end and e >= start]
+            assert tree.overlap(start, end) == expected
+
+    def test_point_query_and_empty_tree(self):
+        tree = IntervalTree([(10, 20, 'a'), (15, 15, 'b'), (21, 30, 'c')])
+        assert tree.overlap(15) == ['a', 'b']
+        assert tree.overlap(21) == ['c']
+        assert tree.overlap(31) == []
+        assert IntervalTree().overlap(1) == []
+
+
+class TestDomainIndex:
+    """Tests for the per-gene index and bundled sources."""
+
+    def test_bundled_sources(self):
+        index = get_domain_index()
+        assert index is get_domain_index()
+
+        names = [r.name for r in index.query('tp53', 273)]
+        assert 'DNA_binding_domain' in names
+        assert 'R273 hotspot' in names
+        assert [r.kind for r in index.query('BRCA1', 1050, kinds=('repeat',))] == ['repeat']
+        assert index.query('NOTAGENE', 1) == []
+
+    def test_merge_and_replace(self):
+        index = DomainIndex()
+        index.add_regions('KRAS', SOURCE_CANCER_HOTSPOTS, [DomainRegion(12, 12, 'G12', 'hotspot', SOURCE_CANCER_HOTSPOTS)])
+        index.add_regions('KRAS', SOURCE_CANCER_HOTSPOTS, [DomainRegion(13, 13, 'G13', 'hotspot', SOURCE_CANCER_HOTSPOTS)],
+                          replace=False)
+        assert [r.name for r in index.query('KRAS', 10, 20)] == ['G12', 'G13']
+
+        index.add_regions('KRAS', SOURCE_CANCER_HOTSPOTS, [])
+        assert index.query('KRAS', 12) == []
+        assert index.has_source('KRAS', SOURCE_CANCER_HOTSPOTS)
+
+
+class TestIndexConsumers:
+    """Tests for components sharing the index."""
+
+    @patch('utils.domain_api_client.requests.get')
+    def test_uniprot_table_is_indexed(self, mock_get):
+        search = Mock(status_code=200)
+        search.json.return_value = {'results': [{'primaryAccession': 'P04637'}]}
+        entry = Mock(status_code=200)
+        entry.json.return_value = {'features': [
+            {'type': 'Region', 'description': 'Disordered', 'location': {'start': {'value': 1}, 'end': {'value': 90}}},
+            {'type': 'Domain', 'description': 'DNA-binding', 'location': {'start': {'value': 80}, 'end': {'value': 300}}},
+        ]}
+        mock_get.side_effect = [search, entry]
+
+        result = DomainAPIClient(cache_enabled=False).check_position_in_domain('TP53', 85)
+
+        assert result['domain_name'] == 'Disordered'
+        assert result['domain_type'] == 'Region'
+        hits = get_domain_index().query('TP53', 250, sources=(SOURCE_UNIPROT,))
+        assert [(r.name, r.kind) for r in hits] == [('DNA-binding', 'domain')]
+
+    def test_inframe_range_overlap(self):
+        analyzer = InframeAnalyzer()
+
+        # c.817_825 spans codons 273-275 (TP53 R273 hotspot)
+        hotspot = VariantData(basic_info={'gene': 'TP53', 'hgvs_c': 'c.817_825del'})
+        assert analyzer._extract_codon_range('c.817_825del') == (273, 275)
+        assert analyzer.evaluate_inframe_deletion(hotspot) == 'PM4'
+
+        repeat = VariantData(basic_info={'gene': 'BRCA2', 'hgvs_c': 'c.1501_1503del'})
+        assert analyzer.evaluate_inframe_deletion(repeat) == 'BP3'
+
+        outside = VariantData(basic_info={'gene': 'TP53', 'hgvs_c': 'c.4_6del'})
+        assert analyzer.evaluate_inframe_deletion(outside) is None
+
+    def test_missense_domain_impact_from_index(self):
+        evaluator = MissenseEvaluator()
+
+        in_domain = VariantData(basic_info={'gene': 'TP53', 'hgvs_p': 'p.Arg248Gln'})
+        assert evaluator._calculate_domain_impact(in_domain) == 0.75
+
+        no_domain = VariantData(basic_info={'gene': 'TP53', 'hgvs_p': 'p.Pro36Leu'})
+        assert evaluator._calculate_domain_impact(no_domain) == 0.5
+
+    def test_missense_domain_impact_of_uniprot_regions(self):
+        evaluator = MissenseEvaluator()
+        get_domain_index().add_regions('GENEX', SOURCE_UNIPROT, [
+            DomainRegion(1, 80, 'Disordered', 'region', SOURCE_UNIPROT, {'type': 'Region'}),
+            DomainRegion(40, 60, 'Polar residues', 'region', SOURCE_UNIPROT, {'type': 'Compositional bias'}),
+            DomainRegion(100, 150, 'Interaction with TP53', 'region', SOURCE_UNIPROT, {'type': 'Region'}),
+            DomainRegion(140, 200, 'Helicase C-terminal', 'domain', SOURCE_UNIPROT, {'type': 'Domain'}),
+        ])
+
+        def impact(residue):
+            variant = VariantData(basic_info={'gene': 'GENEX', 'hgvs_p': f'p.Ala{residue}Val'})
+            return evaluator._calculate_domain_impact(variant)
+
+        assert impact(50) == 0.35
+        assert impact(120) == 0.55
+        assert impact(145) == 0.6
+        assert impact(300) == 0.5
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -301,6 +301,39 @@ class TestDomainAPIClient:
         assert ann.domain_name == "DNA-binding"
         assert "UniProt" in ann.source
     
+    @patch('utils.domain_api_client.requests.get')
+    def test_uniprot_feature_table_cached_per_gene(self, mock_get):
+        """Test new positions in the same gene reuse the UniProt feature table."""
+        mock_uniprot_search = Mock()
+        mock_uniprot_search.status_code = 200
+        mock_uniprot_search.json.return_value = {
+            'results': [{'primaryAccession': 'P04637'}]
+        }
+        
+        mock_uniprot_entry = Mock()
+        mock_uniprot_entry.status_code = 200
+        mock_uniprot_entry.json.return_value = {
+            'features': [
+                {
+                    'type': 'Domain',
+                    'description': 'DNA-binding',
+                    'location': {'start': {'value': 100}, 'end': {'value': 300}}
+                }
+            ]
+        }
+        
+        mock_get.side_effect = [mock_uniprot_search, mock_uniprot_entry]
+        
+        client = DomainAPIClient(cache_enabled=False)
+        first = client.check_position_in_domain("TP53", 248)
+        second = client.check_position_in_domain("tp53", 150)
+        outside = client.check_position_in_domain("TP53", 350)
+        
+        assert mock_get.call_count == 2
+        assert first['in_domain'] is True
+        assert second['domain_name'] == "DNA-binding"
+        assert outside['in_domain'] is False
+    
     def test_extract_position_from_hgvs_p(self):
         """Test position extraction from protein HGVS."""
         client = DomainAPIClient(cache_enabled=False)
@@ -0,0 +1,152 @@
+"""
+Tests for the gnomAD Site Bloom Filter
+======================================
+
+Builds a filter from a small sites VCF and verifies that it has no false
+negatives, keeps to the configured false-positive rate, and lets
+PopulationAPIClient and PM2 settle "absent from gnomAD" without network
+access.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import random
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.constants import API_SETTINGS
+from utils.gnomad_bloom import (
+    BloomFilterBuilder,
+    GnomADBloomError,
+    GnomADBloomFilter,
+    bloom_parameters,
+    build_gnomad_bloom,
+    clear_gnomad_blooms,
+    get_gnomad_bloom,
+)
+from utils.predictor_api_client import PopulationAPIClient
+from core.evidence_evaluator import EvidenceEvaluator, VariantData
+
+
+HEADER = ['##fileformat=VCFv4.2', '#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO']
+
+EXOMES_VCF = '\n'.join(HEADER + [
+    'chr17\t43092919\t.\tG\tA,T\t.\tPASS\tAC=10,2;AN=100000',
+    'chr17\t43092930\t.\tGA\tG\t.\tAC0;RF\tAC=0;AN=90000',
+    '',
+])
+
+GENOMES_VCF = '\n'.join(HEADER + [
+    'chr13\t32315508\t.\tC\tT\t.\tPASS\tAC=7000;AN=100000',
+    '',
+])
+
+
+def _write_vcfs(tmp_path):
+    exomes = tmp_path / 'gnomad.exomes.v4.1.sites.vcf'
+    exomes.write_text(EXOMES_VCF)
+    genomes = tmp_path / 'gnomad.genomes.v4.1.sites.vcf'
+    genomes.write_text(GENOMES_VCF)
+    return [str(exomes), str(genomes)]
+
+
+@pytest.fixture
+def bloom_path(tmp_path):
+    path = str(tmp_path / 'gnomad.bloom')
+    assert build_gnomad_bloom(_write_vcfs(tmp_path), path, fpr=0.001, complete=True) == 4
+    clear_gnomad_blooms()
+    yield path
+    clear_gnomad_blooms()
+
+
+class TestGnomADBloomFilter:
+    def test_no_false_negatives_and_coverage(self, bloom_path):
+        with GnomADBloomFilter(bloom_path) as bloom:
+            assert len(bloom) == 4 and bloom.fpr == 0.001
+            assert bloom.complete and bloom.datasets == ['exomes', 'genomes']
+            for site in [('17', 43092919, 'G', 'A'), ('chr17', 43092919, 'g', 't'),
+                         ('17', 43092930, 'GA', 'G'), ('13', 32315508, 'C', 'T')]:
+                assert bloom.might_contain(*site)
+                assert not bloom.definitely_absent(*site)
+            assert bloom.definitely_absent('17', 43092919, 'G', 'C')
+            # Contigs the filter was not built from are never reported absent
+            assert not bloom.definitely_absent('1', 5, 'A', 'G')
+            stats = bloom.absent_stats()
+            assert (stats.ac, stats.an, stats.af, stats.population) == (0, 0, 0.0, 'gnomad_v4')
+
+    def test_absence_requires_complete_build(self, tmp_path):
+        vcf_paths = _write_vcfs(tmp_path)
+        path = str(tmp_path / 'exomes.bloom')
+        assert build_gnomad_bloom(vcf_paths[0], path, fpr=0.001) == 3
+        with GnomADBloomFilter(path) as bloom:
+            assert bloom.datasets == ['exomes'] and not bloom.complete
+            assert not bloom.might_contain('17', 43092919, 'G', 'C')
+            assert not bloom.definitely_absent('17', 43092919, 'G', 'C')
+
+        # Non-PASS sites are still gnomAD sites, so a PASS-only build is never complete
+        assert build_gnomad_bloom(vcf_paths, path, pass_only=True) == 3
+        with pytest.raises(GnomADBloomError):
+            build_gnomad_bloom(vcf_paths, path, complete=True, pass_only=True)
+
+    def test_configured_false_positive_rate(self, tmp_path, monkeypatch):
+        rng = random.Random(11)
+        present = {('1', rng.randrange(1, 10 ** 8), 'A', 'G') for _ in range(2000)}
+        monkeypatch.setitem(API_SETTINGS, 'gnomad_bloom_fpr', 0.01)
+        builder = BloomFilterBuilder(len(present))
+        assert builder.fpr == 0.01
+        for site in present:
+            builder.add(*site)
+        path = str(tmp_path / 'random.bloom')
+        builder.write(path, contigs=['1'], complete=True)
+
+        with GnomADBloomFilter(path) as bloom:
+            assert all(bloom.might_contain(*site) for site in present)
+            probes = [('1', pos, 'C', 'T') for pos in range(1, 20001)]
+            false_positives = sum(bloom.might_contain(*site) for site in probes)
+            assert false_positives / len(probes) < 0.02
+
+        with pytest.raises(GnomADBloomError):
+            bloom_parameters(100, 1.0)
+
+    def test_shared_filter_resolution(self, bloom_path, tmp_path, monkeypatch, capsys):
+        monkeypatch.setenv('ACMG_GNOMAD_BLOOM', bloom_path)
+        assert get_gnomad_bloom() is get_gnomad_bloom()
+
+        broken = tmp_path / 'broken.bloom'
+        broken.write_bytes(b'not a bloom filter' * 8)
+        assert get_gnomad_bloom(str(broken)) is None
+        assert get_gnomad_bloom(str(broken)) is None
+        assert capsys.readouterr().out.count('Bloom filter unavailable') == 1
+
+
+class TestBloomConsumers:
+    @patch('utils.predictor_api_client.requests')
+    def test_population_client_short_circuits(self, mock_requests, bloom_path):
+        client = PopulationAPIClient(api_enabled=True, bloom_filter=GnomADBloomFilter(bloom_path))
+
+        stats = client.get_population_stats(chrom='17', pos=43092919, ref='G', alt='C')
+        assert stats['gnomad_v4'].is_absent()
+        assert stats['gnomad_v4'].source == 'gnomAD_bloom_gnomad_r4'
+
+        many = client.get_population_stats_many([('13', 1, 'C', 'T'), ('17', 5, 'A', 'G')])
+        assert many[('13', 1, 'C', 'T')]['gnomad_v4'].ac == 0
+        assert many[('17', 5, 'A', 'G')]['gnomad_v4'].an == 0
+        assert not mock_requests.post.called
+
+    def test_pm2_uses_bloom_absence(self, bloom_path):
+        evaluator = EvidenceEvaluator(test_mode=True)
+        evaluator.gnomad_bloom = GnomADBloomFilter(bloom_path)
+        variant = VariantData(basic_info={'gene': 'BRCA1', 'chromosome': '17', 'position': '43092919',
+                                          'ref_allele': 'G', 'alt_allele': 'C'})
+
+        result = evaluator._evaluate_pm2(variant)
+        assert result['applies']
+        assert result['population_frequencies']['gnomad_v4'] == 0.0
+        assert 'Bloom filter: absent' in result['data_source']
+        assert not evaluator.api_client.get_variant_frequency.called
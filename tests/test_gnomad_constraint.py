@@ -0,0 +1,126 @@
+"""
+Tests for the Local gnomAD Constraint Table
+===========================================
+
+Parses small v4 and v2.1.1 constraint metrics extracts and verifies the
+transcript preference, classification and that APIClient answers gene
+constraint queries from the table without network access.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.constants import API_SETTINGS
+from utils.gnomad_constraint import (
+    ConstraintTableError,
+    GnomADConstraintTable,
+    build_constraint_result,
+    clear_constraint_tables,
+)
+from utils.api_client import APIClient
+
+
+V4_HEADER = ['gene', 'gene_id', 'transcript', 'canonical', 'mane_select', 'lof.obs', 'lof.exp',
+             'lof.oe', 'lof.oe_ci.lower', 'lof.oe_ci.upper', 'lof.z_score', 'lof.pLI',
+             'mis.obs', 'mis.exp', 'mis.oe', 'mis.oe_ci.upper', 'mis.z_score', 'constraint_flags']
+
+V4_ROWS = [
+    ['BRCA1', 'ENSG1', 'ENST_alt', 'false', 'false', '50', '60', '0.83', '0.7', '0.99', '0.5', '0',
+     '900', '1000', '0.9', '0.95', '1.1', '[]'],
+    ['BRCA1', 'ENSG1', 'ENST_mane', 'true', 'true', '30', '100', '0.3', '0.2', '0.45', '4.2', '0.2',
+     '700', '1000', '0.7', '0.75', '2.5', '[]'],
+    ['TP53', 'ENSG2', 'ENST_tp53', 'true', 'true', '2', '40', '0.05', '0.02', '0.2', '5.9', '0.99',
+     '200', '500', '0.4', '0.5', '3.5', '["no_variants"]'],
+    ['OR4F5', 'ENSG3', 'ENST_or', 'true', 'false', '10', '8', '1.25', '0.9', '1.6', '-1', 'NA',
+     '150', '140', '1.07', '1.2', '-0.5', ''],
+]
+
+V2 = 'gene\ttranscript\tobs_lof\texp_lof\toe_lof\tpLI\toe_lof_lower\toe_lof_upper\tmis_z\toe_mis\n' \
+     'PTEN\tENST1\t1\t30\t0.03\t1.0\t0.01\t0.15\t3.8\t0.5\n'
+
+
+def _write(name, content):
+    path = os.path.join(tempfile.mkdtemp(prefix='acmg_constraint_test_'), name)
+    with open(path, 'w') as f:
+        f.write(content)
+    return path
+
+
+@pytest.fixture
+def v4_path():
+    lines = ['\t'.join(V4_HEADER)] + ['\t'.join(row) for row in V4_ROWS]
+    clear_constraint_tables()
+    yield _write('constraint.tsv', '\n'.join(lines) + '\n')
+    clear_constraint_tables()
+
+
+class TestGnomADConstraintTable:
+    """Tests for parsing and classification."""
+
+    def test_v4_prefers_mane_select(self, v4_path):
+        table = GnomADConstraintTable.from_tsv(v4_path)
+        assert len(table) == 3
+
+        brca1 = table.get('brca1')
+        assert brca1['oe_lof_upper'] == 0.45
+        assert brca1['obs_lof'] == 30
+        assert brca1['classification'] == 'uncertain_intolerant'
+        assert brca1['source'] == 'gnomAD v4 (local)'
+
+        tp53 = table.get('TP53')
+        assert tp53['is_lof_intolerant'] is True and tp53['classification'] == 'LOF_intolerant'
+        assert tp53['is_mis_constrained'] is True
+        assert tp53['flags'] == ['no_variants']
+
+        assert table.get('OR4F5')['classification'] == 'LOF_tolerant'
+        assert table.get('NOTAGENE') is None
+
+    def test_bulk_lookup(self, v4_path):
+        table = GnomADConstraintTable.from_tsv(v4_path)
+        panel = table.get_many(['TP53', 'brca1', 'NOTAGENE'])
+        assert set(panel) == {'TP53', 'BRCA1', 'NOTAGENE'}
+        assert panel['NOTAGENE'] is None
+        assert panel['TP53'] is table.get('TP53')
+
+    def test_v2_and_invalid(self):
+        table = GnomADConstraintTable.from_tsv(_write('lof_metrics.by_gene.txt', V2))
+        assert table.version == 'v2.1.1'
+        assert table.get('PTEN')['LOEUF'] == 0.15
+
+        with pytest.raises(ConstraintTableError):
+            GnomADConstraintTable.from_tsv(_write('other.tsv', 'a\tb\n'))
+
+    def test_result_matches_api_classification(self):
+        result = build_constraint_result('X', {'pLI': 0.6, 'oe_lof_upper': 0.55, 'oe_mis': 0.7})
+        assert result['classification'] == 'uncertain_intolerant'
+        assert result['mis_classification'] == 'uncertain_constrained'
+
+
+class TestAPIClientConstraint:
+    """Tests for APIClient using the table."""
+
+    @patch('utils.api_client.requests.post')
+    def test_local_table_without_api(self, mock_post, v4_path, monkeypatch):
+        monkeypatch.setenv('ACMG_GNOMAD_CONSTRAINT', v4_path)
+        monkeypatch.setitem(API_SETTINGS, 'enabled', False)
+        client = APIClient(cache_enabled=False)
+
+        assert client.get_gene_constraint('tp53')['pLI'] == 0.99
+
+        panel = client.get_gene_constraints(['TP53', 'OR4F5', 'KRAS'])
+        assert panel['OR4F5']['is_lof_intolerant'] is False
+        assert panel['KRAS']['classification'] == 'unknown'
+        assert not mock_post.called
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,122 @@
+"""
+Tests for the Local gnomAD Frequency Store
+==========================================
+
+Builds a store from a small sites VCF and verifies binary-search lookups,
+absence semantics and that PopulationAPIClient and APIClient serve local
+data without network access.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.gnomad_store import (
+    GnomADStoreError,
+    LocalGnomADStore,
+    build_gnomad_store,
+    clear_gnomad_stores,
+)
+from utils.predictor_api_client import PopulationAPIClient
+from utils.api_client import APIClient
+
+
+VCF = '\n'.join([
+    '##fileformat=VCFv4.2',
+    '#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO',
+    'chr17\t43092919\t.\tG\tA,T\t.\tPASS\tAC=10,2;AN=100000;AF=0.0001,0.00002;nhomalt=1,0;'
+    'fafmax_faf95_max=0.0002,.;fafmax_faf95_max_gen_anc=nfe,.',
+    'chr17\t43092919\t.\tGA\tG\t.\tAC0;RF\tAC=0;AN=90000;AF=0',
+    'chr13\t32315508\t.\tC\tT\t.\tPASS\tAC=7000;AN=100000;nhomalt=300',
+    'chrX\t100\t.\tA\tC\t.\tPASS\tAC=1;AN=50000;AF=0.00002',
+    '',
+])
+
+
+@pytest.fixture
+def store_path():
+    """Build a store from the sample VCF."""
+    temp_dir = tempfile.mkdtemp(prefix='acmg_gnomad_test_')
+    vcf_path = os.path.join(temp_dir, 'sites.vcf')
+    with open(vcf_path, 'w') as f:
+        f.write(VCF)
+    path = os.path.join(temp_dir, 'gnomad.bin')
+    assert build_gnomad_store(vcf_path, path, complete=True) == 5
+    clear_gnomad_stores()
+    yield path
+    clear_gnomad_stores()
+
+
+class TestLocalGnomADStore:
+    """Tests for building and querying the binary store."""
+
+    def test_lookup_multiallelic_site(self, store_path):
+        with LocalGnomADStore(store_path) as store:
+            assert len(store) == 5
+
+            stats = store.lookup('17', 43092919, 'G', 'A')
+            assert (stats.ac, stats.an, stats.af) == (10, 100000, 0.0001)
+            assert stats.homozygote_count == 1
+            assert stats.popmax_af == 0.0002
+            assert stats.popmax_population == 'nfe'
+            assert stats.population == 'gnomad_v4'
+            assert stats.source == 'gnomAD_local_gnomad_r4'
+
+            assert store.lookup('chr17', 43092919, 'G', 'T').ac == 2
+            assert store.lookup('17', 43092919, 'G', 'T').popmax_af is None
+            assert store.lookup('17', 43092919, 'GA', 'G').filters == ['AC0', 'RF']
+
+    def test_af_derived_and_absence(self, store_path):
+        with LocalGnomADStore(store_path) as store:
+            assert store.lookup('13', 32315508, 'C', 'T').af == pytest.approx(0.07)
+
+            absent = store.get_population_stats('17', 43092920, 'C', 'T')
+            assert absent.is_absent() and absent.an == 0
+            # Chromosomes outside the store cannot be answered
+            assert store.get_population_stats('1', 100, 'A', 'G') is None
+
+    def test_rejects_other_files(self, store_path):
+        with pytest.raises(GnomADStoreError):
+            LocalGnomADStore(os.path.join(os.path.dirname(__file__), 'conftest.py'))
+
+
+class TestLocalStoreConsumers:
+    """Tests for clients using the local store."""
+
+    @patch('utils.predictor_api_client.requests')
+    def test_population_client_uses_store(self, mock_requests, store_path):
+        client = PopulationAPIClient(api_enabled=False, local_store=LocalGnomADStore(store_path))
+
+        stats = client.get_population_stats(chrom='X', pos=100, ref='A', alt='C')
+        assert stats['gnomad_v4'].ac == 1
+
+        many = client.get_population_stats_many([('13', 32315508, 'C', 'T'), ('1', 5, 'A', 'G')])
+        assert many[('13', 32315508, 'C', 'T')]['gnomad_v4'].homozygote_count == 300
+        assert many[('1', 5, 'A', 'G')] == {}
+        assert not mock_requests.post.called
+
+    @patch('utils.api_client.requests.post')
+    def test_api_client_frequency_from_store(self, mock_post, store_path, monkeypatch):
+        monkeypatch.setenv('ACMG_GNOMAD_STORE', store_path)
+        client = APIClient(cache_enabled=False)
+
+        result = client.get_variant_frequency(chrom='17', pos=43092919, ref='G', alt='A')
+        assert result['allele_count'] == 10
+        assert result['popmax_population'] == 'nfe'
+        assert result['source'] == 'gnomAD v4.1 (local)'
+
+        absent = client.get_variant_frequencies([('17', 1, 'A', 'G')])[('17', 1, 'A', 'G')]
+        assert absent['allele_frequency'] is None and 'not found' in absent['note']
+        assert not mock_post.called
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,124 @@
+"""
+Tests for the HGNC Gene Symbol Index
+====================================
+
+Parses a small hgnc_complete_set extract and verifies alias and previous
+symbol resolution, ambiguity handling, and that APIClient resolves
+chromosomes and shares cache keys through canonical symbols.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.hgnc_index import (
+    HGNCIndex,
+    HGNCIndexError,
+    canonical_gene_symbol,
+    chromosome_from_location,
+    clear_hgnc_indexes,
+    get_hgnc_index,
+)
+from utils.api_client import APIClient
+
+
+HEADER = ['hgnc_id', 'symbol', 'name', 'locus_group', 'locus_type', 'status', 'location',
+          'alias_symbol', 'prev_symbol', 'entrez_id', 'ensembl_gene_id', 'uniprot_ids']
+
+ROWS = [
+    ['HGNC:1100', 'BRCA1', 'BRCA1 DNA repair associated', 'protein-coding gene', 'gene with protein product',
+     'Approved', '17q21.31', '"RNF53|BRCC1|FANCS"', '', '672', 'ENSG00000012048', 'P38398'],
+    ['HGNC:11998', 'TP53', 'tumor protein p53', 'protein-coding gene', 'gene with protein product',
+     'Approved', '17p13.1', '"p53|LFS1"', '', '7157', 'ENSG00000141510', 'P04637'],
+    ['HGNC:28337', 'C9orf72', 'C9orf72-SMCR8 complex subunit', 'protein-coding gene', 'gene with protein product',
+     'Approved', '9p21.2', '"ALSFTD|SHARED1"', '', '203228', 'ENSG00000147894', 'Q96LT7'],
+    ['HGNC:7421', 'MT-ND1', 'mitochondrially encoded NADH dehydrogenase 1', 'protein-coding gene',
+     'gene with protein product', 'Approved', 'mitochondria', '"SHARED1"', 'MTND1', '4535', 'ENSG00000198888', 'P03886'],
+    ['HGNC:1', 'OLD1', 'withdrawn gene', 'protein-coding gene', 'gene with protein product',
+     'Entry Withdrawn', '1p36', '', '', '', '', ''],
+]
+
+
+@pytest.fixture
+def hgnc_path():
+    path = os.path.join(tempfile.mkdtemp(prefix='acmg_hgnc_test_'), 'hgnc_complete_set.txt')
+    with open(path, 'w') as f:
+        f.write('\n'.join('\t'.join(row) for row in [HEADER] + ROWS) + '\n')
+    clear_hgnc_indexes()
+    yield path
+    clear_hgnc_indexes()
+
+
+class TestHGNCIndex:
+    """Tests for parsing and name resolution."""
+
+    def test_resolution(self, hgnc_path):
+        index = HGNCIndex.from_tsv(hgnc_path)
+        assert len(index) == 4
+
+        assert index.resolve('fancs').symbol == 'BRCA1'
+        assert index.resolve('HGNC:11998').symbol == 'TP53'
+        assert index.resolve('ENSG00000147894').symbol == 'C9orf72'
+        assert index.resolve('mtnd1').chromosome == 'MT'
+        assert index.chromosome('p53') == '17'
+        assert index.resolve('BRCA1').uniprot_ids == ('P38398',)
+        assert index.resolve('OLD1') is None
+
+    def test_ambiguous_alias(self, hgnc_path):
+        index = HGNCIndex.from_tsv(hgnc_path)
+        assert index.resolve('SHARED1') is None
+        assert [r.symbol for r in index.candidates('shared1')] == ['C9orf72', 'MT-ND1']
+        assert index.is_known('SHARED1')
+
+    def test_locations_and_invalid_file(self, tmp_path):
+        assert chromosome_from_location('Xp22.33 and Yp11.2') == 'X'
+        assert chromosome_from_location('2cen-q11') == '2'
+        assert chromosome_from_location('not on reference assembly') is None
+
+        other = tmp_path / 'other.tsv'
+        other.write_text('a\tb\n')
+        with pytest.raises(HGNCIndexError):
+            HGNCIndex.from_tsv(str(other))
+
+
+    def test_snapshot_round_trip(self, hgnc_path, tmp_path):
+        saved = str(tmp_path / 'hgnc.json.gz')
+        HGNCIndex.from_tsv(hgnc_path).save(saved)
+        index = get_hgnc_index(saved)
+        assert len(index) == 4
+        assert index.resolve('fancs').uniprot_ids == ('P38398',)
+        assert index.resolve('SHARED1') is None
+
+        # Only .json.gz / .json paths are read as snapshots; other files are parsed as the TSV
+        stray = tmp_path / 'hgnc.bin'
+        stray.write_bytes(b'\x80\x04\x95junk')
+        assert get_hgnc_index(str(stray)) is None
+
+
+class TestCanonicalSymbols:
+    """Tests for APIClient using the shared index."""
+
+    @patch('utils.api_client.requests.get')
+    def test_chromosome_and_cache_keys(self, mock_get, hgnc_path, monkeypatch):
+        assert canonical_gene_symbol(' fancs ') == 'FANCS'  # no index configured
+
+        monkeypatch.setenv('ACMG_HGNC_PATH', hgnc_path)
+        assert canonical_gene_symbol('fancs') == 'BRCA1'
+        assert canonical_gene_symbol('c9orf72') == 'C9ORF72'
+
+        client = APIClient(cache_enabled=False)
+        assert client.get_chromosome_from_ensembl('RNF53') == '17'
+        assert client.get_chromosomes_from_ensembl(['p53', 'MTND1']) == {'P53': '17', 'MTND1': 'MT'}
+        assert not mock_get.called
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
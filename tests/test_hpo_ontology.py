@@ -0,0 +1,216 @@
+"""
+Tests for the HPO Ontology
+==========================
+
+Loads a small synthetic hp.obo and checks the ancestor closure, alternative
+and obsolete ID resolution, information content from structure and from
+annotations, and ancestor-aware PP4/BP5 similarity in PhenotypeMatcher.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.hpo_ontology import HPOOntology, clear_hpo_ontologies, get_hpo_ontology, load_hpoa
+from core.phenotype_matcher import PhenotypeMatcher, PhenotypeSimilarityCalculator
+
+
+OBO = """format-version: 1.2
+ontology: hp
+
+[Term]
+id: HP:0000001
+name: All
+
+[Term]
+id: HP:0000118
+name: Phenotypic abnormality
+is_a: HP:0000001 ! All
+
+[Term]
+id: HP:0002664
+name: Neoplasm
+synonym: "Tumor" EXACT []
+is_a: HP:0000118 ! Phenotypic abnormality
+
+[Term]
+id: HP:0100013
+name: Neoplasm of the breast
+is_a: HP:0002664 ! Neoplasm
+
+[Term]
+id: HP:0003002
+name: Breast carcinoma
+alt_id: HP:0006770
+synonym: "Breast cancer" EXACT []
+is_a: HP:0100013 ! Neoplasm of the breast
+
+[Term]
+id: HP:0000137
+name: Abnormality of the ovary
+is_a: HP:0000118 ! Phenotypic abnormality
+
+[Term]
+id: HP:0100615
+name: Ovarian neoplasm
+is_a: HP:0002664 ! Neoplasm
+is_a: HP:0000137 ! Abnormality of the ovary
+
+[Term]
+id: HP:0001250
+name: Seizure
+is_a: HP:0000118 ! Phenotypic abnormality
+
+[Term]
+id: HP:0002069
+name: Bilateral tonic-clonic seizure
+is_a: HP:0001250 ! Seizure
+
+[Term]
+id: HP:0000999
+name: obsolete Breast cancer
+is_obsolete: true
+replaced_by: HP:0003002
+
+[Typedef]
+id: part_of
+name: part of
+"""
+
+HPOA = """#description: synthetic
+database_id\tdisease_name\tqualifier\thpo_id\treference\tevidence\tonset\tfrequency\tsex\tmodifier\taspect\tbiocuration
+OMIM:1\tHBOC\t\tHP:0003002\tPMID:1\tPCS\t\t\t\t\tP\tHPO:test
+OMIM:1\tHBOC\t\tHP:0100615\tPMID:1\tPCS\t\t\t\t\tP\tHPO:test
+OMIM:2\tEpilepsy\t\tHP:0002069\tPMID:2\tPCS\t\t\t\t\tP\tHPO:test
+OMIM:2\tEpilepsy\tNOT\tHP:0003002\tPMID:2\tPCS\t\t\t\t\tP\tHPO:test
+OMIM:3\tLi-Fraumeni\t\tHP:0002664\tPMID:3\tPCS\t\t\t\t\tP\tHPO:test
+OMIM:3\tLi-Fraumeni\t\tHP:0003593\tPMID:3\tPCS\t\t\t\t\tC\tHPO:test
+"""
+
+
+@pytest.fixture
+def obo_path(tmp_path):
+    path = tmp_path / 'hp.obo'
+    path.write_text(OBO)
+    return str(path)
+
+
+@pytest.fixture
+def ontology(obo_path):
+    return HPOOntology.from_obo(obo_path)
+
+
+@pytest.fixture(autouse=True)
+def _clear_ontologies():
+    clear_hpo_ontologies()
+    yield
+    clear_hpo_ontologies()
+
+
+class TestOntology:
+    def test_ancestor_closure_and_id_resolution(self, ontology):
+        assert len(ontology) == 9
+        assert ontology.ancestors_of('HP:0100615') == {
+            'HP:0100615', 'HP:0002664', 'HP:0000137', 'HP:0000118', 'HP:0000001'}
+        assert ontology.is_ancestor('HP:0000118', 'HP:0003002')
+        assert not ontology.is_ancestor('HP:0003002', 'HP:0000118')
+        # Alternative and obsolete IDs resolve to the current term
+        assert ontology.index_of('HP:0006770') == ontology.index_of('HP:0003002')
+        assert ontology.index_of('HP:0000999') == ontology.index_of('HP:0003002')
+        assert 'Breast cancer' in ontology.synonyms[ontology.index_of('HP:0003002')]
+        assert list(ontology.to_indices(['TEXT:cancer', 'HP:0006770', 'HP:0003002'])) == [
+            ontology.index_of('HP:0003002')]
+
+    def test_information_content(self, ontology, tmp_path):
+        ic = dict(zip(ontology.ids, ontology.ic))
+        assert ic['HP:0000001'] == 0.0
+        assert ic['HP:0002664'] < ic['HP:0100013'] < ic['HP:0003002']
+
+        hpoa = tmp_path / 'phenotype.hpoa'
+        hpoa.write_text(HPOA)
+        annotations = load_hpoa(str(hpoa))
+        assert annotations == {'OMIM:1': {'HP:0003002', 'HP:0100615'}, 'OMIM:2': {'HP:0002069'},
+                               'OMIM:3': {'HP:0002664'}}
+        ontology.annotate(annotations, source='phenotype.hpoa')
+        ic = dict(zip(ontology.ids, ontology.ic))
+        # Neoplasm annotates two of three diseases (directly or through a descendant)
+        assert ic['HP:0002664'] == pytest.approx(np.log(3 / 2))
+        assert ic['HP:0003002'] == pytest.approx(np.log(3))
+        assert ontology.ic_source == 'phenotype.hpoa'
+
+    def test_resnik_matrix_matches_pairwise_mica(self, ontology):
+        indices = np.arange(len(ontology), dtype=np.int32)
+        matrix = ontology.resnik_matrix(indices, indices)
+        for a, b in itertools.product(ontology.ids, repeat=2):
+            common = ontology.ancestors_of(a) & ontology.ancestors_of(b)
+            mica = max(ontology.ic[ontology.index_of(term)] for term in common)
+            assert matrix[ontology.index_of(a), ontology.index_of(b)] == pytest.approx(mica)
+
+        assert ontology.similarity(['HP:0003002'], ['HP:0006770']) == pytest.approx(1.0)
+        related = ontology.similarity(['HP:0003002'], ['HP:0100013', 'HP:0100615'])
+        unrelated = ontology.similarity(['HP:0003002'], ['HP:0002069'])
+        assert related > 5 * unrelated
+        assert ontology.similarity(['TEXT:cancer'], ['HP:0003002']) == 0.0
+
+
+class TestPhenotypeMatching:
+    @pytest.fixture
+    def gene_db_path(self, tmp_path):
+        path = tmp_path / 'gene_phenotypes.json'
+        path.write_text(json.dumps({
+            '_comment': 'synthetic',
+            'BRCA1': {'hpo_terms': ['HP:0100013', 'HP:0100615'], 'disease': 'HBOC'},
+            'SCN1A': {'hpo_terms': ['HP:0002069'], 'disease': 'Dravet syndrome'},
+        }))
+        return str(path)
+
+    def test_ancestor_aware_pp4_and_bp5(self, ontology, gene_db_path):
+        class Variant:
+            gene = 'BRCA1'
+
+        patient = ['HP:0003002', 'HP:0100615', 'HP:0000137']
+        jaccard = PhenotypeMatcher(gene_db_path=gene_db_path)
+        assert jaccard.ontology is None
+        semantic = PhenotypeMatcher(gene_db_path=gene_db_path, ontology=ontology)
+
+        # Breast carcinoma is a descendant of the gene's "Neoplasm of the breast"
+        assert jaccard.evaluate_phenotype_match(Variant(), patient)['evidence_code'] is None
+        result = semantic.evaluate_phenotype_match(Variant(), patient)
+        assert result['evidence_code'] in ('PP4', 'PP4_supporting')
+        assert result['similarity'] > 0.5
+
+        Variant.gene = 'SCN1A'
+        assert semantic.evaluate_phenotype_match(Variant(), patient)['evidence_code'] == 'BP5'
+
+        assert semantic.thresholds['PP4'] > jaccard.thresholds['BP5'] > semantic.thresholds['BP5']
+
+        # Tokens outside the ontology stay in the best-match average as exact matches
+        calculator = PhenotypeSimilarityCalculator(ontology=ontology)
+        assert calculator.calculate_similarity({'TEXT:lump'}, {'TEXT:lump', 'TEXT:pain'}) == 0.75
+        with_text = calculator.calculate_similarity({'HP:0003002', 'TEXT:lump'}, {'HP:0003002'})
+        assert with_text == pytest.approx(0.75)
+        assert calculator.calculate_similarity({'HP:0003002', 'TEXT:lump'}, {'HP:0003002', 'TEXT:lump'}) == 1.0
+
+    def test_shared_ontology_resolution(self, obo_path, tmp_path, monkeypatch, capsys):
+        hpoa = tmp_path / 'phenotype.hpoa'
+        hpoa.write_text(HPOA)
+        monkeypatch.setenv('ACMG_HPO_OBO', obo_path)
+        monkeypatch.setenv('ACMG_HPO_ANNOTATIONS', str(hpoa))
+        assert get_hpo_ontology() is get_hpo_ontology()
+        assert get_hpo_ontology().ic_source == 'phenotype.hpoa'
+        assert PhenotypeMatcher().ontology is get_hpo_ontology()
+
+        empty = tmp_path / 'empty.obo'
+        empty.write_text('format-version: 1.2\n')
+        assert get_hpo_ontology(str(empty)) is None
+        assert get_hpo_ontology(str(empty)) is None
+        assert capsys.readouterr().out.count('Local HPO ontology unavailable') == 1
@@ -0,0 +1,111 @@
+"""
+Tests for the HPO Text Matcher
+==============================
+
+Checks the token-level Aho-Corasick automaton against a brute-force scan,
+leftmost-longest span selection, token normalization, negation, and the
+HPOClient integration for clinical notes.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.hpo_ontology import HPOOntology
+from utils.hpo_text_matcher import HPOTextMatcher, normalize_token, tokenize
+from core.phenotype_matcher import HPOClient, PhenotypeMatcher
+
+
+PHRASES = [
+    ('breast cancer', 'HP:0003002'),
+    ('cancer', 'HP:0002664'),
+    ('ovarian tumor', 'HP:0000137'),
+    ('seizure', 'HP:0001250'),
+    ('generalized tonic clonic seizure', 'HP:0002069'),
+    ('tonic clonic', 'HP:0020219'),
+    ('Breast carcinoma', 'HP:0003002'),
+    ('BREAST CANCER', 'HP:9999999'),
+]
+
+
+class TestAutomaton:
+    def test_scan_matches_brute_force(self):
+        rng = random.Random(17)
+        vocabulary = ['a', 'b', 'c', 'd']
+        phrases = {' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4))) for _ in range(40)}
+        matcher = HPOTextMatcher((phrase, phrase) for phrase in sorted(phrases))
+        assert len(matcher) == len(phrases)
+
+        words = [rng.choice(vocabulary) for _ in range(300)]
+        expected = {(i, j, ' '.join(words[i:j + 1]))
+                    for i in range(len(words)) for j in range(i, min(i + 4, len(words)))
+                    if ' '.join(words[i:j + 1]) in phrases}
+        assert set(matcher.scan(tokenize(' '.join(words)))) == expected
+
+    def test_leftmost_longest_spans_and_normalization(self):
+        matcher = HPOTextMatcher(PHRASES)
+        # Phrases that normalize alike keep the first HPO ID
+        assert len(matcher) == 7
+        note = "Pt with Breast  Cancer (dx 2019), ovarian tumours and generalised tonic-clonic seizures."
+        mentions = matcher.find(note)
+        assert [(m.hpo_id, m.text) for m in mentions] == [
+            ('HP:0003002', 'Breast  Cancer'),
+            ('HP:0000137', 'ovarian tumours'),
+            ('HP:0002069', 'generalised tonic-clonic seizures'),
+        ]
+        assert note[mentions[0].start:mentions[0].end] == 'Breast  Cancer'
+        assert normalize_token('Ovaries') == 'ovary' and normalize_token('tumours') == 'tumor'
+        assert normalize_token('paralysis') == 'paralysis' and normalize_token('raise') == 'raise'
+        assert normalize_token('Generalised') == normalize_token('generalized')
+        assert normalize_token('hospitalisation') == 'hospitalization'
+        assert matcher.find('cancerous growth') == []
+
+    def test_negation_scope(self):
+        matcher = HPOTextMatcher(PHRASES)
+        note = "Denies seizures. Mother had no cancer but breast cancer in sister; negative for ovarian tumor"
+        found = {(m.text, m.negated) for m in matcher.find(note)}
+        assert found == {('seizures', True), ('cancer', True), ('breast cancer', False), ('ovarian tumor', True)}
+        assert matcher.extract_terms(note) == {'HP:0003002'}
+
+    def test_negation_cue_phrases_and_commas(self):
+        matcher = HPOTextMatcher(PHRASES)
+        assert [(m.text, m.negated) for m in matcher.find('Triple negative breast cancer at 41')] == [
+            ('breast cancer', False)]
+        assert [(m.text, m.negated) for m in matcher.find('No ovarian tumor, seizures since age 2')] == [
+            ('ovarian tumor', True), ('seizures', False)]
+        assert [(m.text, m.negated) for m in matcher.find('No ovarian tumor, breast cancer or seizures.')] == [
+            ('ovarian tumor', True), ('breast cancer', True), ('seizures', True)]
+        assert [(m.text, m.negated) for m in matcher.find(
+            'No ovarian tumor, seizures since age 2 and breast cancer.')] == [
+            ('ovarian tumor', True), ('seizures', False), ('breast cancer', False)]
+        assert [(m.text, m.negated) for m in matcher.find(
+            'No fever, seizures since age 2 and developmental delay.')] == [('seizures', False)]
+        assert all(m.negated for m in matcher.find('No seizures, ovarian tumor, or breast cancer.'))
+
+
+class TestHPOClientIntegration:
+    def test_clinical_note_terms(self):
+        client = HPOClient()
+        note = "8 y/o girl, recurrent seizures since infancy. Family history of breast cancer. No colon cancer."
+        assert client.get_phenotype_terms([note]) == {'HP:0001250', 'HP:0003002'}
+        assert [m.text for m in client.extract_phenotypes(note, include_negated=True)] == [
+            'seizures', 'breast cancer', 'colon cancer']
+        # Negated-only text adds nothing; unknown text still becomes a TEXT: token
+        assert client.get_phenotype_terms(['no seizures']) == set()
+        assert client.get_phenotype_terms(['unknownphenotype']) == {'TEXT:unknownphenotype'}
+
+    def test_ontology_labels_and_synonyms(self):
+        ontology = HPOOntology([
+            {'id': 'HP:0000001', 'name': 'All', 'synonyms': [], 'is_a': [], 'alt_ids': [],
+             'obsolete': False, 'replaced_by': None},
+            {'id': 'HP:0001252', 'name': 'Hypotonia', 'synonyms': ['Floppy infant', 'Low muscle tone'],
+             'is_a': ['HP:0000001'], 'alt_ids': [], 'obsolete': False, 'replaced_by': None},
+        ])
+        matcher = PhenotypeMatcher(ontology=ontology)
+        terms = matcher.normalize_phenotypes(["Presented as a floppy infant with low muscle tone and seizures in all limbs"])
+        assert terms == {'HP:0001252', 'HP:0001250'}
@@ -0,0 +1,169 @@
+"""
+Tests for HTTP Cassette Record/Replay
+=====================================
+
+Verifies that recorded upstream responses can be replayed through a local
+stand-in server so the real API client parsing and caching paths run
+without network access.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import json
+import shutil
+import tempfile
+import sys
+import os
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.http_cassette import (
+    CassetteStore,
+    CassetteReplayServer,
+    record_http,
+    replay_http,
+    request_key,
+)
+from utils.predictor_api_client import (
+    PredictorAPIClient,
+    PREDICTOR_API_ENDPOINTS,
+    MYVARIANT_FIELDS,
+)
+
+
+@pytest.fixture
+def store():
+    """Cassette store in a temporary directory."""
+    temp_dir = tempfile.mkdtemp(prefix='acmg_cassette_test_')
+    yield CassetteStore(temp_dir)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _save_myvariant(store: CassetteStore, variant_id: str, payload: dict) -> None:
+    """Record a myvariant.info response the way PredictorAPIClient requests it."""
+    url = requests.Request(
+        'GET',
+        f"{PREDICTOR_API_ENDPOINTS['myvariant']}/{variant_id}",
+        params={'fields': MYVARIANT_FIELDS}
+    ).prepare().url
+    store.save('GET', url, 200, json.dumps(payload))
+
+
+class TestCassetteStore:
+    """Tests for cassette keying and storage."""
+
+    def test_query_order_does_not_change_key(self):
+        a = request_key('GET', 'https://example.org/api?b=2&a=1')
+        b = request_key('GET', 'https://example.org/api?a=1&b=2')
+        assert a == b
+
+    def test_json_body_key_order_does_not_change_key(self):
+        a = request_key('POST', 'https://example.org/api', '{"x": 1, "y": 2}')
+        b = request_key('POST', 'https://example.org/api', b'{"y":2,"x":1}')
+        assert a == b
+
+    def test_save_and_load(self, store):
+        store.save('GET', 'https://example.org/api?q=1', 200, '{"ok": true}')
+        entry = store.load('GET', 'https://example.org/api?q=1')
+        assert entry['status_code'] == 200
+        assert json.loads(entry['body']) == {'ok': True}
+        assert store.load('GET', 'https://example.org/api?q=2') is None
+        assert len(store) == 1
+
+    def test_store_reopens_existing_entries(self, store):
+        store.save('GET', 'https://example.org/api', 404, '')
+        reopened = CassetteStore(str(store.cassette_dir))
+        assert reopened.load('GET', 'https://example.org/api')['status_code'] == 404
+
+
+class TestReplay:
+    """Tests for replaying cassettes through the real client code."""
+
+    def test_predictor_client_parses_replayed_response(self, store):
+        _save_myvariant(store, 'chr17:g.7674220C>T', {
+            'dbnsfp': {'revel': {'score': 0.93}, 'cadd': {'phred': 29.1}}
+        })
+        client = PredictorAPIClient(api_enabled=True)
+
+        with replay_http(store) as server:
+            scores = client._fetch_from_myvariant('17', 7674220, 'C', 'T')
+
+        assert scores['revel'].value == 0.93
+        assert scores['cadd_phred'].value == 29.1
+        assert server.get_stats()['hits'] == 1
+
+    def test_missing_entry_returns_miss_status(self, store):
+        with replay_http(store, miss_status=599) as server:
+            response = requests.get('https://example.org/unrecorded')
+        assert response.status_code == 599
+        assert server.get_stats()['misses'] == 1
+
+    def test_error_injection(self, store):
+        _save_myvariant(store, 'chr17:g.7674220C>T', {
+            'dbnsfp': {'revel': {'score': 0.93}}
+        })
+        client = PredictorAPIClient(api_enabled=True)
+
+        with replay_http(store, error_rate=1.0, error_status=503) as server:
+            scores = client._fetch_from_myvariant('17', 7674220, 'C', 'T')
+
+        assert scores == {}
+        assert server.get_stats()['injected_errors'] == 1
+
+    def test_latency_is_applied(self, store):
+        store.save('GET', 'https://example.org/api', 200, '{}')
+        import time
+        with replay_http(store, latency=0.05):
+            start = time.perf_counter()
+            requests.get('https://example.org/api')
+            elapsed = time.perf_counter() - start
+        assert elapsed >= 0.05
+
+    def test_requests_functions_restored(self, store):
+        original_get, original_post = requests.get, requests.post
+        with replay_http(store):
+            assert requests.get is not original_get
+        assert requests.get is original_get
+        assert requests.post is original_post
+
+
+class TestRecording:
+    """Tests for recording responses into a store."""
+
+    def test_record_round_trip(self, store):
+        """Responses served by one store are recorded into another."""
+        upstream_dir = tempfile.mkdtemp(prefix='acmg_cassette_upstream_')
+        try:
+            upstream = CassetteStore(upstream_dir)
+            upstream.save(
+                'POST', 'https://gnomad.broadinstitute.org/api/', 200,
+                '{"data": {"variant": null}}',
+                request_body='{"query": "q", "variables": {"variantId": "1-1-A-T"}}'
+            )
+
+            with replay_http(upstream):
+                with record_http(store):
+                    response = requests.post(
+                        'https://gnomad.broadinstitute.org/api/',
+                        json={'variables': {'variantId': '1-1-A-T'}, 'query': 'q'}
+                    )
+
+            assert response.json() == {'data': {'variant': None}}
+            entry = store.load(
+                'POST', 'https://gnomad.broadinstitute.org/api/',
+                '{"query": "q", "variables": {"variantId": "1-1-A-T"}}'
+            )
+            assert entry is not None
+            assert entry['status_code'] == 200
+        finally:
+            shutil.rmtree(upstream_dir, ignore_errors=True)
+
+    def test_server_context_manager(self, store):
+        with CassetteReplayServer(store) as server:
+            assert server.base_url.startswith('http://127.0.0.1:')
+            proxied = server.proxy_url('https://rest.ensembl.org/lookup?x=1')
+            assert proxied.endswith('/https/rest.ensembl.org/lookup?x=1')
@@ -0,0 +1,146 @@
+"""
+Tests for the Local Liftover
+============================
+
+Lifts variants through a small synthetic chain file (plus and minus
+strand chains, a gap) against a GRCh38 .2bit reference, and checks the
+per-record failure reasons and GRCh37 input in the batch planner.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import random
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.liftover import (
+    LIFTOVER_NO_CHAIN,
+    LIFTOVER_NO_REFERENCE,
+    LIFTOVER_REF_MISMATCH,
+    LIFTOVER_SPLIT,
+    LIFTOVER_UNMAPPED,
+    ChainFileError,
+    ChainLiftover,
+    reverse_complement,
+)
+from utils.reference_genome import TwoBitFile, write_twobit
+from utils.batch_planner import VariantBatchPlanner
+from core.evidence_evaluator import VariantData
+
+
+# chr1:0-100 -> chr1:1000-1090 (+), 10 bp source gap after 50 bp
+# chr2:0-30  -> chr5 (-), query size 100, query start 10
+CHAIN = """chain 1000 chr1 249250621 + 0 100 chr1 248956422 + 1000 1090 1
+50 10 0
+40
+
+chain 500 chr2 243199373 + 0 30 chr5 100 - 10 40 2
+30
+"""
+
+TARGET = {
+    'chr1': ''.join(random.Random(5).choice('ACGT') for _ in range(1100)),
+    'chr5': ''.join(random.Random(6).choice('ACGT') for _ in range(100)),
+}
+
+
+@pytest.fixture
+def liftover(tmp_path):
+    chain = tmp_path / 'hg19ToHg38.over.chain'
+    chain.write_text(CHAIN)
+    return ChainLiftover.from_chain_file(str(chain))
+
+
+@pytest.fixture
+def reference(tmp_path):
+    path = tmp_path / 'hg38.2bit'
+    write_twobit(str(path), TARGET)
+    return TwoBitFile(str(path))
+
+
+class TestChainLiftover:
+    """Tests for position and variant liftover."""
+
+    def test_positions(self, liftover):
+        assert liftover.lift_position('chr1', 11) == [('1', 1011, '+')]
+        assert liftover.lift_position('1', 61) == [('1', 1051, '+')]
+        assert liftover.lift_position('1', 55) == []
+        assert liftover.lift_position('2', 1) == [('5', 90, '-')]
+        assert liftover.lift_position('2', 30) == [('5', 61, '-')]
+
+    def test_plus_strand_and_failures(self, liftover, reference):
+        ref = TARGET['chr1'][1010]
+        other = 'A' if ref != 'A' else 'C'
+        result = liftover.lift_variant('chr1', 11, ref, other, reference)
+        assert result.ok and result.key == ('1', 1011, ref, other)
+
+        assert liftover.lift_variant('1', 11, other, 'T', reference).error == LIFTOVER_REF_MISMATCH
+        assert liftover.lift_variant('1', 55, 'A', 'T', reference).error == LIFTOVER_UNMAPPED
+        assert liftover.lift_variant('7', 55, 'A', 'T', reference).error == LIFTOVER_UNMAPPED
+        assert liftover.lift_variant('1', 50, 'A' * 12, 'A', reference).error == LIFTOVER_SPLIT
+
+    def test_minus_strand(self, liftover, reference):
+        target = TARGET['chr5']
+        snv_ref = reverse_complement(target[89])
+        snv = liftover.lift_variant('2', 1, snv_ref, 'A', reference)
+        assert snv.key == ('5', 90, target[89], 'T') and snv.strand == '-'
+
+        # Deletion of source base 6 (anchor at 5) -> left-anchored at target 84
+        deletion_ref = reverse_complement(target[84:86])
+        deletion = liftover.lift_variant('2', 5, deletion_ref, deletion_ref[0], reference)
+        assert deletion.key == ('5', 84, target[83:85], target[83])
+
+        no_reference = liftover.lift_variants([('2', 5, deletion_ref, deletion_ref[0])], reference=None)
+        assert no_reference[0].error == LIFTOVER_NO_REFERENCE
+
+    def test_bulk_and_invalid_chain(self, liftover, reference, tmp_path):
+        ref = TARGET['chr1'][1010]
+        results = liftover.lift_variants([('1', 11, ref, 'A'), ('1', 55, 'A', 'T'), ('1', 'x', 'A', 'T')], reference)
+        assert [r.error for r in results] == [None, LIFTOVER_UNMAPPED, 'invalid']
+
+        bad = tmp_path / 'bad.chain'
+        bad.write_text('50 10 0\n')
+        with pytest.raises(ChainFileError):
+            ChainLiftover.from_chain_file(str(bad))
+
+
+class TestBatchPlannerLiftover:
+    """Tests for GRCh37 input in the batch planner."""
+
+    def test_grch37_variants_are_lifted(self, liftover, reference, monkeypatch):
+        ref = TARGET['chr1'][1010]
+        variants = [VariantData(), VariantData()]
+        variants[0].basic_info = {'chromosome': '1', 'position': 11, 'ref_allele': ref, 'alt_allele': 'A'}
+        variants[1].basic_info = {'chromosome': '1', 'position': 55, 'ref_allele': 'A', 'alt_allele': 'T'}
+
+        monkeypatch.setattr('utils.reference_genome.get_reference_genome', lambda path=None: reference)
+        predictor_client = Mock()
+        predictor_client.get_predictor_scores_many.return_value = {('1', 1011, ref, 'A'): {'revel': 'score'}}
+        planner = VariantBatchPlanner(predictor_client=predictor_client, genome_build='GRCh37', liftover=liftover)
+
+        result = planner.prefetch(variants)
+        predictor_client.get_predictor_scores_many.assert_called_once_with([('1', 1011, ref, 'A')])
+        assert list(result.liftover.values())[1].error == LIFTOVER_UNMAPPED
+
+        planner.apply(variants, result)
+        assert variants[0].basic_info['position'] == 1011
+        assert variants[0].basic_info['liftover']['position'] == 11
+        assert variants[0].predictor_scores == {'revel': 'score'}
+        assert variants[1].basic_info['liftover']['error'] == LIFTOVER_UNMAPPED
+        assert planner.plan(variants).variants == [('1', 1011, ref, 'A')]
+
+    def test_missing_chain_reported_per_record(self, monkeypatch):
+        monkeypatch.delenv('ACMG_LIFTOVER_CHAIN', raising=False)
+        plan = VariantBatchPlanner(genome_build='GRCh37').plan([('1', 11, 'A', 'G')])
+        assert plan.variants == []
+        assert plan.liftover_failures == {('1', 11, 'A', 'G'): LIFTOVER_NO_CHAIN}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
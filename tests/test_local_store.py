@@ -0,0 +1,78 @@
+"""
+Tests for Shared Local Resources
+================================
+
+Checks path resolution, one open per file, one warning per failing file,
+reloading on modification, and closing on clear.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config.constants import LOCAL_DATA_SOURCES
+from utils.local_store import LocalResource
+
+
+class Resource:
+    opened = 0
+
+    def __init__(self, path):
+        with open(path) as f:
+            self.content = f.read()
+        if not self.content:
+            raise ValueError('empty file')
+        self.closed = False
+        Resource.opened += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('v1')
+    Resource.opened = 0
+    return str(path)
+
+
+class TestLocalResource:
+    def test_resolution_and_single_open(self, data_file, tmp_path, monkeypatch, capsys):
+        resources = LocalResource('test_resource', 'ACMG_TEST_RESOURCE', Resource,
+                                  label='Local test resource', errors=(ValueError,))
+        assert resources.get() is None
+
+        monkeypatch.setenv('ACMG_TEST_RESOURCE', data_file)
+        assert resources.get() is resources.get(data_file)
+        assert Resource.opened == 1
+
+        monkeypatch.setitem(LOCAL_DATA_SOURCES, 'test_resource', str(tmp_path / 'missing.txt'))
+        empty = tmp_path / 'empty.txt'
+        empty.write_text('')
+        assert resources.get() is None and resources.get() is None
+        assert resources.get(str(empty)) is None and resources.get(str(empty)) is None
+        assert capsys.readouterr().out.count('Local test resource unavailable') == 2
+
+        shared = resources.get(data_file)
+        resources.clear()
+        assert shared.closed and resources.get(data_file) is not shared
+
+    def test_reload_on_change_and_register(self, data_file):
+        resources = LocalResource(None, None, Resource, label='Local test resource', reload_on_change=True)
+        first = resources.get(data_file)
+        assert resources.get(data_file) is first
+
+        with open(data_file, 'w') as f:
+            f.write('v2')
+        os.utime(data_file, (0, 0))
+        assert resources.get(data_file).content == 'v2'
+
+        resources.register(first, data_file)
+        assert resources.get(data_file) is first
@@ -0,0 +1,150 @@
+"""
+Tests for Phenotype-Driven Gene Ranking and Batch Evaluation
+============================================================
+
+Checks that ranking all genes through the inverted term -> gene index, and
+batch PP4/BP5 evaluation of (patient, gene) pairs, give the same scores and
+results as evaluating each gene on its own, for weighted Jaccard and for
+ontology-aware similarity.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import json
+import os
+import random
+import sys
+
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.phenotype_matcher import GenePhenotypeIndex, PhenotypeMatcher, PhenotypeSimilarityCalculator
+from utils.hpo_ontology import HPOOntology
+
+
+def _term(i):
+    return f"HP:{i:07d}"
+
+
+def _random_ontology(size, seed=5):
+    # Layered DAG (term i has parents among the terms before it) with some multiple inheritance
+    rng = random.Random(seed)
+    return HPOOntology([
+        {'id': _term(i), 'name': f"term {i}", 'synonyms': [], 'alt_ids': [f"HP:9{i:06d}"],
+         'is_a': [_term(rng.randrange(i // 4, i // 2 + 1)) for _ in range(rng.choice([1, 1, 2]))] if i else [],
+         'obsolete': False, 'replaced_by': None}
+        for i in range(size)
+    ])
+
+
+@pytest.fixture
+def random_gene_db(tmp_path):
+    rng = random.Random(7)
+    genes = {f"GENE{g}": {'hpo_terms': [_term(rng.randrange(1, 400)) for _ in range(rng.randint(1, 12))],
+                          'disease': f"Disease {g}"}
+             for g in range(300)}
+    genes['GENE0']['hpo_terms'] = ['TEXT:unmapped']
+    # The same term under its primary and alternative ID
+    genes['GENE1']['hpo_terms'] = [_term(10), 'HP:9000010', _term(11)]
+    path = tmp_path / 'gene_phenotypes.json'
+    path.write_text(json.dumps(genes))
+    return str(path)
+
+
+class TestGenePhenotypeIndex:
+    def test_postings(self):
+        index = GenePhenotypeIndex({'BRCA1': {'HP:0003002', 'HP:0000137'}, 'TP53': {'HP:0003002'}, 'EMPTY': set()})
+        assert index.genes == ['BRCA1', 'TP53']
+        assert list(index.term_genes['HP:0003002']) == [0, 1]
+        assert index.row('tp53') == 1 and index.row('EMPTY') is None
+
+
+class TestRankGenes:
+    def test_bundled_database_ranking(self):
+        matcher = PhenotypeMatcher()
+        patient = ['breast cancer', 'ovarian neoplasm']
+        ranking = matcher.rank_genes(patient, top_k=3)
+        assert [hit['gene'] for hit in ranking[:2]] == ['BRCA1', 'BRCA2']
+        assert ranking[0]['matched_terms'] == {'HP:0003002', 'HP:0000137'}
+        assert ranking[0]['disease']
+
+        for hit in matcher.rank_genes(patient, top_k=None):
+            single = matcher.evaluate_phenotype_match(type('Variant', (), {'gene': hit['gene']})(), patient)
+            assert hit['similarity'] == pytest.approx(single['similarity'])
+
+        assert all(hit['similarity'] >= 0.3 for hit in matcher.rank_genes(patient, top_k=None, min_similarity=0.3))
+        assert matcher.rank_genes([]) == []
+
+    @pytest.mark.parametrize('with_ontology', [False, True])
+    def test_vectorized_scores_match_per_gene_scores(self, random_gene_db, with_ontology):
+        ontology = _random_ontology(500) if with_ontology else None
+        matcher = PhenotypeMatcher(gene_db_path=random_gene_db)
+        matcher.similarity_calculator = PhenotypeSimilarityCalculator(ontology=ontology)
+        index = matcher.gene_phenotype_db.get_index()
+        rng = random.Random(3)
+
+        for _ in range(5):
+            patient = {_term(rng.randrange(1, 500)) for _ in range(rng.randint(1, 8))} | {'TEXT:tall'}
+            scores = matcher.similarity_calculator.calculate_similarity_many(patient, index)
+            for row, gene_terms in enumerate(index.gene_terms):
+                expected = matcher.similarity_calculator.calculate_similarity(patient, set(gene_terms))
+                assert scores[row] == pytest.approx(expected)
+
+            top = matcher.rank_genes(sorted(patient - {'TEXT:tall'}) + ['tall'], top_k=10)
+            assert len(top) == 10
+            assert [hit['similarity'] for hit in top] == sorted(scores, reverse=True)[:10]
+
+
+class TestBatchEvaluation:
+    def test_batch_matches_single_pair_results(self):
+        matcher = PhenotypeMatcher()
+        patients = [
+            ['HP:0003002', 'HP:0100013', 'HP:0000137', 'HP:0030075'],
+            ['breast cancer', 'ovarian neoplasm'],
+            ['Recurrent seizures, no breast cancer.'],
+            ['unknownphenotype', 'HP:0001250', 'HP:0002664'],
+            [],
+            None,
+        ]
+        genes = matcher.gene_phenotype_db.get_all_genes() + ['NOT_A_GENE', '']
+        pairs = [(patient, gene) for patient in patients for gene in genes]
+
+        class Variant:
+            def __init__(self, gene, phenotypes):
+                self.basic_info = {'gene': gene}
+                self.patient_phenotypes = phenotypes
+
+        pairs.append((None, Variant('TP53', ['HP:0003002'])))
+        pairs.append((['HP:0003002'], Variant(None, None)))
+
+        batch = matcher.evaluate_phenotype_matches(pairs)
+        assert len(batch) == len(pairs)
+        for (patient, gene), result in zip(pairs, batch):
+            variant = gene if not isinstance(gene, str) else type('Variant', (), {'gene': gene})()
+            single = matcher.evaluate_phenotype_match(variant, patient)
+            assert result.pop('similarity') == pytest.approx(single.pop('similarity'))
+            assert result == single
+        assert batch[0]['evidence_code'] == 'PP4'
+
+    def test_each_patient_normalized_once(self, random_gene_db):
+        matcher = PhenotypeMatcher(gene_db_path=random_gene_db)
+        matcher.similarity_calculator = PhenotypeSimilarityCalculator(ontology=_random_ontology(500))
+        genes = matcher.gene_phenotype_db.get_all_genes()
+        rng = random.Random(9)
+        patients = [[_term(rng.randrange(1, 500)) for _ in range(5)] for _ in range(4)]
+        pairs = [(list(reversed(patient)) if i % 2 else patient, gene)
+                 for patient in patients for i, gene in enumerate(genes)]
+
+        with patch.object(matcher.hpo_client, 'get_phenotype_terms',
+                          wraps=matcher.hpo_client.get_phenotype_terms) as normalize:
+            batch = matcher.evaluate_phenotype_matches(pairs)
+        assert normalize.call_count == len(patients)
+
+        for (patient, gene), result in list(zip(pairs, batch))[::37]:
+            single = matcher.evaluate_phenotype_match(type('Variant', (), {'gene': gene})(), patient)
+            assert result['similarity'] == pytest.approx(single['similarity'])
+            assert result['evidence_code'] == single['evidence_code']
@@ -31,7 +31,12 @@ from config.predictors import (
     INSILICO_WEIGHTS,
     MIN_PREDICTORS_FOR_COMPOSITE,
 )
-from utils.predictor_api_client import PredictorAPIClient, PopulationAPIClient
+from utils.predictor_api_client import (
+    PredictorAPIClient,
+    PopulationAPIClient,
+    build_gnomad_batch_query,
+)
+from utils.api_client import APIClient
 from core.missense_evaluator import MissenseEvaluator
 from core.population_analyzer import GnomADClient, EthnicityAwarePopulationAnalyzer
 from core.variant_data import VariantData
@@ -280,6 +285,99 @@ class TestPredictorAPIClient:
         # First should be REVEL (highest weight)
         assert weighted[0][0] == 'revel'
 
+    
+    @patch('utils.predictor_api_client.requests.post')
+    def test_predictor_scores_many_batches_myvariant(self, mock_post):
+        """Test batch POST maps hits back to variants by query ID."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = [
+            {'query': 'chr17:g.43092919G>A',
+             'dbnsfp': {'revel': {'score': 0.85}, 'cadd': {'phred': 28.5},
+                        'alphamissense': {'am_pathogenicity': 0.9}}},
+            {'query': 'chr13:g.32339076C>T', 'notfound': True},
+        ]
+        mock_post.return_value = mock_response
+        
+        client = PredictorAPIClient(api_enabled=True)
+        with patch.object(client, '_fetch_fallback_scores_many'):
+            results = client.get_predictor_scores_many([
+                ('17', 43092919, 'G', 'A'),
+                ('13', 32339076, 'C', 'T'),
+            ])
+        
+        assert mock_post.call_count == 1
+        sent_ids = mock_post.call_args.kwargs['data']['ids'].split(',')
+        assert sent_ids == ['chr17:g.43092919G>A', 'chr13:g.32339076C>T']
+        assert results[('17', 43092919, 'G', 'A')]['revel'].value == 0.85
+        assert results[('17', 43092919, 'G', 'A')]['cadd_phred'].value == 28.5
+        assert results[('13', 32339076, 'C', 'T')]['revel'].value is None
+        # Found hits are cached individually; not-found hits are not
+        assert 'myvariant_chr17:g.43092919G>A' in client.cache
+        assert 'myvariant_chr13:g.32339076C>T' not in client.cache
+    
+    @patch('utils.predictor_api_client.requests.post')
+    def test_predictor_scores_many_chunks_and_skips_cached(self, mock_post):
+        """Test cached variants are skipped and the rest are chunked."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = []
+        mock_post.return_value = mock_response
+        
+        client = PredictorAPIClient(api_enabled=True)
+        client.cache['myvariant_chr1:g.100A>G'] = {'dbnsfp': {'revel': {'score': 0.4}}}
+        variants = [('1', 100 + i, 'A', 'G') for i in range(5)]
+        
+        with patch.object(client, '_fetch_fallback_scores_many'):
+            results = client.get_predictor_scores_many(variants, batch_size=2)
+        
+        assert mock_post.call_count == 2
+        assert results[('1', 100, 'A', 'G')]['revel'].value == 0.4
+        assert len(results) == 5
+    
+    @patch('utils.predictor_api_client.requests.get')
+    @patch('utils.predictor_api_client.requests.post')
+    def test_predictor_scores_many_batches_fallback_through_vep(self, mock_post, mock_get):
+        """Test AlphaMissense/CADD gaps are filled by one VEP POST, not per-variant GETs."""
+        myvariant = Mock(status_code=200)
+        myvariant.json.return_value = [
+            {'query': 'chr17:g.43092919G>A', 'dbnsfp': {'revel': {'score': 0.85}}},
+            {'query': 'chr13:g.32339076C>T', 'notfound': True},
+        ]
+        vep = Mock(status_code=200)
+        vep.json.return_value = [
+            {'input': '17 43092919 . G A . . .', 'transcript_consequences': [
+                {'cadd_phred': 12.0, 'alphamissense': {'am_pathogenicity': 0.2}},
+                {'canonical': 1, 'cadd_phred': 28.5, 'alphamissense': {'am_pathogenicity': 0.9}},
+            ]},
+            {'input': '13 32339076 . C T . . .', 'transcript_consequences': [{'cadd_phred': 3.1}]},
+        ]
+        mock_post.side_effect = [myvariant, vep]
+        
+        client = PredictorAPIClient(api_enabled=True)
+        variants = [('17', 43092919, 'G', 'A'), ('13', 32339076, 'C', 'T')]
+        results = client.get_predictor_scores_many(variants)
+        
+        assert mock_post.call_count == 2 and not mock_get.called
+        assert mock_post.call_args.kwargs['json']['variants'] == ['17 43092919 . G A . . .', '13 32339076 . C T . . .']
+        assert results[variants[0]]['alphamissense'].value == 0.9
+        assert results[variants[0]]['cadd_phred'].value == 28.5
+        assert results[variants[0]]['cadd_phred'].source == 'VEP'
+        assert results[variants[1]]['cadd_phred'].value == 3.1
+        assert results[variants[1]]['alphamissense'].value is None
+        
+        # Answered variants are cached, including the missing AlphaMissense score
+        mock_post.side_effect = None
+        mock_post.return_value = myvariant
+        client.get_predictor_scores_many(variants)
+        assert mock_post.call_count == 3
+    
+    def test_predictor_scores_many_test_mode(self):
+        """Test batch lookup honours test_mode."""
+        client = PredictorAPIClient(api_enabled=True, test_mode=True)
+        results = client.get_predictor_scores_many([('17', 43092919, 'G', 'A')])
+        assert results[('17', 43092919, 'G', 'A')]['revel'].source == 'mock'
+
 
 # =============================================================================
 # PopulationAPIClient Tests with Mocked Responses
@@ -345,6 +443,90 @@ class TestPopulationAPIClient:
             'gnomad_v4': PopulationStats(population='gnomad_v4', af=0.001)
         }
         assert client.is_absent_from_all(present_stats) is False
+    
+    def test_build_gnomad_batch_query_aliases(self):
+        """Test aliased batch document passes variant IDs as variables."""
+        query, variables = build_gnomad_batch_query(['17-1-G-A', '13-2-C-T'])
+        
+        assert 'v0: variant(variantId: $v0, dataset: $datasetId)' in query
+        assert 'v1: variant(variantId: $v1, dataset: $datasetId)' in query
+        assert '$v1: String!' in query
+        assert variables == {'v0': '17-1-G-A', 'v1': '13-2-C-T'}
+    
+    @patch('utils.predictor_api_client.requests.post')
+    def test_population_stats_many_unpacks_aliases(self, mock_post):
+        """Test batched gnomAD query unpacks and caches each alias."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'data': {
+                'v0': {'variant_id': '17-43092919-G-A',
+                       'genome': {'ac': 4, 'an': 100000, 'af': 0.00004}},
+                'v1': None,
+                'v2': None,
+            },
+            'errors': [
+                {'message': 'Variant not found', 'path': ['v1']},
+                {'message': 'Internal error', 'path': ['v2']},
+            ]
+        }
+        mock_post.return_value = mock_response
+        
+        client = PopulationAPIClient(api_enabled=True)
+        variants = [('17', 43092919, 'G', 'A'), ('13', 1, 'C', 'T'), ('2', 5, 'A', 'G')]
+        stats = client._fetch_gnomad_many(variants, batch_size=10)
+        
+        assert mock_post.call_count == 1
+        assert stats[('17', 43092919, 'G', 'A')].ac == 4
+        assert stats[('13', 1, 'C', 'T')].is_absent()
+        assert ('2', 5, 'A', 'G') not in stats
+        assert 'gnomad_pop_gnomad_r4_17_43092919_G_A' in client.cache
+        
+        # Second call is served from the per-variant cache
+        client._fetch_gnomad_many(variants[:2], batch_size=10)
+        assert mock_post.call_count == 1
+    
+    @patch('utils.predictor_api_client.requests.post')
+    def test_population_stats_many_falls_back_to_v3(self, mock_post):
+        """Test v3 is queried only for variants without v4 data."""
+        v4_response = Mock(status_code=200)
+        v4_response.json.return_value = {'data': {
+            'v0': {'genome': {'ac': 1, 'an': 1000, 'af': 0.001}},
+            'v1': None,
+        }}
+        v3_response = Mock(status_code=200)
+        v3_response.json.return_value = {'data': {
+            'v0': {'genome': {'ac': 2, 'an': 2000, 'af': 0.001}},
+        }}
+        mock_post.side_effect = [v4_response, v3_response]
+        
+        client = PopulationAPIClient(api_enabled=True)
+        results = client.get_population_stats_many([('1', 10, 'A', 'G'), ('1', 20, 'C', 'T')])
+        
+        v3_call = mock_post.call_args_list[1].kwargs['json']
+        assert v3_call['variables']['datasetId'] == 'gnomad_r3'
+        assert v3_call['variables']['v0'] == '1-20-C-T'
+        assert 'gnomad_v3' not in results[('1', 10, 'A', 'G')]
+        assert results[('1', 20, 'C', 'T')]['gnomad_v3'].ac == 2
+    
+    @patch('utils.api_client.requests.post')
+    def test_api_client_variant_frequencies_batch(self, mock_post):
+        """Test APIClient batch frequency lookup returns per-variant dicts."""
+        mock_response = Mock(status_code=200)
+        mock_response.json.return_value = {'data': {
+            'v0': {'genome': {'ac': 3, 'an': 3000, 'af': 0.001, 'faf95': {'popmax': 0.002}}},
+            'v1': None,
+        }}
+        mock_post.return_value = mock_response
+        
+        client = APIClient(cache_enabled=False)
+        results = client.get_variant_frequencies([('17', 1, 'G', 'A'), ('17', 2, 'G', 'T')])
+        
+        assert mock_post.call_count == 1
+        assert results[('17', 1, 'G', 'A')]['allele_frequency'] == 0.001
+        assert results[('17', 1, 'G', 'A')]['popmax_af'] == 0.002
+        assert results[('17', 2, 'G', 'T')]['allele_count'] == 0
+        assert 'note' in results[('17', 2, 'G', 'T')]
 
 
 # =============================================================================
@@ -0,0 +1,127 @@
+"""
+Tests for the Local Reference Genome
+====================================
+
+Checks FASTA/.fai and .2bit readers against each other, REF allele checks,
+indel left-alignment, and that normalize_variant_id() maps equivalent
+representations to one identifier.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.reference_genome import (
+    IndexedFasta,
+    ReferenceGenomeError,
+    TwoBitFile,
+    clear_reference_genomes,
+    write_twobit,
+)
+from utils.cache import normalize_variant_id
+from utils.api_client import APIClient
+
+
+#              1234567890123456789
+CHR17_START = 'GATTACACAAAGTCTGTCT'
+
+
+def _sequences():
+    rng = random.Random(11)
+    chr17 = CHR17_START + ''.join(rng.choice('ACGT') for _ in range(200)) + 'N' * 13 + 'ACGTACGTAC'
+    return {'chr17': chr17, 'chrM': ''.join(rng.choice('ACGT') for _ in range(37))}
+
+
+@pytest.fixture
+def reference_paths(tmp_path):
+    sequences = _sequences()
+    fasta = tmp_path / 'ref.fa'
+    with open(fasta, 'w') as f:
+        for name, sequence in sequences.items():
+            f.write(f">{name} test\n")
+            for i in range(0, len(sequence), 10):
+                f.write(sequence[i:i + 10] + '\n')
+    twobit = tmp_path / 'ref.2bit'
+    write_twobit(str(twobit), sequences)
+    clear_reference_genomes()
+    yield str(fasta), str(twobit)
+    clear_reference_genomes()
+
+
+class TestReaders:
+    """Tests for FASTA and .2bit access."""
+
+    def test_fasta_and_twobit_agree(self, reference_paths):
+        sequences = _sequences()
+        fasta, twobit = IndexedFasta(reference_paths[0]), TwoBitFile(reference_paths[1])
+        assert os.path.exists(reference_paths[0] + '.fai')
+
+        rng = random.Random(3)
+        for name, sequence in sequences.items():
+            assert fasta.length(name) == twobit.length(name) == len(sequence)
+            for _ in range(100):
+                start = rng.randint(1, len(sequence))
+                end = rng.randint(start, min(len(sequence), start + 30))
+                expected = sequence[start - 1:end]
+                assert fasta.fetch(name, start, end) == expected
+                assert twobit.fetch(name, start, end) == expected
+
+        assert twobit.fetch('17', 218, 222) == sequences['chr17'][217:222]
+        assert 'N' in twobit.fetch('17', 218, 222)
+        assert fasta.fetch('MT', 1, 5) == sequences['chrM'][:5]
+        with pytest.raises(ReferenceGenomeError):
+            fasta.fetch('1', 1)
+        with pytest.raises(ReferenceGenomeError):
+            twobit.fetch('17', 240, 260)
+
+    def test_check_ref_and_normalize(self, reference_paths):
+        genome = TwoBitFile(reference_paths[1])
+        assert genome.check_ref('17', 1, 'GATT')
+        assert not genome.check_ref('17', 1, 'GATC')
+
+        # CAAA at 8-11: deleting any A left-aligns to 8 CA>C
+        assert genome.normalize('17', 10, 'AA', 'A') == ('17', 8, 'CA', 'C')
+        assert genome.normalize('17', 11, 'AG', 'G') == ('17', 8, 'CA', 'C')
+        # Inserting AC into the ACAC repeat (5-8) shifts left to the T at 4
+        assert genome.normalize('17', 8, 'C', 'CAC') == ('17', 4, 'T', 'TAC')
+        # MNV trimming
+        assert genome.normalize('17', 1, 'GATT', 'GACT') == ('17', 3, 'T', 'C')
+        assert genome.normalize('17', 5, 'A', 'G') == ('17', 5, 'A', 'G')
+
+
+class TestNormalizedIds:
+    """Tests for normalize_variant_id() and coordinate validation."""
+
+    def test_equivalent_representations_share_id(self, reference_paths, monkeypatch):
+        assert normalize_variant_id('17', 10, 'AA', 'A') == 'GRCh38:17-10-AA-A'
+
+        monkeypatch.setenv('ACMG_REFERENCE_GENOME', reference_paths[0])
+        assert normalize_variant_id('chr17', 10, 'AA', 'A') == 'GRCh38:17-8-CA-C'
+        assert normalize_variant_id('17', 11, 'ag', 'g') == 'GRCh38:17-8-CA-C'
+        # REF mismatch and other builds are left as given
+        assert normalize_variant_id('17', 10, 'GG', 'G') == 'GRCh38:17-10-GG-G'
+        assert normalize_variant_id('17', 10, 'AA', 'A', 'GRCh37') == 'GRCh37:17-10-AA-A'
+
+    def test_validate_coordinates(self, reference_paths, monkeypatch):
+        monkeypatch.setenv('ACMG_REFERENCE_GENOME', reference_paths[1])
+        client = APIClient(cache_enabled=False)
+
+        mismatch = client.validate_variant_coordinates('17', 1, 'C', 'T')
+        assert not mismatch['valid']
+        assert 'does not match GRCh38 reference (G)' in mismatch['errors'][0]
+
+        shifted = client.validate_variant_coordinates('17', 10, 'AA', 'A')
+        assert shifted['valid']
+        assert shifted['normalized'] == {'chromosome': '17', 'position': 8, 'ref': 'CA', 'alt': 'C'}
+        assert shifted['warnings']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,149 @@
+"""
+Tests for the Local Transcript Model Index
+==========================================
+
+Projects c. <-> g. positions on a small synthetic GFF3 (one plus-strand
+RefSeq transcript, a minus-strand MANE Select transcript and a
+single-exon alternative), and checks exon context, NMD escape and the
+PVS1 downgrade.
+
+Author: Can Sevilmiş
+License: MIT License
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.transcript_index import TranscriptIndex, clear_transcript_indexes, get_transcript_index
+from utils.hgvs_parser import HGVSParser
+from core.evidence_evaluator import EvidenceEvaluator, VariantData
+
+
+# GENEA (+): exons 101-200, 301-400, 501-700; CDS 151-650 (c.1 = 151, 300 nt)
+# GENEB (-): exons 1201-1300, 1001-1100; CDS 1250-1051 (c.1 = 1250)
+GFF = """##gff-version 3
+NC_000001.11\tBestRefSeq\tgene\t101\t700\t.\t+\t.\tID=gene-GENEA;Name=GENEA
+NC_000001.11\tBestRefSeq\tmRNA\t101\t700\t.\t+\t.\tID=rna-NM_000001.1;Parent=gene-GENEA;Name=NM_000001.1;gene=GENEA;transcript_id=NM_000001.1
+NC_000001.11\tBestRefSeq\texon\t101\t200\t.\t+\t.\tID=exon-NM_000001.1-1;Parent=rna-NM_000001.1
+NC_000001.11\tBestRefSeq\texon\t301\t400\t.\t+\t.\tID=exon-NM_000001.1-2;Parent=rna-NM_000001.1
+NC_000001.11\tBestRefSeq\texon\t501\t700\t.\t+\t.\tID=exon-NM_000001.1-3;Parent=rna-NM_000001.1
+NC_000001.11\tBestRefSeq\tCDS\t151\t200\t.\t+\t0\tID=cds-NP_1;Parent=rna-NM_000001.1
+NC_000001.11\tBestRefSeq\tCDS\t301\t400\t.\t+\t1\tID=cds-NP_1;Parent=rna-NM_000001.1
+NC_000001.11\tBestRefSeq\tCDS\t501\t650\t.\t+\t0\tID=cds-NP_1;Parent=rna-NM_000001.1
+chr2\tBestRefSeq\tmRNA\t1001\t1300\t.\t-\t.\tID=rna-NM_000002.2;Name=NM_000002.2;gene=GENEB;tag=MANE Select;transcript_id=NM_000002.2
+chr2\tBestRefSeq\texon\t1201\t1300\t.\t-\t.\tParent=rna-NM_000002.2
+chr2\tBestRefSeq\texon\t1001\t1100\t.\t-\t.\tParent=rna-NM_000002.2
+chr2\tBestRefSeq\tCDS\t1201\t1250\t.\t-\t0\tParent=rna-NM_000002.2
+chr2\tBestRefSeq\tCDS\t1051\t1100\t.\t-\t1\tParent=rna-NM_000002.2
+chr2\tBestRefSeq\tmRNA\t1001\t2000\t.\t-\t.\tID=rna-NM_000003.1;Name=NM_000003.1;gene=GENEB;transcript_id=NM_000003.1
+chr2\tBestRefSeq\texon\t1001\t2000\t.\t-\t.\tParent=rna-NM_000003.1
+chr2\tBestRefSeq\tCDS\t1001\t1999\t.\t-\t0\tParent=rna-NM_000003.1
+"""
+
+
+@pytest.fixture
+def gff_path(tmp_path):
+    path = tmp_path / 'refseq_genomic.gff'
+    path.write_text(GFF)
+    return str(path)
+
+
+@pytest.fixture
+def index(gff_path):
+    return TranscriptIndex.from_gff(gff_path)
+
+
+@pytest.fixture(autouse=True)
+def _clear_indexes():
+    clear_transcript_indexes()
+    yield
+    clear_transcript_indexes()
+
+
+class TestProjection:
+    def test_plus_strand_round_trip(self, index):
+        model = index.get('NM_000001.1')
+        assert model.chrom == '1' and model.exon_count == 3 and model.cds_length == 300
+        cases = {'1': 151, '50': 200, '50+1': 201, '50+50': 250, '51-50': 251,
+                 '51-1': 300, '51': 301, '-1': 150, '-50': 101, '300': 650, '*1': 651}
+        for c_position, g in cases.items():
+            assert model.c_to_g(c_position) == g
+            assert model.g_to_c(g) == c_position
+        # Intronic offsets must be anchored at an exon boundary
+        assert model.c_to_g('49+1') is None
+        assert model.c_to_g('0') is None
+        assert model.c_to_g('*51') is None
+        assert index.c_to_g('NM_000001', 'c.51') == ('1', 301)
+
+    def test_minus_strand_and_preferred_transcript(self, index):
+        model = index.preferred('geneb')
+        assert model.transcript_id == 'NM_000002.2' and model.mane_select
+        assert model.c_to_g('1') == 1250
+        assert model.c_to_g('50') == 1201
+        assert model.c_to_g('50+1') == 1200
+        assert model.c_to_g('51') == 1100
+        assert model.g_to_c(1199) == '50+2'
+        assert {m.transcript_id for m in index.overlapping('chr2', 1050)} == {'NM_000002.2', 'NM_000003.1'}
+
+    def test_hgvs_to_genomic(self, index):
+        projected = HGVSParser.to_genomic('NM_000002.2:c.1A>G', index=index)
+        assert projected == {'transcript': 'NM_000002.2', 'chromosome': '2', 'start': 1250,
+                             'end': 1250, 'strand': '-', 'ref': 'T', 'alt': 'C'}
+        deletion = HGVSParser.to_genomic('c.50_51del', gene='GENEA', index=index)
+        assert (deletion['start'], deletion['end']) == (200, 301)
+        assert HGVSParser.to_genomic('c.1A>G', index=index) is None
+
+
+class TestExonContext:
+    def test_nmd_escape_by_distance_to_last_junction(self, index):
+        upstream = index.locate('NM_000001.1', '100')
+        assert upstream.exon == 2 and upstream.distance_to_last_junction == 51
+        assert not upstream.escapes_nmd
+        boundary = index.locate('NM_000001.1', '101')
+        assert boundary.distance_to_last_junction == 50 and boundary.escapes_nmd
+        last = index.locate('NM_000001.1', '151')
+        assert last.exon == 3 and last.in_last_exon and last.cds_position == 151
+        intronic = index.locate('NM_000001.1', '51-2')
+        assert intronic.exon is None and intronic.intron == 1 and intronic.cds_position is None
+        single = index.locate('NM_000003.1', '10')
+        assert single.distance_to_last_junction is None and single.escapes_nmd
+
+    def test_pvs1_downgraded_when_stop_escapes_nmd(self, gff_path, monkeypatch):
+        monkeypatch.setenv('ACMG_TRANSCRIPT_GFF', gff_path)
+        evaluator = EvidenceEvaluator(test_mode=True)
+        evaluator.test_mode = False
+
+        def pvs1(hgvs):
+            variant = VariantData(basic_info={'gene': 'GENEA', 'transcript': 'NM_000001.1', 'hgvs_c': hgvs})
+            result = {'applies': True, 'strength': 'Very Strong', 'details': 'LOF'}
+            evaluator._apply_nmd_context(variant, result)
+            return result
+
+        assert pvs1('c.100C>T')['strength'] == 'Very Strong'
+        assert pvs1('c.100C>T')['transcript_context']['exon'] == 2
+        assert pvs1('c.160C>T')['strength'] == 'Strong'
+        # Less than 10% of the protein removed
+        assert pvs1('c.280C>T')['strength'] == 'Moderate'
+
+
+class TestSharedIndex:
+    def test_snapshot_round_trip_and_shared_resolution(self, index, gff_path, tmp_path, monkeypatch, capsys):
+        saved = str(tmp_path / 'transcripts.json.gz')
+        index.save(saved)
+        loaded = TranscriptIndex.load(saved)
+        assert len(loaded) == 3
+        assert loaded.get('NM_000002.2') == index.get('NM_000002.2')
+        assert loaded.get('NM_000002.2').c_to_g('51') == 1100
+
+        monkeypatch.setenv('ACMG_TRANSCRIPT_GFF', saved)
+        assert get_transcript_index() is get_transcript_index()
+        assert get_transcript_index().preferred('GENEB').mane_select
+
+        missing = str(tmp_path / 'missing.gff')
+        assert get_transcript_index(missing) is None
+        assert get_transcript_index(missing) is None
+        assert capsys.readouterr().out.count('Local transcript index unavailable') == 1